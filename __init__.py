@@ -11,19 +11,17 @@ from flask import (
     json,
 )
 from werkzeug.utils import secure_filename
-from docx import Document
-from docx.shared import Pt
-from docx.oxml.ns import qn
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from copy import deepcopy
-from PIL import Image
-from io import BytesIO
 from flask_wtf.csrf import CSRFProtect, CSRFError
 from api import api_bp 
 import os
-import re
-from docx.shared import Inches
-from funcionalidades.resaltado import subrayar_texto
+from funcionalidades.informe import procesar_archivo, ruta_plantilla
+from funcionalidades.admision import ControlAdmision, ServidorOcupadoError
+from funcionalidades.subidas import AlmacenSubidas
+from funcionalidades.presupuesto import (
+    GeneracionCanceladaError,
+    PresupuestoGeneracion,
+    sonda_cliente,
+)
 from flask_login import LoginManager, login_required, current_user, login_user
 from flask_mail import Mail, Message
 from models import db, bcrypt, User, PasswordResetToken
@@ -48,6 +46,8 @@ db.init_app(app)
 bcrypt.init_app(app)
 mail = Mail(app)
 csrf = CSRFProtect(app)
+control_informes = ControlAdmision(app)
+almacen_subidas = AlmacenSubidas(app)
 
 #Evita pedir csrf token en la ruta /api/validar-acceso
 csrf.exempt(api_bp)
@@ -89,871 +89,6 @@ def load_user(user_id):
     return db.session.get(User, str(user_id))
 
 
-def aplicar_fuente_cascadia_code(run, size_pt):
-    """
-    Propósito:
-        Aplicar la tipografía específica 'Cascadia Code' y un tamaño determinado
-        a un 'run' (fragmento de texto) dentro de un párrafo de Word.
-
-    Entradas:
-        run (docx.text.run.Run): El objeto Run de python-docx a modificar.
-        size_pt (int/float): El tamaño de la fuente en puntos.
-
-    Salidas:
-        None: Modifica el objeto run directamente en memoria.
-
-    Dependencias:
-        - docx.shared.Pt
-        - docx.oxml.ns.qn
-    """
-    # Establecer el nombre de la fuente principal
-    run.font.name = "Cascadia Code"
-    # Establecer el tamaño usando la unidad Pt (puntos)
-    run.font.size = Pt(size_pt)
-    # Forzar la configuración de fuente para caracteres de Asia Oriental (compatibilidad Word)
-    # Esto asegura que Word reconozca la fuente incluso en configuraciones regionales mixtas
-    run._element.rPr.rFonts.set(qn("w:eastAsia"), "Cascadia Code")
-
-
-def limpiar_texto_xml(texto):
-    """
-    Propósito:
-        Sanitizar cadenas de texto eliminando caracteres de control incompatibles
-        con el estándar XML de Word (.docx), evitando errores al generar el archivo.
-
-    Entradas:
-        texto (str): La cadena de texto original.
-
-    Salidas:
-        str: La cadena limpia y segura para insertar en XML.
-
-    Dependencias:
-        None (usa funciones nativas de str y ord).
-    """
-    # Si el texto es None o vacío, devolverlo tal cual
-    if not texto:
-        return texto
-
-    # Eliminar bytes nulos (NULL bytes) que rompen cualquier parser XML
-    texto = texto.replace("\x00", "")
-
-    # Lista para acumular los caracteres válidos
-    caracteres_permitidos = []
-    
-    # Iterar sobre cada carácter del texto
-    for char in texto:
-        # Obtener el código ASCII/Unicode del carácter
-        code = ord(char)
-        
-        # Criterios de aceptación XML 1.0:
-        # 1. Caracteres imprimibles (code >= 0x20)
-        # 2. Caracteres de control permitidos: Tab (0x09), Salto línea (0x0A), Retorno carro (0x0D)
-        if code >= 0x20 or code in (0x09, 0x0A, 0x0D):
-            # Excluir específicamente el carácter DEL (0x7F)
-            # Excluir rango de control extendido (0x80-0x9F) que a veces causa problemas
-            if code != 0x7F and not (0x80 <= code <= 0x9F):
-                caracteres_permitidos.append(char)
-
-    # Unir la lista en un solo string
-    return "".join(caracteres_permitidos)
-
-
-def pruebas(lines, start_re, end_re):
-    """
-    Propósito:
-        Extraer bloques de texto específicos desde una lista de líneas, delimitados
-        por expresiones regulares de inicio y fin. Usado para aislar los logs de cada prueba.
-
-    Entradas:
-        lines (list[str]): Lista de todas las líneas del archivo de texto.
-        start_re (re.Pattern): Regex compilado que marca el inicio del bloque.
-        end_re (re.Pattern): Regex compilado que marca el fin del bloque.
-
-    Salidas:
-        list[str]: Lista de bloques de texto encontrados (cada bloque es un string con saltos de línea).
-
-    Dependencias:
-        - re (expresiones regulares)
-    """
-    # Lista para guardar los bloques completos encontrados
-    blocks = []
-    # Bandera para saber si estamos actualmente dentro de un bloque
-    collecting = False
-    # Lista temporal para guardar las líneas del bloque actual
-    current = []
-
-    # Recorrer el archivo línea por línea
-    for line in lines:
-        # Quitar espacios al inicio y final para facilitar la detección de patrones
-        stripped = line.strip()
-        
-        # CASO 1: No estamos recolectando y encontramos la marca de inicio
-        if not collecting and start_re.match(stripped):
-            # Activamos la bandera de recolección
-            collecting = True
-            # Iniciamos el bloque actual con esta línea
-            current = [line]
-            # Pasamos a la siguiente iteración
-            continue
-
-        # CASO 2: Estamos recolectando líneas
-        if collecting:
-            # Añadimos la línea actual al buffer
-            current.append(line)
-            
-            # Verificamos si esta línea es la marca de finalización
-            if end_re.match(stripped):
-                # Si es el fin, unimos las líneas acumuladas y las guardamos en blocks
-                blocks.append("\n".join(current))
-                # Desactivamos la bandera para buscar el siguiente bloque
-                collecting = False
-                
-    # Retornar todos los bloques encontrados
-    return blocks
-
-
-def iter_paragraphs(doc):
-    """
-    Propósito:
-        Generador que recorre TODOS los párrafos de un documento Word, incluyendo
-        los que están dentro de tablas (celdas anidadas), para búsqueda y reemplazo global.
-
-    Entradas:
-        doc (docx.Document): El objeto documento a recorrer.
-
-    Salidas:
-        yield: Párrafos individuales (docx.text.paragraph.Paragraph).
-
-    Dependencias:
-        - python-docx
-    """
-    # 1. Iterar sobre párrafos del cuerpo principal del documento
-    for p in doc.paragraphs:
-        yield p
-        
-    # 2. Iterar sobre todas las tablas del documento
-    for table in doc.tables:
-        # Recorrer filas
-        for row in table.rows:
-            # Recorrer celdas
-            for cell in row.cells:
-                # Recorrer párrafos dentro de la celda
-                for p in cell.paragraphs:
-                    yield p
-
-
-def aplicar_fuente_cascadia_code(run, size_pt):
-    run.font.name = "Cascadia Code"
-    run.font.size = Pt(size_pt)
-    run._element.rPr.rFonts.set(qn("w:eastAsia"), "Cascadia Code")
-
-
-def limpiar_texto_xml(texto):
-    """
-    Limpia el texto de caracteres incompatibles con XML.
-    Elimina NULL bytes y caracteres de control excepto tab, newline y carriage return.
-
-    Args:
-        texto: String a limpiar
-
-    Returns:
-        String limpio compatible con XML
-    """
-    if not texto:
-        return texto
-
-    # Eliminar NULL bytes
-    texto = texto.replace("\x00", "")
-
-    # Eliminar caracteres de control (0x00-0x1F) excepto tab (0x09), newline (0x0A), carriage return (0x0D)
-    # También eliminar DEL (0x7F) y caracteres de control en rango extendido (0x80-0x9F)
-    caracteres_permitidos = []
-    for char in texto:
-        code = ord(char)
-        # Permitir caracteres normales, tab, newline, carriage return
-        if code >= 0x20 or code in (0x09, 0x0A, 0x0D):
-            # Excluir DEL y caracteres de control extendidos
-            if code != 0x7F and not (0x80 <= code <= 0x9F):
-                caracteres_permitidos.append(char)
-
-    return "".join(caracteres_permitidos)
-
-
-# Función para extraer bloques
-def pruebas(lines, start_re, end_re):
-    blocks = []
-    collecting = False
-    current = []
-    for line in lines:
-        stripped = line.strip()
-        if not collecting and start_re.match(stripped):
-            collecting = True
-            current = [line]
-            continue
-
-        if collecting:
-            current.append(line)
-            if end_re.match(stripped):
-                blocks.append("\n".join(current))
-                collecting = False
-    return blocks
-
-
-def iter_paragraphs(doc):
-    for p in doc.paragraphs:
-        yield p
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    yield p
-
-
-# EMu_PER_INCH:
-#   Número de EMUs (English Metric Units) que hay en una pulgada.
-#   Es la unidad interna que usa Word para tamaños.
-EMu_PER_INCH = 914400
-
-# DEFAULT_DPI:
-#   DPI "fijo" que vamos a usar para convertir píxeles a pulgadas.
-#   Muchos archivos traen 300/600 DPI y eso hace que Word las vea "muy pequeñas".
-DEFAULT_DPI = 96
-
-
-def _get_image_emu_size(image_bytes, max_width_cm=None):
-    """
-    Propósito:
-        Calcular el tamaño de una imagen en EMUs (unidades que usa Word),
-        partiendo de sus dimensiones en píxeles. Opcionalmente limita el
-        ancho máximo para que la imagen no sea gigantesca en la página.
-
-    Entradas:
-        image_bytes (bytes):
-            Bytes crudos de la imagen (tal como los devuelve .read()).
-        max_width_cm (float | None):
-            - None: no limita el ancho, se respeta el tamaño según píxeles.
-            - Número en centímetros: si la imagen es más ancha, se escala
-              proporcionalmente para que no supere ese ancho.
-
-    Salidas:
-        (cx, cy) (tuple[int, int]):
-            Tupla con ancho (cx) y alto (cy) de la imagen en EMUs.
-
-    Dependencias:
-        - PIL.Image (from PIL import Image)
-        - io.BytesIO (from io import BytesIO)
-        - EMu_PER_INCH (constante de este módulo)
-        - DEFAULT_DPI (constante de este módulo)
-    """
-
-    # Abrimos la imagen desde los bytes usando un buffer en memoria
-    img = Image.open(BytesIO(image_bytes))
-
-    # Obtenemos el tamaño de la imagen en píxeles (ancho y alto)
-    px_w, px_h = img.size
-
-    # Convertimos píxeles a pulgadas usando un DPI fijo (DEFAULT_DPI)
-    #   width_inch  = ancho_en_pixeles  / DPI
-    #   height_inch = alto_en_pixeles   / DPI
-    width_inch = px_w / DEFAULT_DPI
-    height_inch = px_h / DEFAULT_DPI
-
-    # Si se especificó un ancho máximo en centímetros, lo aplicamos.
-    if max_width_cm is not None:
-        # Pasamos de cm a pulgadas: 1 pulgada = 2.54 cm
-        max_width_inch = max_width_cm / 2.54
-
-        # Si la imagen es más ancha que el máximo permitido...
-        if width_inch > max_width_inch:
-            # Calculamos un factor de escala (target / actual)
-            scale = max_width_inch / width_inch
-
-            # Escalamos tanto ancho como alto para mantener la proporción
-            width_inch *= scale
-            height_inch *= scale
-
-    # Ahora convertimos pulgadas a EMUs:
-    #   EMUs = pulgadas * EMu_PER_INCH
-    cx = int(width_inch * EMu_PER_INCH)
-    cy = int(height_inch * EMu_PER_INCH)
-
-    # Devolvemos ancho y alto en EMUs
-    return cx, cy
-
-def reemplazar_imagen_flotante(doc, marker, image_file):
-    """
-    Propósito:
-        Reemplazar en el documento Word la imagen de un placeholder
-        identificado por el atributo descr == marker, usando la imagen
-        subida por el usuario y ajustando su tamaño.
-
-    Entradas:
-        doc (docx.Document):
-            Documento Word cargado con python-docx.
-        marker (str):
-            Valor del atributo 'descr' en <pic:cNvPr>, por ejemplo "IMG1".
-        image_file (FileStorage):
-            Archivo de imagen recibido por Flask (request.files[...]).
-    
-    Salidas:
-        None. Modifica el documento `doc` en memoria.
-
-    Dependencias:
-        - doc.part.get_or_add_image
-        - _get_image_emu_size
-        - doc.element.xpath
-        - qn (docx.oxml.ns.qn)
-    """
-
-    # Leer todos los bytes del archivo de imagen subido.
-    image_bytes = image_file.read()
-
-    # Registrar la imagen dentro del paquete .docx y obtener el nuevo rId.
-    # new_rId: ID de relación para referenciar la imagen desde el XML.
-    # _: objeto ImagePart que no necesitamos guardar aquí.
-    new_rId, _ = doc.part.get_or_add_image(BytesIO(image_bytes))
-
-    # Calcular el tamaño de la imagen en EMUs.
-    # max_width_cm=16 limita el ancho máximo a ~16 cm, manteniendo proporción.
-    cx, cy = _get_image_emu_size(image_bytes, max_width_cm=16)
-
-    # Recorrer todos los nodos <w:drawing> del documento.
-    # Ahí es donde se guardan las imágenes e ilustraciones.
-    for drawing in doc.element.xpath(".//w:drawing"):
-
-        # Dentro de cada <w:drawing> buscamos el nodo <pic:pic> (la imagen en sí).
-        pics = drawing.xpath(".//pic:pic")
-        if not pics:
-            # Si no hay imagen en este drawing, pasamos al siguiente.
-            continue
-
-        # Buscar el nodo <pic:cNvPr> que tiene atributos como name y descr.
-        cNvPr_list = pics[0].xpath(".//pic:cNvPr")
-        if not cNvPr_list:
-            # Si no existe, no podemos comprobar el descr, así que seguimos.
-            continue
-
-        cNvPr = cNvPr_list[0]
-
-        # Solo queremos modificar el dibujo cuyo descr coincide con nuestro marcador.
-        # Ej: descr="IMG1", descr="IMG2", etc.
-        if cNvPr.get("descr") != marker:
-            # Si no coincide, seguimos con el siguiente <w:drawing>.
-            continue
-
-        # Si llegamos aquí, encontramos el placeholder correcto.
-
-        # Dentro de <pic:pic> buscamos <a:blip>, que tiene el atributo r:embed
-        # apuntando al rId de la imagen actual.
-        blip_list = pics[0].xpath(".//a:blip")
-        if not blip_list:
-            # Si no hay blip, algo raro pasa, salimos del bucle.
-            break
-
-        blip = blip_list[0]
-
-        # Actualizamos r:embed para que apunte al nuevo rId (la imagen subida).
-        blip.set(qn("r:embed"), new_rId)
-
-        # Buscar <wp:extent>, que define ancho y alto de la imagen en EMUs.
-        extent_list = drawing.xpath(".//wp:extent")
-        if extent_list:
-            extent = extent_list[0]
-            # Actualizar ancho (cx) y alto (cy) en EMUs.
-            extent.set("cx", str(cx))
-            extent.set("cy", str(cy))
-
-        # Rompemos el bucle porque ya reemplazamos el placeholder que nos interesaba.
-        break
-
-
-
-
-def insertar_imagenes(doc, image_files, marker):
-    """
-    Propósito:
-        Gestionar la inserción de una o varias imágenes en los placeholders del documento.
-        Clona el placeholder original si se deben insertar múltiples archivos.
-
-    Entradas:
-        doc (docx.Document): Documento Word abierto en memoria.
-        image_files (list[FileStorage]): Lista de imágenes subidas desde Flask.
-        marker (str): Valor del atributo 'descr' en <pic:cNvPr> que identifica el placeholder.
-
-    Salidas:
-        None: Modifica el objeto `doc` directamente.
-
-    Dependencias:
-        - reemplazar_imagen_flotante: maneja la carga de bytes, generación de rId y actualización de XML.
-        - deepcopy: permite clonar nodos XML para insertar múltiples instancias sin perder el original.
-        - doc.element.xpath: busca nodos <w:drawing> que contienen los placeholders.
-    """
-    # 1) Buscar todos los contenedores <w:drawing> con el marker en <pic:cNvPr>
-    drawings = [
-        d
-        for d in doc.element.xpath(".//w:drawing")  # obtiene lista de nodos <w:drawing>
-        if d.xpath(".//pic:cNvPr")[0].get("descr")
-        == marker  # filtra solo los que coinciden con marker
-    ]
-    #    Por qué: identificar todas las posiciones donde puede ir una imagen.
-    #    Relación: estos nodos serán actualizados por reemplazar_imagen_flotante.
-    if not drawings:
-        # Por qué: si no encuentra placeholders, no hay nada que reemplazar.
-        # Relación: evita llamar a reemplazar_imagen_flotante innecesariamente.
-        return
-
-    # 2) Seleccionar el primer placeholder como plantilla
-    first = drawings[0]  # nodo XML <w:drawing> original
-    #    Por qué: usamos el primer nodo para la primera imagen y como base para clonar.
-    #    Relación: reemplazar_imagen_flotante siempre repara el primer placeholder.
-    parent = first.getparent()  # contenedor XML de los drawings
-    #    Por qué: necesitamos el nodo padre para insertar clones.
-    #    Relación: parent.insert se usará para agregar nodos clonados.
-    idx = parent.index(first)  # posición del placeholder original en `parent`
-    #    Por qué: conocer el índice inicial permite calcular posición de inserción.
-    #    Relación: idx + i determina dónde ubicar cada clon.
-
-    # 3) Iterar sobre cada imagen subida
-    for i, img in enumerate(
-        image_files
-    ):  # i: índice (0,1,2...), img: objeto FileStorage
-        # 3.1) Determinar nodo a usar: original si i=0, clon si i>0
-        drawing = first if i == 0 else deepcopy(first)
-        #      Por qué: el primer placeholder se actualiza directamente,
-        #      y para más imágenes mantenemos la anterior intacta.
-        #      Relación: deepcopy crea un nodo independiente para no interferir con el original.
-
-        # 3.2) Reemplazar contenido y tamaño en el placeholder original
-        reemplazar_imagen_flotante(doc, marker, img)
-        #      Por qué: esta función maneja la inserción real del binario,
-        #      generación de new_rId y ajuste de dimensiones.
-        #      Relación: conecta image_files con <a:blip r:embed> y <wp:extent>.
-
-        # 3.3) Insertar el clon tras el original si es imagen adicional
-        if i > 0:
-            parent.insert(idx + i, drawing)
-            #      Por qué: ubicamos cada nueva imagen en orden de subida.
-            #      Relación: mantiene la secuencia de <w:drawing> en el XML.
-
-    # Fin de insertar_imagenes: cada img en image_files aparece en un <w:drawing> distinto
-
-
-def replace_marker_with_text(doc, marker, text):
-    for p in iter_paragraphs(doc):
-        if marker in p.text:
-            # Eliminar runs viejos
-            for run in list(p.runs):
-                p._p.remove(run._r)
-
-            # Limpiar el texto del párrafo (por si queda el marcador)
-            p.text = ""
-
-            # Limpiar el texto de caracteres incompatibles con XML
-            text = limpiar_texto_xml(str(text))
-
-            # Crear run con el texto nuevo
-            run = p.add_run(text)
-            run.font.name = "Arial"
-
-            # Compatibilidad para fuentes
-            run._element.rPr.rFonts.set(qn("w:eastAsia"), "Arial")
-
-            if marker == "{{proyecto}}":
-                run.font.size = Pt(13)
-                run.bold = True
-                p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            else:
-                # Para cliente, orden_compra, nota_venta
-                run.font.size = Pt(11)
-                run.bold = False
-                p.alignment = (
-                    WD_PARAGRAPH_ALIGNMENT.CENTER
-                )  
-            return
-
-
-# ====== Insertar texto en Word =======
-def insertar_texto(doc, marker, texto, size_pt):
-    """
-    Busca celdas con `marker`, borra su contenido y agrega todo el `texto`
-    línea a línea con la fuente y tamaño indicados.
-    Devuelve la lista de párrafos creados (para más tarde resaltar).
-    """
-    paras = []
-
-    # Limpiar el texto de caracteres incompatibles con XML
-    texto = limpiar_texto_xml(texto)
-
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                if marker in cell.text:
-                    cell.text = ""
-                    para = cell.add_paragraph()
-                    para.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                    for line in texto.split("\n"):
-                        # Limpiar cada línea individualmente por seguridad
-                        line = limpiar_texto_xml(line)
-                        run = para.add_run(line)
-                        aplicar_fuente_cascadia_code(run, size_pt)
-                        para.add_run("\n")  # salto tras cada línea
-                    paras.append(para)
-    return paras
-
-
-def insertar_info_dispositivo(doc, modelo, serial, version):
-    # Limpiar los valores de caracteres incompatibles con XML
-    modelo = limpiar_texto_xml(modelo) if modelo else ""
-    serial = limpiar_texto_xml(serial) if serial else ""
-    version = limpiar_texto_xml(version) if version else ""
-
-    # También revisamos las celdas de todas las tablas en el documento, por si no están en párrafos
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                if "{{modelo}}" in cell.text:
-                    cell.text = cell.text.replace("{{modelo}}", modelo)
-                    para = cell.paragraphs[0]
-                    para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER  # Centrar texto
-                    # Aplicar formato Arial 11 a todo el párrafo
-                    for run in para.runs:
-                        run.font.name = "Arial"
-                        run.font.size = Pt(11)
-                        run._element.rPr.rFonts.set(qn("w:eastAsia"), "Arial")
-
-                if "{{serial}}" in cell.text:
-                    cell.text = cell.text.replace("{{serial}}", serial)
-                    para = cell.paragraphs[0]
-                    para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER  # Centrar texto
-                    for run in para.runs:
-                        run.font.name = "Arial"
-                        run.font.size = Pt(11)
-                        run._element.rPr.rFonts.set(qn("w:eastAsia"), "Arial")
-
-                if "{{version}}" in cell.text:
-                    cell.text = cell.text.replace("{{version}}", version)
-                    para = cell.paragraphs[0]
-                    para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER  # Centrar texto
-                    for run in para.runs:
-                        run.font.name = "Arial"
-                        run.font.size = Pt(11)
-                        run._element.rPr.rFonts.set(qn("w:eastAsia"), "Arial")
-
-
-def procesar_archivo(
-    file_stream,
-    docx_template_path,
-    img_1,
-    img_2,
-    img_3,
-    proyecto,
-    cliente,
-    ordenCompra,
-    notaVenta,
-    file_type,
-):
-
-    # Carga la plantilla
-    doc = Document(docx_template_path)
-
-    # Leemos todo el contenido del TXT en 'lines'
-    file_stream.seek(0)
-    lines = file_stream.read().decode("utf-8").split("\n")
-
-    # --------- EXTRACCION DE INFORMACION DEL DISPOSITIVO ----------
-    # Inicializamos variables para almacenar información del dispositivo
-    modelo, serial, version = None, None, None
-
-    # Expresiones regulares para extraer información del dispositivo
-    if (
-        file_type == "SW L2 9200"
-        or file_type == "SW L2 9300"
-        or file_type == "SW L2 9500"
-    ):
-        # Ahora buscamos el bloque de "INICIO PRUEBA 1"
-        patron_inicio_prueba_1 = re.compile(
-            r".*[#>]\s*INICIO\s+PRUEBA\s+1\b", re.IGNORECASE
-        )
-        # Expresiones regulares para extraer información del dispositivo
-        modelo_regex = re.compile(r"Model Number\s*:\s*(\S+)", re.IGNORECASE)
-        serial_regex = re.compile(r"System Serial Number\s*:\s*(\S+)", re.IGNORECASE)
-
-        # Buscar información del dispositivo
-        for line in lines:
-            model_match = modelo_regex.search(line)
-            serial_match = serial_regex.search(line)
-
-            if model_match:
-                modelo = model_match.group(1).strip()
-            if serial_match:
-                serial = serial_match.group(1).strip()
-
-        for line in lines:
-            match = patron_inicio_prueba_1.match(line.strip())
-            if match:
-                # Contenido dentro de prueba 1
-                for siguiente_linea in lines[
-                    lines.index(line) :
-                ]:  # Comienza a buscar en las líneas siguientes a la línea actual (donde se encontró "INICIO PRUEBA 1") para encontrar la línea que contiene la versión.
-                    version_match = re.search(
-                        r"Version\s+(\S+)", siguiente_linea, re.IGNORECASE
-                    )  # Usa una expresión regular para buscar la línea que contiene "Version" y capturar el valor que le sigue.
-                    if version_match:
-                        version = version_match.group(1).strip()
-                        break  # Salir del bucle al encontrar la versión
-                break  # Salir del bucle principal al encontrar el bloque de prueba
-
-    elif file_type == "SW L3 9348GC" or file_type == "SW L3 C93180YC":
-        # Ahora buscamos el bloque de "INICIO PRUEBA 1"
-        patron_inicio_prueba_1 = re.compile(
-            r".*[#>]\s*INICIO\s+PRUEBA\s+1\b", re.IGNORECASE
-        )
-        for line in lines:
-            match = patron_inicio_prueba_1.match(line.strip())
-            if match:
-                # Contenido dentro de prueba 1
-                for siguiente_linea in lines[
-                    lines.index(line) + 1 :
-                ]:  # Comienza a buscar desde la siguiente línea
-                    model_match = re.search(
-                        r"PID:\s*(\S+)", siguiente_linea, re.IGNORECASE
-                    )
-                    serial_match = re.search(
-                        r"SN:\s*(\S+)", siguiente_linea, re.IGNORECASE
-                    )
-                    version_match = re.search(
-                        r"NXOS:\s+version\s+(\S+)", siguiente_linea, re.IGNORECASE
-                    )
-
-                    if model_match:
-                        modelo = model_match.group(1).strip()
-                    if serial_match:
-                        serial = serial_match.group(1).strip()
-                    if version_match:
-                        version = version_match.group(1).strip()
-
-                    # Verificar si se encontraron todos los datos
-                    if modelo and serial and version:
-                        break  # Salir del bucle si todos están encontrados
-                break  # Salir del bucle principal al encontrar el bloque de prueba
-
-    elif file_type == "SW IE3300" or file_type == "SW IE4010":
-        # Ahora buscamos el bloque de "INICIO PRUEBA 1"
-        patron_inicio_prueba_1 = re.compile(
-            r".*[#>]\s*INICIO\s+PRUEBA\s+1\b", re.IGNORECASE
-        )
-
-        # Expresiones regulares para extraer información del dispositivo
-        modelo_regex = re.compile(r"Model Number\s*:\s*(\S+)", re.IGNORECASE)
-        serial_regex = re.compile(r"System Serial Number\s*:\s*(\S+)", re.IGNORECASE)
-
-        # Buscar información del dispositivo
-        for line in lines:
-            model_match = modelo_regex.search(line)
-            serial_match = serial_regex.search(line)
-
-            if model_match:
-                modelo = model_match.group(1).strip()
-            if serial_match:
-                serial = serial_match.group(1).strip()
-
-        for line in lines:
-            match = patron_inicio_prueba_1.match(line.strip())
-            if match:
-                # Contenido dentro de prueba 1
-                for siguiente_linea in lines[
-                    lines.index(line) :
-                ]:  # Comienza a buscar en las líneas siguientes a la línea actual (donde se encontró "INICIO PRUEBA 1") para encontrar la línea que contiene la versión.
-                    version_match = re.search(
-                        r"Version\s+(\S+)", siguiente_linea, re.IGNORECASE
-                    )  # Usa una expresión regular para buscar la línea que contiene "Version" y capturar el valor que le sigue.
-                    if version_match:
-                        version = version_match.group(1).strip()
-                        break  # Salir del bucle al encontrar la versión
-                break  # Salir del bucle principal al encontrar el bloque de prueba
-
-    elif file_type == "Router C8500" or file_type == "Router ISR4431":
-        # Ahora buscamos el bloque de "INICIO PRUEBA 1"
-        patron_inicio_prueba_1 = re.compile(
-            r".*[#>]\s*INICIO\s+PRUEBA\s+1\b", re.IGNORECASE
-        )
-        for line in lines:
-            match = patron_inicio_prueba_1.match(line.strip())
-            if match:
-                # Contenido dentro de prueba 1
-                for siguiente_linea in lines[
-                    lines.index(line) + 1 :
-                ]:  # Comienza a buscar desde la siguiente línea
-                    model_match = re.search(
-                        r"PID:\s*(\S+)", siguiente_linea, re.IGNORECASE
-                    )
-                    serial_match = re.search(
-                        r"SN:\s*(\S+)", siguiente_linea, re.IGNORECASE
-                    )
-
-                    if model_match:
-                        modelo = model_match.group(1).strip()
-                    if serial_match:
-                        serial = serial_match.group(1).strip()
-
-                    # Verificar si se encontraron todos los datos
-                    if modelo and serial:
-                        break  # Salir del bucle si todos están encontrados
-                break  # Salir del bucle principal al encontrar el bloque de prueba
-
-        for line in lines:
-            match = patron_inicio_prueba_1.match(line.strip())
-            if match:
-                # Contenido dentro de prueba 1
-                for siguiente_linea in lines[
-                    lines.index(line) :
-                ]:  # Comienza a buscar en las líneas siguientes a la línea actual (donde se encontró "INICIO PRUEBA 1") para encontrar la línea que contiene la versión.
-                    version_match = re.search(
-                        r"Version\s+(\S+)", siguiente_linea, re.IGNORECASE
-                    )  # Usa una expresión regular para buscar la línea que contiene "Version" y capturar el valor que le sigue.
-                    if version_match:
-                        version = version_match.group(1).strip()
-                        break  # Salir del bucle al encontrar la versión
-                break  # Salir del bucle principal al encontrar el bloque de prueba
-
-    elif (
-        file_type == "AP C9115AXI"
-        or file_type == "AP C9120AXE"
-        or file_type == "AP C9130AXI"
-    ):
-        # Expresiones regulares para extraer información del dispositivo
-        modelo_regex = re.compile(r"Product/Model Number\s*:\s*(\S+)", re.IGNORECASE)
-        serial_regex = re.compile(
-            r"Top Assembly Serial Number\s*:\s*(\S+)", re.IGNORECASE
-        )
-        version_regex = re.compile(r"Primary Boot Image\s*:\s*(\S+)", re.IGNORECASE)
-
-        # Buscar información del dispositivo
-        for line in lines:
-            model_match = modelo_regex.search(line)
-            serial_match = serial_regex.search(line)
-            version_match = version_regex.search(line)
-
-            if model_match:
-                modelo = model_match.group(1).strip()
-            if serial_match:
-                serial = serial_match.group(1).strip()
-            if version_match:
-                version = version_match.group(1).strip()
-
-    elif (
-        file_type == "AP C9115AXI"
-        or file_type == "AP C9120AXE"
-        or file_type == "AP C9130AXI"
-    ):
-        # Expresiones regulares para extraer información del dispositivo
-        modelo_regex = re.compile(r"Product/Model Number\s*:\s*(\S+)", re.IGNORECASE)
-        serial_regex = re.compile(
-            r"Top Assembly Serial Number\s*:\s*(\S+)", re.IGNORECASE
-        )
-        version_regex = re.compile(r"Primary Boot Image\s*:\s*(\S+)", re.IGNORECASE)
-
-        # Buscar información del dispositivo
-        for line in lines:
-            model_match = modelo_regex.search(line)
-            serial_match = serial_regex.search(line)
-            version_match = version_regex.search(line)
-
-            if model_match:
-                modelo = model_match.group(1).strip()
-            if serial_match:
-                serial = serial_match.group(1).strip()
-            if version_match:
-                version = version_match.group(1).strip()
-
-    elif file_type == "Check Point 6200" or file_type == "Check Point 6600":
-        # Expresiones regulares para extraer información del dispositivo
-        modelo_regex = re.compile(
-            r"Appliance Name\s*:\s*(.+)", re.IGNORECASE
-        )  # Captura todo lo que sigue
-        serial_regex = re.compile(r"Appliance SN\s*:\s*(\S+)", re.IGNORECASE)
-        version_regex = re.compile(
-            r"SVN Foundation Version String\s*:\s*(\S+)", re.IGNORECASE
-        )
-
-        # Buscar información del dispositivo
-        for line in lines:
-            model_match = modelo_regex.search(line)
-            serial_match = serial_regex.search(line)
-            version_match = version_regex.search(line)
-
-            if model_match:
-                modelo = model_match.group(1).strip()
-            if serial_match:
-                serial = serial_match.group(1).strip()
-            if version_match:
-                version = version_match.group(1).strip()
-
-    # Insertar información del dispositivo en el documento
-    insertar_info_dispositivo(doc, modelo, serial, version)
-
-    # -------------PRUEBAS--------------
-    # 1) Primero, buscamos cuántas "pruebas" hay en el texto.
-    #    Cada instrucción de inicio de prueba debería tener formato:
-    #       # INICIO PRUEBA {numero}
-    #   Extraemos todos los números que aparezcan en esas líneas.
-    patron_inicio_any = re.compile(r".*[#>]\s*INICIO\s+PRUEBA\s+(\d+)\b", re.IGNORECASE)
-    numeros_encontrados = set()
-
-    for line in lines:
-        match = patron_inicio_any.match(line.strip())
-        if match:
-            numeros_encontrados.add(int(match.group(1)))
-
-    buffer = BytesIO()
-    if not numeros_encontrados:
-        doc.save(buffer)
-        buffer.seek(0)
-        nombre = f"{file_type}_documento_vacio.docx"
-        return buffer, nombre
-
-    # 2) Ordenamos los números de prueba (1, 2, 3, ...)
-    numeros_ordenados = sorted(numeros_encontrados)
-    # 3) Por cada número de prueba, construimos los regex de inicio y fin,
-    #    llamamos a 'pruebas' para extraer el bloque, y luego insertamos el texto
-    contador = 0
-    for n in numeros_ordenados:
-        # Creamos un patrón para:    # INICIO PRUEBA {n}
-        start_re = re.compile(rf".*[#>]\s*INICIO\s+PRUEBA\s+{n}\b", re.IGNORECASE)
-        # Creamos un patrón para:    # FIN PRUEBA {n}
-        end_re = re.compile(rf".*[#>]\s*FIN\s+PRUEBA\s+{n}\b", re.IGNORECASE)
-
-        # Extraemos el bloque correspondiente a esa prueba
-        bloques = pruebas(lines, start_re, end_re)
-
-        # Si encontramos bloques, los procesamos uno a uno.
-        # El texto a insertar lleva un sufijo con dos dígitos, p. ej. "01", "02", ...
-        sufijo = f"{n:02d}"
-        texto_label = f"Insertar codigo de la extracción {sufijo}"
-
-        for bloque in bloques:
-            contador = n
-            # Se inserta el texto
-            paras = insertar_texto(doc, texto_label, bloque, 8)
-            # Se subraya el texto
-            subrayar_texto(paras, file_type, contador)
-
-    # Se insertan las imagenes
-    # Se reemplazan las imágenes flotantes predefinidas
-    insertar_imagenes(doc, img_1, "IMG1")
-    insertar_imagenes(doc, img_2, "IMG2")
-    insertar_imagenes(doc, img_3, "IMG3")
-    replace_marker_with_text(doc, "{{proyecto}}", proyecto)
-    replace_marker_with_text(doc, "{{cliente}}", cliente)
-    replace_marker_with_text(doc, "{{orden_compra}}", ordenCompra)
-    replace_marker_with_text(doc, "{{nota_venta}}", notaVenta)
-    # 4) Una vez terminadas todas las pruebas, guardamos el documento
-    doc.save(buffer)
-    buffer.seek(0)
-    nombre = f"{modelo} {serial}.docx"
-    return buffer, nombre
-
-
 def necesita_pago(user):
     """
     Propósito:
@@ -2207,66 +1342,47 @@ def upload_files():
         if file:
             filename = secure_filename(file.filename)
             # Plantilla basada en el tipo de archivo
-            if file_type == "SW L2 9200" or file_type == "SW L2 9300":
-                docx_template_path = os.path.join(
-                    "plantillas", "Template Extraccion SW 9200 - 9300.docx"
-                )
-
-            elif file_type == "SW L2 9500":
-                docx_template_path = os.path.join(
-                    "plantillas", "Template Extraccion SW 9500.docx"
-                )
-
-            elif file_type == "SW L3 9348GC" or file_type == "SW L3 C93180YC":
-                docx_template_path = os.path.join(
-                    "plantillas", "Template Extraccion SW 9348GC - C93180YC.docx"
-                )
-
-            elif file_type == "SW IE3300" or file_type == "SW IE4010":
-                docx_template_path = os.path.join(
-                    "plantillas", "Template Extraccion SW IE 3300 - 4010.docx"
-                )
-
-            elif file_type == "Router C8500":
-                docx_template_path = os.path.join(
-                    "plantillas", "Template Extraccion Router C8500.docx"
-                )
+            docx_template_path = ruta_plantilla(file_type, "plantillas")
 
-            elif file_type == "Router ISR4431":
-                docx_template_path = os.path.join(
-                    "plantillas", "Template Extraccion Router ISR4431.docx"
-                )
-
-            elif (
-                file_type == "AP C9115AXI"
-                or file_type == "AP C9120AXE"
-                or file_type == "AP C9130AXI"
-            ):
-                docx_template_path = os.path.join(
-                    "plantillas",
-                    "Template Extraccion C9115AXI-A,C9120AXE-A,C9130AXI-A.docx",
-                )
-
-            elif file_type == "Check Point 6200" or file_type == "Check Point 6600":
-                docx_template_path = os.path.join(
-                    "plantillas", "Template Extraccion Check Point 6200P - 6600P.docx"
+            # Procesamiento de archivo (con límite de informes simultáneos)
+            try:
+                with control_informes.turno(current_user.id_usuario):
+                    # El presupuesto corre desde que se obtiene el turno
+                    presupuesto = PresupuestoGeneracion(
+                        tiempo_maximo=app.config["INFORME_TIEMPO_MAXIMO"],
+                        tiempo_resaltado=app.config["INFORME_TIEMPO_RESALTADO"],
+                        cliente_conectado=sonda_cliente(request.environ),
+                    )
+                    word_buffer, download_filename = procesar_archivo(
+                        file.stream,
+                        docx_template_path,
+                        img_1,
+                        img_2,
+                        img_3,
+                        proyecto,
+                        cliente,
+                        ordenCompra,
+                        notaVenta,
+                        file_type,
+                        paralelo=app.config["INFORME_PARALELO"],
+                        max_procesos=app.config["INFORME_MAX_PROCESOS"],
+                        presupuesto=presupuesto,
+                    )
+            except GeneracionCanceladaError as e:
+                app.logger.warning(f"[INFORME] Generación cancelada ({e.motivo}) en etapa: {e.etapa}")
+                if e.motivo == "cliente_desconectado":
+                    # Nadie va a recibir la respuesta
+                    return "", 499
+                flash(f"{e} Intenta nuevamente en unos minutos.", "danger")
+                return render_template("informes.html", opciones=opciones), 503
+            except ServidorOcupadoError as e:
+                flash(f"{e} Intenta nuevamente en {e.reintentar_en} segundos.", "warning")
+                return (
+                    render_template("informes.html", opciones=opciones),
+                    503,
+                    {"Retry-After": str(e.reintentar_en)},
                 )
 
-            # Procesamiento de archivo
-
-            word_buffer, download_filename = procesar_archivo(
-                file.stream,
-                docx_template_path,
-                img_1,
-                img_2,
-                img_3,
-                proyecto,
-                cliente,
-                ordenCompra,
-                notaVenta,
-                file_type,
-            )
-
             # Limpiar el nombre del archivo
             download_filename = (
                 download_filename.strip().replace("\n", "").replace("\r", "")
@@ -1,11 +1,109 @@
-from flask import Blueprint, request, jsonify
-from models import User
+from flask import Blueprint, request, jsonify, current_app, abort, g
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from werkzeug.utils import secure_filename
+from models import db, User
 from utils import suscripcion_vigente 
+from funcionalidades.subidas import SubidaError
+from funcionalidades.licencias import (
+    LicenciaInvalidaError,
+    cargar_clave_privada,
+    emitir_licencia,
+    verificar_licencia,
+)
+from datetime import datetime, time as hora, timezone
+from functools import wraps
+import hmac
+import time
 
 
 # Creamos un "grupo" de rutas llamado 'api
 api_bp = Blueprint('api', __name__)
 
+
+def _serializador_tokens():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt="api-escritorio")
+
+
+def emitir_token(user):
+    """Token Bearer firmado para las rutas de la API que usa el ejecutable."""
+    return _serializador_tokens().dumps({"id": str(user.id_usuario)})
+
+
+def _clave_licencias():
+    clave = current_app.config.get("LICENCIA_CLAVE_PRIVADA")
+    return cargar_clave_privada(clave) if clave else None
+
+
+def emitir_licencia_escritorio(user):
+    """
+    Licencia firmada con la que el ejecutable inicia sesión sin conexión.
+    Vence con la suscripción, y como máximo LICENCIA_VIGENCIA_MAXIMA después
+    de emitida. None si el servidor no tiene clave de licencias.
+    """
+    clave = _clave_licencias()
+    if clave is None:
+        return None
+
+    hasta = time.time() + current_app.config.get("LICENCIA_VIGENCIA_MAXIMA", 3 * 24 * 3600)
+    # Las fechas de la base se guardan en UTC sin zona horaria
+    if user.licencia_valida_hasta:
+        fin_suscripcion = user.licencia_valida_hasta
+    else:
+        fin_suscripcion = datetime.combine(user.fecha_fin_suscripcion, hora(23, 59, 59))
+    hasta = min(hasta, fin_suscripcion.replace(tzinfo=timezone.utc).timestamp())
+
+    datos = {
+        "id": str(user.id_usuario),
+        "email": user.email,
+        "usuario": f"{user.nombre} {user.apellido}",
+    }
+    return emitir_licencia(clave, datos, hasta)
+
+
+def _usuario_de_licencia(token):
+    """id_usuario de una licencia vigente firmada por este servidor, o None."""
+    clave = _clave_licencias()
+    if clave is None:
+        return None
+    try:
+        return verificar_licencia(clave.public_key(), token).get("id")
+    except LicenciaInvalidaError:
+        return None
+
+
+def token_requerido(vista):
+    """
+    Decorador: exige 'Authorization: Bearer <token>' vigente (token de la API
+    o licencia del ejecutable), de una cuenta activa con suscripción vigente.
+    Deja el usuario en g.usuario_api.
+    """
+    @wraps(vista)
+    def vista_protegida(*args, **kwargs):
+        esquema, _, token = request.headers.get("Authorization", "").partition(" ")
+        if esquema.lower() != "bearer" or not token:
+            return jsonify({"error": "Falta el token de acceso"}), 401
+
+        # Con sesión iniciada sin conexión, el ejecutable solo tiene la licencia
+        id_usuario = _usuario_de_licencia(token)
+        if id_usuario is None:
+            try:
+                datos = _serializador_tokens().loads(
+                    token, max_age=current_app.config.get("API_TOKEN_VIGENCIA", 12 * 3600)
+                )
+            except SignatureExpired:
+                return jsonify({"error": "Token vencido", "motivo": "TOKEN_VENCIDO"}), 401
+            except BadSignature:
+                return jsonify({"error": "Token inválido"}), 401
+            id_usuario = datos.get("id")
+
+        user = db.session.get(User, id_usuario)
+        if user is None or user.estado_cuenta != "ACTIVA" or not suscripcion_vigente(user):
+            return jsonify({"error": "Cuenta sin acceso", "motivo": "SIN_SUSCRIPCION"}), 403
+        g.usuario_api = user
+        return vista(*args, **kwargs)
+
+    return vista_protegida
+
 @api_bp.route('/validar-acceso', methods=['POST'])
 def validar_acceso_desktop():
     """
@@ -44,7 +142,9 @@ def validar_acceso_desktop():
                 "mensaje": "Acceso autorizado",
                 "permitir_acceso": True,
                 "usuario": f"{user.nombre} {user.apellido}",
-                "estado_suscripcion": "ACTIVA"
+                "estado_suscripcion": "ACTIVA",
+                "token": emitir_token(user),
+                "licencia": emitir_licencia_escritorio(user),
             }), 200
         else:
             # CASO SIN PAGO: Usuario existe, pero no ha pagado o venció.
@@ -59,4 +159,70 @@ def validar_acceso_desktop():
         "mensaje": "Correo o contraseña incorrectos",
         "permitir_acceso": False,
         "motivo": "CREDENCIALES_INVALIDAS"
-    }), 401
\ No newline at end of file
+    }), 401
+
+
+@api_bp.route('/metricas/informes', methods=['GET'])
+def metricas_informes():
+    """
+    Métricas del control de admisión de informes (cola, ocupación, esperas).
+    Requiere el header 'X-Metricas-Token' igual a METRICAS_TOKEN; si el token
+    no está configurado, el endpoint no existe.
+    """
+    token_esperado = current_app.config.get("METRICAS_TOKEN")
+    if not token_esperado:
+        abort(404)
+
+    token = request.headers.get("X-Metricas-Token", "")
+    if not hmac.compare_digest(token, token_esperado):
+        return jsonify({"error": "Token inválido"}), 401
+
+    control = current_app.extensions["admision_informes"]
+    return jsonify(control.metricas()), 200
+
+
+# ====== SUBIDA DE CAPTURAS (bloques gzip reanudables) ======
+
+
+@api_bp.errorhandler(SubidaError)
+def error_subida(e):
+    return jsonify({"error": str(e)}), e.estado
+
+
+@api_bp.route('/subidas', methods=['POST'])
+@token_requerido
+def iniciar_subida():
+    """
+    Recibe el manifiesto de una captura y responde qué bloques faltan.
+
+    JSON: {"nombre", "tamano", "sha256", "tamano_bloque", "bloques": [sha256, ...]}
+    """
+    data = request.get_json(silent=True) or {}
+    almacen = current_app.extensions["subidas_capturas"]
+    resultado = almacen.iniciar(
+        g.usuario_api.id_usuario,
+        secure_filename(data.get("nombre") or ""),
+        data.get("tamano"),
+        data.get("sha256"),
+        data.get("tamano_bloque"),
+        data.get("bloques"),
+    )
+    return jsonify(resultado), 200
+
+
+@api_bp.route('/subidas/<id_subida>/bloques/<int:indice>', methods=['PUT'])
+@token_requerido
+def subir_bloque(id_subida, indice):
+    """Recibe un bloque comprimido con gzip (cuerpo crudo de la petición)."""
+    almacen = current_app.extensions["subidas_capturas"]
+    almacen.guardar_bloque(g.usuario_api.id_usuario, id_subida, indice, request.get_data(cache=False))
+    return "", 204
+
+
+@api_bp.route('/subidas/<id_subida>/completar', methods=['POST'])
+@token_requerido
+def completar_subida(id_subida):
+    """Arma la captura con todos sus bloques y verifica el hash final."""
+    almacen = current_app.extensions["subidas_capturas"]
+    resultado = almacen.completar(g.usuario_api.id_usuario, id_subida)
+    return jsonify(resultado), 201
@@ -52,6 +52,33 @@ class Config:
     MAX_FILE_SIZE_TXT = 20 * 1024 * 1024  # 20 MB para archivos .txt (logs de consola Cisco)
     MAX_FILE_SIZE_IMAGE = 5 * 1024 * 1024  # 5 MB por imagen (JPG/PNG optimizado)
 
+    # Subida de capturas desde la app de escritorio (bloques gzip reanudables)
+    SUBIDAS_DIR = os.environ.get('SUBIDAS_DIR') or 'subidas'
+    SUBIDAS_RETENCION_DIAS = int(os.environ.get('SUBIDAS_RETENCION_DIAS') or 7)  # bloques sin uso
+    # Vigencia del token Bearer que entrega /api/validar-acceso (segundos)
+    API_TOKEN_VIGENCIA = int(os.environ.get('API_TOKEN_VIGENCIA') or 12 * 3600)
+    # Licencia firmada (Ed25519) para iniciar sesión sin conexión en el ejecutable
+    # (clave en base64, ver funcionalidades/licencias.py; sin clave no se emite licencia)
+    LICENCIA_CLAVE_PRIVADA = os.environ.get('LICENCIA_CLAVE_PRIVADA')
+    LICENCIA_VIGENCIA_MAXIMA = int(os.environ.get('LICENCIA_VIGENCIA_MAXIMA') or 3 * 24 * 3600)
+
+    # Generación de informes
+    # Procesa cada bloque de prueba (inserción + resaltado) en un proceso trabajador
+    INFORME_PARALELO = os.environ.get('INFORME_PARALELO', 'false').lower() in ['true', 'on', '1']
+    INFORME_MAX_PROCESOS = int(os.environ.get('INFORME_MAX_PROCESOS') or os.cpu_count() or 1)
+
+    # Control de admisión (límites por proceso del servidor)
+    INFORME_MAX_CONCURRENTES = int(os.environ.get('INFORME_MAX_CONCURRENTES') or 2)
+    INFORME_MAX_COLA = int(os.environ.get('INFORME_MAX_COLA') or 4)
+    INFORME_ESPERA_MAXIMA = int(os.environ.get('INFORME_ESPERA_MAXIMA') or 30)  # segundos en cola
+    INFORME_MAX_POR_USUARIO = int(os.environ.get('INFORME_MAX_POR_USUARIO') or 1)
+    # Presupuesto de tiempo por informe (segundos, 0 = sin límite)
+    INFORME_TIEMPO_MAXIMO = float(os.environ.get('INFORME_TIEMPO_MAXIMO') or 0)
+    # Pasado este tiempo, el resto de los bloques se inserta sin resaltar (0 = siempre resaltar)
+    INFORME_TIEMPO_RESALTADO = float(os.environ.get('INFORME_TIEMPO_RESALTADO') or 0)
+    # Token para consultar /api/metricas/informes (sin token el endpoint queda deshabilitado)
+    METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+
     # MercadoPago
     sdk_mp = mercadopago.SDK(os.environ["MP_ACCESS_TOKEN"])
     MP_WEBHOOK_SECRET = os.environ.get('MP_WEBHOOK_SECRET')
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""
+Sesión de consola con equipos Cisco, compartida por la aplicación de
+escritorio (exe/appLocal.py) y los scripts de script_modelos/.
+
+    consola.transportes   puerto serie, pty y servidor de consolas por TCP;
+                          multiplexor de E/S
+    consola.sesion        lectura por prompt, comandos, enable, arranque
+"""
@@ -0,0 +1,1803 @@
+"""
+Sesión de consola con equipos Cisco, común a exe/appLocal.py y a los scripts
+de script_modelos/.
+
+Lectura guiada por prompt, envío de comandos (de a uno o en lote), paginación
+--More--, modo enable, salud del enlace, timeouts aprendidos por modelo y
+seguimiento del arranque tras un reload. Trabaja sobre cualquier transporte de
+consola/transportes.py: toda mejora de latencia se hace (y se mide con
+exe/benchmark_consola.py) una sola vez para todos los front ends.
+"""
+
+import json
+import logging
+import os
+import re
+import statistics
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import serial
+from serial import SerialException
+
+from .transportes import (
+    VALID_BAUDRATES,
+    abrir_transporte,
+    multiplexar_conexion,
+    validar_baudrate,
+    validar_puerto_serial,
+)
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+# Timeouts configurables
+TIMEOUT_CONEXION_INICIAL = 5  # segundos para validar conexión inicial
+TIMEOUT_LECTURA = 2  # segundos por defecto para leer respuesta
+TIMEOUT_COMANDO = 10  # segundos para comandos normales
+TIMEOUT_RELOAD = 180  # 3 minutos para reload
+
+# Caracteres que indican prompt de Cisco
+CISCO_PROMPTS = ['>', '#']
+
+# Palabras clave que indican dispositivo Cisco válido
+CISCO_KEYWORDS = ['Cisco', 'IOS', 'Catalyst', 'Switch', 'Router']
+
+# Prompt de IOS al final de una línea: hostname, modo opcional "(config)" y > o #
+PATRON_PROMPT_GENERICO = re.compile(r'^([A-Za-z0-9][\w.\-]*)(?:\([\w\-]+\))?[>#]\s*$')
+
+# Otras salidas que indican que el equipo quedó esperando una entrada
+PATRON_ESPERA_ENTRADA = re.compile(r'(?:--More--|[Pp]assword:)[ \t]*$')
+
+# Caracteres del final del buffer donde se busca el prompt
+VENTANA_PROMPT = 256
+
+# Lectura guiada por prompt
+SILENCIO_FIN_LECTURA = 0.6  # lectura por silencio: segundos sin datos que dan la respuesta por terminada
+SILENCIO_SIN_PROMPT = 3.0  # segundos sin datos ni prompt antes de dar la respuesta por terminada
+TIMEOUT_LECTURA_MAXIMO = 120  # tope absoluto de una lectura aunque sigan llegando datos
+
+# Comandos en lote: los "show" de una prueba se envían juntos y la salida se separa por prompt + eco
+EJECUTAR_EN_LOTE = True
+PREFIJOS_COMANDO_LOTE = ("show ",)  # solo lectura y sin preguntas al operador
+
+# Timeouts adaptativos por (modelo, comando), aprendidos de corridas anteriores
+ARCHIVO_HISTORIAL_TIEMPOS = Path.home() / ".fat_testing" / "tiempos_comandos.json"
+MUESTRAS_HISTORIAL = 20  # silencios máximos recordados por comando
+FACTOR_HOLGURA_TIMEOUT = 2.0  # el timeout aprendido es el peor silencio visto multiplicado por este factor
+
+# Salud del enlace: solo se envía un Enter de prueba si la línea estuvo inactiva
+INTERVALO_LATIDO = 2.0  # segundos sin datos recibidos antes de sondear
+TIMEOUT_LATIDO = 1.0  # segundos máximos esperando el primer byte de respuesta al latido
+SILENCIO_FIN_LATIDO = 0.3  # con prompt desconocido, silencio que da por terminada la respuesta al latido
+
+# Bytes que se conservan de la salida: tab, LF, CR e imprimibles ASCII
+BYTES_CONTROL = bytes(b for b in range(256) if b not in (9, 10, 13) and not 32 <= b <= 126)
+PATRON_CONTROL = re.compile(r'[^\t\n\r\x20-\x7e]')
+MARCA_MORE = b"--More--"
+
+# Espera por defecto tras cada comando
+ESPERA_COMANDO = 1
+ESPERA_RELOAD = 120  # sin historial del modelo, segundos tras los cuales se sondea la consola si no hay mensajes
+
+# Seguimiento del arranque tras el reload (se continúa apenas el equipo está listo)
+TIMEOUT_CONFIRMACION_RELOAD = 45  # segundos para ver las confirmaciones y el inicio del apagado
+INTERVALO_CONFIRMACION_RELOAD = 2.0  # sin mensajes de apagado, se reenvía la confirmación tras este tiempo
+TIMEOUT_ARRANQUE_MAXIMO = 600  # tope absoluto de espera del arranque aunque sigan llegando mensajes
+SILENCIO_FIN_ARRANQUE = 20  # segundos sin mensajes de boot antes de sondear la consola con Enter
+FACTOR_HOLGURA_ARRANQUE = 1.5  # el tope aprendido es el peor arranque visto multiplicado por este factor
+INTERVALO_SEGUIMIENTO_ARRANQUE = 1.0  # cada cuánto se actualiza la etapa y el tiempo estimado en la UI
+TIMEOUT_INTENTO_RECONEXION = 4  # segundos esperando el prompt en cada intento de reconexión
+TIMEOUT_INTENTO_ESTABILIZAR = 3  # segundos esperando el prompt en cada intento de estabilización
+
+# =============================================================================
+# EXCEPCIONES PERSONALIZADAS
+# =============================================================================
+class ConexionSerialError(Exception):
+    """Excepción base para errores de conexión serial"""
+    pass
+
+class DispositivoNoDetectadoError(ConexionSerialError):
+    """Se abrió el puerto pero no hay dispositivo Cisco respondiendo"""
+    pass
+
+class DispositivoDesconectadoError(ConexionSerialError):
+    """El dispositivo se desconectó durante la ejecución"""
+    pass
+
+class TimeoutConexionError(ConexionSerialError):
+    """Timeout esperando respuesta del dispositivo"""
+    pass
+
+class RespuestaInvalidaError(ConexionSerialError):
+    """La respuesta del dispositivo no es válida"""
+    pass
+
+# =============================================================================
+# CONEXIÓN
+# =============================================================================
+def abrir_conexion_serial(puerto: str, baudrate: int) -> serial.Serial:
+    """
+    Abre una conexión serial con el dispositivo Cisco y valida que haya un dispositivo real conectado.
+
+    Args:
+        puerto: Puerto serial (ej: COM3, /dev/ttyUSB0) o servidor de consolas (telnet:// o socket://host:puerto)
+        baudrate: Velocidad de comunicación (9600, 115200, etc.)
+
+    Returns:
+        Objeto serial.Serial (o transporte con su interfaz) con conexión validada
+
+    Raises:
+        ValueError: Si puerto o baudrate son inválidos
+        serial.SerialException: Si no se puede abrir el puerto
+        DispositivoNoDetectadoError: Si el puerto abre pero no hay dispositivo Cisco
+        TimeoutConexionError: Si el dispositivo no responde en el tiempo esperado
+    """
+    # Validar inputs
+    if not validar_puerto_serial(puerto):
+        logger.error(f"Puerto serial inválido: {puerto}")
+        raise ValueError(
+            f"Puerto serial inválido: {puerto}. Use formato COM1-99, /dev/ttyUSB0-99, telnet://host:puerto o socket://host:puerto"
+        )
+
+    if not validar_baudrate(baudrate):
+        logger.error(f"Baudrate inválido: {baudrate}")
+        raise ValueError(f"Baudrate inválido: {baudrate}. Valores permitidos: {VALID_BAUDRATES}")
+
+    conexion = None
+    try:
+        logger.info(f"Abriendo conexión serial en {puerto} a {baudrate} baudios...")
+        conexion = abrir_transporte(puerto, baudrate, TIMEOUT_LECTURA)
+
+        logger.info(f"Puerto {puerto} abierto correctamente")
+
+        # VALIDACIÓN CRÍTICA: Verificar que hay un dispositivo Cisco real conectado
+        if not validar_dispositivo_conectado(conexion):
+            conexion.close()
+            raise DispositivoNoDetectadoError(
+                f"El puerto {puerto} está disponible pero no hay un dispositivo Cisco respondiendo. "
+                "Verifique que el cable esté conectado correctamente y que el dispositivo esté encendido."
+            )
+
+        logger.info(f"Dispositivo Cisco detectado y validado en {puerto}")
+        return multiplexar_conexion(conexion)
+
+    except SerialException as error:
+        logger.error(f"Error abriendo puerto serial {puerto}: {error}")
+        if conexion and conexion.is_open:
+            conexion.close()
+        raise
+    except (DispositivoNoDetectadoError, TimeoutConexionError):
+        # Re-lanzar nuestras excepciones personalizadas
+        raise
+    except Exception as error:
+        logger.error(f"Error inesperado abriendo conexión serial: {error}")
+        if conexion and conexion.is_open:
+            conexion.close()
+        raise
+
+
+def validar_dispositivo_conectado(conexion: serial.Serial) -> bool:
+    """
+    Valida que haya un dispositivo Cisco real conectado enviando comandos de prueba.
+
+    Args:
+        conexion: Conexión serial abierta
+
+    Returns:
+        True si hay un dispositivo Cisco respondiendo, False en caso contrario
+    """
+    try:
+        logger.info("Validando dispositivo Cisco...")
+
+        # Limpiar buffer
+        conexion.reset_input_buffer()
+        conexion.reset_output_buffer()
+
+        # Enviar enters para despertar la consola
+        for i in range(3):
+            conexion.write(b"\r\n")
+            time.sleep(0.3)
+
+        # Leer respuesta inicial
+        time.sleep(1)
+        if conexion.in_waiting > 0:
+            respuesta_inicial = conexion.read(conexion.in_waiting).decode('ascii', errors='ignore')
+            logger.debug(f"Respuesta inicial: {respuesta_inicial[:100]}")
+
+            # Verificar si hay un prompt
+            if any(prompt in respuesta_inicial for prompt in CISCO_PROMPTS):
+                logger.info("Prompt de Cisco detectado en respuesta inicial")
+                return True
+
+        # Si no hay prompt en respuesta inicial, enviar comando de prueba
+        logger.info("Enviando comando de prueba: show version")
+        conexion.reset_input_buffer()
+        conexion.write(b"show version\n")
+
+        # Esperar respuesta con timeout
+        tiempo_inicio = time.time()
+        respuesta_completa = ""
+
+        while (time.time() - tiempo_inicio) < TIMEOUT_CONEXION_INICIAL:
+            if conexion.in_waiting > 0:
+                datos = conexion.read(conexion.in_waiting)
+                respuesta_completa += datos.decode('ascii', errors='ignore')
+
+                # Verificar si tenemos suficiente información
+                if len(respuesta_completa) > 50:
+                    break
+            time.sleep(0.2)
+
+        logger.debug(f"Respuesta de validación: {respuesta_completa[:200]}")
+
+        # Verificar que la respuesta contenga palabras clave de Cisco
+        if any(keyword in respuesta_completa for keyword in CISCO_KEYWORDS):
+            logger.info("Dispositivo Cisco validado correctamente")
+            return True
+
+        # Verificar si hay prompt aunque no haya keywords
+        if any(prompt in respuesta_completa for prompt in CISCO_PROMPTS):
+            logger.warning("Prompt detectado pero sin keywords de Cisco. Aceptando conexión.")
+            return True
+
+        logger.warning(f"No se detectó dispositivo Cisco. Respuesta recibida: {respuesta_completa[:100]}")
+        return False
+
+    except Exception as error:
+        logger.error(f"Error validando dispositivo conectado: {error}")
+        return False
+
+
+def verificar_conexion_activa(conexion: serial.Serial) -> bool:
+    """
+    Verifica que la conexión serial siga activa sin ensuciar la consola.
+
+    Se usa primero la evidencia pasiva del MonitorEnlace de la conexión:
+    errores de lectura/escritura, líneas de módem (DSR/CTS/CD) que caen y
+    datos recibidos hace menos de INTERVALO_LATIDO segundos. Solo si la línea
+    estuvo inactiva se envía un Enter de prueba (latido), porque en Windows
+    write/flush/is_open pueden NO fallar con el cable desconectado.
+
+    Args:
+        conexion: Objeto de conexión serial
+
+    Returns:
+        True si la conexión está activa y el dispositivo responde, False en caso contrario
+    """
+    try:
+        if not conexion:
+            logger.error("[VERIFICAR] Conexión es None")
+            return False
+
+        if not conexion.is_open:
+            logger.error("[VERIFICAR] Conexión serial cerrada (is_open = False)")
+            return False
+
+        monitor = estado_consola(conexion).enlace
+
+        if monitor.error is not None:
+            logger.error(f"[VERIFICAR] Error de puerto sin recuperar: {monitor.error}")
+            return False
+
+        caidas = monitor.lineas_caidas(conexion)
+        if caidas:
+            logger.error(f"[VERIFICAR] Líneas de módem caídas: {', '.join(caidas)}")
+            return False
+
+        try:
+            if conexion.in_waiting > 0:
+                # Hay datos sin leer: el equipo está transmitiendo
+                monitor.registrar_actividad()
+                return True
+        except (OSError, SerialException) as e:
+            monitor.registrar_error(e)
+            logger.error(f"[VERIFICAR] Error consultando el puerto: {type(e).__name__} - {e}")
+            return False
+
+        if monitor.inactivo() < INTERVALO_LATIDO:
+            return True
+
+        return enviar_latido(conexion)
+
+    except Exception as error:
+        logger.error(f"[VERIFICAR] Error inesperado: {type(error).__name__} - {error}")
+        return False
+
+
+def enviar_latido(conexion: serial.Serial) -> bool:
+    """
+    Envía un Enter a una consola inactiva y espera cualquier respuesta.
+
+    Termina en cuanto llega el primer byte y luego consume la respuesta hasta
+    el prompt, para que no quede mezclada con la salida del próximo comando.
+
+    Returns:
+        True si el dispositivo respondió
+    """
+    estado = estado_consola(conexion)
+    timeout_original = conexion.timeout
+    try:
+        # Descartar restos anteriores para no confundirlos con la respuesta
+        if conexion.in_waiting > 0:
+            conexion.read(conexion.in_waiting)
+
+        if conexion.write(b"\r\n") == 0:
+            logger.error("[VERIFICAR] write() retornó 0 bytes - puerto no acepta escritura")
+            return False
+        conexion.flush()
+        logger.debug("[VERIFICAR] Latido enviado, esperando respuesta...")
+
+        respuesta = ""
+        inicio = time.time()
+        ultimo_dato = None
+        while True:
+            # Bloquea hasta el primer byte (o TIMEOUT_LATIDO) y luego hasta el silencio final
+            if ultimo_dato is None:
+                conexion.timeout = max(0.0, TIMEOUT_LATIDO - (time.time() - inicio))
+            else:
+                conexion.timeout = max(0.0, SILENCIO_FIN_LATIDO - (time.time() - ultimo_dato))
+            datos = conexion.read(conexion.in_waiting or 1)
+            ahora = time.time()
+            if datos:
+                respuesta += datos.decode("ascii", errors="ignore")
+                ultimo_dato = ahora
+                estado.enlace.registrar_actividad()
+                if estado.fin_de_respuesta(respuesta):
+                    break
+            elif ultimo_dato is None:
+                if ahora - inicio >= TIMEOUT_LATIDO:
+                    logger.error("[VERIFICAR] Sin respuesta al latido - probablemente desconectado")
+                    return False
+            elif ahora - ultimo_dato >= SILENCIO_FIN_LATIDO:
+                break
+
+        logger.debug(f"[VERIFICAR] Dispositivo respondió al latido ({len(respuesta)} caracteres)")
+        return True
+
+    except (OSError, SerialException, IOError) as e:
+        estado.enlace.registrar_error(e)
+        logger.error(f"[VERIFICAR] Error en latido: {type(e).__name__} - {e}")
+        return False
+    finally:
+        conexion.timeout = timeout_original
+
+
+def limpiar_caracteres_control(texto):
+    """
+    Elimina caracteres de control no imprimibles de la salida,
+    dejando solo saltos de línea, retorno de carro y tabulaciones.
+    Esto evita que en el archivo aparezcan cuadros raros.
+    """
+    # Se permiten salto de línea, retorno de carro, tabulación e imprimibles ASCII
+    return PATRON_CONTROL.sub("", texto)
+
+
+def limpiar_bytes_control(datos) -> str:
+    """
+    Equivalente a limpiar_caracteres_control(datos.decode("ascii", errors="ignore"))
+    en una sola pasada sobre los bytes crudos.
+    """
+    return bytes(datos).translate(None, BYTES_CONTROL).decode("ascii")
+
+
+class BufferConsola:
+    """
+    Acumula los bytes crudos de la consola y los decodifica una sola vez.
+
+    Las lecturas agregan bloques a un bytearray (sin concatenar strings ni
+    limpiar por bloque); para detectar el prompt solo se decodifica la cola.
+    Los --More-- se quitan de la cola a medida que aparecen.
+
+    Modo acotado: con `limite` (bytes), al superarlo se entrega a `destino`
+    el texto ya limpio de todo salvo la cola, y se libera de memoria. Las
+    posiciones (posicion(), texto(desde)) son absolutas e incluyen lo entregado.
+    """
+
+    def __init__(self, limite: Optional[int] = None, destino=None):
+        self.datos = bytearray()
+        self.limite = limite
+        self.destino = destino
+        self.descargados = 0  # bytes ya entregados a destino (o descartados)
+
+    def __len__(self) -> int:
+        return len(self.datos)
+
+    def posicion(self) -> int:
+        """Cantidad total de bytes recibidos hasta ahora"""
+        return self.descargados + len(self.datos)
+
+    def agregar(self, datos: bytes) -> None:
+        self.datos += datos
+        if self.limite is not None and len(self.datos) > self.limite:
+            self._descargar()
+
+    def _descargar(self) -> None:
+        corte = len(self.datos) - VENTANA_PROMPT
+        if corte <= 0:
+            return
+        if self.destino is not None:
+            self.destino(limpiar_bytes_control(memoryview(self.datos)[:corte]))
+        else:
+            logger.warning(f"BufferConsola sin destino: se descartan {corte} bytes")
+        del self.datos[:corte]
+        self.descargados += corte
+
+    def cola(self, n: int = VENTANA_PROMPT) -> str:
+        """Últimos `n` bytes, limpios, para buscar el prompt"""
+        return limpiar_bytes_control(memoryview(self.datos)[-n:])
+
+    def quitar_more(self) -> bool:
+        """
+        Si la salida quedó detenida en --More--, quita la marca de la cola.
+
+        Returns:
+            True si había un --More-- pendiente
+        """
+        inicio = max(0, len(self.datos) - VENTANA_PROMPT)
+        indice = self.datos.rfind(MARCA_MORE, inicio)
+        if indice < 0 or self.datos[indice + len(MARCA_MORE):].strip():
+            return False
+        del self.datos[indice:indice + len(MARCA_MORE)]
+        return True
+
+    def texto(self, desde: int = 0) -> str:
+        """Texto limpio desde la posición absoluta `desde` (lo entregado a destino no se repite)"""
+        inicio = max(0, desde - self.descargados)
+        return limpiar_bytes_control(memoryview(self.datos)[inicio:])
+
+class MonitorEnlace:
+    """
+    Evidencia pasiva de que el enlace serial sigue vivo.
+
+    Las lecturas registran actividad y errores; las líneas de módem se
+    comparan contra las que estaban activas la primera vez que se consultaron.
+    Mientras llegan datos, verificar el enlace no cuesta nada.
+    """
+
+    def __init__(self):
+        self.ultima_actividad = time.time()
+        self.error = None
+        self.lineas_base = None  # líneas de módem activas al empezar (None = aún no leídas)
+
+    def registrar_actividad(self) -> None:
+        """Se recibieron datos: el enlace funciona (y se recuperó si había fallado)"""
+        self.ultima_actividad = time.time()
+        self.error = None
+
+    def registrar_error(self, error: Exception) -> None:
+        self.error = error
+
+    def inactivo(self) -> float:
+        """Segundos desde los últimos datos recibidos"""
+        return time.time() - self.ultima_actividad
+
+    def lineas_caidas(self, conexion) -> List[str]:
+        """
+        Líneas de módem que estaban activas y ya no lo están.
+
+        Muchos adaptadores USB-serial o puertos virtuales no las informan; en
+        ese caso no aportan evidencia y se devuelve una lista vacía.
+        """
+        try:
+            lineas = {"DSR": conexion.dsr, "CTS": conexion.cts, "CD": conexion.cd}
+        except (OSError, SerialException, ValueError):
+            return []
+        if self.lineas_base is None:
+            self.lineas_base = [nombre for nombre, activa in lineas.items() if activa]
+            return []
+        return [nombre for nombre in self.lineas_base if not lineas[nombre]]
+
+
+class EstadoConsola:
+    """
+    Estado aprendido de la consola de un equipo, asociado a su conexión.
+
+    Guarda el hostname y el regex del prompt (hostname> / hostname# /
+    hostname(config)#) para que la lectura termine apenas el equipo vuelve a
+    mostrar el prompt, en lugar de esperar silencio en la línea.
+
+    También recuerda el prompt con el que terminó la última respuesta
+    (prompt_actual), de modo que la transcripción puede reproducir las líneas
+    de prompt sin enviar Enter antes de cada comando. Se invalida cuando una
+    lectura no termina en el prompt y tras eventos que lo cambian por fuera
+    de las lecturas (reload, enable sin verificación).
+    """
+
+    def __init__(self):
+        self.hostname = None
+        self.patron_prompt = None
+        # Modelo elegido en la UI; clave del historial de tiempos
+        self.modelo = None
+        # Resultado de la última lectura guiada por prompt
+        self.prompt_visto = False
+        self.silencio_maximo = 0.0
+        self.enlace = MonitorEnlace()
+        # Prompt al final de la última respuesta (None = hay que sondearlo)
+        self.prompt_actual = None
+        # "terminal length 0" aplicado desde el último arranque: las salidas no se paginan
+        self.paginacion_desactivada = False
+
+    def aprender_prompt(self, texto: str) -> bool:
+        """
+        Busca el último prompt presente en `texto` y lo guarda.
+
+        Returns:
+            True si se identificó un prompt
+        """
+        for linea in reversed(texto.replace("\r", "\n").split("\n")):
+            coincidencia = PATRON_PROMPT_GENERICO.match(linea.strip())
+            if coincidencia:
+                self.hostname = coincidencia.group(1)
+                self.patron_prompt = re.compile(
+                    r'(?:^|[\r\n])' + re.escape(self.hostname) + r'(?:\([\w\-]+\))?[>#][ \t]*$'
+                )
+                self.actualizar_prompt(texto)
+                return True
+        return False
+
+    def patron_limite(self, comando: str):
+        """
+        Regex del límite entre dos comandos enviados en lote: el prompt
+        seguido del eco de `comando`. El grupo 1 es el prompt.
+        """
+        return re.compile(
+            r'[\r\n](' + re.escape(self.hostname) + r'(?:\([\w\-]+\))?[>#][ \t]*)' + re.escape(comando) + r'[ \t]*\r?\n'
+        )
+
+    def actualizar_prompt(self, cola: str) -> None:
+        """Toma el prompt con el que termina `cola`; si no termina en prompt, lo invalida"""
+        coincidencia = self.patron_prompt.search(cola) if self.patron_prompt is not None else None
+        self.prompt_actual = coincidencia.group(0).lstrip("\r\n") if coincidencia else None
+
+    def invalidar_prompt(self) -> None:
+        """El prompt pudo cambiar sin pasar por una lectura: el próximo comando lo sondea"""
+        self.prompt_actual = None
+
+    @property
+    def modo(self) -> Optional[str]:
+        """'usuario', 'enable' o 'config' según el prompt actual (None si no se conoce)"""
+        if self.prompt_actual is None:
+            return None
+        if "(" in self.prompt_actual:
+            return "config"
+        return "enable" if self.prompt_actual.rstrip().endswith("#") else "usuario"
+
+    def fin_de_respuesta(self, buffer: str) -> bool:
+        """True si el final del buffer es el prompt o una espera de entrada (--More--, Password:)"""
+        cola = buffer[-VENTANA_PROMPT:]
+        if self.patron_prompt is not None and self.patron_prompt.search(cola):
+            return True
+        return PATRON_ESPERA_ENTRADA.search(cola) is not None
+
+
+# Estado de consola por conexión; se libera solo cuando la conexión deja de existir
+_estados_consola = weakref.WeakKeyDictionary()
+_lock_estados_consola = threading.Lock()
+
+
+def estado_consola(conexion) -> EstadoConsola:
+    """Devuelve (creando si hace falta) el EstadoConsola de una conexión"""
+    with _lock_estados_consola:
+        estado = _estados_consola.get(conexion)
+        if estado is None:
+            estado = EstadoConsola()
+            _estados_consola[conexion] = estado
+        return estado
+
+
+class HistorialTiempos:
+    """
+    Tiempos de respuesta observados por modelo y comando, persistidos en JSON.
+
+    Para cada comando se guarda el mayor silencio (segundos sin datos antes de
+    ver el prompt) de las últimas corridas. Con eso se calcula cuánto esperar
+    el prompt la próxima vez: lo justo para ese modelo, en lugar del "espera"
+    fijo del mapeo.
+    """
+
+    def __init__(self, ruta: Path = ARCHIVO_HISTORIAL_TIEMPOS):
+        self.ruta = Path(ruta)
+        self.datos = {}
+        self._modificado = False
+        # Compartido por todas las sesiones de prueba en paralelo
+        self._lock = threading.Lock()
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                self.datos = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as error:
+            logger.warning(f"No se pudo leer el historial de tiempos {self.ruta}: {error}")
+
+    def limite(self, modelo: Optional[str], comando: str, espera: float) -> float:
+        """
+        Segundos de silencio a tolerar esperando el prompt de `comando`.
+
+        El piso es `espera` del mapeo (al menos SILENCIO_SIN_PROMPT); el
+        historial solo lo alarga, con el peor silencio visto con holgura.
+        Acortarlo no acelera nada (la lectura termina apenas aparece el
+        prompt) y solo cortaría respuestas que se demoran, ej: tras un corte
+        breve de la línea.
+        """
+        piso = max(espera, SILENCIO_SIN_PROMPT)
+        muestras = self.muestras(modelo, comando)
+        if not muestras:
+            return piso
+        aprendido = max(muestras) * FACTOR_HOLGURA_TIMEOUT
+        return max(piso, min(TIMEOUT_LECTURA_MAXIMO, aprendido))
+
+    def muestras(self, modelo: Optional[str], clave: str) -> List[float]:
+        """Copia de las muestras guardadas para `clave` (comando o etapa de arranque)"""
+        with self._lock:
+            return list(self.datos.get(modelo or "", {}).get(clave) or [])
+
+    def registrar(self, modelo: Optional[str], comando: str, silencio: float) -> None:
+        """Agrega una muestra de silencio máximo (segundos) para el comando"""
+        with self._lock:
+            muestras = self.datos.setdefault(modelo or "", {}).setdefault(comando, [])
+            muestras.append(round(silencio, 3))
+            del muestras[:-MUESTRAS_HISTORIAL]
+            self._modificado = True
+
+    def guardar(self) -> None:
+        """Escribe el historial si cambió; un error de disco no detiene las pruebas"""
+        with self._lock:
+            if not self._modificado:
+                return
+            datos = json.dumps(self.datos, ensure_ascii=False, indent=1)
+            self._modificado = False
+        try:
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_name(f"{self.ruta.stem}_{threading.get_ident()}.tmp")
+            with open(temporal, "w", encoding="utf-8") as f:
+                f.write(datos)
+            os.replace(temporal, self.ruta)
+        except OSError as error:
+            logger.warning(f"No se pudo guardar el historial de tiempos {self.ruta}: {error}")
+
+
+HISTORIAL_TIEMPOS = HistorialTiempos()
+
+
+# =============================================================================
+# SEGUIMIENTO DEL ARRANQUE (RELOAD)
+# =============================================================================
+
+# Etapas del arranque en el orden en que aparecen en consola, con el texto que las delata
+ETAPAS_ARRANQUE = [
+    ("apagado", re.compile(r"Reload requested|Proceeding with reload|Reload Reason|%SYS-5-RELOAD")),
+    ("bootloader", re.compile(r"System Bootstrap|Initializing Hardware|BOOTLDR|rommon \d*\s*>|^switch:\s*$", re.MULTILINE)),
+    ("imagen", re.compile(r"boot: attempting to boot|Loading \S+|Booting \S+|Launching Linux Kernel|Verifying image")),
+    ("ios", re.compile(r"Restricted Rights Legend|Cisco IOS(?:[ -]XE)? [Ss]oftware")),
+    ("listo", re.compile(r"Press RETURN to get started|initial configuration dialog")),
+]
+DESCRIPCION_ETAPAS_ARRANQUE = {
+    "apagado": "apagando",
+    "bootloader": "bootloader / ROMMON",
+    "imagen": "cargando imagen",
+    "ios": "iniciando IOS",
+    "listo": "listo",
+}
+# Mensajes que indican que el equipo aceptó el reload y empezó a apagarse
+MENSAJES_INICIO_RELOAD = (
+    "Reload requested", "Proceeding with reload", "***", "System Bootstrap",
+    "reload in", "Reload command",
+)
+# Etapas que prueban que el equipo realmente está reiniciando (antes de aceptar "listo")
+ETAPAS_REINICIO = ("bootloader", "imagen", "ios")
+# Prefijo de las claves del historial de tiempos para las etapas de arranque
+CLAVE_HISTORIAL_ARRANQUE = "reload: "
+# Caracteres de la lectura anterior que se conservan para detectar marcas partidas entre lecturas
+COLA_SEGUIMIENTO_ARRANQUE = 64
+
+
+class SeguimientoArranque:
+    """
+    Sigue las etapas del arranque del equipo en la salida de la consola.
+
+    A partir de la confirmación del reload reconoce el apagado, el bootloader
+    (ROMMON), la carga de la imagen, el inicio de IOS / IOS-XE y el aviso
+    "Press RETURN to get started", para continuar apenas el equipo está listo
+    en lugar de esperar tiempos fijos. Los segundos en que se alcanzó cada
+    etapa se guardan en el historial de tiempos del modelo y sirven para
+    estimar cuánto falta en los próximos reloads.
+    """
+
+    def __init__(self, modelo: Optional[str], historial: HistorialTiempos = HISTORIAL_TIEMPOS):
+        self.modelo = modelo
+        self.historial = historial
+        self.inicio = time.monotonic()
+        self.etapas = {}  # nombre de la etapa -> segundos desde el inicio
+        self._cola = ""
+
+    def transcurrido(self) -> float:
+        return time.monotonic() - self.inicio
+
+    @property
+    def listo(self) -> bool:
+        return "listo" in self.etapas
+
+    @property
+    def reiniciando(self) -> bool:
+        """True si ya se vio alguna etapa propia del arranque (no solo el apagado)"""
+        return any(etapa in self.etapas for etapa in ETAPAS_REINICIO)
+
+    @property
+    def etapa_actual(self) -> Optional[str]:
+        """Última etapa alcanzada (None si todavía no se reconoció ninguna)"""
+        if not self.etapas:
+            return None
+        return max(self.etapas, key=self.etapas.get)
+
+    def procesar(self, texto: str) -> List[str]:
+        """
+        Analiza texto nuevo de la consola.
+
+        "listo" solo se acepta si antes se vio el arranque; un "Press RETURN"
+        previo al reinicio sería un falso positivo.
+
+        Returns:
+            Etapas alcanzadas con este texto, en orden
+        """
+        ventana = self._cola + texto
+        self._cola = ventana[-COLA_SEGUIMIENTO_ARRANQUE:]
+        nuevas = []
+        for nombre, patron in ETAPAS_ARRANQUE:
+            if nombre in self.etapas or not patron.search(ventana):
+                continue
+            if nombre == "listo" and not self.reiniciando:
+                logger.warning(f"[RELOAD] '{patron.search(ventana).group(0)}' antes de ver el arranque, se ignora")
+                continue
+            self.etapas[nombre] = self.transcurrido()
+            nuevas.append(nombre)
+        return nuevas
+
+    def _mediana(self, etapa: str) -> Optional[float]:
+        muestras = self.historial.muestras(self.modelo, CLAVE_HISTORIAL_ARRANQUE + etapa)
+        return statistics.median(muestras) if muestras else None
+
+    def eta(self) -> Optional[float]:
+        """
+        Segundos estimados hasta "listo" según los arranques anteriores del
+        modelo, tomando como referencia la última etapa alcanzada.
+
+        Returns:
+            Segundos restantes, o None si no hay historial
+        """
+        total = self._mediana("listo")
+        if total is None:
+            return None
+        if self.listo:
+            return 0.0
+        etapa = self.etapa_actual
+        referencia = self._mediana(etapa) if etapa else None
+        if referencia is None:
+            return max(0.0, total - self.transcurrido())
+        return max(0.0, total - referencia - (self.transcurrido() - self.etapas[etapa]))
+
+    def tope(self) -> float:
+        """Segundos tras los cuales, si la consola calla, se deja de esperar el aviso de arranque"""
+        muestras = self.historial.muestras(self.modelo, CLAVE_HISTORIAL_ARRANQUE + "listo")
+        if not muestras:
+            return ESPERA_RELOAD
+        return min(TIMEOUT_ARRANQUE_MAXIMO, max(muestras) * FACTOR_HOLGURA_ARRANQUE)
+
+    def descripcion(self) -> str:
+        """Texto corto para el tablero: etapa actual y tiempo estimado restante"""
+        etapa = self.etapa_actual
+        texto = f"Reload: {DESCRIPCION_ETAPAS_ARRANQUE[etapa] if etapa else 'esperando boot'}"
+        eta = self.eta()
+        if eta is not None and not self.listo:
+            texto += f" (~{int(eta)}s restantes)"
+        return texto
+
+    def resumen(self) -> str:
+        """Tiempos de cada etapa alcanzada, ej: 'apagando 3s, bootloader / ROMMON 15s, ...'"""
+        return ", ".join(
+            f"{DESCRIPCION_ETAPAS_ARRANQUE[nombre]} {int(segundos)}s"
+            for nombre, segundos in sorted(self.etapas.items(), key=lambda item: item[1])
+        )
+
+    def registrar(self) -> None:
+        """Guarda en el historial los tiempos de un arranque completo"""
+        if not self.listo:
+            return
+        for nombre, segundos in self.etapas.items():
+            self.historial.registrar(self.modelo, CLAVE_HISTORIAL_ARRANQUE + nombre, segundos)
+
+
+def leer_fragmento_consola(conexion: serial.Serial, espera: float) -> bytes:
+    """
+    Espera hasta `espera` segundos a que lleguen datos y devuelve lo disponible.
+
+    Pensada para el reload, donde los cortes de la línea son normales: ante
+    un error de lectura no lanza excepción, agota la espera y devuelve b"".
+    """
+    timeout_original = conexion.timeout
+    try:
+        conexion.timeout = max(0.0, espera)
+        datos = conexion.read(conexion.in_waiting or 1)
+        if datos and conexion.in_waiting:
+            datos += conexion.read(conexion.in_waiting)
+    except (OSError, SerialException) as error:
+        logger.debug(f"[RELOAD] Error leyendo la consola: {error}")
+        time.sleep(max(0.0, espera))
+        return b""
+    finally:
+        try:
+            conexion.timeout = timeout_original
+        except (OSError, SerialException):
+            pass
+    if datos:
+        estado_consola(conexion).enlace.registrar_actividad()
+    return datos
+
+
+def termina_en_prompt_generico(texto: str) -> bool:
+    """True si la última línea de `texto` (sin salto final) es un prompt de IOS"""
+    ultima_linea = texto.replace("\r", "\n").rsplit("\n", 1)[-1]
+    return PATRON_PROMPT_GENERICO.match(ultima_linea.strip()) is not None
+
+
+def esperar_prompt_generico(conexion: serial.Serial, timeout: float) -> str:
+    """
+    Lee hasta que la consola muestre un prompt (hostname> o hostname#) o
+    pasen `timeout` segundos. No depende del prompt aprendido, que puede no
+    valer tras un reload, y no lanza excepciones por desconexión.
+
+    Returns:
+        Texto recibido (puede estar vacío)
+    """
+    buffer = BufferConsola()
+    limite = time.monotonic() + timeout
+    while True:
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            break
+        datos = leer_fragmento_consola(conexion, restante)
+        if not datos:
+            break
+        buffer.agregar(datos)
+        if termina_en_prompt_generico(buffer.cola()):
+            break
+    return buffer.texto()
+
+
+def leer_respuesta_comando(conexion: serial.Serial, comando: Optional[str], espera: float) -> str:
+    """
+    Lee la respuesta de un comando recién enviado.
+
+    Con prompt conocido, `espera` es solo un tope: la lectura termina cuando
+    aparece el prompt, y el silencio tolerado sale del historial del modelo.
+    El silencio observado se registra para las próximas corridas. Sin prompt
+    conocido se mantiene la pausa fija previa a la lectura por silencio.
+
+    Args:
+        conexion: Conexión serial activa
+        comando: Comando enviado (clave del historial); None para no registrarlo
+        espera: Tope en segundos configurado para el comando
+
+    Returns:
+        Respuesta del dispositivo
+    """
+    estado = estado_consola(conexion)
+    if estado.patron_prompt is None:
+        time.sleep(espera)
+        return leer_respuesta_completa(conexion)
+
+    if comando is None:
+        return leer_hasta_prompt(conexion, estado, silencio=max(espera, SILENCIO_SIN_PROMPT))
+
+    limite = HISTORIAL_TIEMPOS.limite(estado.modelo, comando, espera)
+    respuesta = leer_hasta_prompt(conexion, estado, silencio=limite)
+    if estado.prompt_visto:
+        HISTORIAL_TIEMPOS.registrar(estado.modelo, comando, estado.silencio_maximo)
+    else:
+        # Cortó por silencio: la próxima vez esperar más que este límite. Se
+        # deja constancia en la respuesta, que va tal cual a la transcripción
+        aviso = f"'{comando}' no devolvió el prompt en {limite:.1f}s de silencio"
+        logger.warning(aviso)
+        HISTORIAL_TIEMPOS.registrar(estado.modelo, comando, limite)
+        respuesta += f"\n### SIN PROMPT: {aviso}; la salida puede estar incompleta\n"
+    return respuesta
+
+
+def leer_respuesta_completa(conexion: serial.Serial, timeout_total: int = 10,
+                            buffer: Optional[BufferConsola] = None) -> str:
+    """
+    Lee la respuesta completa del dispositivo.
+
+    Si ya se conoce el prompt del equipo (ver despertar_consola), la lectura
+    termina en cuanto el prompt aparece al final de lo recibido. Si no, se usa
+    la detección por silencio de leer_respuesta_por_silencio().
+
+    Args:
+        conexion: Conexión serial activa
+        timeout_total: Timeout máximo en segundos sin recibir datos
+        buffer: BufferConsola donde acumular; por defecto uno nuevo
+
+    Returns:
+        Texto recibido en esta lectura
+
+    Raises:
+        DispositivoDesconectadoError: Si el dispositivo se desconecta durante la lectura
+        TimeoutConexionError: Si no se recibe respuesta en el tiempo esperado
+    """
+    estado = estado_consola(conexion)
+    if estado.patron_prompt is None:
+        return leer_respuesta_por_silencio(conexion, timeout_total, buffer)
+    return leer_hasta_prompt(conexion, estado, timeout_total, buffer=buffer)
+
+
+def leer_hasta_prompt(conexion: serial.Serial, estado: EstadoConsola, timeout_total: int = 10,
+                      silencio: Optional[float] = None, buffer: Optional[BufferConsola] = None) -> str:
+    """
+    Lectura estilo "expect": acumula datos y devuelve en cuanto el final del
+    buffer coincide con el prompt aprendido (o con --More-- / Password:).
+
+    No sondea la conexión mientras llegan datos. Solo si el prompt no aparece
+    tras SILENCIO_SIN_PROMPT segundos sin datos (o se alcanza un tope) se
+    verifica el enlace una vez antes de devolver lo leído. Al terminar deja en
+    `estado` si se vio el prompt y el mayor silencio entre datos.
+
+    Args:
+        conexion: Conexión serial activa
+        estado: EstadoConsola con el prompt aprendido
+        timeout_total: Segundos sin datos tolerados antes de cortar
+        silencio: Si se indica, reemplaza el límite de silencio por defecto
+        buffer: BufferConsola donde acumular; por defecto uno nuevo
+
+    Returns:
+        Texto recibido en esta lectura (incluye el prompt final)
+
+    Raises:
+        DispositivoDesconectadoError: Si el puerto falla o el equipo no responde a la verificación
+    """
+    if buffer is None:
+        buffer = BufferConsola()
+    inicio_lectura = buffer.posicion()
+    tiempo_inicio = time.time()
+    ultimo_dato = tiempo_inicio
+    limite_silencio = silencio if silencio is not None else min(SILENCIO_SIN_PROMPT, timeout_total)
+    estado.prompt_visto = False
+    estado.silencio_maximo = 0.0
+
+    timeout_original = conexion.timeout
+    try:
+        while True:
+            # read() bloquea hasta que llegan datos o vence el silencio tolerado: sin sondeos
+            conexion.timeout = max(0.0, limite_silencio - (time.time() - ultimo_dato))
+            try:
+                datos = conexion.read(conexion.in_waiting or 1)
+            except (OSError, SerialException) as e:
+                estado.enlace.registrar_error(e)
+                logger.error(f"Error leyendo datos del puerto: {e}")
+                raise DispositivoDesconectadoError(f"Error leyendo del puerto serial: {e}")
+
+            ahora = time.time()
+            if datos:
+                estado.enlace.registrar_actividad()
+                buffer.agregar(datos)
+                estado.silencio_maximo = max(estado.silencio_maximo, ahora - ultimo_dato)
+                ultimo_dato = ahora
+                cola = buffer.cola()
+                if estado.fin_de_respuesta(cola):
+                    estado.prompt_visto = True
+                    estado.actualizar_prompt(cola)
+                    return buffer.texto(inicio_lectura)
+                if ahora - tiempo_inicio < TIMEOUT_LECTURA_MAXIMO:
+                    continue
+                logger.warning(f"Lectura cortada tras {TIMEOUT_LECTURA_MAXIMO}s sin ver el prompt")
+                break
+
+            if ahora - ultimo_dato >= limite_silencio:
+                logger.debug(f"Prompt no detectado tras {limite_silencio}s de silencio")
+                break
+    finally:
+        conexion.timeout = timeout_original
+
+    estado.invalidar_prompt()
+
+    # El prompt no llegó: antes de devolver, confirmar que el equipo sigue ahí
+    if not verificar_conexion_activa(conexion):
+        logger.error("Conexión perdida mientras esperaba el prompt")
+        raise DispositivoDesconectadoError(
+            "La conexión se perdió. No se recibieron más datos del dispositivo."
+        )
+    return buffer.texto(inicio_lectura)
+
+
+def leer_respuesta_por_silencio(conexion: serial.Serial, timeout_total: int = 10,
+                                buffer: Optional[BufferConsola] = None) -> str:
+    """
+    Lee la respuesta completa del dispositivo hasta que no haya más datos.
+
+    Args:
+        conexion: Conexión serial activa
+        timeout_total: Timeout máximo en segundos
+        buffer: BufferConsola donde acumular; por defecto uno nuevo
+
+    Returns:
+        Texto recibido en esta lectura
+
+    Raises:
+        DispositivoDesconectadoError: Si el dispositivo se desconecta durante la lectura
+        TimeoutConexionError: Si no se recibe respuesta en el tiempo esperado
+    """
+    if buffer is None:
+        buffer = BufferConsola()
+    inicio_lectura = buffer.posicion()
+    tiempo_inicio = time.time()
+    timeout_alcanzado = False
+    ultimo_check_conexion = time.time()
+    monitor = estado_consola(conexion).enlace
+    timeout_original = conexion.timeout
+
+    try:
+        while True:
+            tiempo_transcurrido = time.time() - tiempo_inicio
+
+            if tiempo_transcurrido > timeout_total:
+                timeout_alcanzado = True
+                break
+
+            # CRÍTICO: Verificar conexión cada 1 segundo para detectar desconexiones rápido
+            # (sin costo mientras llegan datos: solo sondea si la línea está inactiva)
+            if time.time() - ultimo_check_conexion > 1.0:
+                if not verificar_conexion_activa(conexion):
+                    logger.error("Dispositivo desconectado durante lectura de respuesta")
+                    raise DispositivoDesconectadoError(
+                        "El dispositivo se desconectó durante la operación. "
+                        "Verifique el cable y la conexión física."
+                    )
+                ultimo_check_conexion = time.time()
+
+            # Bloquea hasta que llegan datos o pasan SILENCIO_FIN_LECTURA segundos sin ellos
+            conexion.timeout = SILENCIO_FIN_LECTURA
+            try:
+                datos = conexion.read(conexion.in_waiting or 1)
+            except (OSError, SerialException) as e:
+                monitor.registrar_error(e)
+                logger.error(f"Error leyendo datos del puerto: {e}")
+                raise DispositivoDesconectadoError(f"Error leyendo del puerto serial: {e}")
+
+            if datos:
+                monitor.registrar_actividad()
+
+                # Se decodifica y limpia una sola vez, al terminar
+                buffer.agregar(datos)
+                tiempo_inicio = time.time()  # Resetear timeout cuando hay datos
+            else:
+                # CRÍTICO: Antes de asumir que terminó, verificar que la conexión está activa
+                # Si no hay datos Y la conexión está muerta, es un error no un fin normal
+                if not verificar_conexion_activa(conexion):
+                    logger.error("Conexión perdida mientras esperaba datos")
+                    raise DispositivoDesconectadoError(
+                        "La conexión se perdió. No se recibieron más datos del dispositivo."
+                    )
+                # Si la conexión está activa pero no hay datos, es fin normal
+                break
+
+    except SerialException as error:
+        logger.error(f"Error serial durante lectura: {error}")
+        raise DispositivoDesconectadoError(f"Error de comunicación serial: {error}")
+    except DispositivoDesconectadoError:
+        # Re-lanzar nuestra excepción personalizada
+        raise
+    except Exception as error:
+        logger.error(f"Error inesperado leyendo respuesta: {error}")
+        raise
+    finally:
+        conexion.timeout = timeout_original
+
+    # Advertir si no se recibió nada y hubo timeout
+    if buffer.posicion() == inicio_lectura and timeout_alcanzado:
+        logger.warning(f"Timeout de {timeout_total}s alcanzado sin recibir datos")
+        raise TimeoutConexionError(
+            f"No se recibió respuesta del dispositivo después de {timeout_total} segundos. "
+            "El dispositivo puede estar desconectado o no responde."
+        )
+
+    return buffer.texto(inicio_lectura)
+
+
+
+def enviar_comando(conexion: serial.Serial, comando: str, espera: int = ESPERA_COMANDO,
+                   registrar_tiempo: bool = True) -> str:
+    """
+    Envía un comando al dispositivo y espera la respuesta.
+
+    Args:
+        conexion: Conexión serial activa
+        comando: Comando a enviar
+        espera: Tope en segundos para la respuesta (pausa fija si aún no se conoce el prompt)
+        registrar_tiempo: False para no guardar el comando en el historial (ej: contraseñas)
+
+    Returns:
+        Respuesta del dispositivo
+
+    Raises:
+        DispositivoDesconectadoError: Si el dispositivo se desconecta
+        TimeoutConexionError: Si no hay respuesta en el tiempo esperado
+    """
+    try:
+        # Verificar conexión activa antes de enviar
+        if not verificar_conexion_activa(conexion):
+            logger.error("Conexión no activa antes de enviar comando")
+            raise DispositivoDesconectadoError("La conexión se perdió antes de enviar el comando")
+
+        logger.debug(f"Enviando comando: {comando}")
+        conexion.reset_input_buffer()
+        comando_bytes = (comando + "\n").encode('ascii')
+        conexion.write(comando_bytes)
+
+        if estado_consola(conexion).patron_prompt is None:
+            time.sleep(espera)
+            # Verificar conexión activa después de enviar. Con prompt conocido no se
+            # hace: la verificación vaciaría el buffer con la respuesta, y la lectura
+            # guiada por prompt ya verifica el enlace si el prompt no llega.
+            if not verificar_conexion_activa(conexion):
+                logger.error("Conexión perdida después de enviar comando")
+                raise DispositivoDesconectadoError("La conexión se perdió después de enviar el comando")
+
+        respuesta = leer_respuesta_comando(conexion, comando if registrar_tiempo else None, espera)
+        logger.debug(f"Respuesta recibida ({len(respuesta)} caracteres)")
+        return respuesta
+
+    except SerialException as error:
+        estado_consola(conexion).enlace.registrar_error(error)
+        logger.error(f"Error serial enviando comando '{comando}': {error}")
+        raise DispositivoDesconectadoError(f"Error de comunicación: {error}")
+    except (DispositivoDesconectadoError, TimeoutConexionError):
+        # Re-lanzar nuestras excepciones personalizadas
+        raise
+    except Exception as error:
+        logger.error(f"Error inesperado enviando comando '{comando}': {error}")
+        raise
+
+
+def manejar_more_prompt(conexion, respuesta):
+    """
+    Maneja el prompt '--More--' que aparece en salidas largas de Cisco.
+    Cada página se agrega al mismo BufferConsola y la marca se quita de la
+    cola, sin recorrer de nuevo lo ya acumulado.
+    """
+    if "--More--" not in respuesta:
+        return respuesta
+
+    buffer = BufferConsola()
+    buffer.agregar(respuesta.encode("ascii"))
+
+    while buffer.quitar_more():
+        conexion.write(b" ")
+        if estado_consola(conexion).patron_prompt is None:
+            time.sleep(0.5)
+        leer_respuesta_completa(conexion, timeout_total=5, buffer=buffer)
+
+    return buffer.texto()
+
+
+def ejecutar_comando_completo_con_prompt(conexion, comando, espera=ESPERA_COMANDO):
+    """
+    Ejecuta un comando capturando EXACTAMENTE lo que se ve en el CLI
+    Incluye los prompts antes del comando para validación
+    """
+    # CRÍTICO: Verificar conexión ANTES de ejecutar comando
+    if not verificar_conexion_activa(conexion):
+        logger.error(f"Conexión perdida antes de ejecutar comando: {comando}")
+        raise DispositivoDesconectadoError(
+            f"La conexión se perdió antes de ejecutar el comando '{comando}'. "
+            "Verifique el cable y la conexión física."
+        )
+
+    estado = estado_consola(conexion)
+
+    # PASO 1: Obtener el prompt (validación). Si la respuesta anterior terminó
+    # en el prompt, se reproducen las líneas que mostrarían los 2 enters.
+    if estado.prompt_actual is not None:
+        respuesta_enter1 = respuesta_enter2 = "\r\n" + estado.prompt_actual
+    else:
+        # Con prompt conocido las lecturas terminan al ver el prompt: sin pausas fijas
+        pausa_enter = 0.3 if estado.patron_prompt is None else 0
+
+        conexion.write(b"\n")
+        time.sleep(pausa_enter)
+        respuesta_enter1 = leer_respuesta_completa(conexion, timeout_total=2)
+
+        conexion.write(b"\n")
+        time.sleep(pausa_enter)
+        respuesta_enter2 = leer_respuesta_completa(conexion, timeout_total=2)
+
+    # PASO 2: Enviar el comando real
+    conexion.reset_input_buffer()
+    comando_bytes = (comando + "\n").encode('ascii')
+    conexion.write(comando_bytes)
+
+    # PASO 3: Leer la respuesta completa ("espera" es solo un tope)
+    respuesta_comando = leer_respuesta_comando(conexion, comando, espera)
+
+    # PASO 4: Manejar paginación --More--
+    respuesta_comando = manejar_more_prompt(conexion, respuesta_comando)
+
+    # PASO 5: Combinar todo - EXACTAMENTE como se vería en el CLI
+    respuesta_completa = respuesta_enter1 + respuesta_enter2 + respuesta_comando
+
+    return respuesta_completa
+
+
+def admite_lote(conexion, comandos: List[str]) -> bool:
+    """
+    True si `comandos` se pueden enviar juntos: hay más de uno, todos son de
+    solo lectura, el prompt del equipo es conocido y la terminal no pagina
+    (un --More-- consumiría el comando siguiente como tecla).
+    """
+    estado = estado_consola(conexion)
+    return (
+        EJECUTAR_EN_LOTE
+        and len(comandos) > 1
+        and estado.patron_prompt is not None
+        and estado.paginacion_desactivada
+        and all(comando.startswith(PREFIJOS_COMANDO_LOTE) for comando in comandos)
+    )
+
+
+def ejecutar_comandos_en_lote(conexion, comandos: List[Tuple[str, float]]) -> List[str]:
+    """
+    Ejecuta varios comandos de solo lectura en una sola ida y vuelta.
+
+    Escribe todos los comandos seguidos y lee una única corriente de salida,
+    que luego se separa en la respuesta de cada comando ubicando cada límite
+    prompt + eco del comando siguiente. Cada resultado tiene el mismo formato
+    que ejecutar_comando_completo_con_prompt (líneas de prompt + eco + salida +
+    prompt). Si la separación falla (el equipo no devolvió todos los prompts),
+    los comandos sin respuesta completa se vuelven a ejecutar de a uno.
+
+    Sin las condiciones de admite_lote() se ejecutan de a uno.
+
+    Args:
+        conexion: Conexión serial activa
+        comandos: Lista de (comando, espera); `espera` es el tope de cada uno
+
+    Returns:
+        Lista de respuestas, una por comando y en el mismo orden
+
+    Raises:
+        DispositivoDesconectadoError: Si el dispositivo se desconecta
+    """
+    if not admite_lote(conexion, [comando for comando, _ in comandos]):
+        return [ejecutar_comando_completo_con_prompt(conexion, comando, espera=espera) for comando, espera in comandos]
+
+    if not verificar_conexion_activa(conexion):
+        raise DispositivoDesconectadoError(
+            f"La conexión se perdió antes de ejecutar los comandos {[comando for comando, _ in comandos]}. "
+            "Verifique el cable y la conexión física."
+        )
+
+    estado = estado_consola(conexion)
+    if estado.prompt_actual is None:
+        # Posición desconocida (ej: tras un reload): un Enter deja la consola en el prompt
+        conexion.write(b"\n")
+        leer_respuesta_completa(conexion, timeout_total=2)
+        if estado.prompt_actual is None:
+            return [ejecutar_comando_completo_con_prompt(conexion, comando, espera=espera) for comando, espera in comandos]
+    prompt_inicial = estado.prompt_actual
+    # Un solo límite de silencio para todo el lote: el peor de los comandos
+    silencio = max(HISTORIAL_TIEMPOS.limite(estado.modelo, comando, espera) for comando, espera in comandos)
+    limites = [estado.patron_limite(comando) for comando, _ in comandos[1:]]
+
+    logger.debug(f"Enviando {len(comandos)} comandos en lote: {[comando for comando, _ in comandos]}")
+    conexion.reset_input_buffer()
+    conexion.write("".join(comando + "\n" for comando, _ in comandos).encode("ascii"))
+
+    # Leer hasta ver el prompt después del eco del último comando
+    buffer = BufferConsola()
+    cortes = []  # (posición donde empieza el eco del comando i+1, prompt que lo precede)
+    while True:
+        leer_hasta_prompt(conexion, estado, silencio=silencio, buffer=buffer)
+        texto = buffer.texto()
+        while len(cortes) < len(limites):
+            desde = cortes[-1][0] if cortes else 0
+            coincidencia = limites[len(cortes)].search(texto, desde)
+            if coincidencia is None:
+                break
+            cortes.append((coincidencia.end(1), coincidencia.group(1)))
+        if not estado.prompt_visto or (len(cortes) == len(limites) and estado.prompt_actual is not None):
+            break
+
+    respuestas = []
+    posiciones = [0] + [posicion for posicion, _ in cortes] + [len(texto)]
+    prompts = [prompt_inicial] + [prompt.rstrip("\r\n") for _, prompt in cortes]
+    completas = len(cortes) + (1 if estado.prompt_visto else 0)
+    for i in range(min(completas, len(comandos))):
+        lineas_prompt = ("\r\n" + prompts[i]) * 2
+        respuestas.append(lineas_prompt + texto[posiciones[i]:posiciones[i + 1]])
+
+    if len(respuestas) < len(comandos):
+        pendientes = comandos[len(respuestas):]
+        logger.warning(
+            f"Lote incompleto: {len(respuestas)}/{len(comandos)} respuestas separadas; "
+            f"se repiten de a uno {[comando for comando, _ in pendientes]}"
+        )
+        estado.invalidar_prompt()
+        respuestas.extend(
+            ejecutar_comando_completo_con_prompt(conexion, comando, espera=espera) for comando, espera in pendientes
+        )
+    return respuestas
+
+
+def ejecutar_comando_completo(conexion, comando, espera=ESPERA_COMANDO):
+    """Ejecuta un comando y maneja automáticamente el paginado --More--"""
+    # CRÍTICO: Verificar conexión ANTES de ejecutar comando
+    if not verificar_conexion_activa(conexion):
+        logger.error(f"Conexión perdida antes de ejecutar comando: {comando}")
+        raise DispositivoDesconectadoError(
+            f"La conexión se perdió antes de ejecutar el comando '{comando}'. "
+            "Verifique el cable y la conexión física."
+        )
+
+    respuesta = enviar_comando(conexion, comando, espera)
+    respuesta = manejar_more_prompt(conexion, respuesta)
+    return respuesta
+
+
+def despertar_consola(conexion):
+    """
+    'Despierta' la consola enviando Enter para obtener el prompt.
+    El prompt recibido queda registrado en el EstadoConsola de la conexión
+    para que las lecturas siguientes terminen apenas vuelva a aparecer.
+    """
+    for _ in range(3):
+        conexion.write(b"\r\n")
+        time.sleep(0.5)
+
+    respuesta = leer_respuesta_completa(conexion, timeout_total=5)
+
+    estado = estado_consola(conexion)
+    if estado.aprender_prompt(respuesta):
+        logger.info(f"Prompt del equipo detectado: {estado.hostname}")
+    else:
+        logger.warning("No se identificó el prompt del equipo; se leerá por silencio")
+    return respuesta
+
+
+def leer_respuesta_permisiva(conexion: serial.Serial, timeout_total: int = 10,
+                             buffer: Optional[BufferConsola] = None) -> str:
+    """
+    Lee la respuesta completa del dispositivo SIN lanzar excepciones por desconexión.
+
+    Esta versión es para usar durante/después del reload cuando la desconexión es NORMAL.
+
+    Args:
+        conexion: Conexión serial activa
+        timeout_total: Timeout máximo en segundos
+        buffer: BufferConsola donde acumular; por defecto uno nuevo
+
+    Returns:
+        Texto recibido en esta lectura (puede estar vacío si no hay datos)
+    """
+    if buffer is None:
+        buffer = BufferConsola()
+    inicio_lectura = buffer.posicion()
+    tiempo_inicio = time.time()
+    timeout_original = conexion.timeout
+
+    try:
+        while True:
+            tiempo_transcurrido = time.time() - tiempo_inicio
+
+            if tiempo_transcurrido > timeout_total:
+                # No lanzar excepción, simplemente retornar lo que se tenga
+                break
+
+            # Bloquea hasta que llegan datos o pasan SILENCIO_FIN_LECTURA segundos sin ellos
+            conexion.timeout = min(SILENCIO_FIN_LECTURA, max(0.0, timeout_total - tiempo_transcurrido))
+            try:
+                datos = conexion.read(conexion.in_waiting or 1)
+            except (OSError, SerialException):
+                # Error leyendo, simplemente continuar
+                break
+
+            if not datos:
+                # No hay más datos, terminar normalmente
+                break
+
+            estado_consola(conexion).enlace.registrar_actividad()
+            buffer.agregar(datos)
+            tiempo_inicio = time.time()  # Resetear timeout cuando hay datos
+
+    except Exception:
+        # Cualquier error, retornar lo que se tenga
+        pass
+    finally:
+        try:
+            conexion.timeout = timeout_original
+        except Exception:
+            pass
+
+    return buffer.texto(inicio_lectura)
+
+
+def ejecutar_comando_sin_verificacion(conexion: serial.Serial, comando: str, espera: int = 2) -> str:
+    """
+    Ejecuta un comando SIN verificar conexión antes/después.
+
+    Uso exclusivo para contextos post-reload donde la verificación puede fallar
+    aunque la conexión esté realmente funcionando.
+
+    Args:
+        conexion: Conexión serial
+        comando: Comando a enviar
+        espera: Tiempo de espera antes de leer respuesta
+
+    Returns:
+        Respuesta del dispositivo (puede estar vacía)
+    """
+    # Lectura cruda sin seguimiento del prompt: el próximo comando lo vuelve a sondear
+    estado_consola(conexion).invalidar_prompt()
+
+    try:
+        logger.debug(f"[SIN_VERIFICACION] Enviando comando: {comando}")
+
+        # NO hacer reset_input_buffer() - podría haber datos valiosos
+        comando_bytes = (comando + "\n").encode('ascii')
+        conexion.write(comando_bytes)
+        time.sleep(espera)
+
+        # Usar versión permisiva de lectura
+        respuesta = leer_respuesta_permisiva(conexion, timeout_total=10)
+        logger.debug(f"[SIN_VERIFICACION] Respuesta recibida ({len(respuesta)} caracteres)")
+        return respuesta
+
+    except Exception as error:
+        logger.error(f"[SIN_VERIFICACION] Error enviando comando: {error}")
+        return ""
+
+
+def ejecutar_comando_completo_sin_verificacion(conexion: serial.Serial, comando: str, espera: int = 2) -> str:
+    """
+    Ejecuta un comando capturando EXACTAMENTE lo que se ve en el CLI (con prompts),
+    pero SIN verificar conexión (para uso post-reload).
+
+    Esta es la versión "sin verificación estricta" de ejecutar_comando_completo_con_prompt().
+    Captura:
+    1. Los prompts previos (2 enters)
+    2. El comando enviado con su eco
+    3. La respuesta completa del dispositivo
+
+    Args:
+        conexion: Conexión serial
+        comando: Comando a enviar
+        espera: Tiempo de espera antes de leer respuesta
+
+    Returns:
+        Respuesta completa incluyendo prompts y eco (como se vería en el CLI)
+    """
+    # Lectura cruda sin seguimiento del prompt: el próximo comando lo vuelve a sondear
+    estado_consola(conexion).invalidar_prompt()
+
+    try:
+        logger.debug(f"[COMPLETO_SIN_VERIFICACION] Ejecutando comando: {comando}")
+
+        # PASO 1: Enviar 2 enters para obtener el prompt (validación)
+        conexion.write(b"\n")
+        time.sleep(0.3)
+        respuesta_enter1 = leer_respuesta_permisiva(conexion, timeout_total=2)
+
+        conexion.write(b"\n")
+        time.sleep(0.3)
+        respuesta_enter2 = leer_respuesta_permisiva(conexion, timeout_total=2)
+
+        # PASO 2: Enviar el comando real
+        # NO resetear buffer - podría haber datos valiosos
+        comando_bytes = (comando + "\n").encode('ascii')
+        conexion.write(comando_bytes)
+        time.sleep(espera)
+
+        # PASO 3: Leer la respuesta completa
+        respuesta_comando = leer_respuesta_permisiva(conexion, timeout_total=10)
+
+        # PASO 4: Manejar paginación --More-- si existe
+        # Usar una versión simple sin excepciones
+        respuesta_total = respuesta_comando
+        intentos_more = 0
+        max_intentos_more = 20
+
+        if "--More--" in respuesta_comando:
+            buffer = BufferConsola()
+            buffer.agregar(respuesta_comando.encode("ascii"))
+            while intentos_more < max_intentos_more and buffer.quitar_more():
+                try:
+                    conexion.write(b" ")
+                    time.sleep(0.5)
+                    leer_respuesta_permisiva(conexion, timeout_total=5, buffer=buffer)
+                    intentos_more += 1
+                except:
+                    break
+            respuesta_total = buffer.texto()
+
+        # PASO 5: Combinar todo - EXACTAMENTE como se vería en el CLI
+        respuesta_completa = respuesta_enter1 + respuesta_enter2 + respuesta_total
+
+        logger.debug(f"[COMPLETO_SIN_VERIFICACION] Respuesta capturada ({len(respuesta_completa)} caracteres)")
+        return respuesta_completa
+
+    except Exception as error:
+        logger.error(f"[COMPLETO_SIN_VERIFICACION] Error ejecutando comando: {error}")
+        return ""
+
+
+def entrar_modo_enable_sin_verificacion(conexion: serial.Serial, password: str = None) -> str:
+    """
+    Entra al modo enable capturando TODO el flujo del CLI (incluyendo Password:) en una sola operación.
+
+    Esta función maneja el flujo completo de enable con password SIN verificaciones estrictas,
+    capturando EXACTAMENTE lo que se ve en el CLI real.
+
+    VERSIÓN SIMPLIFICADA: Lectura manual TOTAL sin usar leer_respuesta_permisiva()
+
+    Args:
+        conexion: Conexión serial
+        password: Contraseña de enable (opcional)
+
+    Returns:
+        String con TODO el output del CLI (prompts + comandos + respuestas)
+    """
+    # Lectura cruda sin seguimiento del prompt: el próximo comando lo vuelve a sondear
+    estado_consola(conexion).invalidar_prompt()
+
+    try:
+        logger.debug("[ENABLE_SIN_VERIFICACION] ===== INICIO ENABLE =====")
+
+        respuesta_total = ""
+        password_enviado = False
+
+        # PASO 1: Enviar primer Enter y leer
+        logger.debug("[ENABLE_SIN_VERIFICACION] Enviando Enter 1")
+        conexion.write(b"\n")
+        time.sleep(0.5)
+
+        # Leer manualmente
+        for _ in range(10):  # Intentar leer por 3 segundos (10 * 0.3)
+            if conexion.in_waiting > 0:
+                datos = conexion.read(conexion.in_waiting)
+                texto = datos.decode('ascii', errors='ignore')
+                respuesta_total += texto
+                logger.debug(f"[ENABLE_SIN_VERIFICACION] Enter1: +{len(datos)} bytes")
+                break
+            time.sleep(0.3)
+
+        # PASO 2: Enviar segundo Enter y leer
+        logger.debug("[ENABLE_SIN_VERIFICACION] Enviando Enter 2")
+        conexion.write(b"\n")
+        time.sleep(0.5)
+
+        for _ in range(10):
+            if conexion.in_waiting > 0:
+                datos = conexion.read(conexion.in_waiting)
+                texto = datos.decode('ascii', errors='ignore')
+                respuesta_total += texto
+                logger.debug(f"[ENABLE_SIN_VERIFICACION] Enter2: +{len(datos)} bytes")
+                break
+            time.sleep(0.3)
+
+        # PASO 3: Enviar comando enable
+        logger.debug("[ENABLE_SIN_VERIFICACION] Enviando: enable")
+        conexion.write(b"enable\n")
+
+        # CRÍTICO: Esperar para que el switch procese el comando ANTES de empezar a leer
+        logger.debug("[ENABLE_SIN_VERIFICACION] Esperando 0.8s para que el switch procese...")
+        time.sleep(0.8)
+
+        # PASO 4: LECTURA CONTINUA con detección reactiva de Password:
+        tiempo_inicio = time.time()
+        tiempo_ultima_lectura = time.time()
+        timeout_total = 25  # Timeout generoso
+
+        logger.debug("[ENABLE_SIN_VERIFICACION] Iniciando lectura continua...")
+
+        iteracion = 0
+        while time.time() - tiempo_inicio < timeout_total:
+            iteracion += 1
+
+            # Logging periódico cada 20 iteraciones
+            if iteracion % 20 == 0:
+                logger.debug(f"[ENABLE_SIN_VERIFICACION] Iteración {iteracion}, in_waiting={conexion.in_waiting}, capturados={len(respuesta_total)} chars")
+
+            # Chequear datos disponibles
+            if conexion.in_waiting > 0:
+                try:
+                    # Leer TODO lo disponible
+                    datos = conexion.read(conexion.in_waiting)
+                    texto = datos.decode('ascii', errors='ignore')
+                    respuesta_total += texto
+                    tiempo_ultima_lectura = time.time()
+
+                    logger.debug(f"[ENABLE_SIN_VERIFICACION] +{len(datos)} bytes: {repr(texto)}")
+
+                    # DETECCIÓN REACTIVA: Si vemos Password: y no hemos enviado password
+                    if password and not password_enviado:
+                        if "Password:" in respuesta_total or "password:" in respuesta_total.lower():
+                            logger.debug("[ENABLE_SIN_VERIFICACION] *** DETECTADO 'Password:' ***")
+                            logger.debug("[ENABLE_SIN_VERIFICACION] Esperando 0.3s antes de enviar password...")
+                            time.sleep(0.3)
+
+                            logger.debug(f"[ENABLE_SIN_VERIFICACION] Enviando password: '{password}'")
+                            conexion.write((password + "\n").encode('ascii'))
+                            password_enviado = True
+
+                            logger.debug("[ENABLE_SIN_VERIFICACION] Password enviado. Continuando lectura...")
+                            # Esperar respuesta después de password
+                            time.sleep(1.5)
+                            continue  # Volver a leer inmediatamente
+
+                    # DETECCIÓN DE FINALIZACIÓN: Si vemos #
+                    if "#" in respuesta_total:
+                        logger.debug("[ENABLE_SIN_VERIFICACION] Detectado '#' en respuesta")
+                        # Esperar un momento para asegurar que no hay más datos
+                        logger.debug("[ENABLE_SIN_VERIFICACION] Esperando 1.5s para confirmar finalización...")
+                        time.sleep(1.5)
+
+                        # Verificar que no hay más datos
+                        if conexion.in_waiting == 0:
+                            logger.debug("[ENABLE_SIN_VERIFICACION] Confirmado: Sin más datos después de #, finalizando")
+                            break
+                        else:
+                            logger.debug(f"[ENABLE_SIN_VERIFICACION] Aún hay {conexion.in_waiting} bytes pendientes, continuando lectura...")
+
+                except Exception as e:
+                    logger.error(f"[ENABLE_SIN_VERIFICACION] Error en lectura: {e}")
+                    import traceback
+                    logger.error(traceback.format_exc())
+                    break
+            else:
+                # Sin datos, esperar
+                time.sleep(0.3)
+
+                # Si llevamos mucho tiempo sin recibir datos, salir
+                # IMPORTANTE: Ser MÁS paciente - esperar 5 segundos de silencio antes de salir
+                tiempo_sin_datos = time.time() - tiempo_ultima_lectura
+                if tiempo_sin_datos > 5.0:
+                    logger.debug(f"[ENABLE_SIN_VERIFICACION] Sin datos por {tiempo_sin_datos:.1f}s, finalizando")
+                    break
+
+        # PASO 5: Limpiar caracteres de control
+        respuesta_total = limpiar_caracteres_control(respuesta_total)
+
+        logger.debug(f"[ENABLE_SIN_VERIFICACION] ===== FIN ENABLE =====")
+        logger.debug(f"[ENABLE_SIN_VERIFICACION] Total capturado: {len(respuesta_total)} caracteres")
+        logger.debug(f"[ENABLE_SIN_VERIFICACION] Contenido COMPLETO:\n{repr(respuesta_total)}")
+
+        return respuesta_total
+
+    except Exception as error:
+        logger.error(f"[ENABLE_SIN_VERIFICACION] ERROR CRÍTICO: {error}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return ""
+
+
+def estabilizar_consola_post_reload(conexion: serial.Serial, max_intentos: int = 10) -> bool:
+    """
+    Estabiliza la consola después del reload enviando Enters hasta obtener un prompt estable.
+
+    Esta función se asegura de que el switch haya terminado de enviar todos los mensajes
+    de boot y esté listo para recibir comandos. Cada intento termina apenas aparece
+    el prompt (o a los TIMEOUT_INTENTO_ESTABILIZAR segundos), sin pausas fijas.
+
+    Args:
+        conexion: Conexión serial
+        max_intentos: Número máximo de intentos
+
+    Returns:
+        True si se estabilizó, False si no
+    """
+    logger.info("[ESTABILIZAR] Iniciando estabilización de consola post-reload")
+
+    prompts_estables_consecutivos = 0
+    prompts_requeridos = 2  # Necesitamos ver el prompt al menos 2 veces seguidas
+
+    for intento in range(max_intentos):
+        try:
+            # Enviar Enter y esperar el prompt (termina apenas aparece)
+            conexion.write(b"\r\n")
+            respuesta = esperar_prompt_generico(conexion, TIMEOUT_INTENTO_ESTABILIZAR)
+
+            # El prompt (> o #) debe estar al FINAL de la respuesta: si después
+            # llegaron mensajes de boot, todavía no está estable
+            if termina_en_prompt_generico(respuesta):
+                prompts_estables_consecutivos += 1
+                ultima_linea = respuesta.strip().split('\n')[-1]
+                logger.debug(f"[ESTABILIZAR] Prompt detectado ({prompts_estables_consecutivos}/{prompts_requeridos}): '{ultima_linea[-20:]}'")
+
+                if prompts_estables_consecutivos >= prompts_requeridos:
+                    estado_consola(conexion).aprender_prompt(respuesta)
+                    logger.info(f"[ESTABILIZAR] Consola estabilizada después de {intento + 1} intentos")
+                    return True
+            else:
+                # Sin prompt al final (o sin respuesta), reiniciar contador
+                prompts_estables_consecutivos = 0
+
+        except Exception as e:
+            logger.warning(f"[ESTABILIZAR] Error en intento {intento + 1}: {e}")
+            prompts_estables_consecutivos = 0
+            time.sleep(TIMEOUT_INTENTO_ESTABILIZAR)
+            continue
+
+    logger.warning("[ESTABILIZAR] No se pudo estabilizar la consola completamente")
+    return False
+
+
+def entrar_modo_enable(conexion, password):
+    """Entra al modo privilegiado (enable) del dispositivo"""
+    respuesta = enviar_comando(conexion, "enable", espera=1)
+
+    if "Password:" in respuesta or "password:" in respuesta.lower():
+        respuesta = enviar_comando(conexion, password, espera=1, registrar_tiempo=False)
+
+    if "#" in respuesta:
+        return True
+    else:
+        return True  # Continuar de todas formas
+
+
+def configurar_terminal(conexion):
+    """Configura el terminal para evitar paginación y mejorar la salida"""
+    respuesta = ejecutar_comando_completo(conexion, "terminal length 0")
+    ejecutar_comando_completo(conexion, "terminal width 512")
+    estado_consola(conexion).paginacion_desactivada = "Invalid input" not in respuesta
+
+
+def contar_fuentes_poder(salida_show_inventory):
+    """
+    Cuenta el número de fuentes de poder según 'show inventory'
+    Busca líneas que contengan PID de fuentes de poder o descripciones
+    """
+    # Contar líneas con PID de fuentes de poder (PWR-, C9K-PWR, etc.)
+    # o descripciones de Power Supply
+    patron_pid = re.compile(r'PID:\s*(PWR-[^\s,]+|C9K-PWR[^\s,]+)', re.IGNORECASE)
+    patron_desc = re.compile(r'DESCR:.*Power\s+Supply', re.IGNORECASE)
+    patron_name = re.compile(r'NAME:.*Power\s+Supply', re.IGNORECASE)
+
+    pids = patron_pid.findall(salida_show_inventory)
+    descs = patron_desc.findall(salida_show_inventory)
+    names = patron_name.findall(salida_show_inventory)
+
+    # Usar el máximo entre los tres métodos
+    cantidad = max(len(pids), len(descs), len(names))
+
+    # Si no se encuentra ninguna, asumir 1
+    if cantidad == 0:
+        cantidad = 1
+
+    return cantidad
+
+
+def contar_ventiladores(salida_show_inventory):
+    """
+    Cuenta el número de ventiladores según 'show inventory'
+    Busca líneas que contengan PID de ventiladores o descripciones
+    """
+    # Contar líneas con PID de ventiladores o descripciones
+    # Ejemplos: C9200-FAN-1, FAN-1, etc.
+    patron_pid = re.compile(r'PID:\s*([^\s,]*FAN[^\s,]*)', re.IGNORECASE)
+    patron_desc = re.compile(r'DESCR:.*Fan\s+(Tray|Module|Assembly)', re.IGNORECASE)
+    patron_name = re.compile(r'NAME:.*Fan', re.IGNORECASE)
+
+    pids = patron_pid.findall(salida_show_inventory)
+    descs = patron_desc.findall(salida_show_inventory)
+    names = patron_name.findall(salida_show_inventory)
+
+    # Usar el máximo entre los tres métodos
+    cantidad = max(len(pids), len(descs), len(names))
+
+    # Si no se encuentra ninguna, asumir 1
+    if cantidad == 0:
+        cantidad = 1
+
+    return cantidad
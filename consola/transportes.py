@@ -0,0 +1,572 @@
+"""
+Transportes de la consola de los equipos.
+
+Una sesión de consola trabaja sobre cualquier objeto con la interfaz de
+serial.Serial que usa (read, write, in_waiting, timeout, reset_input_buffer,
+close...). Según el destino se abre uno u otro:
+
+    COM3, /dev/ttyUSB0, /dev/ttyACM0   puerto serie (pyserial)
+    /dev/pts/7                         pseudo-terminal (ej: exe/simulador_consola.py)
+    socket://10.0.0.5:2003             puerto TCP crudo de un servidor de consolas
+    telnet://10.0.0.5:2003             puerto telnet de un servidor de consolas
+
+En Linux/macOS todas las consolas abiertas las atiende un único hilo de E/S
+(MultiplexorConsolas), sea cual sea el transporte.
+"""
+
+import logging
+import os
+import re
+import select
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import serial
+from serial import SerialException
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DESTINOS Y PARÁMETROS DE LÍNEA
+# =============================================================================
+# Puertos seriales válidos (/dev/pts/N: pseudo-terminales, ej: simulador_consola.py)
+# y puertos de un servidor de consolas (socket://host:puerto o telnet://host:puerto)
+VALID_PORT_PATTERN = re.compile(
+    r'^(COM[1-9]\d?|/dev/tty(USB|ACM)\d+|/dev/pts/\d+|(socket|telnet)://[\w.\-]+:\d{1,5})$', re.IGNORECASE
+)
+PATRON_DESTINO_RED = re.compile(r'^(?P<esquema>[a-z]+)://(?P<host>[\w.\-]+):(?P<puerto>\d{1,5})$', re.IGNORECASE)
+
+# Baudrates permitidos para dispositivos Cisco
+VALID_BAUDRATES = [9600, 19200, 38400, 57600, 115200]
+
+# Configuración estándar para consola Cisco
+BYTESIZE = serial.EIGHTBITS
+PARITY = serial.PARITY_NONE
+STOPBITS = serial.STOPBITS_ONE
+
+# Servidor de consolas por TCP
+TIMEOUT_CONEXION_TCP = 5  # segundos para establecer la conexión
+TIMEOUT_ESCRITURA_TCP = 10  # segundos máximos bloqueado enviando
+TAMANO_LECTURA_TCP = 4096
+
+# Telnet (RFC 854): comandos y opciones que usa el transporte
+IAC, DONT, DO, WONT, WILL, SB, BRK, SE = 255, 254, 253, 252, 251, 250, 243, 240
+OPCION_BINARIA, OPCION_ECO, OPCION_SGA = 0, 1, 3
+# Opciones que se aceptan del servidor (él hace el eco, sin go-ahead, 8 bits) y de este lado
+OPCIONES_REMOTAS_ACEPTADAS = {OPCION_BINARIA, OPCION_ECO, OPCION_SGA}
+OPCIONES_LOCALES_ACEPTADAS = {OPCION_BINARIA, OPCION_SGA}
+# Pedidas al conectar: modo carácter, con el eco del equipo a través del servidor
+OPCIONES_INICIALES = ((DO, OPCION_SGA), (WILL, OPCION_SGA), (DO, OPCION_ECO))
+PATRON_CR_SUELTO = re.compile(rb"\r(?!\n)")
+
+
+def validar_puerto_serial(puerto: str) -> bool:
+    """Valida que el puerto serial (o el destino socket:// / telnet://) tenga un formato válido"""
+    if not puerto:
+        return False
+    return VALID_PORT_PATTERN.match(puerto) is not None
+
+
+def validar_baudrate(baudrate: int) -> bool:
+    """Valida que el baudrate sea uno de los valores permitidos"""
+    return baudrate in VALID_BAUDRATES
+
+
+# =============================================================================
+# TRANSPORTE TCP (SERVIDOR DE CONSOLAS)
+# =============================================================================
+class TransporteTCP:
+    """
+    Puerto de un servidor de consolas en modo TCP crudo, con la interfaz de
+    serial.Serial que usa la sesión.
+
+    La velocidad de la línea la fija el servidor de consolas: `baudrate` solo
+    se conserva como dato. No hay líneas de módem (dsr/cts/cd son False), así
+    que la salud del enlace se juzga por los datos recibidos y los errores del
+    socket. TCP_NODELAY evita que cada comando corto espere al algoritmo de
+    Nagle.
+
+    Raises:
+        SerialException: Si no se puede conectar
+    """
+
+    esquema = "socket"
+
+    def __init__(self, host: str, puerto: int, baudrate: int, timeout: Optional[float] = None,
+                 timeout_conexion: float = TIMEOUT_CONEXION_TCP):
+        self.host = host
+        self.numero_puerto = puerto
+        self.port = f"{self.esquema}://{host}:{puerto}"
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self._entrada = bytearray()
+        self._lock_escritura = threading.Lock()  # el multiplexor también escribe (negociación telnet)
+        try:
+            self._socket = socket.create_connection((host, puerto), timeout=timeout_conexion)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._socket.settimeout(TIMEOUT_ESCRITURA_TCP)
+        except OSError as error:
+            raise SerialException(f"No se pudo conectar a {self.port}: {error}")
+
+    # Líneas de módem: un socket no las tiene
+    dsr = cts = cd = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._socket is not None
+
+    def fileno(self) -> int:
+        if self._socket is None:
+            raise SerialException(f"{self.port} está cerrado")
+        return self._socket.fileno()
+
+    def _recibir(self, espera: float) -> bool:
+        """
+        Pasa al buffer lo que llegue en hasta `espera` segundos.
+
+        Returns:
+            True si se recibió algo
+
+        Raises:
+            SerialException: Si la conexión se cerró o falló
+        """
+        if self._socket is None:
+            raise SerialException(f"{self.port} está cerrado")
+        try:
+            legible, _, _ = select.select([self._socket], [], [], max(0.0, espera))
+            if not legible:
+                return False
+            datos = self._socket.recv(TAMANO_LECTURA_TCP)
+        except OSError as error:
+            raise SerialException(f"Error de lectura en {self.port}: {error}")
+        if not datos:
+            raise SerialException(f"El servidor de consolas cerró la conexión ({self.port})")
+        self._entrada += self.procesar_entrada(datos)
+        return True
+
+    def procesar_entrada(self, datos: bytes) -> bytes:
+        """Bytes recibidos del socket -> bytes de la consola (TCP crudo: sin cambios)"""
+        return datos
+
+    @property
+    def in_waiting(self) -> int:
+        while self._recibir(0):
+            pass
+        return len(self._entrada)
+
+    def read(self, size: int = 1) -> bytes:
+        """Igual que serial.Serial.read: espera hasta `size` bytes o hasta el timeout"""
+        limite = None if self.timeout is None else time.monotonic() + self.timeout
+        while len(self._entrada) < size:
+            restante = None if limite is None else limite - time.monotonic()
+            if restante is not None and restante <= 0:
+                break
+            self._recibir(TIMEOUT_ESCRITURA_TCP if restante is None else restante)
+        datos = bytes(self._entrada[:size])
+        del self._entrada[:size]
+        return datos
+
+    def codificar_salida(self, datos) -> bytes:
+        """Bytes de la consola -> bytes para el socket (TCP crudo: sin cambios)"""
+        return bytes(datos)
+
+    def _enviar(self, datos: bytes) -> None:
+        if self._socket is None:
+            raise SerialException(f"{self.port} está cerrado")
+        try:
+            with self._lock_escritura:
+                self._socket.sendall(datos)
+        except OSError as error:
+            raise SerialException(f"Error de escritura en {self.port}: {error}")
+
+    def write(self, datos) -> int:
+        self._enviar(self.codificar_salida(datos))
+        return len(datos)
+
+    def send_break(self, duration: float = 0.25) -> None:
+        raise SerialException(f"{self.port}: el TCP crudo no transmite break (use telnet://)")
+
+    def flush(self) -> None:
+        """sendall ya entregó todo al sistema operativo"""
+
+    def reset_input_buffer(self) -> None:
+        self._entrada.clear()
+        while self._recibir(0):
+            self._entrada.clear()
+
+    def reset_output_buffer(self) -> None:
+        """Lo enviado ya está en camino: no hay nada que descartar"""
+
+    def close(self) -> None:
+        if self._socket is None:
+            return
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        self._socket = None
+
+
+def _abrir_serie(destino: str, baudrate: int, timeout: float) -> serial.Serial:
+    """Puerto serie o pseudo-terminal"""
+    return serial.Serial(
+        port=destino,
+        baudrate=baudrate,
+        bytesize=BYTESIZE,
+        parity=PARITY,
+        stopbits=STOPBITS,
+        timeout=timeout,
+        xonxoff=False,
+        rtscts=False,
+        dsrdtr=False
+    )
+
+
+# =============================================================================
+# TRANSPORTE TELNET (SERVIDOR DE CONSOLAS)
+# =============================================================================
+class TransporteTelnet(TransporteTCP):
+    """
+    Puerto de un servidor de consolas por telnet.
+
+    Negocia modo carácter (supresión de go-ahead y eco del lado remoto) y
+    rechaza las demás opciones. Cada opción se contesta solo si cambia de
+    estado y no era la respuesta a un pedido propio, para no entrar en bucles
+    de negociación (RFC 1143). De la entrada se quitan los comandos telnet; al
+    enviar se duplica 0xFF y, fuera del modo binario, un CR suelto viaja como
+    CR NUL. send_break() envía IAC BRK, que el servidor convierte en un break
+    de la línea serie (ej: para detener el arranque en ROMMON).
+    """
+
+    esquema = "telnet"
+
+    def __init__(self, *args, **kwargs):
+        self._estado = "datos"  # "datos" | "iac" | "opcion" | "sb" | "sb_iac"
+        self._verbo = None
+        self._tras_cr = False
+        self._remotas = set()  # opciones activas del lado del servidor
+        self._locales = set()  # opciones activas de este lado
+        self._pedidos = set()  # (verbo, opción) enviados que esperan respuesta
+        super().__init__(*args, **kwargs)
+        for verbo, opcion in OPCIONES_INICIALES:
+            self._pedidos.add((verbo, opcion))
+            self._enviar(bytes([IAC, verbo, opcion]))
+
+    def procesar_entrada(self, datos: bytes) -> bytes:
+        """Quita los comandos telnet (y responde la negociación) de los bytes recibidos"""
+        salida = bytearray()
+        indice = 0
+        while indice < len(datos):
+            if self._estado == "datos":
+                fin = datos.find(IAC, indice)
+                if fin < 0:
+                    fin = len(datos)
+                else:
+                    self._estado = "iac"
+                salida += self._datos_nvt(datos[indice:fin])
+                indice = fin + 1
+                continue
+
+            byte = datos[indice]
+            indice += 1
+            if self._estado == "iac":
+                if byte == IAC:
+                    salida.append(IAC)
+                    self._tras_cr = False
+                    self._estado = "datos"
+                elif byte in (DO, DONT, WILL, WONT):
+                    self._verbo = byte
+                    self._estado = "opcion"
+                elif byte == SB:
+                    self._estado = "sb"
+                else:
+                    # NOP, GA, AYT...: no afectan a la consola
+                    self._estado = "datos"
+            elif self._estado == "opcion":
+                self._negociar(self._verbo, byte)
+                self._estado = "datos"
+            elif self._estado == "sb":
+                # Subnegociación de una opción que no se aceptó: se descarta hasta IAC SE
+                if byte == IAC:
+                    self._estado = "sb_iac"
+            else:
+                self._estado = "datos" if byte == SE else "sb"
+        return bytes(salida)
+
+    def _datos_nvt(self, datos: bytes) -> bytes:
+        """Fuera del modo binario, el CR NUL de la terminal virtual vuelve a ser un CR"""
+        if not datos or OPCION_BINARIA in self._remotas:
+            return datos
+        if self._tras_cr and datos[0] == 0:
+            datos = datos[1:]
+        self._tras_cr = datos.endswith(b"\r")
+        return datos.replace(b"\r\0", b"\r")
+
+    def _negociar(self, verbo: int, opcion: int) -> None:
+        if verbo in (WILL, WONT):
+            aceptadas, activas, si, no, pedido = OPCIONES_REMOTAS_ACEPTADAS, self._remotas, DO, DONT, (DO, opcion)
+        else:
+            aceptadas, activas, si, no, pedido = OPCIONES_LOCALES_ACEPTADAS, self._locales, WILL, WONT, (WILL, opcion)
+        era_respuesta = pedido in self._pedidos
+        self._pedidos.discard(pedido)
+
+        respuesta = None
+        if verbo in (WILL, DO):
+            if opcion not in aceptadas:
+                respuesta = no
+            elif opcion not in activas:
+                activas.add(opcion)
+                respuesta = None if era_respuesta else si
+        elif opcion in activas:
+            activas.discard(opcion)
+            respuesta = None if era_respuesta else no
+
+        logger.debug(f"[TELNET] {self.port}: recibido {verbo} {opcion}, respuesta {respuesta}")
+        if respuesta is not None:
+            self._enviar(bytes([IAC, respuesta, opcion]))
+
+    def codificar_salida(self, datos) -> bytes:
+        datos = bytes(datos).replace(b"\xff", b"\xff\xff")
+        if OPCION_BINARIA not in self._locales:
+            datos = PATRON_CR_SUELTO.sub(b"\r\0", datos)
+        return datos
+
+    def send_break(self, duration: float = 0.25) -> None:
+        """La duración del break la decide el servidor de consolas"""
+        self._enviar(bytes([IAC, BRK]))
+
+
+# Transportes de red por esquema del destino ("socket://host:puerto", "telnet://host:puerto")
+TRANSPORTES_RED = {
+    "socket": TransporteTCP,
+    "telnet": TransporteTelnet,
+}
+
+
+def abrir_transporte(destino: str, baudrate: int, timeout: float):
+    """
+    Abre el transporte que corresponde al destino, sin validar el equipo.
+
+    Args:
+        destino: Puerto serie, pty o URL de un servidor de consolas
+        baudrate: Velocidad de la línea (en TCP la fija el servidor de consolas)
+        timeout: Timeout de lectura por defecto
+
+    Returns:
+        serial.Serial o un transporte de red con su misma interfaz
+
+    Raises:
+        serial.SerialException: Si no se puede abrir
+    """
+    red = PATRON_DESTINO_RED.match(destino)
+    if red is None:
+        return _abrir_serie(destino, baudrate, timeout)
+    transporte = TRANSPORTES_RED.get(red.group("esquema").lower())
+    if transporte is None:
+        raise SerialException(f"Transporte no soportado: {destino}")
+    return transporte(red.group("host"), int(red.group("puerto")), baudrate, timeout)
+
+
+# =============================================================================
+# MULTIPLEXOR DE CONSOLAS
+# =============================================================================
+# En Linux/macOS un solo hilo de E/S atiende todas las consolas abiertas con
+# selectors. Cada sesión lee de un buffer propio y queda bloqueada en una
+# condición hasta que llegan datos o vence su timeout: sin sondeos periódicos
+# de in_waiting ni despertares mientras el equipo no transmite.
+# En Windows los puertos COM no se pueden multiplexar con select y se usa
+# serial.Serial directamente.
+
+TAMANO_LECTURA_MULTIPLEXOR = 4096
+
+
+class MultiplexorConsolas:
+    """Hilo único que lee todas las consolas registradas y reparte los datos"""
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._hilo = None
+        # Pipe para despertar al select() cuando se registra o quita una consola
+        self._despertar_r, self._despertar_w = os.pipe()
+        os.set_blocking(self._despertar_r, False)
+        self._selector.register(self._despertar_r, selectors.EVENT_READ, None)
+        self._pendientes = deque()  # ("alta" | "baja", consola)
+
+    @staticmethod
+    def disponible() -> bool:
+        return os.name == "posix"
+
+    def registrar(self, consola: "ConsolaMultiplexada") -> None:
+        with self._lock:
+            self._pendientes.append(("alta", consola))
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="multiplexor-consolas", daemon=True)
+                self._hilo.start()
+        os.write(self._despertar_w, b"x")
+
+    def quitar(self, consola: "ConsolaMultiplexada") -> None:
+        with self._lock:
+            self._pendientes.append(("baja", consola))
+        os.write(self._despertar_w, b"x")
+
+    def _aplicar_pendientes(self) -> None:
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, deque()
+        for operacion, consola in pendientes:
+            try:
+                if operacion == "alta":
+                    self._selector.register(consola.fd, selectors.EVENT_READ, consola)
+                else:
+                    # Se usa el descriptor guardado: el puerto ya puede estar cerrado y su
+                    # número reutilizado por una consola nueva
+                    clave = self._selector.get_map().get(consola.fd)
+                    if clave is not None and clave.data is consola:
+                        self._selector.unregister(consola.fd)
+            except (KeyError, ValueError, OSError) as error:
+                logger.debug(f"[MULTIPLEXOR] {operacion} de {consola.port}: {error}")
+
+    def _bucle(self) -> None:
+        while True:
+            for clave, _ in self._selector.select():
+                if clave.data is None:
+                    try:
+                        os.read(self._despertar_r, 512)
+                    except BlockingIOError:
+                        pass
+                    self._aplicar_pendientes()
+                    continue
+
+                consola = clave.data
+                try:
+                    datos = os.read(clave.fd, TAMANO_LECTURA_MULTIPLEXOR)
+                    if not datos:
+                        raise SerialException("El puerto se cerró (EOF)")
+                except (OSError, SerialException) as error:
+                    self._selector.unregister(clave.fd)
+                    consola._registrar_error(error)
+                    continue
+                consola._recibir(datos)
+
+
+class ConsolaMultiplexada:
+    """
+    Fachada con la interfaz de serial.Serial que usa el resto del programa
+    (read, write, in_waiting, timeout, reset_input_buffer, close...). Las
+    escrituras van directo al puerto; las lecturas salen del buffer que llena
+    el MultiplexorConsolas.
+    """
+
+    def __init__(self, conexion: serial.Serial, multiplexor: MultiplexorConsolas):
+        self._conexion = conexion
+        self._multiplexor = multiplexor
+        # Lo que el transporte ya tenía recibido no se pierde al pasar al multiplexor
+        self._buffer = bytearray(conexion.read(conexion.in_waiting))
+        self._condicion = threading.Condition()
+        self._error = None
+        # Transportes que interpretan un protocolo sobre los bytes crudos del descriptor
+        self._procesar_entrada = getattr(conexion, "procesar_entrada", None)
+        self.timeout = conexion.timeout
+        # Descriptor del puerto, para darlo de baja en el selector aunque ya esté cerrado
+        self.fd = conexion.fileno()
+        multiplexor.registrar(self)
+
+    def __getattr__(self, nombre):
+        # port, baudrate, dsr, cts, cd, fileno, write_timeout, etc.
+        return getattr(self._conexion, nombre)
+
+    def _recibir(self, datos: bytes) -> None:
+        if self._procesar_entrada is not None:
+            datos = self._procesar_entrada(datos)
+        with self._condicion:
+            self._buffer += datos
+            self._condicion.notify_all()
+
+    def _registrar_error(self, error: Exception) -> None:
+        with self._condicion:
+            self._error = error
+            self._condicion.notify_all()
+
+    @property
+    def in_waiting(self) -> int:
+        if self._error is not None and not self._buffer:
+            raise SerialException(f"Error de lectura en {self._conexion.port}: {self._error}")
+        return len(self._buffer)
+
+    def read(self, size: int = 1) -> bytes:
+        """Igual que serial.Serial.read: espera hasta `size` bytes o hasta el timeout"""
+        limite = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._condicion:
+            while len(self._buffer) < size and self._error is None:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    break
+                self._condicion.wait(restante)
+            if not self._buffer and self._error is not None:
+                raise SerialException(f"Error de lectura en {self._conexion.port}: {self._error}")
+            datos = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return datos
+
+    def reset_input_buffer(self) -> None:
+        with self._condicion:
+            self._buffer.clear()
+        # Un socket solo lo lee el hilo del multiplexor (el protocolo no admite lectores cruzados)
+        if self._procesar_entrada is None:
+            self._conexion.reset_input_buffer()
+
+    def write(self, datos) -> int:
+        return self._conexion.write(datos)
+
+    def flush(self) -> None:
+        self._conexion.flush()
+
+    @property
+    def is_open(self) -> bool:
+        return self._conexion.is_open
+
+    def close(self) -> None:
+        if self._conexion.is_open:
+            self._multiplexor.quitar(self)
+        self._conexion.close()
+
+
+_multiplexor_consolas = None
+_lock_multiplexor = threading.Lock()
+
+
+def multiplexar_conexion(conexion: serial.Serial):
+    """
+    Pasa la conexión al multiplexor compartido si la plataforma lo permite.
+
+    Returns:
+        ConsolaMultiplexada, o la misma conexión en Windows
+    """
+    global _multiplexor_consolas
+    if not MultiplexorConsolas.disponible():
+        return conexion
+    with _lock_multiplexor:
+        if _multiplexor_consolas is None:
+            _multiplexor_consolas = MultiplexorConsolas()
+    return ConsolaMultiplexada(conexion, _multiplexor_consolas)
+
+
+def cerrar_conexion_serial(conexion: Optional[serial.Serial]) -> None:
+    """
+    Cierra la conexión serial de forma segura.
+
+    Args:
+        conexion: Objeto de conexión serial o None
+    """
+    try:
+        if conexion and conexion.is_open:
+            logger.info("Cerrando conexión serial...")
+            conexion.close()
+            logger.info("Conexión serial cerrada correctamente")
+    except Exception as error:
+        logger.error(f"Error cerrando conexión serial: {error}")
@@ -6,23 +6,108 @@ import logging
 from pathlib import Path
 import requests
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                               QLabel, QLineEdit, QPushButton, QMessageBox, QFrame, QTextEdit,
-                               QSpinBox, QCheckBox, QScrollArea, QGroupBox, QComboBox, QFileDialog)
-from PySide6.QtCore import Qt, QThread, Signal
-from PySide6.QtGui import QFont, QTextCursor, QIcon
+                               QLabel, QLineEdit, QPushButton, QMessageBox, QFrame,
+                               QSpinBox, QCheckBox, QScrollArea, QGroupBox, QComboBox, QFileDialog,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+                               QPlainTextEdit)
+from PySide6.QtCore import Qt, QThread, Signal, QObject, QTimer
+from PySide6.QtGui import QFont, QTextCursor, QIcon, QTextCharFormat, QColor
 
 # Importar módulos para conexión serial
 import serial
 from serial import SerialException, SerialTimeoutException
+from serial.tools import list_ports
 import time
 import re
+import json
+import gzip
+import hashlib
+import hmac
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Agregar el directorio padre al path para importar módulos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Sesión de consola compartida con script_modelos/ (transportes serie, pty y TCP)
+from consola.transportes import (
+    BYTESIZE,
+    PARITY,
+    STOPBITS,
+    VALID_BAUDRATES,
+    cerrar_conexion_serial,
+    validar_baudrate,
+    validar_puerto_serial,
+)
+from consola.sesion import (
+    DESCRIPCION_ETAPAS_ARRANQUE,
+    ESPERA_COMANDO,
+    HISTORIAL_TIEMPOS,
+    INTERVALO_CONFIRMACION_RELOAD,
+    INTERVALO_SEGUIMIENTO_ARRANQUE,
+    MENSAJES_INICIO_RELOAD,
+    PATRON_ESPERA_ENTRADA,
+    PATRON_PROMPT_GENERICO,
+    SILENCIO_FIN_ARRANQUE,
+    TIMEOUT_ARRANQUE_MAXIMO,
+    TIMEOUT_COMANDO,
+    TIMEOUT_CONFIRMACION_RELOAD,
+    TIMEOUT_INTENTO_ESTABILIZAR,
+    TIMEOUT_INTENTO_RECONEXION,
+    VENTANA_PROMPT,
+    DispositivoDesconectadoError,
+    DispositivoNoDetectadoError,
+    SeguimientoArranque,
+    TimeoutConexionError,
+    abrir_conexion_serial,
+    configurar_terminal,
+    despertar_consola,
+    ejecutar_comando_completo,
+    ejecutar_comando_completo_con_prompt,
+    ejecutar_comando_completo_sin_verificacion,
+    ejecutar_comando_sin_verificacion,
+    ejecutar_comandos_en_lote,
+    entrar_modo_enable,
+    entrar_modo_enable_sin_verificacion,
+    estabilizar_consola_post_reload,
+    estado_consola,
+    esperar_prompt_generico,
+    leer_fragmento_consola,
+    termina_en_prompt_generico,
+    verificar_conexion_activa,
+)
+
+# Motor de informes del servidor (python-docx, Pillow); sin él solo se genera el .txt
+# Al compilar, las plantillas se empaquetan con --add-data "plantillas;plantillas"
+try:
+    from funcionalidades.informe import generar_informe_desde_archivo
+except ImportError:
+    generar_informe_desde_archivo = None
+
+# Verificación local de la licencia (cryptography); sin ella siempre se valida en el servidor
+try:
+    from funcionalidades.licencias import LicenciaInvalidaError, cargar_clave_publica, verificar_licencia
+except ImportError:
+    verificar_licencia = None
+
 
 # URL de la API que expone el backend Flask
 API_VALIDAR_ACCESO_URL = "http://localhost:80/api/validar-acceso"
+# Subida de capturas en bloques gzip reanudables (requiere el token del login)
+API_SUBIDAS_URL = "http://localhost:80/api/subidas"
+TIMEOUT_LOGIN = 10  # segundos
+
+# Sesión HTTP compartida: reutiliza la conexión (keep-alive) entre peticiones a la API
+SESION_HTTP = requests.Session()
+
+# Licencia firmada por el servidor (Ed25519, ver funcionalidades/licencias.py).
+# Con una licencia vigente en caché, el inicio de sesión no consulta al servidor.
+# Sin clave pública configurada no se guarda caché y siempre se valida en línea.
+LICENCIA_CLAVE_PUBLICA = os.environ.get("FAT_LICENCIA_CLAVE_PUBLICA", "")
+ARCHIVO_LICENCIA = Path.home() / ".fat_testing" / "licencia.json"
+ITERACIONES_PBKDF2 = 200_000  # verificador local de la contraseña
 
 # BASE_DIR:
 #   - Si el programa está compilado con PyInstaller, usa la carpeta temporal _MEIPASS
@@ -52,63 +137,38 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 # CONSTANTES DE VALIDACIÓN Y CONFIGURACIÓN
 # =============================================================================
-# Puertos seriales válidos
-VALID_PORT_PATTERN = re.compile(r'^(COM[1-9]\d?|/dev/tty(USB|ACM)\d+)$', re.IGNORECASE)
-
-# Baudrates permitidos para dispositivos Cisco
-VALID_BAUDRATES = [9600, 19200, 38400, 57600, 115200]
+# Puertos, baudrates, timeouts de consola y patrones de prompt: consola/transportes.py y consola/sesion.py
 
-# Timeouts configurables
-TIMEOUT_CONEXION_INICIAL = 5  # segundos para validar conexión inicial
-TIMEOUT_LECTURA = 2  # segundos por defecto para leer respuesta
-TIMEOUT_COMANDO = 10  # segundos para comandos normales
-TIMEOUT_RELOAD = 180  # 3 minutos para reload
+# Descubrimiento de consolas (botón "Detectar"): un Enter por baudrate, todos los puertos en paralelo
+TIMEOUT_SONDEO_PUERTO = 0.8  # segundos esperando el prompt tras el Enter, por baudrate
+TIMEOUT_SONDEO_MODELO = 3.0  # segundos para "show version | include" en el equipo detectado
+MAX_SONDEOS_PARALELOS = 16
 
 # Reintentos
 MAX_REINTENTOS = 3
 ESPERA_ENTRE_REINTENTOS = 2  # segundos
 
-# Caracteres que indican prompt de Cisco
-CISCO_PROMPTS = ['>', '#']
-
-# Palabras clave que indican dispositivo Cisco válido
-CISCO_KEYWORDS = ['Cisco', 'IOS', 'Catalyst', 'Switch', 'Router']
-
-# =============================================================================
-# EXCEPCIONES PERSONALIZADAS
-# =============================================================================
-class ConexionSerialError(Exception):
-    """Excepción base para errores de conexión serial"""
-    pass
-
-class DispositivoNoDetectadoError(ConexionSerialError):
-    """Se abrió el puerto pero no hay dispositivo Cisco respondiendo"""
-    pass
+# Informe Word generado localmente al terminar cada sesión, junto a la transcripción
+GENERAR_INFORME_LOCAL = True
+TIPO_INFORME_POR_MODELO = {
+    "Cisco Catalyst 9200": "SW L2 9200",
+    "Cisco Catalyst 9300": "SW L2 9300",
+    "Cisco Catalyst 9500": "SW L2 9500",
+}
 
-class DispositivoDesconectadoError(ConexionSerialError):
-    """El dispositivo se desconectó durante la ejecución"""
-    pass
+# Subida de la transcripción al servidor al terminar cada sesión
+SUBIR_CAPTURAS_AL_SERVIDOR = True
+TAMANO_BLOQUE_SUBIDA = 256 * 1024  # bytes sin comprimir por bloque
+TIMEOUT_SUBIDA = 30  # segundos por petición
 
-class TimeoutConexionError(ConexionSerialError):
-    """Timeout esperando respuesta del dispositivo"""
-    pass
-
-class RespuestaInvalidaError(ConexionSerialError):
-    """La respuesta del dispositivo no es válida"""
-    pass
 
 # =============================================================================
 # FUNCIONES DE VALIDACIÓN
 # =============================================================================
-def validar_puerto_serial(puerto: str) -> bool:
-    """Valida que el puerto serial tenga un formato válido"""
-    if not puerto:
-        return False
-    return VALID_PORT_PATTERN.match(puerto) is not None
+def parsear_puertos(texto: str) -> List[str]:
+    """Separa una lista de puertos escrita por el usuario ("COM3, COM4 COM5")"""
+    return [puerto for puerto in re.split(r'[,;\s]+', texto.strip()) if puerto]
 
-def validar_baudrate(baudrate: int) -> bool:
-    """Valida que el baudrate sea uno de los valores permitidos"""
-    return baudrate in VALID_BAUDRATES
 
 def sanitizar_nombre_archivo(nombre: str) -> str:
     """Sanitiza nombre de archivo removiendo caracteres inválidos"""
@@ -177,9 +237,14 @@ def show_message(parent, title, message, msg_type="info"):
 
 
 
+# Columnas del tablero de sesiones en paralelo (una fila por puerto)
+COLUMNAS_SESIONES = ["Puerto", "Estado", "Etapa", "Último mensaje", "Archivo"]
+
 # =============================================================================
 # MAPEO DE COMANDOS POR DISPOSITIVO
 # =============================================================================
+# "espera": tope en segundos para la respuesta de cada comando. La lectura
+# termina apenas vuelve el prompt; el tope se ajusta con HistorialTiempos.
 
 MAPEO_DISPOSITIVOS = {
     "Cisco Catalyst 9200": {
@@ -313,19 +378,22 @@ class DesktopUser:
     # Entradas:
     #   - email (str): correo del usuario.
     #   - nombre_completo (str | None): nombre y apellido tal como vienen desde la API (opcional).
+    #   - token_api (str | None): token Bearer entregado por la API al validar el acceso.
     #
     # Salidas:
     #   - Instancia con los atributos:
     #       - self.email (str)
     #       - self.nombre (str)
     #       - self.apellido (str)
+    #       - self.token_api (str | None)
     #
     # Dependencias:
     #   - No depende de la base de datos ni de modelos de SQLAlchemy.
     #   - Se usa en LoginWindow (al autenticar) y MainWindow (para mostrar el nombre).
 
-    def __init__(self, email: str, nombre_completo: str | None = None):
+    def __init__(self, email: str, nombre_completo: str | None = None, token_api: str | None = None):
         self.email = (email or "").strip()
+        self.token_api = token_api  # Bearer para las rutas de la API (subida de capturas)
 
         nombre_completo = (nombre_completo or "").strip()
         self.nombre = ""
@@ -338,974 +406,1045 @@ class DesktopUser:
             if len(partes) >= 2:
                 self.apellido = " ".join(partes[1:])
 
+
 # =============================================================================
-# FUNCIONES DEL SCRIPT CISCO 9200 - ADAPTADAS PARA LA INTERFAZ
+# LICENCIA EN CACHÉ (INICIO DE SESIÓN SIN CONEXIÓN)
 # =============================================================================
 
-# Configuración estándar para consola Cisco
-BYTESIZE = serial.EIGHTBITS
-PARITY = serial.PARITY_NONE
-STOPBITS = serial.STOPBITS_ONE
-ESPERA_COMANDO = 1
-ESPERA_RELOAD = 120  # 2 minutos para el reload (reducido de 3 minutos)
-
+class CacheLicencia:
+    """
+    Última licencia entregada por el servidor, para iniciar sesión sin consultarlo.
 
-def abrir_conexion_serial(puerto: str, baudrate: int) -> serial.Serial:
+    Se guarda la licencia firmada y un verificador PBKDF2 de la contraseña
+    (nunca la contraseña): sin conexión solo entra la misma cuenta con la
+    misma contraseña, y solo mientras la licencia esté vigente.
     """
-    Abre una conexión serial con el dispositivo Cisco y valida que haya un dispositivo real conectado.
 
-    Args:
-        puerto: Puerto serial (ej: COM3, /dev/ttyUSB0)
-        baudrate: Velocidad de comunicación (9600, 115200, etc.)
+    def __init__(self, ruta: Path = ARCHIVO_LICENCIA, clave_publica: str = LICENCIA_CLAVE_PUBLICA):
+        self.ruta = ruta
+        self.clave_publica = None
+        if clave_publica and verificar_licencia is not None:
+            try:
+                self.clave_publica = cargar_clave_publica(clave_publica)
+            except ValueError as error:
+                logger.error(f"Clave pública de licencias inválida, sin inicio de sesión local: {error}")
 
-    Returns:
-        Objeto serial.Serial con conexión validada
+    @property
+    def disponible(self) -> bool:
+        return self.clave_publica is not None
 
-    Raises:
-        ValueError: Si puerto o baudrate son inválidos
-        serial.SerialException: Si no se puede abrir el puerto
-        DispositivoNoDetectadoError: Si el puerto abre pero no hay dispositivo Cisco
-        TimeoutConexionError: Si el dispositivo no responde en el tiempo esperado
-    """
-    # Validar inputs
-    if not validar_puerto_serial(puerto):
-        logger.error(f"Puerto serial inválido: {puerto}")
-        raise ValueError(f"Puerto serial inválido: {puerto}. Use formato COM1-99 o /dev/ttyUSB0-99")
-
-    if not validar_baudrate(baudrate):
-        logger.error(f"Baudrate inválido: {baudrate}")
-        raise ValueError(f"Baudrate inválido: {baudrate}. Valores permitidos: {VALID_BAUDRATES}")
-
-    conexion = None
-    try:
-        logger.info(f"Abriendo conexión serial en {puerto} a {baudrate} baudios...")
-        conexion = serial.Serial(
-            port=puerto,
-            baudrate=baudrate,
-            bytesize=BYTESIZE,
-            parity=PARITY,
-            stopbits=STOPBITS,
-            timeout=TIMEOUT_LECTURA,
-            xonxoff=False,
-            rtscts=False,
-            dsrdtr=False
-        )
+    @staticmethod
+    def _verificador(password: str, sal: bytes, iteraciones: int) -> str:
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), sal, iteraciones).hex()
 
-        logger.info(f"Puerto {puerto} abierto correctamente")
+    def validar(self, email: str, password: str) -> Optional[dict]:
+        """
+        Datos de la licencia en caché si es de esta cuenta, la contraseña
+        coincide y sigue vigente (incluye la licencia firmada en "licencia").
+        """
+        if not self.disponible:
+            return None
+        try:
+            with open(self.ruta, encoding="utf-8") as archivo:
+                cache = json.load(archivo)
+            if cache["email"] != email.strip().lower():
+                return None
+            verificador = self._verificador(password, bytes.fromhex(cache["sal"]), int(cache["iteraciones"]))
+            if not hmac.compare_digest(verificador, cache["verificador"]):
+                return None
+            datos = verificar_licencia(self.clave_publica, cache["licencia"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.warning(f"Licencia en caché ilegible, se valida en el servidor: {error}")
+            return None
+        except LicenciaInvalidaError as error:
+            logger.info(f"Licencia en caché no utilizable ({error.motivo}), se valida en el servidor")
+            return None
+        return dict(datos, licencia=cache["licencia"])
 
-        # VALIDACIÓN CRÍTICA: Verificar que hay un dispositivo Cisco real conectado
-        if not validar_dispositivo_conectado(conexion):
-            conexion.close()
-            raise DispositivoNoDetectadoError(
-                f"El puerto {puerto} está disponible pero no hay un dispositivo Cisco respondiendo. "
-                "Verifique que el cable esté conectado correctamente y que el dispositivo esté encendido."
-            )
+    def guardar(self, email: str, password: str, licencia: str):
+        """Guarda la licencia recibida del servidor (solo si su firma es válida)"""
+        if not self.disponible:
+            return
+        try:
+            verificar_licencia(self.clave_publica, licencia)
+        except LicenciaInvalidaError as error:
+            logger.warning(f"El servidor entregó una licencia no verificable ({error.motivo}), no se guarda")
+            return
 
-        logger.info(f"Dispositivo Cisco detectado y validado en {puerto}")
-        return conexion
+        sal = os.urandom(16)
+        cache = {
+            "email": email.strip().lower(),
+            "sal": sal.hex(),
+            "iteraciones": ITERACIONES_PBKDF2,
+            "verificador": self._verificador(password, sal, ITERACIONES_PBKDF2),
+            "licencia": licencia,
+        }
+        try:
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_suffix(".tmp")
+            with open(temporal, "w", encoding="utf-8") as archivo:
+                json.dump(cache, archivo)
+            os.chmod(temporal, 0o600)
+            os.replace(temporal, self.ruta)
+        except OSError as error:
+            logger.warning(f"No se pudo guardar la licencia en {self.ruta}: {error}")
+
+    def borrar(self):
+        """Olvida la licencia (el servidor negó el acceso a la cuenta)"""
+        try:
+            self.ruta.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as error:
+            logger.warning(f"No se pudo borrar la licencia en caché {self.ruta}: {error}")
 
-    except SerialException as error:
-        logger.error(f"Error abriendo puerto serial {puerto}: {error}")
-        if conexion and conexion.is_open:
-            conexion.close()
-        raise
-    except (DispositivoNoDetectadoError, TimeoutConexionError):
-        # Re-lanzar nuestras excepciones personalizadas
-        raise
-    except Exception as error:
-        logger.error(f"Error inesperado abriendo conexión serial: {error}")
-        if conexion and conexion.is_open:
-            conexion.close()
-        raise
+# =============================================================================
+# DESCUBRIMIENTO DE CONSOLAS
+# =============================================================================
+# Cada puerto se sondea con un Enter (precedido de Ctrl+U, que borra lo que
+# haya quedado escrito en la línea) en cada baudrate hasta ver un prompt de
+# IOS; con baudrate equivocado solo llega basura y el patrón no coincide.
+# Los puertos se sondean en paralelo: el tiempo total es el del más lento.
 
+# Primero los baudrates de consola más comunes
+BAUDRATES_SONDEO = sorted(VALID_BAUDRATES, key=lambda b: (b not in (9600, 115200), b))
+PATRON_MODELO_SONDEO = re.compile(r'Model Number\s*:\s*(\S+)', re.IGNORECASE)
+PATRON_SERIAL_SONDEO = re.compile(r'System Serial Number\s*:\s*(\S+)', re.IGNORECASE)
+PATRON_CREDENCIALES = re.compile(r'(?:[Uu]sername|[Pp]assword):[ \t]*$')
 
-def validar_dispositivo_conectado(conexion: serial.Serial) -> bool:
-    """
-    Valida que haya un dispositivo Cisco real conectado enviando comandos de prueba.
 
-    Args:
-        conexion: Conexión serial abierta
+class DispositivoDetectado:
+    """Consola Cisco encontrada al sondear un puerto"""
 
-    Returns:
-        True si hay un dispositivo Cisco respondiendo, False en caso contrario
-    """
-    try:
-        logger.info("Validando dispositivo Cisco...")
+    def __init__(self, puerto: str, baudrate: int, hostname: Optional[str] = None,
+                 modelo: Optional[str] = None, serial_equipo: Optional[str] = None,
+                 requiere_credenciales: bool = False):
+        self.puerto = puerto
+        self.baudrate = baudrate
+        self.hostname = hostname
+        self.modelo = modelo
+        self.serial_equipo = serial_equipo
+        self.requiere_credenciales = requiere_credenciales
+
+    @property
+    def modelo_catalogo(self) -> Optional[str]:
+        """Modelo de MAPEO_DISPOSITIVOS que corresponde al equipo (ej: C9300-48P -> Cisco Catalyst 9300)"""
+        if not self.modelo:
+            return None
+        for modelo in MAPEO_DISPOSITIVOS:
+            if modelo.split()[-1] in self.modelo:
+                return modelo
+        return None
+
+    def descripcion(self) -> str:
+        if self.requiere_credenciales:
+            return f"{self.puerto} @ {self.baudrate}: consola con usuario/contraseña"
+        return (
+            f"{self.puerto} @ {self.baudrate}: {self.hostname or '?'} - "
+            f"{self.modelo or 'modelo desconocido'}{f' ({self.serial_equipo})' if self.serial_equipo else ''}"
+        )
 
-        # Limpiar buffer
-        conexion.reset_input_buffer()
-        conexion.reset_output_buffer()
-
-        # Enviar enters para despertar la consola
-        for i in range(3):
-            conexion.write(b"\r\n")
-            time.sleep(0.3)
-
-        # Leer respuesta inicial
-        time.sleep(1)
-        if conexion.in_waiting > 0:
-            respuesta_inicial = conexion.read(conexion.in_waiting).decode('ascii', errors='ignore')
-            logger.debug(f"Respuesta inicial: {respuesta_inicial[:100]}")
-
-            # Verificar si hay un prompt
-            if any(prompt in respuesta_inicial for prompt in CISCO_PROMPTS):
-                logger.info("Prompt de Cisco detectado en respuesta inicial")
-                return True
-
-        # Si no hay prompt en respuesta inicial, enviar comando de prueba
-        logger.info("Enviando comando de prueba: show version")
-        conexion.reset_input_buffer()
-        conexion.write(b"show version\n")
-
-        # Esperar respuesta con timeout
-        tiempo_inicio = time.time()
-        respuesta_completa = ""
-
-        while (time.time() - tiempo_inicio) < TIMEOUT_CONEXION_INICIAL:
-            if conexion.in_waiting > 0:
-                datos = conexion.read(conexion.in_waiting)
-                respuesta_completa += datos.decode('ascii', errors='ignore')
-
-                # Verificar si tenemos suficiente información
-                if len(respuesta_completa) > 50:
-                    break
-            time.sleep(0.2)
 
-        logger.debug(f"Respuesta de validación: {respuesta_completa[:200]}")
+def listar_puertos_serie() -> List[str]:
+    """Puertos serie del sistema con formato válido (COMn, /dev/ttyUSBn, /dev/ttyACMn)"""
+    return sorted(
+        (puerto.device for puerto in list_ports.comports() if validar_puerto_serial(puerto.device)),
+        key=lambda puerto: [int(p) if p.isdigit() else p for p in re.split(r'(\d+)', puerto)]
+    )
 
-        # Verificar que la respuesta contenga palabras clave de Cisco
-        if any(keyword in respuesta_completa for keyword in CISCO_KEYWORDS):
-            logger.info("Dispositivo Cisco validado correctamente")
-            return True
 
-        # Verificar si hay prompt aunque no haya keywords
-        if any(prompt in respuesta_completa for prompt in CISCO_PROMPTS):
-            logger.warning("Prompt detectado pero sin keywords de Cisco. Aceptando conexión.")
-            return True
+def _leer_sondeo(conexion: serial.Serial, limite: float) -> str:
+    """Lee hasta que la última línea sea un prompt o pida una entrada, o pasen `limite` segundos"""
+    datos = bytearray()
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        bloque = conexion.read(conexion.in_waiting or 1)
+        if not bloque:
+            continue
+        datos += bloque
+        ultima = _ultima_linea(datos[-VENTANA_PROMPT:].decode('ascii', errors='replace'))
+        if PATRON_PROMPT_GENERICO.match(ultima) or PATRON_ESPERA_ENTRADA.search(ultima) \
+                or PATRON_CREDENCIALES.search(ultima):
+            break
+    return datos.decode('ascii', errors='replace')
 
-        logger.warning(f"No se detectó dispositivo Cisco. Respuesta recibida: {respuesta_completa[:100]}")
-        return False
 
-    except Exception as error:
-        logger.error(f"Error validando dispositivo conectado: {error}")
-        return False
+def _ultima_linea(texto: str) -> str:
+    return re.split(r'[\r\n]', texto.rstrip('\r\n'))[-1] if texto.strip() else ""
 
 
-def verificar_conexion_activa(conexion: serial.Serial) -> bool:
+def sondear_puerto(puerto: str, baudrates: Optional[List[int]] = None) -> Optional[DispositivoDetectado]:
     """
-    Verifica que la conexión serial siga activa enviando Enter y esperando respuesta.
+    Busca una consola Cisco en un puerto probando cada baudrate con un Enter.
 
-    En Windows, write/flush/is_open pueden NO fallar incluso si el cable está desconectado.
-    La ÚNICA forma confiable es: enviar comando → esperar respuesta → si no hay respuesta = desconectado
+    Con el prompt identificado se consulta el modelo y el serial con un
+    "show version | include" (funciona en modo usuario y modo privilegiado).
 
     Args:
-        conexion: Objeto de conexión serial
+        puerto: Puerto serial
+        baudrates: Baudrates a probar, en orden (por defecto BAUDRATES_SONDEO)
 
     Returns:
-        True si la conexión está activa y el dispositivo responde, False en caso contrario
+        DispositivoDetectado, o None si no respondió ninguna consola (o el
+        puerto no se pudo abrir: inexistente o en uso)
     """
-    try:
-        if not conexion:
-            logger.error("[VERIFICAR] Conexión es None")
-            return False
-
-        if not conexion.is_open:
-            logger.error("[VERIFICAR] Conexión serial cerrada (is_open = False)")
-            return False
-
-        # ESTRATEGIA DEFINITIVA: Enviar Enter y ESPERAR respuesta
-        # Si el dispositivo está conectado, SIEMPRE responde algo (eco, prompt, etc.)
+    for baudrate in baudrates or BAUDRATES_SONDEO:
         try:
-            # Guardar configuración original
-            timeout_original = conexion.timeout
-
-            # Timeout corto para detección rápida (1 segundo máximo)
-            conexion.timeout = 1.0
-
-            # Limpiar buffer de entrada para no confundir respuestas anteriores
-            try:
-                if conexion.in_waiting > 0:
-                    conexion.read(conexion.in_waiting)
-            except:
-                pass
-
-            # Enviar Enter
-            try:
-                bytes_written = conexion.write(b"\r\n")
-                if bytes_written == 0:
-                    logger.error("[VERIFICAR] write() retornó 0 bytes - puerto no acepta escritura")
-                    conexion.timeout = timeout_original
-                    return False
-
-                # Flush para asegurar que se envía
-                conexion.flush()
-                logger.debug("[VERIFICAR] Enter enviado, esperando respuesta...")
-
-            except (OSError, SerialException, IOError) as e:
-                logger.error(f"[VERIFICAR] Error en write/flush: {type(e).__name__} - {e}")
-                conexion.timeout = timeout_original
-                return False
-
-            # Esperar un momento a que el dispositivo procese y responda
-            time.sleep(0.7)
-
-            # CRÍTICO: Verificar si hay respuesta
-            # Un dispositivo Cisco SIEMPRE responde algo al Enter (mínimo un eco o prompt)
-            try:
-                bytes_disponibles = conexion.in_waiting
-                logger.debug(f"[VERIFICAR] Bytes disponibles para leer: {bytes_disponibles}")
-
-                if bytes_disponibles > 0:
-                    # HAY RESPUESTA = Dispositivo está conectado y funcionando
-                    respuesta = conexion.read(bytes_disponibles)
-                    logger.debug(f"[VERIFICAR] Dispositivo respondió ({len(respuesta)} bytes): {respuesta[:50]}")
-                    conexion.timeout = timeout_original
-                    return True
-                else:
-                    # NO HAY RESPUESTA después de 0.7 segundos
-                    # Esto significa que el dispositivo NO está conectado o NO responde
-                    logger.error("[VERIFICAR] Sin respuesta del dispositivo - probablemente desconectado")
-                    conexion.timeout = timeout_original
-                    return False
-
-            except (OSError, SerialException, IOError) as e:
-                logger.error(f"[VERIFICAR] Error leyendo respuesta: {type(e).__name__} - {e}")
-                conexion.timeout = timeout_original
-                return False
-
-        except (OSError, SerialException, IOError) as e:
-            logger.error(f"[VERIFICAR] Error general en verificación: {type(e).__name__} - {e}")
-            return False
+            conexion = serial.Serial(
+                port=puerto, baudrate=baudrate, bytesize=BYTESIZE, parity=PARITY,
+                stopbits=STOPBITS, timeout=0.1, write_timeout=1, exclusive=True
+            )
+        except (SerialException, ValueError) as error:
+            logger.debug(f"[SONDEO] {puerto} no disponible: {error}")
+            return None
 
-    except Exception as error:
-        logger.error(f"[VERIFICAR] Error inesperado: {type(error).__name__} - {error}")
-        return False
+        try:
+            conexion.reset_input_buffer()
+            respuesta = ""
+            # Segundo Enter si la consola estaba en "Press RETURN", en --More-- o mostrando logs
+            for _ in range(2):
+                conexion.write(b"q\x15\r" if "--More--" in respuesta[-VENTANA_PROMPT:] else b"\x15\r")
+                respuesta = _leer_sondeo(conexion, TIMEOUT_SONDEO_PUERTO)
+                ultima = _ultima_linea(respuesta)
+                if not respuesta.strip() or PATRON_PROMPT_GENERICO.match(ultima) or PATRON_CREDENCIALES.search(ultima):
+                    break
 
+            if PATRON_CREDENCIALES.search(ultima):
+                logger.info(f"[SONDEO] {puerto} @ {baudrate}: consola pide credenciales")
+                return DispositivoDetectado(puerto, baudrate, requiere_credenciales=True)
+
+            prompt = PATRON_PROMPT_GENERICO.match(ultima)
+            if prompt is None:
+                continue
+
+            conexion.write(b"show version | include Model Number|System Serial Number\r")
+            salida = _leer_sondeo(conexion, TIMEOUT_SONDEO_MODELO)
+            modelo = PATRON_MODELO_SONDEO.search(salida)
+            serial_equipo = PATRON_SERIAL_SONDEO.search(salida)
+            dispositivo = DispositivoDetectado(
+                puerto, baudrate, hostname=prompt.group(1),
+                modelo=modelo.group(1) if modelo else None,
+                serial_equipo=serial_equipo.group(1) if serial_equipo else None
+            )
+            logger.info(f"[SONDEO] {dispositivo.descripcion()}")
+            return dispositivo
+        except SerialException as error:
+            logger.debug(f"[SONDEO] Error en {puerto} @ {baudrate}: {error}")
+            return None
+        finally:
+            conexion.close()
+    return None
 
-def cerrar_conexion_serial(conexion: Optional[serial.Serial]) -> None:
-    """
-    Cierra la conexión serial de forma segura.
 
-    Args:
-        conexion: Objeto de conexión serial o None
-    """
-    try:
-        if conexion and conexion.is_open:
-            logger.info("Cerrando conexión serial...")
-            conexion.close()
-            logger.info("Conexión serial cerrada correctamente")
-    except Exception as error:
-        logger.error(f"Error cerrando conexión serial: {error}")
-        
-def limpiar_caracteres_control(texto):
-    """
-    Elimina caracteres de control no imprimibles de la salida,
-    dejando solo saltos de línea, retorno de carro y tabulaciones.
-    Esto evita que en el archivo aparezcan cuadros raros.
-    """
-    resultado = []
-    for ch in texto:
-        codigo = ord(ch)
-        # Permitimos salto de línea, retorno de carro y tabulación
-        if ch in ("\n", "\r", "\t"):
-            resultado.append(ch)
-        # Permitimos caracteres imprimibles estándar
-        elif 32 <= codigo <= 126:
-            resultado.append(ch)
-        # El resto de caracteres de control se descarta
-    return "".join(resultado)
-
-def leer_respuesta_completa(conexion: serial.Serial, timeout_total: int = 10) -> str:
+def descubrir_dispositivos(puertos: Optional[List[str]] = None) -> List[DispositivoDetectado]:
     """
-    Lee la respuesta completa del dispositivo hasta que no haya más datos.
-
-    Args:
-        conexion: Conexión serial activa
-        timeout_total: Timeout máximo en segundos
+    Sondea en paralelo los puertos (por defecto, todos los del sistema).
 
     Returns:
-        Respuesta completa del dispositivo
-
-    Raises:
-        DispositivoDesconectadoError: Si el dispositivo se desconecta durante la lectura
-        TimeoutConexionError: Si no se recibe respuesta en el tiempo esperado
+        Dispositivos detectados, en el orden de los puertos
     """
-    respuesta_completa = ""
-    tiempo_inicio = time.time()
-    timeout_alcanzado = False
-    ultimo_check_conexion = time.time()
-
-    try:
-        while True:
-            tiempo_transcurrido = time.time() - tiempo_inicio
-
-            if tiempo_transcurrido > timeout_total:
-                timeout_alcanzado = True
-                break
-
-            # CRÍTICO: Verificar conexión cada 1 segundo para detectar desconexiones rápido
-            # Pero no en cada iteración para no sobrecargar
-            if time.time() - ultimo_check_conexion > 1.0:
-                if not verificar_conexion_activa(conexion):
-                    logger.error("Dispositivo desconectado durante lectura de respuesta")
-                    raise DispositivoDesconectadoError(
-                        "El dispositivo se desconectó durante la operación. "
-                        "Verifique el cable y la conexión física."
-                    )
-                ultimo_check_conexion = time.time()
-
-            if conexion.in_waiting > 0:
-                try:
-                    datos = conexion.read(conexion.in_waiting)
-                except (OSError, SerialException) as e:
-                    logger.error(f"Error leyendo datos del puerto: {e}")
-                    raise DispositivoDesconectadoError(f"Error leyendo del puerto serial: {e}")
+    puertos = listar_puertos_serie() if puertos is None else puertos
+    if not puertos:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_SONDEOS_PARALELOS, len(puertos))) as ejecutor:
+        resultados = list(ejecutor.map(sondear_puerto, puertos))
+    return [dispositivo for dispositivo in resultados if dispositivo is not None]
 
-                try:
-                    texto = datos.decode("ascii", errors="ignore")
-                except UnicodeDecodeError:
-                    logger.warning("Error decodificando como ASCII, intentando latin-1")
-                    texto = datos.decode("latin-1", errors="ignore")
-
-                # Limpiar caracteres de control no imprimibles
-                texto = limpiar_caracteres_control(texto)
-
-                respuesta_completa += texto
-                tiempo_inicio = time.time()  # Resetear timeout cuando hay datos
-            else:
-                time.sleep(0.1)
-
-                if conexion.in_waiting == 0:
-                    time.sleep(0.5)
-                    if conexion.in_waiting == 0:
-                        # CRÍTICO: Antes de asumir que terminó, verificar que la conexión está activa
-                        # Si no hay datos Y la conexión está muerta, es un error no un fin normal
-                        if not verificar_conexion_activa(conexion):
-                            logger.error("Conexión perdida mientras esperaba datos")
-                            raise DispositivoDesconectadoError(
-                                "La conexión se perdió. No se recibieron más datos del dispositivo."
-                            )
-                        # Si la conexión está activa pero no hay datos, es fin normal
-                        break
-
-    except SerialException as error:
-        logger.error(f"Error serial durante lectura: {error}")
-        raise DispositivoDesconectadoError(f"Error de comunicación serial: {error}")
-    except DispositivoDesconectadoError:
-        # Re-lanzar nuestra excepción personalizada
-        raise
-    except Exception as error:
-        logger.error(f"Error inesperado leyendo respuesta: {error}")
-        raise
-
-    # Advertir si no se recibió nada y hubo timeout
-    if not respuesta_completa and timeout_alcanzado:
-        logger.warning(f"Timeout de {timeout_total}s alcanzado sin recibir datos")
-        raise TimeoutConexionError(
-            f"No se recibió respuesta del dispositivo después de {timeout_total} segundos. "
-            "El dispositivo puede estar desconectado o no responde."
-        )
 
-    return respuesta_completa
+PATRON_SERIAL_EQUIPO = re.compile(r'System Serial Number\s*:\s*(\S+)', re.IGNORECASE)
 
 
+def extraer_info_dispositivo_9200(lines):
+    """Extrae modelo, serial y versión del archivo de salida (igual que __init__.py)"""
+    modelo, serial, version = None, None, None
 
-def enviar_comando(conexion: serial.Serial, comando: str, espera: int = ESPERA_COMANDO) -> str:
-    """
-    Envía un comando al dispositivo y espera la respuesta.
-
-    Args:
-        conexion: Conexión serial activa
-        comando: Comando a enviar
-        espera: Tiempo de espera en segundos antes de leer respuesta
+    patron_inicio_prueba_1 = re.compile(r'.*[#>]\s*INICIO\s+PRUEBA\s+1\b', re.IGNORECASE)
+    modelo_regex = re.compile(r'Model Number\s*:\s*(\S+)', re.IGNORECASE)
+    serial_regex = re.compile(r'System Serial Number\s*:\s*(\S+)', re.IGNORECASE)
 
-    Returns:
-        Respuesta del dispositivo
+    # Una sola pasada: `lines` puede ser el archivo abierto (no hace falta cargarlo en memoria)
+    en_prueba_1 = False
+    for line in lines:
+        model_match = modelo_regex.search(line)
+        serial_match = serial_regex.search(line)
 
-    Raises:
-        DispositivoDesconectadoError: Si el dispositivo se desconecta
-        TimeoutConexionError: Si no hay respuesta en el tiempo esperado
-    """
-    try:
-        # Verificar conexión activa antes de enviar
-        if not verificar_conexion_activa(conexion):
-            logger.error("Conexión no activa antes de enviar comando")
-            raise DispositivoDesconectadoError("La conexión se perdió antes de enviar el comando")
-
-        logger.debug(f"Enviando comando: {comando}")
-        conexion.reset_input_buffer()
-        comando_bytes = (comando + "\n").encode('ascii')
-        conexion.write(comando_bytes)
-        time.sleep(espera)
-
-        # Verificar conexión activa después de enviar
-        if not verificar_conexion_activa(conexion):
-            logger.error("Conexión perdida después de enviar comando")
-            raise DispositivoDesconectadoError("La conexión se perdió después de enviar el comando")
-
-        respuesta = leer_respuesta_completa(conexion)
-        logger.debug(f"Respuesta recibida ({len(respuesta)} caracteres)")
-        return respuesta
+        if model_match:
+            modelo = model_match.group(1).strip()
+        if serial_match:
+            serial = serial_match.group(1).strip()
 
-    except SerialException as error:
-        logger.error(f"Error serial enviando comando '{comando}': {error}")
-        raise DispositivoDesconectadoError(f"Error de comunicación: {error}")
-    except (DispositivoDesconectadoError, TimeoutConexionError):
-        # Re-lanzar nuestras excepciones personalizadas
-        raise
-    except Exception as error:
-        logger.error(f"Error inesperado enviando comando '{comando}': {error}")
-        raise
+        # La versión es la primera que aparece desde el inicio de la prueba 1
+        if not en_prueba_1 and patron_inicio_prueba_1.match(line.strip()):
+            en_prueba_1 = True
+        if en_prueba_1 and version is None:
+            version_match = re.search(r'Version\s+(\S+)', line, re.IGNORECASE)
+            if version_match:
+                version = version_match.group(1).strip()
 
+    return modelo, serial, version
 
-def manejar_more_prompt(conexion, respuesta):
-    """Maneja el prompt '--More--' que aparece en salidas largas de Cisco"""
-    respuesta_total = respuesta
 
-    while "--More--" in respuesta_total:
-        conexion.write(b" ")
-        time.sleep(0.5)
-        nueva_respuesta = leer_respuesta_completa(conexion, timeout_total=5)
-        respuesta_total = respuesta_total.replace("--More--", "")
-        respuesta_total += nueva_respuesta
+# =============================================================================
+# TRANSCRIPCIÓN EN DISCO
+# =============================================================================
 
-    return respuesta_total
+INTERVALO_SINCRONIZACION_TRANSCRIPCION = 5.0  # segundos máximos entre fsync de la transcripción
+TAMANO_BUFFER_TRANSCRIPCION = 64 * 1024  # bytes acumulados en memoria antes de escribir al archivo
+SUFIJO_INDICE_TRANSCRIPCION = ".idx.json"
 
 
-def ejecutar_comando_completo_con_prompt(conexion, comando, espera=ESPERA_COMANDO):
+class TranscripcionIncremental:
     """
-    Ejecuta un comando capturando EXACTAMENTE lo que se ve en el CLI
-    Incluye los prompts antes del comando para validación
+    Transcripción de una sesión de pruebas escrita en disco a medida que llega.
+
+    El texto se agrega al final del archivo (con buffer) y se sincroniza con
+    fsync cada INTERVALO_SINCRONIZACION_TRANSCRIPCION segundos, de modo que un
+    cierre inesperado, un corte del USB o un error pierden como mucho los
+    últimos segundos y la memoria no crece con la captura.
+
+    Junto al archivo se mantiene un índice JSON (<archivo>.idx.json) con el
+    estado de la sesión y los límites de cada prueba (offset en bytes dentro
+    de la transcripción). El índice se reescribe de forma atómica y solo
+    después de sincronizar la transcripción, así sus offsets nunca apuntan
+    más allá de lo que ya está en disco.
     """
-    # CRÍTICO: Verificar conexión ANTES de ejecutar comando
-    if not verificar_conexion_activa(conexion):
-        logger.error(f"Conexión perdida antes de ejecutar comando: {comando}")
-        raise DispositivoDesconectadoError(
-            f"La conexión se perdió antes de ejecutar el comando '{comando}'. "
-            "Verifique el cable y la conexión física."
-        )
-
-    # PASO 1: Enviar 2 enters para obtener el prompt (validación)
-    conexion.write(b"\n")
-    time.sleep(0.3)
-    respuesta_enter1 = leer_respuesta_completa(conexion, timeout_total=2)
-
-    conexion.write(b"\n")
-    time.sleep(0.3)
-    respuesta_enter2 = leer_respuesta_completa(conexion, timeout_total=2)
 
-    # PASO 2: Enviar el comando real
-    conexion.reset_input_buffer()
-    comando_bytes = (comando + "\n").encode('ascii')
-    conexion.write(comando_bytes)
-    time.sleep(espera)
-
-    # PASO 3: Leer la respuesta completa
-    respuesta_comando = leer_respuesta_completa(conexion)
-
-    # PASO 4: Manejar paginación --More--
-    respuesta_comando = manejar_more_prompt(conexion, respuesta_comando)
+    def __init__(self, ruta: Path, **datos_sesion):
+        self.ruta = Path(ruta)
+        self._abrir("w")
+        self.indice = {
+            "archivo": self.ruta.name,
+            "estado": "en_curso",
+            "inicio": datetime.now().isoformat(timespec="seconds"),
+            **datos_sesion,
+            "eventos": [],
+        }
+        self._guardar_indice()
 
-    # PASO 5: Combinar todo - EXACTAMENTE como se vería en el CLI
-    respuesta_completa = respuesta_enter1 + respuesta_enter2 + respuesta_comando
+    def _abrir(self, modo: str) -> None:
+        self._archivo = open(self.ruta, modo, encoding="utf-8", buffering=TAMANO_BUFFER_TRANSCRIPCION)
+        self._ultima_sincronizacion = time.monotonic()
 
-    return respuesta_completa
+    @classmethod
+    def reanudar(cls, ruta_indice: Path, desde_prueba: int) -> "TranscripcionIncremental":
+        """
+        Reabre una transcripción interrumpida para continuarla desde `desde_prueba`.
 
+        El archivo se corta al final de la prueba anterior (FIN PRUEBA
+        desde_prueba - 1); lo que seguía, la prueba que quedó a medias y el
+        error, se mueve a <archivo>.descartado_<fecha>.txt para no dejar un
+        INICIO PRUEBA sin su FIN dentro de la transcripción.
 
-def ejecutar_comando_completo(conexion, comando, espera=ESPERA_COMANDO):
-    """Ejecuta un comando y maneja automáticamente el paginado --More--"""
-    # CRÍTICO: Verificar conexión ANTES de ejecutar comando
-    if not verificar_conexion_activa(conexion):
-        logger.error(f"Conexión perdida antes de ejecutar comando: {comando}")
-        raise DispositivoDesconectadoError(
-            f"La conexión se perdió antes de ejecutar el comando '{comando}'. "
-            "Verifique el cable y la conexión física."
+        Raises:
+            OSError, ValueError, KeyError: Si el índice o la transcripción no se pueden usar
+        """
+        ruta_indice = Path(ruta_indice)
+        with open(ruta_indice, "r", encoding="utf-8") as f:
+            indice = json.load(f)
+
+        eventos = indice["eventos"]
+        posicion = max(
+            i for i, evento in enumerate(eventos)
+            if evento["evento"] == "fin_prueba" and evento.get("prueba") == desde_prueba - 1
         )
+        corte = eventos[posicion]["offset"]
+
+        transcripcion = cls.__new__(cls)
+        transcripcion.ruta = ruta_indice.with_name(indice["archivo"])
+        with open(transcripcion.ruta, "r+b") as f:
+            f.seek(corte)
+            descartado = f.read()
+            f.truncate(corte)
+            f.flush()
+            os.fsync(f.fileno())
+        if descartado.strip():
+            ruta_descartado = transcripcion.ruta.with_name(
+                f"{transcripcion.ruta.stem}.descartado_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+            )
+            ruta_descartado.write_bytes(descartado)
+            logger.info(f"Salida de la prueba interrumpida guardada en {ruta_descartado}")
+
+        transcripcion._abrir("a")
+        indice["estado"] = "en_curso"
+        indice.pop("fin", None)
+        indice.pop("bytes", None)
+        indice["eventos"] = eventos[:posicion + 1]
+        transcripcion.indice = indice
+        transcripcion.marcar("reanudacion", desde_prueba=desde_prueba)
+        return transcripcion
+
+    def pruebas_completas(self) -> List[int]:
+        """Pruebas con INICIO y FIN en la transcripción, en orden"""
+        return [evento["prueba"] for evento in self.indice["eventos"] if evento["evento"] == "fin_prueba"]
+
+    @property
+    def ruta_indice(self) -> Path:
+        return self.ruta.with_name(self.ruta.name + SUFIJO_INDICE_TRANSCRIPCION)
+
+    @property
+    def abierta(self) -> bool:
+        return not self._archivo.closed
+
+    def escribir(self, texto: str) -> None:
+        self._archivo.write(texto)
+        if time.monotonic() - self._ultima_sincronizacion >= INTERVALO_SINCRONIZACION_TRANSCRIPCION:
+            self.sincronizar()
+
+    def sincronizar(self) -> None:
+        """Vuelca el buffer y fuerza la escritura a disco (fsync)"""
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._ultima_sincronizacion = time.monotonic()
+
+    def offset(self) -> int:
+        """Bytes escritos hasta ahora (incluye lo que aún está en el buffer)"""
+        return self._archivo.tell()
+
+    def marcar(self, evento: str, **datos) -> None:
+        """
+        Registra un límite en el índice (inicio/fin de prueba, error, etc.).
 
-    respuesta = enviar_comando(conexion, comando, espera)
-    respuesta = manejar_more_prompt(conexion, respuesta)
-    return respuesta
-
+        Sincroniza la transcripción antes de actualizar el índice.
+        """
+        self.sincronizar()
+        self.indice["eventos"].append({
+            "evento": evento,
+            "offset": self.offset(),
+            "hora": datetime.now().isoformat(timespec="seconds"),
+            **datos,
+        })
+        self._guardar_indice()
+
+    def _guardar_indice(self) -> None:
+        temporal = self.ruta_indice.with_name(self.ruta_indice.name + ".tmp")
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self.indice, f, ensure_ascii=False, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.ruta_indice)
+        except OSError as error:
+            # El índice es auxiliar: un error de disco no detiene las pruebas
+            logger.warning(f"No se pudo actualizar el índice {self.ruta_indice}: {error}")
+
+    def actualizar_indice(self, **datos) -> None:
+        """Agrega datos de la sesión al índice (serial, cantidades, etc.)"""
+        self.indice.update(datos)
+        self._guardar_indice()
+
+    def cerrar(self, estado: str) -> None:
+        """Sincroniza, cierra el archivo y deja el estado final en el índice"""
+        if not self.abierta:
+            return
+        try:
+            self.sincronizar()
+        finally:
+            self.indice["bytes"] = self.offset()
+            self._archivo.close()
+            self.indice["estado"] = estado
+            self.indice["fin"] = datetime.now().isoformat(timespec="seconds")
+            self._guardar_indice()
+
+    def renombrar(self, nombre: str) -> Path:
+        """
+        Renombra la transcripción (ya cerrada) y su índice.
 
-def despertar_consola(conexion):
-    """'Despierta' la consola enviando Enter para obtener el prompt"""
-    for _ in range(3):
-        conexion.write(b"\r\n")
-        time.sleep(0.5)
+        Raises:
+            OSError: Si no se pudo renombrar; la transcripción queda con su nombre anterior
+        """
+        nueva_ruta = self.ruta.with_name(nombre)
+        if nueva_ruta == self.ruta:
+            return self.ruta
+        ruta_indice_anterior = self.ruta_indice
+        os.replace(self.ruta, nueva_ruta)
+        self.ruta = nueva_ruta
+        self.indice["archivo"] = nueva_ruta.name
+        self._guardar_indice()
+        try:
+            os.remove(ruta_indice_anterior)
+        except OSError:
+            pass
+        return nueva_ruta
 
-    respuesta = leer_respuesta_completa(conexion, timeout_total=5)
-    return respuesta
 
+ARCHIVO_CORRIDAS_PENDIENTES = Path.home() / ".fat_testing" / "corridas_pendientes.json"
+CANTIDAD_PRUEBAS = 5
 
-def leer_respuesta_permisiva(conexion: serial.Serial, timeout_total: int = 10) -> str:
-    """
-    Lee la respuesta completa del dispositivo SIN lanzar excepciones por desconexión.
 
-    Esta versión es para usar durante/después del reload cuando la desconexión es NORMAL.
+def prueba_para_reanudar(pruebas_completas: List[int]) -> int:
+    """Primera prueba (1..CANTIDAD_PRUEBAS + 1) que falta, siguiendo el orden de ejecución"""
+    prueba = 1
+    while prueba in pruebas_completas:
+        prueba += 1
+    return prueba
 
-    Args:
-        conexion: Conexión serial activa
-        timeout_total: Timeout máximo en segundos
 
-    Returns:
-        Respuesta completa del dispositivo (puede estar vacía si no hay datos)
+class RegistroCorridas:
     """
-    respuesta_completa = ""
-    tiempo_inicio = time.time()
+    Corridas interrumpidas por número de serie, persistidas en JSON.
 
-    try:
-        while True:
-            tiempo_transcurrido = time.time() - tiempo_inicio
-
-            if tiempo_transcurrido > timeout_total:
-                # No lanzar excepción, simplemente retornar lo que se tenga
-                break
-
-            if conexion.in_waiting > 0:
-                try:
-                    datos = conexion.read(conexion.in_waiting)
-                    texto = datos.decode("ascii", errors="ignore")
-                    texto = limpiar_caracteres_control(texto)
-                    respuesta_completa += texto
-                    tiempo_inicio = time.time()  # Resetear timeout cuando hay datos
-                except (OSError, SerialException):
-                    # Error leyendo, simplemente continuar
-                    break
-            else:
-                time.sleep(0.1)
-
-                if conexion.in_waiting == 0:
-                    time.sleep(0.5)
-                    if conexion.in_waiting == 0:
-                        # No hay más datos, terminar normalmente
-                        break
+    Por cada serial se guarda la ruta del índice de su transcripción (ver
+    TranscripcionIncremental); el índice ya tiene las pruebas completas, sus
+    offsets y las cantidades de fuentes y ventiladores usadas. Al volver a
+    conectar el mismo equipo se puede reanudar desde la primera prueba que
+    quedó sin terminar. Las corridas completas se quitan del registro.
+    """
 
-    except Exception:
-        # Cualquier error, retornar lo que se tenga
-        pass
+    def __init__(self, ruta: Path = ARCHIVO_CORRIDAS_PENDIENTES):
+        self.ruta = Path(ruta)
+        # Compartido por todas las sesiones de prueba en paralelo
+        self._lock = threading.Lock()
 
-    return respuesta_completa
+    def _leer(self) -> dict:
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logger.warning(f"No se pudo leer el registro de corridas {self.ruta}: {error}")
+            return {}
+
+    def _escribir(self, datos: dict) -> None:
+        try:
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_name(f"{self.ruta.stem}_{threading.get_ident()}.tmp")
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(datos, f, ensure_ascii=False, indent=1)
+            os.replace(temporal, self.ruta)
+        except OSError as error:
+            logger.warning(f"No se pudo guardar el registro de corridas {self.ruta}: {error}")
+
+    def pendiente(self, serial: str, modelo: str) -> Optional[Tuple[Path, dict]]:
+        """
+        Corrida interrumpida del equipo `serial` que se puede reanudar.
 
+        Returns:
+            (ruta del índice, índice) o None si no hay una corrida válida
+            (otro modelo, transcripción borrada, ya completa o sin pruebas terminadas)
+        """
+        with self._lock:
+            ruta = self._leer().get(serial)
+        if not ruta:
+            return None
+        ruta_indice = Path(ruta)
+        try:
+            with open(ruta_indice, "r", encoding="utf-8") as f:
+                indice = json.load(f)
+        except (OSError, ValueError) as error:
+            logger.info(f"Corrida pendiente de {serial} no disponible ({error})")
+            return None
+        if (indice.get("estado") == "completo" or indice.get("modelo") != modelo
+                or not ruta_indice.with_name(indice.get("archivo", "")).is_file()):
+            return None
+        completas = [e.get("prueba") for e in indice.get("eventos", []) if e.get("evento") == "fin_prueba"]
+        if prueba_para_reanudar(completas) == 1:
+            return None
+        return ruta_indice, indice
 
-def ejecutar_comando_sin_verificacion(conexion: serial.Serial, comando: str, espera: int = 2) -> str:
-    """
-    Ejecuta un comando SIN verificar conexión antes/después.
+    def registrar(self, serial: str, ruta_indice: Path) -> None:
+        with self._lock:
+            datos = self._leer()
+            datos[serial] = str(Path(ruta_indice).resolve())
+            self._escribir(datos)
 
-    Uso exclusivo para contextos post-reload donde la verificación puede fallar
-    aunque la conexión esté realmente funcionando.
+    def quitar(self, serial: str) -> None:
+        with self._lock:
+            datos = self._leer()
+            if datos.pop(serial, None) is not None:
+                self._escribir(datos)
 
-    Args:
-        conexion: Conexión serial
-        comando: Comando a enviar
-        espera: Tiempo de espera antes de leer respuesta
 
-    Returns:
-        Respuesta del dispositivo (puede estar vacía)
-    """
-    try:
-        logger.debug(f"[SIN_VERIFICACION] Enviando comando: {comando}")
+REGISTRO_CORRIDAS = RegistroCorridas()
 
-        # NO hacer reset_input_buffer() - podría haber datos valiosos
-        comando_bytes = (comando + "\n").encode('ascii')
-        conexion.write(comando_bytes)
-        time.sleep(espera)
 
-        # Usar versión permisiva de lectura
-        respuesta = leer_respuesta_permisiva(conexion, timeout_total=10)
-        logger.debug(f"[SIN_VERIFICACION] Respuesta recibida ({len(respuesta)} caracteres)")
-        return respuesta
+# =============================================================================
+# SUBIDA DE CAPTURAS AL SERVIDOR
+# =============================================================================
+# La transcripción se envía en bloques de TAMANO_BLOQUE_SUBIDA comprimidos con
+# gzip. Primero se manda el manifiesto (hash del archivo y de cada bloque) y el
+# servidor responde qué bloques le faltan: si la subida se corta, reintentarla
+# solo envía lo que no llegó. Ver funcionalidades/subidas.py.
 
-    except Exception as error:
-        logger.error(f"[SIN_VERIFICACION] Error enviando comando: {error}")
-        return ""
+class SubidaCapturaError(Exception):
+    """La captura no se pudo subir al servidor"""
+    pass
 
 
-def ejecutar_comando_completo_sin_verificacion(conexion: serial.Serial, comando: str, espera: int = 2) -> str:
+class ClienteSubidas:
     """
-    Ejecuta un comando capturando EXACTAMENTE lo que se ve en el CLI (con prompts),
-    pero SIN verificar conexión (para uso post-reload).
-
-    Esta es la versión "sin verificación estricta" de ejecutar_comando_completo_con_prompt().
-    Captura:
-    1. Los prompts previos (2 enters)
-    2. El comando enviado con su eco
-    3. La respuesta completa del dispositivo
+    Cliente de la API de subidas (/api/subidas).
 
     Args:
-        conexion: Conexión serial
-        comando: Comando a enviar
-        espera: Tiempo de espera antes de leer respuesta
-
-    Returns:
-        Respuesta completa incluyendo prompts y eco (como se vería en el CLI)
+        url_base: URL de la API de subidas
+        token: Token Bearer obtenido al validar el acceso
+        tamano_bloque: Bytes sin comprimir por bloque
+        sesion_http: requests.Session opcional (reutiliza la conexión)
     """
-    try:
-        logger.debug(f"[COMPLETO_SIN_VERIFICACION] Ejecutando comando: {comando}")
-
-        # PASO 1: Enviar 2 enters para obtener el prompt (validación)
-        conexion.write(b"\n")
-        time.sleep(0.3)
-        respuesta_enter1 = leer_respuesta_permisiva(conexion, timeout_total=2)
 
-        conexion.write(b"\n")
-        time.sleep(0.3)
-        respuesta_enter2 = leer_respuesta_permisiva(conexion, timeout_total=2)
-
-        # PASO 2: Enviar el comando real
-        # NO resetear buffer - podría haber datos valiosos
-        comando_bytes = (comando + "\n").encode('ascii')
-        conexion.write(comando_bytes)
-        time.sleep(espera)
-
-        # PASO 3: Leer la respuesta completa
-        respuesta_comando = leer_respuesta_permisiva(conexion, timeout_total=10)
+    def __init__(self, url_base: str, token: str, tamano_bloque: int = TAMANO_BLOQUE_SUBIDA, sesion_http=None):
+        self.url_base = url_base.rstrip("/")
+        self.tamano_bloque = tamano_bloque
+        self.http = sesion_http or requests.Session()
+        self.autorizacion = {"Authorization": f"Bearer {token}"}
+
+    def manifiesto(self, ruta: Path) -> dict:
+        """Tamaño y SHA-256 del archivo y de cada bloque"""
+        total = hashlib.sha256()
+        bloques = []
+        tamano = 0
+        with open(ruta, "rb") as archivo:
+            while True:
+                bloque = archivo.read(self.tamano_bloque)
+                if not bloque:
+                    break
+                total.update(bloque)
+                bloques.append(hashlib.sha256(bloque).hexdigest())
+                tamano += len(bloque)
+        return {
+            "nombre": Path(ruta).name,
+            "tamano": tamano,
+            "sha256": total.hexdigest(),
+            "tamano_bloque": self.tamano_bloque,
+            "bloques": bloques,
+        }
 
-        # PASO 4: Manejar paginación --More-- si existe
-        # Usar una versión simple sin excepciones
-        respuesta_total = respuesta_comando
-        intentos_more = 0
-        max_intentos_more = 20
+    def _peticion(self, metodo: str, url: str, headers: Optional[dict] = None, **kwargs) -> requests.Response:
+        """
+        Petición con reintentos ante errores de red o del servidor (5xx).
 
-        while "--More--" in respuesta_total and intentos_more < max_intentos_more:
+        Raises:
+            SubidaCapturaError: Si el servidor rechaza la petición (4xx) o se agotan los reintentos
+        """
+        kwargs["headers"] = dict(headers or {}, **self.autorizacion)
+        ultimo_error = ""
+        for intento in range(1, MAX_REINTENTOS + 1):
             try:
-                conexion.write(b" ")
-                time.sleep(0.5)
-                nueva_respuesta = leer_respuesta_permisiva(conexion, timeout_total=5)
-                respuesta_total = respuesta_total.replace("--More--", "")
-                respuesta_total += nueva_respuesta
-                intentos_more += 1
-            except:
-                break
+                respuesta = self.http.request(metodo, url, timeout=TIMEOUT_SUBIDA, **kwargs)
+            except requests.exceptions.RequestException as error:
+                ultimo_error = str(error)
+            else:
+                if respuesta.status_code < 400:
+                    return respuesta
+                try:
+                    ultimo_error = respuesta.json().get("error", respuesta.reason)
+                except ValueError:
+                    ultimo_error = respuesta.reason
+                if respuesta.status_code < 500:
+                    raise SubidaCapturaError(f"{respuesta.status_code}: {ultimo_error}")
+            logger.warning(f"Subida: intento {intento}/{MAX_REINTENTOS} fallido ({ultimo_error})")
+            if intento < MAX_REINTENTOS:
+                time.sleep(ESPERA_ENTRE_REINTENTOS * intento)
+        raise SubidaCapturaError(f"Sin respuesta del servidor tras {MAX_REINTENTOS} intentos: {ultimo_error}")
+
+    def subir(self, ruta: Path) -> dict:
+        """
+        Sube (o retoma la subida de) una captura.
 
-        # PASO 5: Combinar todo - EXACTAMENTE como se vería en el CLI
-        respuesta_completa = respuesta_enter1 + respuesta_enter2 + respuesta_total
+        Returns:
+            Resumen: archivo guardado en el servidor, bloques totales y enviados,
+            bytes originales y bytes enviados (comprimidos)
 
-        logger.debug(f"[COMPLETO_SIN_VERIFICACION] Respuesta capturada ({len(respuesta_completa)} caracteres)")
-        return respuesta_completa
+        Raises:
+            SubidaCapturaError: Si la subida no se pudo completar
+            OSError: Si no se puede leer el archivo
+        """
+        manifiesto = self.manifiesto(ruta)
+        estado = self._peticion("POST", self.url_base, json=manifiesto).json()
+        id_subida = estado["id_subida"]
+        faltantes = estado["faltantes"]
+
+        enviados = 0
+        with open(ruta, "rb") as archivo:
+            for indice in faltantes:
+                archivo.seek(indice * self.tamano_bloque)
+                datos = gzip.compress(archivo.read(self.tamano_bloque))
+                self._peticion(
+                    "PUT", f"{self.url_base}/{id_subida}/bloques/{indice}",
+                    data=datos, headers={"Content-Type": "application/gzip"}
+                )
+                enviados += len(datos)
+
+        resultado = self._peticion("POST", f"{self.url_base}/{id_subida}/completar").json()
+        return {
+            "archivo": resultado["archivo"],
+            "bloques": len(manifiesto["bloques"]),
+            "bloques_enviados": len(faltantes),
+            "tamano": manifiesto["tamano"],
+            "bytes_enviados": enviados,
+        }
 
-    except Exception as error:
-        logger.error(f"[COMPLETO_SIN_VERIFICACION] Error ejecutando comando: {error}")
-        return ""
 
+class SubidaCapturaThread(QThread):
+    """Sube una transcripción terminada sin bloquear la UI"""
+    subida_completada = Signal(str, object)  # (transcripción, resumen de ClienteSubidas.subir)
+    subida_fallida = Signal(str, str)  # (transcripción, mensaje de error)
 
-def entrar_modo_enable_sin_verificacion(conexion: serial.Serial, password: str = None) -> str:
-    """
-    Entra al modo enable capturando TODO el flujo del CLI (incluyendo Password:) en una sola operación.
+    def __init__(self, archivo_txt, token):
+        super().__init__()
+        self.archivo_txt = archivo_txt
+        self.token = token
 
-    Esta función maneja el flujo completo de enable con password SIN verificaciones estrictas,
-    capturando EXACTAMENTE lo que se ve en el CLI real.
+    def run(self):
+        try:
+            resumen = ClienteSubidas(API_SUBIDAS_URL, self.token, sesion_http=SESION_HTTP).subir(Path(self.archivo_txt))
+        except (SubidaCapturaError, OSError, KeyError, ValueError) as error:
+            logger.error(f"Error subiendo {self.archivo_txt}: {error}")
+            self.subida_fallida.emit(self.archivo_txt, str(error))
+            return
+        self.subida_completada.emit(self.archivo_txt, resumen)
 
-    VERSIÓN SIMPLIFICADA: Lectura manual TOTAL sin usar leer_respuesta_permisiva()
 
-    Args:
-        conexion: Conexión serial
-        password: Contraseña de enable (opcional)
+# =============================================================================
+# THREAD PARA EJECUTAR LAS PRUEBAS
+# =============================================================================
 
-    Returns:
-        String con TODO el output del CLI (prompts + comandos + respuestas)
+def crear_popup_prueba(parent, titulo, mensaje, pregunta=False):
     """
-    try:
-        logger.debug("[ENABLE_SIN_VERIFICACION] ===== INICIO ENABLE =====")
-
-        respuesta_total = ""
-        password_enviado = False
-
-        # PASO 1: Enviar primer Enter y leer
-        logger.debug("[ENABLE_SIN_VERIFICACION] Enviando Enter 1")
-        conexion.write(b"\n")
-        time.sleep(0.5)
-
-        # Leer manualmente
-        for _ in range(10):  # Intentar leer por 3 segundos (10 * 0.3)
-            if conexion.in_waiting > 0:
-                datos = conexion.read(conexion.in_waiting)
-                texto = datos.decode('ascii', errors='ignore')
-                respuesta_total += texto
-                logger.debug(f"[ENABLE_SIN_VERIFICACION] Enter1: +{len(datos)} bytes")
-                break
-            time.sleep(0.3)
-
-        # PASO 2: Enviar segundo Enter y leer
-        logger.debug("[ENABLE_SIN_VERIFICACION] Enviando Enter 2")
-        conexion.write(b"\n")
-        time.sleep(0.5)
-
-        for _ in range(10):
-            if conexion.in_waiting > 0:
-                datos = conexion.read(conexion.in_waiting)
-                texto = datos.decode('ascii', errors='ignore')
-                respuesta_total += texto
-                logger.debug(f"[ENABLE_SIN_VERIFICACION] Enter2: +{len(datos)} bytes")
-                break
-            time.sleep(0.3)
-
-        # PASO 3: Enviar comando enable
-        logger.debug("[ENABLE_SIN_VERIFICACION] Enviando: enable")
-        conexion.write(b"enable\n")
-
-        # CRÍTICO: Esperar para que el switch procese el comando ANTES de empezar a leer
-        logger.debug("[ENABLE_SIN_VERIFICACION] Esperando 0.8s para que el switch procese...")
-        time.sleep(0.8)
-
-        # PASO 4: LECTURA CONTINUA con detección reactiva de Password:
-        tiempo_inicio = time.time()
-        tiempo_ultima_lectura = time.time()
-        timeout_total = 25  # Timeout generoso
-
-        logger.debug("[ENABLE_SIN_VERIFICACION] Iniciando lectura continua...")
+    Arma el QMessageBox de instrucciones al operador (desconectar, reconectar, verificar).
+    Con pregunta=True muestra Sí / No en lugar de OK (ver respuesta_popup).
+    """
+    msg_box = QMessageBox(parent)
+    msg_box.setWindowTitle(titulo)
+    msg_box.setText(mensaje)
+    if pregunta:
+        msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        msg_box.setDefaultButton(QMessageBox.Yes)
+    else:
+        msg_box.setStandardButtons(QMessageBox.Ok)
 
-        iteracion = 0
-        while time.time() - tiempo_inicio < timeout_total:
-            iteracion += 1
+    # Determinar el icono según el tipo de acción
+    if "Desconecte" in mensaje or "desconectar" in mensaje.lower():
+        icon_color = "#f59e0b"
+        msg_box.setIcon(QMessageBox.Warning)
+    elif "Reconecte" in mensaje or "reconectar" in mensaje.lower():
+        icon_color = "#10b981"
+        msg_box.setIcon(QMessageBox.Information)
+    elif "Verifique" in mensaje or "verificar" in mensaje.lower():
+        icon_color = "#3b82f6"
+        msg_box.setIcon(QMessageBox.Information)
+    else:
+        icon_color = "#3b82f6"
+        msg_box.setIcon(QMessageBox.Information)
 
-            # Logging periódico cada 20 iteraciones
-            if iteracion % 20 == 0:
-                logger.debug(f"[ENABLE_SIN_VERIFICACION] Iteración {iteracion}, in_waiting={conexion.in_waiting}, capturados={len(respuesta_total)} chars")
+    # Estilo compacto y profesional para los pop ups de prueba
+    msg_box.setStyleSheet(f"""
+        QMessageBox {{
+            background-color: #ffffff;
+            border: 1px solid {icon_color};
+            border-radius: 6px;
+        }}
+        QLabel {{
+            color: #1e293b;
+            font-size: 10pt;
+            padding: 8px 12px;
+        }}
+        QPushButton {{
+            background-color: #1a56db;
+            color: #ffffff;
+            border: none;
+            border-radius: 4px;
+            padding: 6px 18px;
+            min-width: 90px;
+            font-size: 9pt;
+            font-weight: 600;
+            margin: 6px;
+        }}
+        QPushButton:hover {{
+            background-color: #1e40af;
+        }}
+        QPushButton:pressed {{
+            background-color: #1e3a8a;
+        }}
+    """)
 
-            # Chequear datos disponibles
-            if conexion.in_waiting > 0:
-                try:
-                    # Leer TODO lo disponible
-                    datos = conexion.read(conexion.in_waiting)
-                    texto = datos.decode('ascii', errors='ignore')
-                    respuesta_total += texto
-                    tiempo_ultima_lectura = time.time()
-
-                    logger.debug(f"[ENABLE_SIN_VERIFICACION] +{len(datos)} bytes: {repr(texto)}")
-
-                    # DETECCIÓN REACTIVA: Si vemos Password: y no hemos enviado password
-                    if password and not password_enviado:
-                        if "Password:" in respuesta_total or "password:" in respuesta_total.lower():
-                            logger.debug("[ENABLE_SIN_VERIFICACION] *** DETECTADO 'Password:' ***")
-                            logger.debug("[ENABLE_SIN_VERIFICACION] Esperando 0.3s antes de enviar password...")
-                            time.sleep(0.3)
-
-                            logger.debug(f"[ENABLE_SIN_VERIFICACION] Enviando password: '{password}'")
-                            conexion.write((password + "\n").encode('ascii'))
-                            password_enviado = True
-
-                            logger.debug("[ENABLE_SIN_VERIFICACION] Password enviado. Continuando lectura...")
-                            # Esperar respuesta después de password
-                            time.sleep(1.5)
-                            continue  # Volver a leer inmediatamente
-
-                    # DETECCIÓN DE FINALIZACIÓN: Si vemos #
-                    if "#" in respuesta_total:
-                        logger.debug("[ENABLE_SIN_VERIFICACION] Detectado '#' en respuesta")
-                        # Esperar un momento para asegurar que no hay más datos
-                        logger.debug("[ENABLE_SIN_VERIFICACION] Esperando 1.5s para confirmar finalización...")
-                        time.sleep(1.5)
-
-                        # Verificar que no hay más datos
-                        if conexion.in_waiting == 0:
-                            logger.debug("[ENABLE_SIN_VERIFICACION] Confirmado: Sin más datos después de #, finalizando")
-                            break
-                        else:
-                            logger.debug(f"[ENABLE_SIN_VERIFICACION] Aún hay {conexion.in_waiting} bytes pendientes, continuando lectura...")
+    # Evita que el diálogo se estire demasiado a lo ancho
+    msg_box.setMinimumWidth(360)
 
-                except Exception as e:
-                    logger.error(f"[ENABLE_SIN_VERIFICACION] Error en lectura: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-                    break
-            else:
-                # Sin datos, esperar
-                time.sleep(0.3)
-
-                # Si llevamos mucho tiempo sin recibir datos, salir
-                # IMPORTANTE: Ser MÁS paciente - esperar 5 segundos de silencio antes de salir
-                tiempo_sin_datos = time.time() - tiempo_ultima_lectura
-                if tiempo_sin_datos > 5.0:
-                    logger.debug(f"[ENABLE_SIN_VERIFICACION] Sin datos por {tiempo_sin_datos:.1f}s, finalizando")
-                    break
+    return msg_box
 
-        # PASO 5: Limpiar caracteres de control
-        respuesta_total = limpiar_caracteres_control(respuesta_total)
 
-        logger.debug(f"[ENABLE_SIN_VERIFICACION] ===== FIN ENABLE =====")
-        logger.debug(f"[ENABLE_SIN_VERIFICACION] Total capturado: {len(respuesta_total)} caracteres")
-        logger.debug(f"[ENABLE_SIN_VERIFICACION] Contenido COMPLETO:\n{repr(respuesta_total)}")
+def respuesta_popup(msg_box) -> bool:
+    """True si el operador eligió Sí en un popup de pregunta (Esc o cerrar cuentan como No)"""
+    boton = msg_box.clickedButton()
+    return boton is not None and msg_box.buttonRole(boton) == QMessageBox.YesRole
 
-        return respuesta_total
 
-    except Exception as error:
-        logger.error(f"[ENABLE_SIN_VERIFICACION] ERROR CRÍTICO: {error}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return ""
+TIMEOUT_PREGUNTA_OPERADOR = 300  # segundos; sin respuesta a una pregunta Sí / No se toma "No"
+NOMBRE_BOTON_CONFIRMAR_TODOS = "confirmarTodos"
 
 
-def estabilizar_consola_post_reload(conexion: serial.Serial, max_intentos: int = 10) -> bool:
+class SolicitudOperador:
     """
-    Estabiliza la consola después del reload enviando Enters hasta obtener un prompt estable.
-
-    Esta función se asegura de que el switch haya terminado de enviar todos los mensajes
-    de boot y esté listo para recibir comandos.
-
-    Args:
-        conexion: Conexión serial
-        max_intentos: Número máximo de intentos
+    Pedido de una sesión de prueba al operador (un popup), con espera bloqueante.
 
-    Returns:
-        True si se estabilizó, False si no
+    La sesión queda detenida en esperar() sobre un threading.Event, sin
+    consumir CPU, hasta que la UI llama a resolver(); el despertar es
+    inmediato. Si vence el timeout la solicitud queda vencida y una
+    respuesta posterior de la UI se ignora.
     """
-    logger.info("[ESTABILIZAR] Iniciando estabilización de consola post-reload")
-
-    prompts_estables_consecutivos = 0
-    prompts_requeridos = 2  # Necesitamos ver el prompt al menos 2 veces seguidas
-
-    for intento in range(max_intentos):
-        try:
-            # Enviar Enter
-            conexion.write(b"\r\n")
-            time.sleep(1.5)  # Espera generosa
-
-            # Leer respuesta
-            if conexion.in_waiting > 0:
-                datos = conexion.read(conexion.in_waiting)
-                respuesta = datos.decode('ascii', errors='ignore')
-
-                # Buscar prompts de usuario (>) o privilegiado (#)
-                # Pero asegurarse de que estén al FINAL de la respuesta (prompt real)
-                lineas = respuesta.strip().split('\n')
-                ultima_linea = lineas[-1] if lineas else ""
-
-                if ultima_linea.endswith('>') or ultima_linea.endswith('#'):
-                    prompts_estables_consecutivos += 1
-                    logger.debug(f"[ESTABILIZAR] Prompt detectado ({prompts_estables_consecutivos}/{prompts_requeridos}): '{ultima_linea[-20:]}'")
-
-                    if prompts_estables_consecutivos >= prompts_requeridos:
-                        logger.info(f"[ESTABILIZAR] Consola estabilizada después de {intento + 1} intentos")
-                        return True
-                else:
-                    # No hay prompt al final, reiniciar contador
-                    prompts_estables_consecutivos = 0
-            else:
-                # Sin respuesta, reiniciar contador
-                prompts_estables_consecutivos = 0
-
-            time.sleep(2)
-
-        except Exception as e:
-            logger.warning(f"[ESTABILIZAR] Error en intento {intento + 1}: {e}")
-            prompts_estables_consecutivos = 0
-            continue
-
-    logger.warning("[ESTABILIZAR] No se pudo estabilizar la consola completamente")
-    return False
-
-
-def entrar_modo_enable(conexion, password):
-    """Entra al modo privilegiado (enable) del dispositivo"""
-    respuesta = enviar_comando(conexion, "enable", espera=1)
-
-    if "Password:" in respuesta or "password:" in respuesta.lower():
-        respuesta = enviar_comando(conexion, password, espera=1)
 
-    if "#" in respuesta:
-        return True
-    else:
-        return True  # Continuar de todas formas
+    def __init__(self, sesion, titulo, mensaje, pregunta=False):
+        self.sesion = sesion
+        self.titulo = titulo
+        self.mensaje = mensaje
+        self.pregunta = pregunta
+        self.respuesta = None
+        self.vencida = False
+        self._evento = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def atendida(self) -> bool:
+        """True si ya se respondió o venció (la UI ya no debe mostrarla)"""
+        return self._evento.is_set()
+
+    @property
+    def grupo(self) -> Optional[Tuple[str, str]]:
+        """Clave para "Confirmar todos": el mismo paso en varios equipos (las preguntas no se agrupan)"""
+        return None if self.pregunta else (self.titulo, self.mensaje)
+
+    def resolver(self, respuesta: bool = True) -> bool:
+        """Respuesta de la UI; devuelve False si la solicitud ya estaba atendida"""
+        with self._lock:
+            if self._evento.is_set():
+                return False
+            self.respuesta = respuesta
+            self._evento.set()
+            return True
 
+    def esperar(self, timeout: Optional[float] = None) -> Optional[bool]:
+        """
+        Bloquea hasta la respuesta del operador.
 
-def configurar_terminal(conexion):
-    """Configura el terminal para evitar paginación y mejorar la salida"""
-    ejecutar_comando_completo(conexion, "terminal length 0")
-    ejecutar_comando_completo(conexion, "terminal width 512")
+        Returns:
+            True / False según la respuesta (OK = True), o None si venció el timeout
+        """
+        self._evento.wait(timeout)
+        with self._lock:
+            if not self._evento.is_set():
+                self.vencida = True
+                self._evento.set()
+            return self.respuesta
 
 
-def contar_fuentes_poder(salida_show_inventory):
+class CanalOperador(QObject):
     """
-    Cuenta el número de fuentes de poder según 'show inventory'
-    Busca líneas que contengan PID de fuentes de poder o descripciones
+    Canal entre las sesiones de prueba y el operador.
+
+    Muestra de a uno, en orden de llegada, los popups de todas las sesiones
+    en paralelo, con el puerto en el título para saber a qué equipo se
+    refieren. Cuando otras sesiones esperan el mismo paso (por ejemplo
+    "desconecte la fuente 1" en varios equipos), el popup ofrece "Confirmar
+    todos" para resolverlos juntos. Las sesiones esperan bloqueadas en su
+    SolicitudOperador.
     """
-    # Contar líneas con PID de fuentes de poder (PWR-, C9K-PWR, etc.)
-    # o descripciones de Power Supply
-    patron_pid = re.compile(r'PID:\s*(PWR-[^\s,]+|C9K-PWR[^\s,]+)', re.IGNORECASE)
-    patron_desc = re.compile(r'DESCR:.*Power\s+Supply', re.IGNORECASE)
-    patron_name = re.compile(r'NAME:.*Power\s+Supply', re.IGNORECASE)
-
-    pids = patron_pid.findall(salida_show_inventory)
-    descs = patron_desc.findall(salida_show_inventory)
-    names = patron_name.findall(salida_show_inventory)
 
-    # Usar el máximo entre los tres métodos
-    cantidad = max(len(pids), len(descs), len(names))
+    def __init__(self, parent_window):
+        super().__init__(parent_window)
+        self.parent_window = parent_window
+        self.pendientes = deque()
+        self.actual = None  # (SolicitudOperador, QMessageBox) visible
+
+    def encolar(self, solicitud):
+        """Slot de TestThread.mostrar_popup_signal (se ejecuta en el hilo de la UI)"""
+        self.pendientes.append(solicitud)
+        if self.actual is not None and solicitud.grupo is not None and solicitud.grupo == self.actual[0].grupo:
+            self._actualizar_confirmar_todos()
+        self._mostrar_siguiente()
+
+    def retirar(self, solicitud):
+        """Slot de TestThread.retirar_popup_signal: cierra o descarta una solicitud vencida"""
+        if self.actual is not None and self.actual[0] is solicitud:
+            self.actual[1].done(0)
+        else:
+            self._actualizar_confirmar_todos()
 
-    # Si no se encuentra ninguna, asumir 1
-    if cantidad == 0:
-        cantidad = 1
+    def _del_mismo_grupo(self, solicitud) -> List[SolicitudOperador]:
+        if solicitud.grupo is None:
+            return []
+        return [otra for otra in self.pendientes if not otra.atendida and otra.grupo == solicitud.grupo]
 
-    return cantidad
+    def _actualizar_confirmar_todos(self):
+        if self.actual is None:
+            return
+        solicitud, msg_box = self.actual
+        boton = msg_box.findChild(QPushButton, NOMBRE_BOTON_CONFIRMAR_TODOS)
+        if boton is None:
+            return
+        iguales = len(self._del_mismo_grupo(solicitud))
+        boton.setText(f"Confirmar todos ({iguales + 1})")
+        boton.setVisible(iguales > 0)
+
+    def _mostrar_siguiente(self):
+        while self.pendientes and self.pendientes[0].atendida:
+            self.pendientes.popleft()
+        if self.actual is not None or not self.pendientes:
+            return
+        solicitud = self.pendientes.popleft()
+        msg_box = crear_popup_prueba(
+            self.parent_window, f"[{solicitud.sesion.puerto}] {solicitud.titulo}",
+            solicitud.mensaje, solicitud.pregunta
+        )
+        if solicitud.grupo is not None:
+            boton = msg_box.addButton("Confirmar todos", QMessageBox.AcceptRole)
+            boton.setObjectName(NOMBRE_BOTON_CONFIRMAR_TODOS)
+        self.actual = (solicitud, msg_box)
+        self._actualizar_confirmar_todos()
+        msg_box.finished.connect(lambda _resultado: self._respondido())
+        # open() en lugar de exec(): no anida event loops entre sesiones
+        msg_box.open()
+
+    def _respondido(self):
+        solicitud, msg_box = self.actual
+        self.actual = None
+        respuesta = respuesta_popup(msg_box) if solicitud.pregunta else True
+        solicitud.resolver(respuesta)
+
+        boton = msg_box.clickedButton()
+        if boton is not None and boton.objectName() == NOMBRE_BOTON_CONFIRMAR_TODOS:
+            for otra in self._del_mismo_grupo(solicitud):
+                otra.resolver(True)
+        self._mostrar_siguiente()
+
+
+# Panel de actividad: los mensajes se vuelcan en lotes y el widget guarda solo los últimos
+INTERVALO_LOG_UI_MS = 50
+MAX_LINEAS_LOG_UI = 5000
+DIRECTORIO_REGISTROS_ACTIVIDAD = Path.home() / ".fat_testing" / "actividad"
+COLORES_LOG = {
+    "info": "#e2e8f0",
+    "success": "#10b981",
+    "warning": "#f59e0b",
+    "error": "#ef4444",
+    "command": "#8b5cf6",  # Morado/violeta para mejor visibilidad
+}
+COLOR_HORA_LOG = "#64748b"
 
 
-def contar_ventiladores(salida_show_inventory):
-    """
-    Cuenta el número de ventiladores según 'show inventory'
-    Busca líneas que contengan PID de ventiladores o descripciones
+class RegistroActividad(QObject):
     """
-    # Contar líneas con PID de ventiladores o descripciones
-    # Ejemplos: C9200-FAN-1, FAN-1, etc.
-    patron_pid = re.compile(r'PID:\s*([^\s,]*FAN[^\s,]*)', re.IGNORECASE)
-    patron_desc = re.compile(r'DESCR:.*Fan\s+(Tray|Module|Assembly)', re.IGNORECASE)
-    patron_name = re.compile(r'NAME:.*Fan', re.IGNORECASE)
+    Registro de actividad de la ventana principal.
 
-    pids = patron_pid.findall(salida_show_inventory)
-    descs = patron_desc.findall(salida_show_inventory)
-    names = patron_name.findall(salida_show_inventory)
+    Los mensajes (de la UI y de todas las sesiones) se acumulan en una cola y
+    un QTimer los vuelca cada INTERVALO_LOG_UI_MS en una sola inserción sobre
+    un QPlainTextEdit con máximo de líneas, usando formatos de texto
+    precalculados. El historial completo se escribe en un archivo en disco
+    (ver ruta), que es lo que se guarda con "Guardar Resultados".
 
-    # Usar el máximo entre los tres métodos
-    cantidad = max(len(pids), len(descs), len(names))
-
-    # Si no se encuentra ninguna, asumir 1
-    if cantidad == 0:
-        cantidad = 1
-
-    return cantidad
-
-
-def extraer_info_dispositivo_9200(lines):
-    """Extrae modelo, serial y versión del archivo de salida (igual que __init__.py)"""
-    modelo, serial, version = None, None, None
-
-    patron_inicio_prueba_1 = re.compile(r'.*[#>]\s*INICIO\s+PRUEBA\s+1\b', re.IGNORECASE)
-    modelo_regex = re.compile(r'Model Number\s*:\s*(\S+)', re.IGNORECASE)
-    serial_regex = re.compile(r'System Serial Number\s*:\s*(\S+)', re.IGNORECASE)
-
-    # Buscar información del dispositivo
-    for line in lines:
-        model_match = modelo_regex.search(line)
-        serial_match = serial_regex.search(line)
-
-        if model_match:
-            modelo = model_match.group(1).strip()
-        if serial_match:
-            serial = serial_match.group(1).strip()
-
-    for line in lines:
-        match = patron_inicio_prueba_1.match(line.strip())
-        if match:
-            for siguiente_linea in lines[lines.index(line):]:
-                version_match = re.search(r'Version\s+(\S+)', siguiente_linea, re.IGNORECASE)
-                if version_match:
-                    version = version_match.group(1).strip()
-                    break
-            break
+    Args:
+        vista: QPlainTextEdit donde se muestran los mensajes.
+        al_volcar: Función opcional que se llama después de cada volcado.
+    """
 
-    return modelo, serial, version
+    def __init__(self, vista, al_volcar=None):
+        super().__init__(vista)
+        self.vista = vista
+        self.vista.setMaximumBlockCount(MAX_LINEAS_LOG_UI)
+        self.al_volcar = al_volcar
+        self.pendientes = deque()
+        self.ruta = None
+        self._archivo = None
+
+        self._formato_hora = QTextCharFormat()
+        self._formato_hora.setForeground(QColor(COLOR_HORA_LOG))
+        self._formatos = {}
+        for tipo, color in COLORES_LOG.items():
+            formato = QTextCharFormat()
+            formato.setForeground(QColor(color))
+            self._formatos[tipo] = formato
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(INTERVALO_LOG_UI_MS)
+        self._timer.timeout.connect(self.volcar)
+        self._timer.start()
+
+    def agregar(self, mensaje, tipo="info"):
+        """Encola un mensaje; se muestra en el próximo volcado"""
+        self.pendientes.append((datetime.now().strftime('%H:%M:%S'), mensaje, tipo))
+
+    def reiniciar(self):
+        """Vacía la vista y empieza un archivo de historial nuevo"""
+        self.volcar()
+        self.vista.clear()
+        self._cerrar_archivo()
+        try:
+            DIRECTORIO_REGISTROS_ACTIVIDAD.mkdir(parents=True, exist_ok=True)
+            self.ruta = DIRECTORIO_REGISTROS_ACTIVIDAD / f"actividad_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+            self._archivo = open(self.ruta, "a", encoding="utf-8")
+        except OSError as error:
+            logger.warning(f"No se pudo crear el historial de actividad: {error}")
+            self.ruta = None
+
+    def volcar(self):
+        """Slot del timer: inserta todos los mensajes pendientes de una vez"""
+        if not self.pendientes:
+            return
+        lote = []
+        while self.pendientes:
+            lote.append(self.pendientes.popleft())
+
+        barra = self.vista.verticalScrollBar()
+        al_final = barra.value() >= barra.maximum()
+
+        cursor = QTextCursor(self.vista.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for hora, mensaje, tipo in lote:
+            if not self.vista.document().isEmpty():
+                cursor.insertBlock()
+            cursor.insertText(f"[{hora}] ", self._formato_hora)
+            cursor.insertText(str(mensaje), self._formatos.get(tipo, self._formatos["info"]))
+        cursor.endEditBlock()
+
+        # Solo se sigue el final si el usuario no subió a leer mensajes anteriores
+        if al_final:
+            barra.setValue(barra.maximum())
+
+        if self._archivo is not None:
+            try:
+                self._archivo.write("".join(f"[{hora}] {mensaje}\n" for hora, mensaje, _ in lote))
+                self._archivo.flush()
+            except OSError as error:
+                logger.warning(f"No se pudo escribir el historial de actividad {self.ruta}: {error}")
+                self._cerrar_archivo()
+
+        if self.al_volcar is not None:
+            self.al_volcar()
+
+    def vacio(self) -> bool:
+        return self.vista.document().isEmpty() and not self.pendientes
+
+    def guardar_como(self, destino):
+        """Copia el historial completo (no solo lo visible) a `destino`"""
+        self.volcar()
+        if self.ruta is not None and self._archivo is not None:
+            shutil.copyfile(self.ruta, destino)
+            return
+        # Sin historial en disco: queda lo que muestra la vista
+        with open(destino, "w", encoding="utf-8") as f:
+            f.write(self.vista.toPlainText())
 
+    def _cerrar_archivo(self):
+        if self._archivo is not None:
+            try:
+                self._archivo.close()
+            except OSError:
+                pass
+            self._archivo = None
 
-# =============================================================================
-# THREAD PARA EJECUTAR LAS PRUEBAS
-# =============================================================================
 
 class TestThread(QThread):
     """Thread para ejecutar las pruebas sin bloquear la UI"""
     log_signal = Signal(str, str)  # (mensaje, tipo)
     finished_signal = Signal(bool, str)  # (success, archivo_salida)
-    mostrar_popup_signal = Signal(str, str)  # (titulo, mensaje) - para mostrar popups desde el thread
+    mostrar_popup_signal = Signal(object)  # SolicitudOperador - para mostrar popups desde el thread
+    retirar_popup_signal = Signal(object)  # SolicitudOperador vencida - la UI cierra su popup
+    etapa_signal = Signal(str)  # etapa actual, para el tablero de sesiones
 
-    def __init__(self, puerto, baudrate, password_enable, num_ventiladores, num_fuentes, ejecutar_prueba5, modelo_dispositivo, permitir_desconexion, parent_window):
+    def __init__(self, puerto, baudrate, password_enable, num_ventiladores, num_fuentes, ejecutar_prueba5, modelo_dispositivo, permitir_desconexion, parent_window, canal_operador=None):
         super().__init__()
         self.puerto = puerto
         self.baudrate = baudrate
@@ -1318,87 +1457,55 @@ class TestThread(QThread):
         self.parent_window = parent_window
         self.mapeo = MAPEO_DISPOSITIVOS.get(modelo_dispositivo, {})
         self.archivo_salida = ""
-        self.contenido_archivo = []
-        self.popup_confirmado = False
-
-        # Conectar señal para popups
-        self.mostrar_popup_signal.connect(self._mostrar_popup_bloqueante)
+        self.transcripcion = None  # TranscripcionIncremental, se abre al iniciar run()
+
+        # Conectar señal para popups (con varias sesiones, se encolan en la ventana principal).
+        # Qt guarda la conexión a un método ligado sin referencia fuerte: el hilo
+        # retiene el canal para que no se recolecte mientras haya popups pendientes.
+        self.canal_operador = canal_operador
+        if canal_operador is not None:
+            self.mostrar_popup_signal.connect(canal_operador.encolar)
+            self.retirar_popup_signal.connect(canal_operador.retirar)
+        else:
+            self.mostrar_popup_signal.connect(self._mostrar_popup_bloqueante)
 
     def log(self, mensaje, tipo="info"):
         """Emite señal de log a la UI"""
         self.log_signal.emit(mensaje, tipo)
 
-    def _mostrar_popup_bloqueante(self, titulo, mensaje):
-        """Muestra un popup y espera a que el usuario presione OK"""
-        msg_box = QMessageBox(self.parent_window)
-        msg_box.setWindowTitle(titulo)
-        msg_box.setText(mensaje)
-        msg_box.setStandardButtons(QMessageBox.Ok)
-
-        # Determinar el icono según el tipo de acción
-        if "Desconecte" in mensaje or "desconectar" in mensaje.lower():
-            icon_color = "#f59e0b"
-            msg_box.setIcon(QMessageBox.Warning)
-        elif "Reconecte" in mensaje or "reconectar" in mensaje.lower():
-            icon_color = "#10b981"
-            msg_box.setIcon(QMessageBox.Information)
-        elif "Verifique" in mensaje or "verificar" in mensaje.lower():
-            icon_color = "#3b82f6"
-            msg_box.setIcon(QMessageBox.Information)
-        else:
-            icon_color = "#3b82f6"
-            msg_box.setIcon(QMessageBox.Information)
-
-        # Estilo compacto y profesional para los pop ups de prueba
-        msg_box.setStyleSheet(f"""
-            QMessageBox {{
-                background-color: #ffffff;
-                border: 1px solid {icon_color};
-                border-radius: 6px;
-            }}
-            QLabel {{
-                color: #1e293b;
-                font-size: 10pt;
-                padding: 8px 12px;
-            }}
-            QPushButton {{
-                background-color: #1a56db;
-                color: #ffffff;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 18px;
-                min-width: 90px;
-                font-size: 9pt;
-                font-weight: 600;
-                margin: 6px;
-            }}
-            QPushButton:hover {{
-                background-color: #1e40af;
-            }}
-            QPushButton:pressed {{
-                background-color: #1e3a8a;
-            }}
-        """)
-
-        # Evita que el diálogo se estire demasiado a lo ancho
-        msg_box.setMinimumWidth(360)
-
+    def _mostrar_popup_bloqueante(self, solicitud):
+        """Sin CanalOperador: muestra el popup (hilo de la UI) y resuelve la solicitud"""
+        msg_box = crear_popup_prueba(self.parent_window, solicitud.titulo, solicitud.mensaje, solicitud.pregunta)
         msg_box.exec()
-        self.popup_confirmado = True
+        solicitud.resolver(respuesta_popup(msg_box) if solicitud.pregunta else True)
+
 
+    def mostrar_popup(self, titulo, mensaje, pregunta=False, timeout=None):
+        """
+        Solicita mostrar un popup y espera (bloqueado, sin sondeo) la confirmación.
 
-    def mostrar_popup(self, titulo, mensaje):
-        """Solicita mostrar un popup y espera confirmación"""
-        self.popup_confirmado = False
-        self.mostrar_popup_signal.emit(titulo, mensaje)
+        Returns:
+            True / False según la respuesta (OK = True), o None si pasaron
+            `timeout` segundos sin respuesta (el popup se retira)
+        """
+        solicitud = SolicitudOperador(self, titulo, mensaje, pregunta)
+        self.mostrar_popup_signal.emit(solicitud)
+        respuesta = solicitud.esperar(timeout)
+        if solicitud.vencida:
+            self.retirar_popup_signal.emit(solicitud)
+            self.log(f"Sin respuesta del operador a '{titulo}' en {int(timeout)}s", "warning")
+        return respuesta
 
-        # Esperar a que el usuario presione OK
-        while not self.popup_confirmado:
-            time.sleep(0.1)
+    def preguntar(self, titulo, mensaje, timeout=TIMEOUT_PREGUNTA_OPERADOR) -> bool:
+        """Hace una pregunta Sí / No al operador; sin respuesta en `timeout` segundos es No"""
+        return bool(self.mostrar_popup(titulo, mensaje, pregunta=True, timeout=timeout))
 
     def escribir_en_archivo(self, texto):
-        """Agrega texto al contenido del archivo"""
-        self.contenido_archivo.append(texto)
+        """Agrega texto a la transcripción en disco"""
+        if self.transcripcion is None or not self.transcripcion.abierta:
+            logger.debug(f"Transcripción cerrada, se descarta: {texto[:80]!r}")
+            return
+        self.transcripcion.escribir(texto)
 
     def escribir_inicio_prueba(self, numero_prueba, descripcion):
         """Escribe el marcador de inicio de una prueba"""
@@ -1406,8 +1513,11 @@ class TestThread(QThread):
         texto += f"### INICIO PRUEBA {numero_prueba}: {descripcion}\n"
         texto += f"### Hora: {datetime.now().strftime('%H:%M:%S')}\n"
         texto += f"{'#' * 80}\n\n"
+        if self.transcripcion is not None:
+            self.transcripcion.marcar("inicio_prueba", prueba=numero_prueba, descripcion=descripcion)
         self.escribir_en_archivo(texto)
         self.log(f"PRUEBA {numero_prueba} INICIANDO: {descripcion}", "info")
+        self.etapa_signal.emit(f"Prueba {numero_prueba}")
 
     def escribir_fin_prueba(self, numero_prueba):
         """Escribe el marcador de fin de una prueba"""
@@ -1416,6 +1526,8 @@ class TestThread(QThread):
         texto += f"### Hora: {datetime.now().strftime('%H:%M:%S')}\n"
         texto += f"{'#' * 80}\n\n"
         self.escribir_en_archivo(texto)
+        if self.transcripcion is not None:
+            self.transcripcion.marcar("fin_prueba", prueba=numero_prueba)
         self.log(f"PRUEBA {numero_prueba} FINALIZADA", "success")
 
     def escribir_comando_resultado(self, resultado):
@@ -1428,6 +1540,89 @@ class TestThread(QThread):
         """
         # Escribir EXACTAMENTE como viene del CLI - sin tocar nada
         self.escribir_en_archivo(resultado)
+    def detectar_serial(self, conexion) -> Optional[str]:
+        """Número de serie del equipo (show version), clave para reanudar corridas interrumpidas"""
+        respuesta = ejecutar_comando_completo(conexion, "show version | include System Serial Number")
+        coincidencia = PATRON_SERIAL_EQUIPO.search(respuesta)
+        if coincidencia is None:
+            self.log("No se identificó el número de serie; la corrida no se podrá reanudar", "warning")
+            return None
+        return coincidencia.group(1).strip()
+
+    def abrir_transcripcion(self, serial_equipo: Optional[str]) -> int:
+        """
+        Abre la transcripción de la sesión.
+
+        Si el equipo tiene una corrida interrumpida del mismo modelo y el
+        operador acepta, se continúa esa transcripción (con las cantidades de
+        fuentes y ventiladores que se usaron); si no, se crea una nueva. El
+        archivo se escribe en disco a medida que avanza; con sesiones en
+        paralelo, el puerto evita que dos archivos coincidan. Al terminar se
+        renombra a modelo_serial.txt.
+
+        Returns:
+            Número de la primera prueba a ejecutar
+        """
+        pendiente = REGISTRO_CORRIDAS.pendiente(serial_equipo, self.modelo_dispositivo) if serial_equipo else None
+        if pendiente is not None:
+            ruta_indice, indice = pendiente
+            completas = [e.get("prueba") for e in indice["eventos"] if e.get("evento") == "fin_prueba"]
+            prueba_inicial = prueba_para_reanudar(completas)
+            hechas = ", ".join(str(n) for n in range(1, prueba_inicial))
+            mensaje = (
+                f"El equipo {serial_equipo} tiene una corrida interrumpida ({indice['archivo']}) "
+                f"con las pruebas {hechas} completas.\n\n"
+                f"¿Reanudar desde la prueba {prueba_inicial}?\n"
+                "(No = empezar de nuevo desde la prueba 1)"
+            )
+            if self.preguntar("Reanudar pruebas", mensaje):
+                try:
+                    self.transcripcion = TranscripcionIncremental.reanudar(ruta_indice, prueba_inicial)
+                except (OSError, ValueError, KeyError) as error:
+                    logger.error(f"No se pudo reanudar la corrida {ruta_indice}: {error}")
+                    self.log("No se pudo reanudar la corrida anterior, se empieza de nuevo", "warning")
+                else:
+                    self.usar_cantidades_anteriores(indice)
+                    self.escribir_en_archivo(
+                        f"\n*** SESIÓN REANUDADA: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} "
+                        f"- desde la prueba {prueba_inicial} ***\n"
+                    )
+                    self.log(f"Reanudando {self.transcripcion.ruta} desde la prueba {prueba_inicial}", "success")
+                    return prueba_inicial
+
+        nombre_provisorio = sanitizar_nombre_archivo(
+            f"resultado_pruebas_cisco_9200_{sanitizar_nombre_archivo(Path(self.puerto).name)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        )
+        self.transcripcion = TranscripcionIncremental(
+            Path(nombre_provisorio), puerto=self.puerto, modelo=self.modelo_dispositivo, serial=serial_equipo
+        )
+        if serial_equipo:
+            REGISTRO_CORRIDAS.registrar(serial_equipo, self.transcripcion.ruta_indice)
+        self.log(f"Transcripción en curso: {nombre_provisorio}", "info")
+        self.escribir_en_archivo("=" * 80 + "\n")
+        self.escribir_en_archivo(f"RESULTADO DE PRUEBAS - {self.modelo_dispositivo.upper()}\n")
+        self.escribir_en_archivo("=" * 80 + "\n")
+        self.escribir_en_archivo(f"Fecha y hora de inicio: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        self.escribir_en_archivo("=" * 80 + "\n\n")
+        return 1
+
+    def usar_cantidades_anteriores(self, indice: dict) -> None:
+        """Al reanudar, usa las fuentes y ventiladores de la corrida anterior"""
+        for clave, atributo, nombre in (("cantidad_psu", "num_fuentes", "Fuentes de poder"),
+                                        ("cantidad_fan", "num_ventiladores", "Ventiladores")):
+            anterior = indice.get(clave)
+            if anterior is None or anterior == getattr(self, atributo):
+                continue
+            self.log(f"{nombre}: se usa {anterior} de la corrida anterior (configurado: {getattr(self, atributo)})", "warning")
+            setattr(self, atributo, anterior)
+
+    def omitir_prueba(self, numero_prueba, prueba_inicial) -> bool:
+        """True (y lo informa) si la prueba ya se completó en la corrida que se reanuda"""
+        if numero_prueba >= prueba_inicial:
+            return False
+        self.log(f"Prueba {numero_prueba} completada en la corrida anterior, se omite", "info")
+        return True
+
     def ejecutar_prueba_generica(self, conexion, numero_prueba, config_prueba):
         """Ejecuta una prueba genérica basada en la configuración del mapeo"""
         if not config_prueba or not config_prueba.get("comandos"):
@@ -1442,14 +1637,15 @@ class TestThread(QThread):
 
         resultado_acumulado = ""
 
-        for cmd_config in config_prueba.get("comandos", []):
-            comando = cmd_config.get("comando")
-            espera = cmd_config.get("espera", ESPERA_COMANDO)
-
+        comandos = [
+            (cmd_config.get("comando"), cmd_config.get("espera", ESPERA_COMANDO))
+            for cmd_config in config_prueba.get("comandos", [])
+        ]
+        for comando, _ in comandos:
             self.log(f"Ejecutando: {comando}", "command")
-            # Usar la nueva función que captura TODO incluyendo prompts
-            resultado = ejecutar_comando_completo_con_prompt(conexion, comando, espera=espera)
 
+        # Los "show" se envían juntos si la consola lo permite; si no, de a uno
+        for resultado in ejecutar_comandos_en_lote(conexion, comandos):
             # Escribir EXACTAMENTE lo que viene del CLI - sin tocar nada
             self.escribir_comando_resultado(resultado)
             resultado_acumulado += resultado
@@ -1604,10 +1800,8 @@ class TestThread(QThread):
 
         # Obtener prompt actual
         conexion.write(b"\n")
-        time.sleep(0.5)
-        prompt_check = ""
-        if conexion.in_waiting > 0:
-            prompt_check = conexion.read(conexion.in_waiting).decode('utf-8', errors='ignore')
+        prompt_check = esperar_prompt_generico(conexion, TIMEOUT_INTENTO_ESTABILIZAR)
+        if prompt_check:
             self.escribir_en_archivo(prompt_check)
 
         logger.debug(f"[RELOAD] Prompt actual: {repr(prompt_check)}")
@@ -1632,14 +1826,11 @@ class TestThread(QThread):
                 # Sin password configurado, intentar igual
                 logger.warning("[RELOAD] Sin password configurado, intentando enable sin password")
                 conexion.write(b"enable\n")
-                time.sleep(1)
+                esperar_prompt_generico(conexion, TIMEOUT_INTENTO_ESTABILIZAR)
 
                 # Verificar que funcionó
                 conexion.write(b"\n")
-                time.sleep(0.5)
-                check_enable = ""
-                if conexion.in_waiting > 0:
-                    check_enable = conexion.read(conexion.in_waiting).decode('utf-8', errors='ignore')
+                check_enable = esperar_prompt_generico(conexion, TIMEOUT_INTENTO_ESTABILIZAR)
 
                 if "#" not in check_enable:
                     raise TimeoutConexionError(
@@ -1664,40 +1855,36 @@ class TestThread(QThread):
 
         # Obtener prompt actual (ahora sabemos que es #)
         conexion.write(b"\n")
-        time.sleep(0.5)
-        if conexion.in_waiting > 0:
-            prompt_actual = conexion.read(conexion.in_waiting).decode('utf-8', errors='ignore')
+        prompt_actual = esperar_prompt_generico(conexion, TIMEOUT_INTENTO_ESTABILIZAR)
+        if prompt_actual:
             self.escribir_en_archivo(prompt_actual)
 
         # Enviar comando reload (el eco lo recibiremos del switch, no lo escribimos manualmente)
+        estado_consola(conexion).invalidar_prompt()
+        # Tras el arranque la terminal vuelve a paginar hasta que se configure de nuevo
+        estado_consola(conexion).paginacion_desactivada = False
         conexion.write(b"reload\n")
-        time.sleep(3)  # Espera inicial para que el switch procese
 
-        # Leer y procesar respuesta completa con timeout LARGO (45 segundos)
-        # Algunos switches tardan en mostrar los prompts
+        # Leer y procesar la respuesta a medida que llega: cada pregunta se responde
+        # apenas aparece y la fase termina en cuanto el equipo empieza a apagarse.
+        # El tope es absoluto (no se renueva con datos) para evitar bucles infinitos
         respuesta_reload_completa = ""
         confirmacion_enviada = False
         save_respondido = False
+        envios_confirmacion = 0
+        ultimo_envio_confirmacion = 0.0
+        seguimiento = None
 
         tiempo_inicio_lectura = time.time()
-        TIMEOUT_RESPUESTA_RELOAD = 45  # 45 segundos para capturar TODA la interacción
 
         self.log("Esperando respuesta del dispositivo (puede solicitar confirmaciones)...", "info")
 
-        # IMPORTANTE: NO resetear el timeout cuando hay datos para evitar bucles infinitos
-        # El timeout es absoluto: 45 segundos desde que se envió reload
-        while time.time() - tiempo_inicio_lectura < TIMEOUT_RESPUESTA_RELOAD:
-            if conexion.in_waiting > 0:
-                try:
-                    datos = conexion.read(conexion.in_waiting).decode('utf-8', errors='ignore')
-                    respuesta_reload_completa += datos
-                    self.escribir_en_archivo(datos)
-                    logger.debug(f"[RELOAD] Recibido: {datos[:100]}")
-                except Exception as e:
-                    logger.error(f"[RELOAD] Error leyendo: {e}")
-                    break
-
-            # Analizar la respuesta acumulada para detectar prompts
+        while time.time() - tiempo_inicio_lectura < TIMEOUT_CONFIRMACION_RELOAD:
+            datos = leer_fragmento_consola(conexion, INTERVALO_CONFIRMACION_RELOAD).decode('utf-8', errors='ignore')
+            if datos:
+                respuesta_reload_completa += datos
+                self.escribir_en_archivo(datos)
+                logger.debug(f"[RELOAD] Recibido: {datos[:100]}")
 
             # 1. Detectar solicitud de guardar configuración
             if ("Save?" in respuesta_reload_completa or
@@ -1705,7 +1892,6 @@ class TestThread(QThread):
                 self.log("Detectado: 'Save configuration?' - Respondiendo 'no'", "info")
                 # Enviar respuesta (el eco lo recibiremos del switch)
                 conexion.write(b"no\n")
-                time.sleep(1)
                 save_respondido = True
                 continue  # Continuar leyendo
 
@@ -1713,36 +1899,27 @@ class TestThread(QThread):
             if (("Proceed with reload?" in respuesta_reload_completa or
                  "[confirm]" in respuesta_reload_completa) and not confirmacion_enviada):
                 self.log("Detectado: 'Proceed with reload? [confirm]' - Confirmando...", "info")
-
-                # MEJORA: Enviar confirmación MÚLTIPLES VECES para asegurar que llega
-                # A veces el primer Enter no es procesado correctamente
-                for intento_confirm in range(3):
-                    logger.debug(f"[RELOAD] Enviando confirmación, intento {intento_confirm + 1}/3")
-                    conexion.write(b"\n")
-                    time.sleep(0.5)
-
+                conexion.write(b"\n")
                 confirmacion_enviada = True
-                self.log("Confirmación enviada (3 veces para asegurar recepción)", "success")
-                # Continuar leyendo para capturar mensajes de shutdown
-                time.sleep(2)  # Espera adicional para recibir respuesta
+                envios_confirmacion = 1
+                ultimo_envio_confirmacion = time.time()
+                # El arranque se cuenta desde la confirmación
+                seguimiento = SeguimientoArranque(self.modelo_dispositivo)
+                continue
 
             # 3. Verificar que el reload realmente se está ejecutando
-            # Buscar mensajes típicos de inicio de reload
-            if confirmacion_enviada and any(msg in respuesta_reload_completa for msg in [
-                "Reload requested", "Proceeding with reload", "***", "System Bootstrap",
-                "reload in", "Reload command"  # Mensajes adicionales
-            ]):
+            if confirmacion_enviada and any(msg in respuesta_reload_completa for msg in MENSAJES_INICIO_RELOAD):
                 self.log("Reload confirmado - El dispositivo está reiniciando", "success")
-                # Esperar un poco más para capturar mensajes finales
-                time.sleep(5)
-                # Leer últimos datos
-                if conexion.in_waiting > 0:
-                    datos_finales = conexion.read(conexion.in_waiting).decode('utf-8', errors='ignore')
-                    respuesta_reload_completa += datos_finales
-                    self.escribir_en_archivo(datos_finales)
                 break
 
-            time.sleep(0.5)
+            # A veces el primer Enter no es procesado: reenviar la confirmación
+            # (hasta 3 veces) si el equipo no empieza a apagarse
+            if (confirmacion_enviada and envios_confirmacion < 3 and
+                    time.time() - ultimo_envio_confirmacion >= INTERVALO_CONFIRMACION_RELOAD):
+                envios_confirmacion += 1
+                logger.debug(f"[RELOAD] Enviando confirmación, intento {envios_confirmacion}/3")
+                conexion.write(b"\n")
+                ultimo_envio_confirmacion = time.time()
 
         # VALIDACIÓN CRÍTICA: Verificar que se confirmó el reload
         if not confirmacion_enviada:
@@ -1762,10 +1939,7 @@ class TestThread(QThread):
             )
 
         # Verificar que realmente se detectaron mensajes de shutdown
-        reload_ejecutandose = any(msg in respuesta_reload_completa for msg in [
-            "Reload requested", "Proceeding with reload", "***", "System Bootstrap",
-            "reload in", "Reload command"
-        ])
+        reload_ejecutandose = any(msg in respuesta_reload_completa for msg in MENSAJES_INICIO_RELOAD)
 
         if not reload_ejecutandose:
             logger.warning("[RELOAD] Confirmación enviada pero NO se detectaron mensajes de shutdown")
@@ -1777,78 +1951,63 @@ class TestThread(QThread):
             self.log("Confirmación de reload enviada Y mensajes de shutdown detectados", "success")
 
         # ==============================
-        # FASE 2: ESPERA DE RELOAD CON VALIDACIÓN TEMPORAL
+        # FASE 2: SEGUIMIENTO DEL ARRANQUE
         # ==============================
-        self.log(f"Esperando {ESPERA_RELOAD} segundos para que el equipo reinicie...", "warning")
-        self.escribir_en_archivo(f"\n=== ESPERANDO {ESPERA_RELOAD} SEGUNDOS PARA REINICIO ===\n")
-
-        # CRÍTICO: Limpiar buffer para no confundir datos viejos con mensajes de boot
-        try:
-            time.sleep(2)
-            conexion.reset_input_buffer()
-            logger.debug("[RELOAD] Buffer limpiado antes de monitorear boot")
-        except:
-            pass
-
-        tiempo_inicio_reload = time.time()
-        boot_detectado = False
-        tiempo_boot_detectado = None
-        TIEMPO_MINIMO_BOOT = 45  # Mínimo 45 segundos antes de aceptar boot
-
-        while time.time() - tiempo_inicio_reload < ESPERA_RELOAD:
-            tiempo_transcurrido = time.time() - tiempo_inicio_reload
+        # Sin pausas fijas: se sigue la salida de boot etapa por etapa y se
+        # continúa apenas aparece "Press RETURN to get started"
+        eta = seguimiento.eta()
+        if eta is not None:
+            self.log(f"Esperando el arranque del equipo (estimado según reloads anteriores: ~{int(eta)}s)...", "warning")
+        else:
+            self.log("Esperando el arranque del equipo (sin historial de reloads para este modelo)...", "warning")
+        self.escribir_en_archivo("\n=== ESPERANDO ARRANQUE DEL EQUIPO ===\n")
+
+        for etapa in seguimiento.procesar(respuesta_reload_completa):
+            self.log(f"Arranque: {DESCRIPCION_ETAPAS_ARRANQUE[etapa]} ({int(seguimiento.etapas[etapa])}s)", "info")
+
+        ultima_actividad = time.monotonic()
+        ultima_descripcion = None
+
+        while not seguimiento.listo:
+            datos = leer_fragmento_consola(conexion, INTERVALO_SEGUIMIENTO_ARRANQUE)
+            if datos:
+                ultima_actividad = time.monotonic()
+                texto = datos.decode('utf-8', errors='ignore')
+                self.escribir_en_archivo(texto)
+                for etapa in seguimiento.procesar(texto):
+                    self.log(f"Arranque: {DESCRIPCION_ETAPAS_ARRANQUE[etapa]} ({int(seguimiento.etapas[etapa])}s)", "info")
+
+            descripcion = seguimiento.descripcion()
+            if descripcion != ultima_descripcion:
+                self.etapa_signal.emit(descripcion)
+                ultima_descripcion = descripcion
+
+            if seguimiento.transcurrido() >= TIMEOUT_ARRANQUE_MAXIMO:
+                logger.warning(f"[RELOAD] Arranque sin 'Press RETURN' tras {TIMEOUT_ARRANQUE_MAXIMO}s")
+                break
 
-            # Leer datos disponibles sin lanzar excepciones
-            if conexion.in_waiting > 0:
-                try:
-                    datos_bytes = conexion.read(conexion.in_waiting)
-                    datos = datos_bytes.decode('utf-8', errors='ignore')
-
-                    if datos:
-                        self.escribir_en_archivo(datos)
-
-                        # Buscar patrones ESPECÍFICOS de boot (no solo >)
-                        # IMPORTANTE: Solo si han pasado al menos 45 segundos
-                        if tiempo_transcurrido >= TIEMPO_MINIMO_BOOT:
-                            if any(patron in datos for patron in [
-                                "Press RETURN to get started",
-                                "Initial configuration dialog",
-                                "Would you like to enter the initial configuration dialog?"
-                            ]):
-                                if not boot_detectado:
-                                    self.log(f"Detectado inicio del sistema después de {int(tiempo_transcurrido)}s", "success")
-                                    boot_detectado = True
-                                    tiempo_boot_detectado = time.time()
-                                    # NO hacer break, continuar monitoreando
-                        else:
-                            # Antes de 45 segundos, ignorar patrones (probablemente falsos positivos)
-                            if "Press RETURN" in datos or "Switch>" in datos:
-                                logger.warning(f"[RELOAD] Patrón de boot detectado a los {int(tiempo_transcurrido)}s - DEMASIADO PRONTO, ignorando")
+            # Consola en silencio: si IOS ya estaba cargando (o se pasó el tope
+            # aprendido) es probable que el aviso no se haya visto; se sondea con Enter
+            silencio = time.monotonic() - ultima_actividad
+            if silencio >= SILENCIO_FIN_ARRANQUE and (
+                    "ios" in seguimiento.etapas or seguimiento.transcurrido() >= seguimiento.tope()):
+                logger.warning(f"[RELOAD] {int(silencio)}s sin mensajes de boot, se sondea la consola")
+                break
 
-                except Exception as e:
-                    # Error leyendo (puede ser normal durante desconexión), continuar
-                    logger.debug(f"[RELOAD] Error leyendo datos durante boot: {e}")
-                    pass
-
-            time.sleep(1)
-
-        # Si se detectó boot antes del timeout, esperar 10 segundos adicionales de estabilización
-        if boot_detectado and tiempo_boot_detectado:
-            tiempo_desde_boot = time.time() - tiempo_boot_detectado
-            if tiempo_desde_boot < 10:
-                espera_adicional = 10 - tiempo_desde_boot
-                self.log(f"Esperando {int(espera_adicional)}s adicionales para estabilización...", "info")
-                time.sleep(espera_adicional)
+        if seguimiento.listo:
+            self.log(f"Equipo listo después de {int(seguimiento.etapas['listo'])}s ({seguimiento.resumen()})", "success")
+            seguimiento.registrar()
         else:
-            # No se detectó boot específicamente, esperar 10 segundos de todas formas
-            self.log("No se detectaron mensajes de boot específicos, esperando estabilización...", "warning")
-            time.sleep(10)
+            self.log("No se detectó el aviso de arranque, se sondea la consola...", "warning")
+            if seguimiento.etapas:
+                self.log(f"Etapas vistas: {seguimiento.resumen()}", "info")
 
         # ==============================
         # FASE 3: RECONEXIÓN ROBUSTA
         # ==============================
         self.escribir_en_archivo("\n=== EQUIPO REINICIADO - RECONECTANDO ===\n")
         self.log("Equipo reiniciado - Intentando reconectar...", "info")
+        self.etapa_signal.emit("Reload: reconectando")
 
         # Intentar despertar la consola y obtener prompt
         conexion_exitosa = False
@@ -1858,37 +2017,25 @@ class TestThread(QThread):
             self.log(f"Intento de reconexión {intento + 1}/{MAX_INTENTOS_RECONEXION}", "info")
 
             try:
-                # Enviar múltiples Enters
-                for _ in range(3):
-                    conexion.write(b"\r\n")
-                    time.sleep(0.5)
-
-                # Esperar respuesta (timeout generoso)
-                time.sleep(2)
-                respuesta = ""
-
-                if conexion.in_waiting > 0:
-                    datos_bytes = conexion.read(conexion.in_waiting)
-                    respuesta = datos_bytes.decode('utf-8', errors='ignore')
-
-                    # Escribir en archivo solo lo que responde el switch
-                    if respuesta:
-                        self.escribir_en_archivo(respuesta)
-
-                    # Buscar prompt AL FINAL de la respuesta
-                    lineas = respuesta.strip().split('\n')
-                    ultima_linea = lineas[-1] if lineas else ""
-
-                    if ultima_linea.endswith('>') or ultima_linea.endswith('#'):
-                        self.log(f"Consola disponible después de {intento + 1} intentos - Prompt: '{ultima_linea[-30:]}'", "success")
-                        conexion_exitosa = True
-                        break
+                # Enviar Enter y esperar el prompt (termina apenas aparece)
+                conexion.write(b"\r\n")
+                respuesta = esperar_prompt_generico(conexion, TIMEOUT_INTENTO_RECONEXION)
+
+                # Escribir en archivo solo lo que responde el switch
+                if respuesta:
+                    self.escribir_en_archivo(respuesta)
+
+                # Buscar prompt AL FINAL de la respuesta
+                if termina_en_prompt_generico(respuesta):
+                    ultima_linea = respuesta.strip().split('\n')[-1]
+                    self.log(f"Consola disponible después de {intento + 1} intentos - Prompt: '{ultima_linea[-30:]}'", "success")
+                    conexion_exitosa = True
+                    break
 
             except Exception as e:
                 self.log(f"Intento {intento + 1} falló: {str(e)[:50]}", "warning")
                 logger.debug(f"[RECONEXION] Error en intento {intento + 1}: {e}")
-
-            time.sleep(5)  # Espera entre intentos
+                time.sleep(TIMEOUT_INTENTO_RECONEXION)
 
         # CRÍTICO: Validar que se reconectó
         if not conexion_exitosa:
@@ -1928,16 +2075,10 @@ class TestThread(QThread):
         try:
             # Enviar "show version" para obtener el uptime
             conexion.write(b"\n")
-            time.sleep(0.3)
-            if conexion.in_waiting > 0:
-                conexion.read(conexion.in_waiting)  # Limpiar
+            esperar_prompt_generico(conexion, TIMEOUT_INTENTO_ESTABILIZAR)  # Limpiar
 
             conexion.write(b"show version | include uptime\n")
-            time.sleep(2)
-
-            respuesta_uptime = ""
-            if conexion.in_waiting > 0:
-                respuesta_uptime = conexion.read(conexion.in_waiting).decode('utf-8', errors='ignore')
+            respuesta_uptime = esperar_prompt_generico(conexion, TIMEOUT_COMANDO)
 
             logger.debug(f"[RELOAD] Respuesta uptime: {repr(respuesta_uptime)}")
 
@@ -2015,13 +2156,13 @@ class TestThread(QThread):
         # FASE 5: CONFIGURAR TERMINAL
         # ==============================
         self.log("Configurando terminal...", "info")
-        ejecutar_comando_sin_verificacion(conexion, "terminal length 0", espera=1)
+        respuesta_terminal = ejecutar_comando_sin_verificacion(conexion, "terminal length 0", espera=1)
         ejecutar_comando_sin_verificacion(conexion, "terminal width 512", espera=1)
+        estado_consola(conexion).paginacion_desactivada = "Invalid input" not in respuesta_terminal
 
         # ==============================
         # FASE 6: SHOW VERSION POST RELOAD
         # ==============================
-        time.sleep(3)  # Pausa adicional para asegurar estabilidad
         self.escribir_en_archivo("\n=== EJECUTANDO SHOW VERSION (POST RELOAD) ===\n")
         self.log("Ejecutando: show version (post reload)", "command")
 
@@ -2050,19 +2191,12 @@ class TestThread(QThread):
     def run(self):
         """Método principal del thread que ejecuta todas las pruebas"""
         try:
-            # Inicializar archivo de salida (SIN limpieza de datos - CLI exacto del dispositivo)
-            self.contenido_archivo = []
-            self.contenido_archivo.append("=" * 80 + "\n")
-            self.contenido_archivo.append(f"RESULTADO DE PRUEBAS - {self.modelo_dispositivo.upper()}\n")
-            self.contenido_archivo.append("=" * 80 + "\n")
-            self.contenido_archivo.append(f"Fecha y hora de inicio: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.contenido_archivo.append("=" * 80 + "\n\n")
-
             # Abrir conexión serial
             self.log(f"Conectando al puerto {self.puerto} a {self.baudrate} baudios...", "info")
 
             try:
                 conexion = abrir_conexion_serial(self.puerto, self.baudrate)
+                estado_consola(conexion).modelo = self.modelo_dispositivo
                 self.log("Conexión establecida y dispositivo Cisco validado correctamente", "success")
             except ValueError as error:
                 # Error de validación de inputs (puerto o baudrate inválidos)
@@ -2097,6 +2231,7 @@ class TestThread(QThread):
                 return
 
             # Preparar la conexión
+            self.etapa_signal.emit("Preparando consola")
             self.log("Despertando consola...", "info")
             despertar_consola(conexion)
 
@@ -2109,69 +2244,80 @@ class TestThread(QThread):
             self.log("Configurando terminal...", "info")
             configurar_terminal(conexion)
 
+            # Identificar el equipo: si tiene una corrida interrumpida se puede reanudar
+            serial_equipo = self.detectar_serial(conexion)
+            prueba_inicial = self.abrir_transcripcion(serial_equipo)
+
             # PRUEBA 1
-            self.log("Preparando Prueba 1...", "info")
-            # CRÍTICO: Verificar conexión antes de cada prueba
-            if not verificar_conexion_activa(conexion):
-                raise DispositivoDesconectadoError("Conexión perdida antes de ejecutar Prueba 1")
+            if not self.omitir_prueba(1, prueba_inicial):
+                self.log("Preparando Prueba 1...", "info")
+                # CRÍTICO: Verificar conexión antes de cada prueba
+                if not verificar_conexion_activa(conexion):
+                    raise DispositivoDesconectadoError("Conexión perdida antes de ejecutar Prueba 1")
 
-            config_prueba1 = self.mapeo.get("prueba_1", {})
-            self.ejecutar_prueba_generica(conexion, 1, config_prueba1)
+                config_prueba1 = self.mapeo.get("prueba_1", {})
+                self.ejecutar_prueba_generica(conexion, 1, config_prueba1)
 
             # Usar las cantidades configuradas por el usuario (sin autocalculo)
             cantidad_psu = self.num_fuentes
             cantidad_fan = self.num_ventiladores
+            self.transcripcion.actualizar_indice(cantidad_psu=cantidad_psu, cantidad_fan=cantidad_fan)
 
             self.log(f"Fuentes de poder configuradas: {cantidad_psu}", "info")
             self.log(f"Ventiladores configurados: {cantidad_fan}", "info")
 
             # PRUEBA 2 (show environment power)
-            self.log("Preparando Prueba 2...", "info")
-            # CRÍTICO: Verificar conexión antes de cada prueba
-            if not verificar_conexion_activa(conexion):
-                raise DispositivoDesconectadoError("Conexión perdida antes de ejecutar Prueba 2")
-
-            config_prueba2 = self.mapeo.get("prueba_2", {})
-            if config_prueba2.get("repetir_por_fuentes"):
-                self.ejecutar_prueba_repetitiva(
-                    conexion, 2, config_prueba2, cantidad_psu,
-                    tipo="fuente(s)",
-                    nombre_componente="fuente de poder"
-                )
-            else:
-                self.ejecutar_prueba_generica(conexion, 2, config_prueba2)
+            if not self.omitir_prueba(2, prueba_inicial):
+                self.log("Preparando Prueba 2...", "info")
+                # CRÍTICO: Verificar conexión antes de cada prueba
+                if not verificar_conexion_activa(conexion):
+                    raise DispositivoDesconectadoError("Conexión perdida antes de ejecutar Prueba 2")
+
+                config_prueba2 = self.mapeo.get("prueba_2", {})
+                if config_prueba2.get("repetir_por_fuentes"):
+                    self.ejecutar_prueba_repetitiva(
+                        conexion, 2, config_prueba2, cantidad_psu,
+                        tipo="fuente(s)",
+                        nombre_componente="fuente de poder"
+                    )
+                else:
+                    self.ejecutar_prueba_generica(conexion, 2, config_prueba2)
 
             # PRUEBA 3 (show environment fan)
-            self.log("Preparando Prueba 3...", "info")
-            # CRÍTICO: Verificar conexión antes de cada prueba
-            if not verificar_conexion_activa(conexion):
-                raise DispositivoDesconectadoError("Conexión perdida antes de ejecutar Prueba 3")
-
-            config_prueba3 = self.mapeo.get("prueba_3", {})
-            if config_prueba3.get("repetir_por_ventiladores"):
-                self.ejecutar_prueba_repetitiva(
-                    conexion, 3, config_prueba3, cantidad_fan,
-                    tipo="ventilador(es)",
-                    nombre_componente="ventilador"
-                )
-            else:
-                self.ejecutar_prueba_generica(conexion, 3, config_prueba3)
+            if not self.omitir_prueba(3, prueba_inicial):
+                self.log("Preparando Prueba 3...", "info")
+                # CRÍTICO: Verificar conexión antes de cada prueba
+                if not verificar_conexion_activa(conexion):
+                    raise DispositivoDesconectadoError("Conexión perdida antes de ejecutar Prueba 3")
+
+                config_prueba3 = self.mapeo.get("prueba_3", {})
+                if config_prueba3.get("repetir_por_ventiladores"):
+                    self.ejecutar_prueba_repetitiva(
+                        conexion, 3, config_prueba3, cantidad_fan,
+                        tipo="ventilador(es)",
+                        nombre_componente="ventilador"
+                    )
+                else:
+                    self.ejecutar_prueba_generica(conexion, 3, config_prueba3)
 
             # PRUEBA 4 (reload - siempre se ejecuta)
-            self.log("Preparando Prueba 4 (RELOAD)...", "info")
-            # CRÍTICO: Verificar conexión antes de cada prueba
-            if not verificar_conexion_activa(conexion):
-                raise DispositivoDesconectadoError("Conexión perdida antes de ejecutar Prueba 4 (reload)")
-
-            config_prueba4 = self.mapeo.get("prueba_4", {})
-            if config_prueba4.get("ejecutar_reload"):
-                self.log("EJECUTANDO PRUEBA 4 (RELOAD) - EL EQUIPO SE REINICIARÁ", "warning")
-                self.ejecutar_prueba_4(conexion)
-            else:
-                self.ejecutar_prueba_generica(conexion, 4, config_prueba4)
+            if not self.omitir_prueba(4, prueba_inicial):
+                self.log("Preparando Prueba 4 (RELOAD)...", "info")
+                # CRÍTICO: Verificar conexión antes de cada prueba
+                if not verificar_conexion_activa(conexion):
+                    raise DispositivoDesconectadoError("Conexión perdida antes de ejecutar Prueba 4 (reload)")
+
+                config_prueba4 = self.mapeo.get("prueba_4", {})
+                if config_prueba4.get("ejecutar_reload"):
+                    self.log("EJECUTANDO PRUEBA 4 (RELOAD) - EL EQUIPO SE REINICIARÁ", "warning")
+                    self.ejecutar_prueba_4(conexion)
+                else:
+                    self.ejecutar_prueba_generica(conexion, 4, config_prueba4)
 
             # PRUEBA 5 (opcional)
-            if self.ejecutar_prueba5:
+            if self.omitir_prueba(5, prueba_inicial):
+                pass
+            elif self.ejecutar_prueba5:
                 self.log("Preparando Prueba 5...", "info")
                 # CRÍTICO: Verificar conexión antes de cada prueba
                 if not verificar_conexion_activa(conexion):
@@ -2188,38 +2334,31 @@ class TestThread(QThread):
                 self.escribir_fin_prueba(5)
 
             # Finalizar archivo
-            self.contenido_archivo.append("\n" + "=" * 80 + "\n")
-            self.contenido_archivo.append(f"PRUEBAS FINALIZADAS: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.contenido_archivo.append("=" * 80 + "\n")
+            self.escribir_en_archivo("\n" + "=" * 80 + "\n")
+            self.escribir_en_archivo(f"PRUEBAS FINALIZADAS: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            self.escribir_en_archivo("=" * 80 + "\n")
+            self.transcripcion.cerrar("completo")
 
-            # Extraer información del dispositivo para el nombre del archivo
-            lines = ''.join(self.contenido_archivo).split('\n')
-            modelo, serial, version = extraer_info_dispositivo_9200(lines)
+            # Extraer información del dispositivo para el nombre del archivo (leyendo del disco)
+            with open(self.transcripcion.ruta, 'r', encoding='utf-8', newline='') as f:
+                modelo, serial, version = extraer_info_dispositivo_9200(f)
 
             if modelo and serial:
                 # Sanitizar modelo y serial para nombre de archivo seguro
                 modelo_limpio = sanitizar_nombre_archivo(modelo)
                 serial_limpio = sanitizar_nombre_archivo(serial)
-                nombre_archivo = f"{modelo_limpio}_{serial_limpio}.txt"
-            else:
-                nombre_archivo = f"resultado_pruebas_cisco_9200_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-
-            # Sanitizar el nombre completo por seguridad
-            nombre_archivo = sanitizar_nombre_archivo(nombre_archivo)
-            logger.info(f"Nombre de archivo generado: {nombre_archivo}")
+                nombre_final = sanitizar_nombre_archivo(f"{modelo_limpio}_{serial_limpio}.txt")
+                try:
+                    self.transcripcion.renombrar(nombre_final)
+                except OSError as error:
+                    # Se conserva el nombre provisorio, que ya tiene todo el contenido
+                    logger.error(f"Error renombrando {self.transcripcion.ruta} a {nombre_final}: {error}")
+                    self.log(f"No se pudo renombrar el archivo a {nombre_final}, se conserva el nombre provisorio", "warning")
 
-            # Guardar archivo con manejo de errores
-            try:
-                with open(nombre_archivo, 'w', encoding='utf-8') as f:
-                    f.writelines(self.contenido_archivo)
-                logger.info(f"Archivo guardado exitosamente: {nombre_archivo}")
-            except (OSError, IOError) as error:
-                logger.error(f"Error guardando archivo {nombre_archivo}: {error}")
-                # Intentar con nombre genérico
-                nombre_archivo = f"resultado_pruebas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-                self.log(f"Error guardando archivo, intentando con nombre alternativo: {nombre_archivo}", "warning")
-                with open(nombre_archivo, 'w', encoding='utf-8') as f:
-                    f.writelines(self.contenido_archivo)
+            nombre_archivo = str(self.transcripcion.ruta)
+            logger.info(f"Archivo guardado exitosamente: {nombre_archivo}")
+            if serial_equipo:
+                REGISTRO_CORRIDAS.quitar(serial_equipo)
 
             self.archivo_salida = nombre_archivo
             self.log(f"Resultados guardados en: {nombre_archivo}", "success")
@@ -2292,6 +2431,123 @@ class TestThread(QThread):
                 cerrar_conexion_serial(conexion)
             self.finished_signal.emit(False, "")
 
+        finally:
+            # Si la sesión terminó con error, la transcripción parcial queda en disco
+            if self.transcripcion is not None and self.transcripcion.abierta:
+                try:
+                    self.transcripcion.cerrar("interrumpido")
+                    self.log(f"Transcripción parcial guardada en: {self.transcripcion.ruta}", "warning")
+                except OSError as error:
+                    logger.error(f"Error cerrando la transcripción {self.transcripcion.ruta}: {error}")
+            # Tiempos aprendidos en esta corrida para los próximos timeouts
+            HISTORIAL_TIEMPOS.guardar()
+
+
+class GeneradorInformeThread(QThread):
+    """Genera el informe .docx de una transcripción sin bloquear la UI"""
+    informe_generado = Signal(str, str)  # (transcripción, ruta del .docx)
+    informe_fallido = Signal(str, str)  # (transcripción, mensaje de error)
+
+    def __init__(self, archivo_txt, modelo_dispositivo):
+        super().__init__()
+        self.archivo_txt = archivo_txt
+        self.tipo_informe = TIPO_INFORME_POR_MODELO.get(modelo_dispositivo)
+
+    def run(self):
+        inicio = time.monotonic()
+        try:
+            if self.tipo_informe is None:
+                raise ValueError("El modelo no tiene plantilla de informe")
+            ruta_docx = generar_informe_desde_archivo(self.archivo_txt, self.tipo_informe)
+        except Exception as error:
+            logger.exception(f"Error generando el informe de {self.archivo_txt}")
+            self.informe_fallido.emit(self.archivo_txt, str(error))
+            return
+        logger.info(f"Informe {ruta_docx} generado en {time.monotonic() - inicio:.1f}s")
+        self.informe_generado.emit(self.archivo_txt, ruta_docx)
+
+
+class DeteccionPuertosThread(QThread):
+    """Sondea los puertos serie en segundo plano (botón Detectar)"""
+    deteccion_terminada = Signal(object, object)  # (puertos sondeados, List[DispositivoDetectado])
+
+    def __init__(self, puertos_excluidos=()):
+        super().__init__()
+        self.puertos_excluidos = {p.upper() for p in puertos_excluidos}
+
+    def run(self):
+        puertos = [p for p in listar_puertos_serie() if p.upper() not in self.puertos_excluidos]
+        inicio = time.monotonic()
+        dispositivos = descubrir_dispositivos(puertos)
+        logger.info(
+            f"[SONDEO] {len(dispositivos)} de {len(puertos)} puertos con consola Cisco "
+            f"({time.monotonic() - inicio:.1f}s)"
+        )
+        self.deteccion_terminada.emit(puertos, dispositivos)
+
+
+class ValidacionAccesoThread(QThread):
+    """
+    Valida las credenciales sin bloquear la ventana de login.
+
+    Con una licencia vigente en caché para la cuenta no consulta al servidor;
+    si no, llama a /api/validar-acceso con la sesión HTTP compartida y guarda
+    la licencia que entrega.
+    """
+    resultado_signal = Signal(int, object)  # (código HTTP, datos de la respuesta); 0 = sin respuesta
+
+    def __init__(self, email, password, cache_licencia):
+        super().__init__()
+        self.email = email
+        self.password = password
+        self.cache_licencia = cache_licencia
+
+    def run(self):
+        licencia = self.cache_licencia.validar(self.email, self.password)
+        if licencia is not None:
+            logger.info("Acceso validado con la licencia en caché")
+            self.resultado_signal.emit(200, {
+                "permitir_acceso": True,
+                "usuario": licencia.get("usuario"),
+                "licencia": licencia["licencia"],
+                "sin_conexion": True,
+            })
+            return
+
+        try:
+            response = SESION_HTTP.post(
+                API_VALIDAR_ACCESO_URL,
+                json={"email": self.email, "password": self.password},
+                timeout=TIMEOUT_LOGIN
+            )
+        except requests.exceptions.ConnectionError:
+            # Log técnico, pero NO se muestra al usuario
+            logger.error("Error de conexión con el backend", exc_info=True)
+            self.resultado_signal.emit(0, {"motivo": "SIN_CONEXION"})
+            return
+        except requests.exceptions.Timeout:
+            logger.error("Timeout al conectar con el backend", exc_info=True)
+            self.resultado_signal.emit(0, {"motivo": "TIMEOUT"})
+            return
+        except requests.exceptions.RequestException:
+            # Cualquier otro error de requests
+            logger.error("Error HTTP inesperado", exc_info=True)
+            self.resultado_signal.emit(0, {"motivo": "ERROR_HTTP"})
+            return
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+
+        if response.status_code == 200 and data.get("permitir_acceso"):
+            if data.get("licencia"):
+                self.cache_licencia.guardar(self.email, self.password, data["licencia"])
+        elif response.status_code == 403:
+            # Cuenta bloqueada o sin suscripción: tampoco se permite entrar sin conexión
+            self.cache_licencia.borrar()
+        self.resultado_signal.emit(response.status_code, data)
+
 
 class LoginWindow(QMainWindow):
     """Ventana de inicio de sesión - Diseño Corporativo Profesional"""
@@ -2302,6 +2558,8 @@ class LoginWindow(QMainWindow):
         self.setMinimumSize(520, 700)
         self.resize(560, 740)
         self.email_valid = False
+        self.cache_licencia = CacheLicencia()
+        self.validacion = None  # ValidacionAccesoThread en curso
         self.setup_ui()
         self.apply_styles()
 
@@ -2694,8 +2952,8 @@ class LoginWindow(QMainWindow):
     def login(self):
         """
         Propósito:
-            - Enviar las credenciales a la API de backend y, según la respuesta,
-              abrir la ventana principal o mostrar errores/advertencias.
+            - Validar las credenciales en segundo plano (licencia en caché o API
+              de backend); la respuesta se procesa en respuesta_login.
 
         Entradas:
             - No recibe parámetros directos.
@@ -2707,16 +2965,13 @@ class LoginWindow(QMainWindow):
         Salidas:
             - No retorna valor.
             - Efectos:
-                - Abre MainWindow si el acceso es autorizado.
-                - Muestra diálogos de mensaje (show_message) en caso de error.
-                - Habilita/deshabilita el botón de login y limpia el campo password.
+                - Lanza ValidacionAccesoThread (la ventana no se bloquea).
+                - Deshabilita el botón de login hasta recibir la respuesta.
 
         Dependencias:
-            - Constante API_VALIDAR_ACCESO_URL (URL de la API).
-            - Clase DesktopUser (para representar al usuario autenticado).
+            - Clase ValidacionAccesoThread (caché de licencia y llamada a la API).
+            - Clase CacheLicencia (self.cache_licencia).
             - Función show_message (para mostrar mensajes).
-            - Clase MainWindow (para abrir la ventana principal).
-            - Librería requests (para realizar la petición HTTP).
         """
 
         email = self.email_input.text().strip()
@@ -2736,65 +2991,53 @@ class LoginWindow(QMainWindow):
             self.email_input.setFocus()
             return
 
+        # Una validación a la vez (Enter repetido mientras se espera la respuesta)
+        if self.validacion is not None and self.validacion.isRunning():
+            return
+
         # Deshabilitar botón mientras se procesa el login
         self.login_button.setEnabled(False)
         self.login_button.setText("Authenticating...")
 
-        # ---------------------------
-        # 1) Llamar a la API de backend
-        # ---------------------------
-        try:
-            payload = {
-                "email": email,
-                "password": password,
-            }
+        # La validación (caché local o API) corre fuera del hilo de la UI
+        self.validacion = ValidacionAccesoThread(email, password, self.cache_licencia)
+        self.validacion.resultado_signal.connect(self.respuesta_login)
+        self.validacion.start()
 
-            response = requests.post(
-                API_VALIDAR_ACCESO_URL,
-                json=payload,
-                timeout=10
-            )
+    def respuesta_login(self, status_code, data):
+        """
+        Procesa el resultado de ValidacionAccesoThread: abre la ventana
+        principal o muestra el error correspondiente.
 
-        except requests.exceptions.ConnectionError as e:
-            # Log técnico, pero NO se muestra al usuario
-            logger.error("Error de conexión con el backend", exc_info=True)
+        Args:
+            status_code: Código HTTP de /api/validar-acceso (0 = sin respuesta del servidor)
+            data: JSON de la respuesta (o los datos de la licencia en caché)
+        """
+        email = self.validacion.email
 
-            show_message(
-                self,
+        # ---------------------------
+        # 1) Errores de comunicación con el backend
+        # ---------------------------
+        errores_red = {
+            "SIN_CONEXION": (
                 "Error de conexión",
                 "No se pudo conectar con el servidor de FAT Testing.\n"
-                "Verifique su conexión o inténtelo más tarde.",
-                "error"
-            )
-            self.login_button.setEnabled(True)
-            self.login_button.setText("Sign In")
-            return
-
-        except requests.exceptions.Timeout as e:
-            logger.error("Timeout al conectar con el backend", exc_info=True)
-
-            show_message(
-                self,
+                "Verifique su conexión o inténtelo más tarde."
+            ),
+            "TIMEOUT": (
                 "Servidor sin respuesta",
                 "El servidor de FAT Testing tardó demasiado en responder.\n"
-                "Intente nuevamente en unos minutos.",
-                "error"
-            )
-            self.login_button.setEnabled(True)
-            self.login_button.setText("Sign In")
-            return
-
-        except requests.exceptions.RequestException as e:
-            # Cualquier otro error de requests
-            logger.error("Error HTTP inesperado", exc_info=True)
-
-            show_message(
-                self,
+                "Intente nuevamente en unos minutos."
+            ),
+            "ERROR_HTTP": (
                 "Error inesperado",
                 "Ocurrió un problema al comunicarse con el servidor.\n"
-                "Si el problema persiste, contacte a soporte.",
-                "error"
-            )
+                "Si el problema persiste, contacte a soporte."
+            ),
+        }
+        if status_code == 0:
+            titulo, mensaje = errores_red.get(data.get("motivo"), errores_red["ERROR_HTTP"])
+            show_message(self, titulo, mensaje, "error")
             self.login_button.setEnabled(True)
             self.login_button.setText("Sign In")
             return
@@ -2802,11 +3045,6 @@ class LoginWindow(QMainWindow):
         # ---------------------------
         # 2) Procesar respuesta de la API
         # ---------------------------
-        try:
-            data = response.json()
-        except ValueError:
-            data = {}
-
         permitir_acceso = data.get("permitir_acceso", False)
         motivo = data.get("motivo")
         mensaje = data.get(
@@ -2814,10 +3052,12 @@ class LoginWindow(QMainWindow):
             "No se pudo validar el acceso. Intente nuevamente."
         )
 
-        # CASO ÉXITO: acceso autorizado por la API
-        if response.status_code == 200 and permitir_acceso:
+        # CASO ÉXITO: acceso autorizado por la API (o por la licencia en caché)
+        if status_code == 200 and permitir_acceso:
             nombre_completo = data.get("usuario") or email.split("@")[0]
-            user = DesktopUser(email=email, nombre_completo=nombre_completo)
+            # Sin conexión solo se tiene la licencia, que la API también acepta como token
+            token_api = data.get("token") or data.get("licencia")
+            user = DesktopUser(email=email, nombre_completo=nombre_completo, token_api=token_api)
 
             self.main_window = MainWindow(user)
             self.main_window.show()
@@ -3078,14 +3318,32 @@ class MainWindow(QMainWindow):
         puerto_label = QLabel("Puerto Serial *")
         puerto_label.setFont(QFont("Segoe UI", 9))
         self.puerto_input = QLineEdit()
-        self.puerto_input.setPlaceholderText("Ejemplo: COM3, COM4, /dev/ttyUSB0")
+        self.puerto_input.setPlaceholderText("Ejemplo: COM3 o varios separados por coma: COM3, COM4, telnet://10.0.0.5:2003")
         self.puerto_input.setFixedHeight(36)
         # Accesibilidad
         puerto_label.setBuddy(self.puerto_input)
         self.puerto_input.setAccessibleName("Puerto Serial")
-        self.puerto_input.setAccessibleDescription("Ingrese el puerto serial del dispositivo Cisco (ej: COM3)")
+        self.puerto_input.setAccessibleDescription(
+            "Ingrese el puerto serial del dispositivo Cisco (ej: COM3) o el puerto "
+            "de un servidor de consolas (telnet://host:puerto). Con varios puertos separados por coma se prueban los equipos en paralelo"
+        )
+        # Botón para detectar las consolas conectadas (puerto, baudrate y modelo)
+        self.detectar_button = QPushButton("Detectar")
+        self.detectar_button.setObjectName("detectarButton")
+        self.detectar_button.setFixedHeight(36)
+        self.detectar_button.setCursor(Qt.PointingHandCursor)
+        self.detectar_button.clicked.connect(self.detectar_dispositivos)
+        self.detectar_button.setAccessibleName("Detectar dispositivos")
+        self.detectar_button.setAccessibleDescription(
+            "Busca consolas Cisco en todos los puertos serie y completa puertos, baudrate y modelo"
+        )
+        self.detectar_button.setToolTip("Buscar consolas Cisco conectadas")
+        puerto_fila = QHBoxLayout()
+        puerto_fila.setSpacing(8)
+        puerto_fila.addWidget(self.puerto_input)
+        puerto_fila.addWidget(self.detectar_button)
         puerto_layout.addWidget(puerto_label)
-        puerto_layout.addWidget(self.puerto_input)
+        puerto_layout.addLayout(puerto_fila)
         conexion_layout.addLayout(puerto_layout)
 
         # Baudrate
@@ -3233,12 +3491,36 @@ class MainWindow(QMainWindow):
         output_title.setObjectName("outputTitle")
         output_layout.addWidget(output_title)
 
-        self.output_text = QTextEdit()
+        # Tablero de sesiones: una fila por puerto en prueba
+        self.tabla_sesiones = QTableWidget(0, len(COLUMNAS_SESIONES))
+        self.tabla_sesiones.setObjectName("tablaSesiones")
+        self.tabla_sesiones.setHorizontalHeaderLabels(COLUMNAS_SESIONES)
+        self.tabla_sesiones.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tabla_sesiones.horizontalHeader().setSectionResizeMode(
+            COLUMNAS_SESIONES.index("Último mensaje"), QHeaderView.Stretch
+        )
+        self.tabla_sesiones.verticalHeader().setVisible(False)
+        self.tabla_sesiones.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla_sesiones.setSelectionMode(QAbstractItemView.NoSelection)
+        self.tabla_sesiones.setFont(QFont("Segoe UI", 9))
+        self.tabla_sesiones.setMaximumHeight(220)
+        self.tabla_sesiones.setAccessibleName("Sesiones de prueba")
+        self.tabla_sesiones.setVisible(False)
+        output_layout.addWidget(self.tabla_sesiones)
+
+        self.output_text = QPlainTextEdit()
         self.output_text.setObjectName("outputText")
         self.output_text.setReadOnly(True)
         self.output_text.setMinimumHeight(400)
         self.output_text.setFont(QFont("Cascadia Code", 9))
         output_layout.addWidget(self.output_text)
+        self.registro_actividad = RegistroActividad(self.output_text, al_volcar=self._volcar_ultimos_mensajes)
+        self.ultimos_mensajes = {}  # sesión -> último mensaje pendiente de mostrar en el tablero
+        self.sesiones = {}  # puerto -> TestThread de la última ejecución
+        self.generadores_informe = set()  # GeneradorInformeThread en curso
+        self.subidas_capturas = set()  # SubidaCapturaThread en curso
+        self.deteccion = None  # DeteccionPuertosThread en curso
+        self.baudrates_detectados = {}  # puerto -> baudrate encontrado con "Detectar"
 
         # Botón para guardar logs
         save_button = QPushButton("Guardar Resultados")
@@ -3260,42 +3542,43 @@ class MainWindow(QMainWindow):
         return panel
 
     def log_message(self, message, tipo="info"):
-        """Agrega un mensaje al área de salida con timestamp"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        color_map = {
-            "info": "#e2e8f0",
-            "success": "#10b981",
-            "warning": "#f59e0b",
-            "error": "#ef4444",
-            "command": "#8b5cf6"  # Morado/violeta para mejor visibilidad
-        }
-        color = color_map.get(tipo, "#e2e8f0")
-
-        formatted_message = f'<span style="color: #64748b;">[{timestamp}]</span> <span style="color: {color};">{message}</span><br>'
-        self.output_text.append(formatted_message)
-        self.output_text.moveCursor(QTextCursor.End)
+        """Agrega un mensaje al área de salida con timestamp (se muestra en el próximo volcado)"""
+        self.registro_actividad.agregar(message, tipo)
 
     def iniciar_pruebas(self):
-        """Inicia el proceso de pruebas"""
+        """Inicia el proceso de pruebas (una sesión por puerto ingresado)"""
         # Validar campos obligatorios
-        puerto = self.puerto_input.text().strip()
-        if not puerto:
+        puertos = parsear_puertos(self.puerto_input.text())
+        if not puertos:
             show_message(self, "Campo Requerido", "Debe ingresar el puerto serial", "warning")
             self.puerto_input.setFocus()
             return
 
-        # Validar formato del puerto
-        if not validar_puerto_serial(puerto):
+        # Validar formato de cada puerto
+        for puerto in puertos:
+            if not validar_puerto_serial(puerto):
+                show_message(
+                    self,
+                    "Puerto Inválido",
+                    f"El formato del puerto '{puerto}' no es válido.\n\n"
+                    f"Use formato COM1-99 (Windows), /dev/ttyUSB0-99 (Linux) o, para un\n"
+                    f"servidor de consolas, telnet://host:puerto (socket:// para TCP crudo)\n"
+                    f"Ejemplos: COM3, COM10, /dev/ttyUSB0, telnet://10.0.0.5:2003",
+                    "warning"
+                )
+                self.puerto_input.setFocus()
+                self.puerto_input.selectAll()
+                return
+
+        repetidos = sorted({p for p in puertos if [q.upper() for q in puertos].count(p.upper()) > 1})
+        if repetidos:
             show_message(
                 self,
-                "Puerto Inválido",
-                f"El formato del puerto '{puerto}' no es válido.\n\n"
-                f"Use formato COM1-99 (Windows) o /dev/ttyUSB0-99 (Linux)\n"
-                f"Ejemplos: COM3, COM10, /dev/ttyUSB0",
+                "Puerto Repetido",
+                f"El puerto {', '.join(repetidos)} figura más de una vez.",
                 "warning"
             )
             self.puerto_input.setFocus()
-            self.puerto_input.selectAll()
             return
 
         # Validar baudrate
@@ -3340,14 +3623,14 @@ class MainWindow(QMainWindow):
         # Actualizar descripción accesible para notificar cambio de estado
         self.start_button.setAccessibleDescription("Las pruebas están en ejecución, por favor espere")
 
-        # Limpiar el área de salida
-        self.output_text.clear()
+        # Limpiar el área de salida (y empezar un historial nuevo en disco)
+        self.registro_actividad.reiniciar()
 
         self.log_message("=" * 60, "info")
         self.log_message(f"INICIANDO PRUEBAS - {modelo_dispositivo.upper()}", "success")
         self.log_message("=" * 60, "info")
         self.log_message(f"Modelo: {modelo_dispositivo}", "info")
-        self.log_message(f"Puerto: {puerto}", "info")
+        self.log_message(f"Puerto{'s' if len(puertos) > 1 else ''}: {', '.join(puertos)}", "info")
         self.log_message(f"Baudrate: {baudrate}", "info")
         self.log_message(f"Ventiladores: {num_ventiladores}", "info")
         self.log_message(f"Fuentes de Poder: {num_fuentes}", "info")
@@ -3356,22 +3639,197 @@ class MainWindow(QMainWindow):
         self.log_message(f"Ejecutar Prueba 5: {'Sí' if ejecutar_prueba5 else 'No'}", "info")
         self.log_message("=" * 60, "info")
 
-        # Crear y ejecutar el thread de pruebas
-        self.test_thread = TestThread(
-            puerto, baudrate, password_enable, num_ventiladores,
-            num_fuentes, ejecutar_prueba5, modelo_dispositivo, permitir_desconexion, self
+        # Crear y ejecutar un thread de pruebas por puerto
+        self.sesiones = {}
+        self.resultados_sesiones = {}
+        self.canal_operador = CanalOperador(self)
+        self.tabla_sesiones.setRowCount(len(puertos))
+        self.tabla_sesiones.setVisible(len(puertos) > 1)
+
+        for fila, puerto in enumerate(puertos):
+            sesion = TestThread(
+                puerto, self.baudrates_detectados.get(puerto, baudrate), password_enable, num_ventiladores,
+                num_fuentes, ejecutar_prueba5, modelo_dispositivo, permitir_desconexion, self,
+                canal_operador=self.canal_operador
+            )
+            sesion.fila_tablero = fila
+            sesion.log_signal.connect(self.log_sesion)
+            sesion.etapa_signal.connect(self.actualizar_etapa_sesion)
+            sesion.finished_signal.connect(self.sesion_finalizada)
+            self.sesiones[puerto] = sesion
+
+            for columna, valor in enumerate([puerto, "En ejecución", "Conectando", "", ""]):
+                self.tabla_sesiones.setItem(fila, columna, QTableWidgetItem(valor))
+
+        for sesion in self.sesiones.values():
+            sesion.start()
+
+    def detectar_dispositivos(self):
+        """Busca consolas Cisco en todos los puertos serie libres (en segundo plano)"""
+        if self.deteccion is not None and self.deteccion.isRunning():
+            return
+        # Los puertos de sesiones en curso no se tocan
+        en_uso = [p for p, sesion in self.sesiones.items() if sesion.isRunning()]
+        self.detectar_button.setEnabled(False)
+        self.detectar_button.setText("Buscando...")
+        self.log_message("Buscando consolas Cisco en los puertos serie...", "info")
+        self.deteccion = DeteccionPuertosThread(en_uso)
+        self.deteccion.deteccion_terminada.connect(self.dispositivos_detectados)
+        self.deteccion.start()
+
+    def dispositivos_detectados(self, puertos, dispositivos):
+        """Completa puertos, baudrate y modelo con las consolas encontradas"""
+        self.detectar_button.setEnabled(True)
+        self.detectar_button.setText("Detectar")
+
+        if not dispositivos:
+            self.log_message(f"No se detectaron consolas Cisco ({len(puertos)} puertos revisados)", "warning")
+            show_message(
+                self, "Sin Dispositivos",
+                "No se encontró ninguna consola Cisco respondiendo.\n\n"
+                "Verifique los cables de consola y que los equipos estén encendidos.",
+                "warning"
+            )
+            return
+
+        for dispositivo in dispositivos:
+            self.log_message(f"Detectado: {dispositivo.descripcion()}", "warning" if dispositivo.requiere_credenciales else "success")
+
+        disponibles = [d for d in dispositivos if not d.requiere_credenciales]
+        self.baudrates_detectados = {d.puerto: d.baudrate for d in disponibles}
+        self.puerto_input.setText(", ".join(d.puerto for d in disponibles))
+        if disponibles:
+            baudrates = [d.baudrate for d in disponibles]
+            self.baudrate_input.setText(str(max(set(baudrates), key=baudrates.count)))
+
+        modelos = {d.modelo_catalogo for d in disponibles if d.modelo_catalogo}
+        if len(modelos) == 1:
+            self.dispositivo_combo.setCurrentText(modelos.pop())
+        elif len(modelos) > 1:
+            self.log_message(
+                "Se detectaron modelos distintos; todas las sesiones usan el modelo seleccionado. "
+                "Deje en el campo de puertos solo los equipos de un mismo modelo.",
+                "warning"
+            )
+
+        resumen = "\n".join(d.descripcion() for d in dispositivos)
+        show_message(self, "Dispositivos Detectados", f"Se encontraron {len(dispositivos)} consolas:\n\n{resumen}", "success")
+
+    def _celda_sesion(self, sesion, columna, valor):
+        """Actualiza una celda del tablero para la sesión dada"""
+        self.tabla_sesiones.setItem(sesion.fila_tablero, COLUMNAS_SESIONES.index(columna), QTableWidgetItem(valor))
+
+    def log_sesion(self, message, tipo="info"):
+        """Slot de log de cada sesión: agrega el puerto cuando hay varias en paralelo"""
+        sesion = self.sender()
+        if len(self.sesiones) > 1:
+            # La celda se actualiza junto con el volcado del registro, no por mensaje
+            self.ultimos_mensajes[sesion] = message
+            message = f"[{sesion.puerto}] {message}"
+        self.log_message(message, tipo)
+
+    def _volcar_ultimos_mensajes(self):
+        for sesion, mensaje in self.ultimos_mensajes.items():
+            if sesion in self.sesiones.values():
+                self._celda_sesion(sesion, "Último mensaje", mensaje)
+        self.ultimos_mensajes.clear()
+
+    def actualizar_etapa_sesion(self, etapa):
+        self._celda_sesion(self.sender(), "Etapa", etapa)
+
+    def sesion_finalizada(self, success, archivo_salida=""):
+        """Registra el fin de una sesión; al terminar todas se muestra el resumen"""
+        sesion = self.sender()
+        self.resultados_sesiones[sesion.puerto] = (success, archivo_salida)
+        self._celda_sesion(sesion, "Estado", "Completada" if success else "Con errores")
+        self._celda_sesion(sesion, "Etapa", "Finalizada")
+        self._celda_sesion(sesion, "Archivo", archivo_salida)
+        if success and archivo_salida:
+            self.generar_informe(archivo_salida, sesion.modelo_dispositivo)
+            self.subir_captura(archivo_salida)
+
+        if len(self.resultados_sesiones) < len(self.sesiones):
+            return
+
+        if len(self.sesiones) == 1:
+            self.pruebas_finalizadas(success, archivo_salida)
+            return
+
+        self._restaurar_boton_inicio()
+        exitosas = [p for p, (ok, _) in self.resultados_sesiones.items() if ok]
+        fallidas = [p for p, (ok, _) in self.resultados_sesiones.items() if not ok]
+        self.log_message("=" * 60, "info")
+        self.log_message(
+            f"SESIONES FINALIZADAS: {len(exitosas)} completadas, {len(fallidas)} con errores",
+            "success" if not fallidas else "warning"
+        )
+        for puerto, (ok, archivo) in self.resultados_sesiones.items():
+            self.log_message(f"[{puerto}] {archivo if ok else 'con errores'}", "success" if ok else "error")
+        self.log_message("=" * 60, "info")
+        resumen = "\n".join(
+            f"{puerto}: {archivo if ok else 'con errores'}"
+            for puerto, (ok, archivo) in self.resultados_sesiones.items()
+        )
+        show_message(
+            self,
+            "Pruebas Completadas" if not fallidas else "Pruebas con Errores",
+            f"Finalizaron {len(self.sesiones)} sesiones.\n\n{resumen}",
+            "success" if not fallidas else "warning"
+        )
+
+    def generar_informe(self, archivo_txt, modelo_dispositivo):
+        """Lanza la generación local del informe .docx de una transcripción terminada"""
+        if not GENERAR_INFORME_LOCAL:
+            return
+        if generar_informe_desde_archivo is None:
+            self.log_message("Informe Word no disponible (faltan python-docx / Pillow); súbalo desde la web", "warning")
+            return
+        generador = GeneradorInformeThread(archivo_txt, modelo_dispositivo)
+        generador.informe_generado.connect(self.informe_generado)
+        generador.informe_fallido.connect(self.informe_fallido)
+        generador.finished.connect(lambda: self.generadores_informe.discard(generador))
+        self.generadores_informe.add(generador)
+        self.log_message(f"Generando informe Word de {archivo_txt}...", "info")
+        generador.start()
+
+    def informe_generado(self, archivo_txt, ruta_docx):
+        self.log_message(f"Informe generado: {ruta_docx}", "success")
+
+    def informe_fallido(self, archivo_txt, mensaje):
+        self.log_message(f"No se pudo generar el informe de {archivo_txt}: {mensaje}", "error")
+
+    def subir_captura(self, archivo_txt):
+        """Sube la transcripción terminada al servidor en segundo plano"""
+        if not SUBIR_CAPTURAS_AL_SERVIDOR or not self.user.token_api:
+            return
+        subida = SubidaCapturaThread(archivo_txt, self.user.token_api)
+        subida.subida_completada.connect(self.captura_subida)
+        subida.subida_fallida.connect(self.captura_no_subida)
+        subida.finished.connect(lambda: self.subidas_capturas.discard(subida))
+        self.subidas_capturas.add(subida)
+        subida.start()
+
+    def captura_subida(self, archivo_txt, resumen):
+        self.log_message(
+            f"Captura subida al servidor: {archivo_txt} ({resumen['bloques_enviados']} de "
+            f"{resumen['bloques']} bloques, {resumen['bytes_enviados'] / 1024:.0f} KB enviados "
+            f"de {resumen['tamano'] / 1024:.0f} KB)",
+            "success"
         )
-        self.test_thread.log_signal.connect(self.log_message)
-        self.test_thread.finished_signal.connect(self.pruebas_finalizadas)
-        self.test_thread.start()
 
-    def pruebas_finalizadas(self, success, archivo_salida=""):
-        """Callback cuando las pruebas finalizan"""
+    def captura_no_subida(self, archivo_txt, mensaje):
+        self.log_message(f"No se pudo subir {archivo_txt} al servidor: {mensaje}", "warning")
+
+    def _restaurar_boton_inicio(self):
         self.start_button.setEnabled(True)
         self.start_button.setText("Iniciar Pruebas")
         # Restaurar descripción accesible
         self.start_button.setAccessibleDescription("Inicia la ejecución de las pruebas en el dispositivo Cisco")
 
+    def pruebas_finalizadas(self, success, archivo_salida=""):
+        """Callback cuando las pruebas finalizan"""
+        self._restaurar_boton_inicio()
+
         if success:
             self.log_message("=" * 60, "info")
             self.log_message("PRUEBAS COMPLETADAS EXITOSAMENTE", "success")
@@ -3386,7 +3844,7 @@ class MainWindow(QMainWindow):
 
     def guardar_resultados(self):
         """Guarda el contenido del área de salida en un archivo"""
-        if not self.output_text.toPlainText().strip():
+        if self.registro_actividad.vacio():
             show_message(self, "Sin Contenido", "No hay contenido para guardar", "warning")
             return
 
@@ -3400,8 +3858,7 @@ class MainWindow(QMainWindow):
 
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.output_text.toPlainText())
+                self.registro_actividad.guardar_como(file_path)
                 show_message(self, "Guardado Exitoso", f"Registro guardado en:\n{file_path}", "success")
             except Exception as e:
                 show_message(self, "Error al Guardar", f"No se pudo guardar el archivo:\n{str(e)}", "error")
@@ -3704,6 +4161,24 @@ class MainWindow(QMainWindow):
                 background-color: #047857;
             }
 
+            QPushButton#detectarButton {
+                background-color: #ffffff;
+                color: #1e40af;
+                border: 1px solid #1e40af;
+                border-radius: 8px;
+                padding: 0 16px;
+                font-weight: 500;
+            }
+
+            QPushButton#detectarButton:hover {
+                background-color: #eff6ff;
+            }
+
+            QPushButton#detectarButton:disabled {
+                color: #94a3b8;
+                border-color: #cbd5e1;
+            }
+
             /* ========== OUTPUT CARD ========== */
             QFrame#outputCard {
                 background-color: #ffffff;
@@ -3715,7 +4190,7 @@ class MainWindow(QMainWindow):
                 color: #0f172a;
             }
 
-            QTextEdit#outputText {
+            QPlainTextEdit#outputText {
                 border: 1px solid #cbd5e1;
                 border-radius: 6px;
                 background-color: #0f172a;
@@ -3723,6 +4198,14 @@ class MainWindow(QMainWindow):
                 padding: 12px;
                 selection-background-color: #1a56db;
             }
+
+            QTableWidget#tablaSesiones {
+                border: 1px solid #cbd5e1;
+                border-radius: 6px;
+                background-color: #ffffff;
+                color: #1e293b;
+                gridline-color: #e2e8f0;
+            }
         """)
 
 
@@ -0,0 +1,313 @@
+"""
+Benchmark del flujo completo de pruebas (TestThread) contra el simulador de consola.
+
+Corre las pruebas 1 a 5 de appLocal sobre un SimuladorConsola, sin switch ni
+operador: los popups se responden solos y, al pedir desconectar o reconectar
+una fuente o un ventilador, el operador simulado lo hace en el equipo
+simulado. Al final informa el tiempo de cada prueba y de cada comando.
+
+Uso (desde la raíz del proyecto, en Linux/macOS con PySide6 instalado):
+    python exe/benchmark_consola.py
+    python exe/benchmark_consola.py --modelo "Cisco Catalyst 9300" --repeticiones 3 --baudios 9600
+    python exe/benchmark_consola.py --latencia 0.05 --jitter 0.05 --json resultados.json
+    python exe/benchmark_consola.py --transporte telnet   (consola detrás de un servidor de consolas; o tcp)
+
+El historial de tiempos, el registro de corridas y las transcripciones se
+guardan en un directorio temporal (o en --salida), de modo que el benchmark no
+modifica los timeouts aprendidos de las corridas reales.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from simulador_consola import PERFILES, ServidorConsolaTCP, ServidorConsolaTelnet, SimuladorConsola
+
+# Funciones de la sesión de consola que envían un comando al equipo; se mide la llamada más externa
+FUNCIONES_COMANDO = (
+    "enviar_comando",
+    "ejecutar_comando_completo",
+    "ejecutar_comando_completo_con_prompt",
+    "ejecutar_comandos_en_lote",
+    "ejecutar_comando_sin_verificacion",
+    "ejecutar_comando_completo_sin_verificacion",
+    "entrar_modo_enable_sin_verificacion",
+)
+
+# Servidor de consolas simulado por transporte (pty: el simulador directo)
+SERVIDORES_CONSOLA = {"tcp": ServidorConsolaTCP, "telnet": ServidorConsolaTelnet}
+
+# Título de los popups de ejecutar_prueba_repetitiva: "⚠️ Desconectar Fuente de poder 2"
+PATRON_POPUP_COMPONENTE = re.compile(r"(Desconectar|Reconectar)\s+(Fuente|Ventilador)\D*(\d+)", re.IGNORECASE)
+
+
+def preparar_entorno(directorio: Path):
+    """
+    Importa appLocal con HOME apuntando a `directorio`.
+
+    Path.home() se evalúa al importar el módulo (historial de tiempos,
+    corridas pendientes), por eso el entorno se ajusta antes del import.
+    """
+    directorio.mkdir(parents=True, exist_ok=True)
+    os.environ["HOME"] = str(directorio)
+    os.environ["USERPROFILE"] = str(directorio)
+    os.chdir(directorio)
+
+    from PySide6.QtCore import QCoreApplication
+    QCoreApplication.instance() or QCoreApplication([])
+
+    import appLocal
+
+    # El log DEBUG por consola tapa el informe y suma tiempo a cada lectura
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setLevel(logging.WARNING)
+    return appLocal
+
+
+class Cronometro:
+    """Acumula la duración de cada prueba y de cada comando enviado"""
+
+    def __init__(self):
+        self.prueba_actual = None
+        self.inicio_prueba = None
+        self.pruebas = defaultdict(list)  # número de prueba -> [segundos]
+        self.comandos = defaultdict(list)  # (prueba, comando) -> [segundos]
+        self._profundidad = 0
+
+    def instrumentar(self, *modulos) -> None:
+        """Envuelve las funciones de envío de comandos en cada módulo que las usa"""
+        for modulo in modulos:
+            for nombre in FUNCIONES_COMANDO:
+                if hasattr(modulo, nombre):
+                    setattr(modulo, nombre, self._medir(getattr(modulo, nombre)))
+
+    def _medir(self, funcion):
+        def medida(*args, **kwargs):
+            self._profundidad += 1
+            inicio = time.monotonic()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                self._profundidad -= 1
+                if self._profundidad == 0:
+                    # No se guardan contraseñas en el informe
+                    if funcion.__name__ == "entrar_modo_enable_sin_verificacion":
+                        etiqueta = "enable"
+                    elif kwargs.get("registrar_tiempo") is False:
+                        etiqueta = "<password>"
+                    elif funcion.__name__ == "ejecutar_comandos_en_lote":
+                        etiqueta = "lote: " + " + ".join(comando for comando, _ in args[1])
+                    else:
+                        etiqueta = args[1] if len(args) > 1 else kwargs.get("comando")
+                    self.comandos[(self.prueba_actual, etiqueta)].append(time.monotonic() - inicio)
+        medida.__name__ = funcion.__name__
+        return medida
+
+    def nueva_corrida(self) -> None:
+        """Los comandos previos a la prueba 1 no se atribuyen a una prueba que quedó abierta"""
+        self.prueba_actual = None
+        self.inicio_prueba = None
+
+    def iniciar_prueba(self, numero: int) -> None:
+        self.prueba_actual = numero
+        self.inicio_prueba = time.monotonic()
+
+    def terminar_prueba(self, numero: int) -> None:
+        if self.inicio_prueba is not None:
+            self.pruebas[numero].append(time.monotonic() - self.inicio_prueba)
+        self.prueba_actual = None
+        self.inicio_prueba = None
+
+
+class OperadorSimulado:
+    """
+    Reemplaza a CanalOperador: responde cada popup en el acto y aplica en el
+    simulador las desconexiones y reconexiones que se le piden al operador.
+    """
+
+    def __init__(self, simulador: SimuladorConsola):
+        self.simulador = simulador
+        self.popups = 0
+
+    def encolar(self, solicitud) -> None:
+        self.popups += 1
+        coincidencia = PATRON_POPUP_COMPONENTE.search(solicitud.titulo)
+        if coincidencia:
+            accion, componente, numero = coincidencia.groups()
+            tipo = "fuente" if componente.lower() == "fuente" else "ventilador"
+            if accion.lower() == "desconectar":
+                self.simulador.desconectar_componente(tipo, int(numero))
+            else:
+                self.simulador.reconectar_componente(tipo, int(numero))
+        # Preguntas (ej: reanudar una corrida) se responden No: cada repetición empieza de cero
+        solicitud.resolver(False if solicitud.pregunta else True)
+
+    def retirar(self, solicitud) -> None:
+        pass
+
+
+def crear_sesion(appLocal, simulador: SimuladorConsola, destino: str, cronometro: Cronometro, args):
+    """Arma un TestThread con el operador simulado y los marcadores de prueba cronometrados"""
+
+    class SesionBenchmark(appLocal.TestThread):
+        def escribir_inicio_prueba(self, numero_prueba, descripcion):
+            cronometro.iniciar_prueba(numero_prueba)
+            super().escribir_inicio_prueba(numero_prueba, descripcion)
+
+        def escribir_fin_prueba(self, numero_prueba):
+            super().escribir_fin_prueba(numero_prueba)
+            cronometro.terminar_prueba(numero_prueba)
+
+        def log(self, mensaje, tipo="info"):
+            if args.verboso or tipo in ("error", "warning"):
+                print(f"    [{tipo}] {mensaje}")
+
+    perfil = simulador.perfil
+    sesion = SesionBenchmark(
+        destino, args.baudios_puerto, simulador.password or "",
+        perfil["ventiladores"], perfil["fuentes"], True,
+        args.modelo, True, None, canal_operador=OperadorSimulado(simulador),
+    )
+    resultado = {}
+    sesion.finished_signal.connect(lambda exito, archivo: resultado.update(exito=exito, archivo=archivo))
+    return sesion, resultado
+
+
+def resumir(muestras):
+    ordenadas = sorted(muestras)
+    p95 = ordenadas[min(len(ordenadas) - 1, int(round(0.95 * (len(ordenadas) - 1))))]
+    return {
+        "n": len(muestras),
+        "total_s": round(sum(muestras), 3),
+        "mediana_s": round(statistics.median(muestras), 3),
+        "p95_s": round(p95, 3),
+        "max_s": round(max(muestras), 3),
+    }
+
+
+def imprimir_informe(informe: dict) -> None:
+    print("\nTiempo por prueba (s)")
+    print(f"  {'prueba':<8}{'n':>4}{'mediana':>10}{'p95':>10}{'max':>10}")
+    for prueba, datos in informe["pruebas"].items():
+        print(f"  {prueba:<8}{datos['n']:>4}{datos['mediana_s']:>10.3f}{datos['p95_s']:>10.3f}{datos['max_s']:>10.3f}")
+
+    print("\nTiempo por comando (s)")
+    print(f"  {'prueba':<8}{'comando':<44}{'n':>4}{'mediana':>10}{'p95':>10}{'total':>10}")
+    for fila in informe["comandos"]:
+        print(f"  {str(fila['prueba'] or '-'):<8}{fila['comando'][:43]:<44}{fila['n']:>4}"
+              f"{fila['mediana_s']:>10.3f}{fila['p95_s']:>10.3f}{fila['total_s']:>10.3f}")
+
+    print("\nCorridas")
+    for numero, corrida in enumerate(informe["corridas"], start=1):
+        estado = "OK" if corrida["exito"] else "FALLÓ"
+        print(f"  #{numero}: {corrida['duracion_s']:.1f} s  {estado}  {corrida['archivo']}")
+
+
+def main(argv=None):
+    modelos = [f"Cisco Catalyst {clave}" for clave in sorted(PERFILES)]
+    parser = argparse.ArgumentParser(description="Benchmark de TestThread contra el simulador de consola.")
+    parser.add_argument("--modelo", default=modelos[0], choices=modelos)
+    parser.add_argument("--repeticiones", type=int, default=1, help="Corridas completas a medir")
+    parser.add_argument("--baudios", type=int, default=None,
+                        help="Velocidad de línea simulada (sin valor = sin límite)")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos antes de cada respuesta")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Segundos aleatorios extra por respuesta")
+    parser.add_argument("--retardo", type=float, default=0.0, help="Demora de la línea en cada sentido (segundos)")
+    parser.add_argument("--escala-arranque", type=float, default=0.05,
+                        help="Factor de los tiempos de arranque del reload (1 = tiempos reales)")
+    parser.add_argument("--corte-tras", type=int, default=None,
+                        help="Cortar la línea tras N comandos en cada corrida")
+    parser.add_argument("--duracion-corte", type=float, default=5.0, help="Segundos que dura el corte")
+    parser.add_argument("--sin-lote", action="store_true",
+                        help="Ejecutar los comandos de cada prueba de a uno (sin envío en lote)")
+    parser.add_argument("--transporte", choices=("pty", "tcp", "telnet"), default="pty",
+                        help="Cómo llegar a la consola simulada: pty directo, o TCP crudo / telnet "
+                             "como detrás de un servidor de consolas")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla del jitter")
+    parser.add_argument("--salida", type=Path, default=None,
+                        help="Directorio para transcripciones e historial (por defecto, uno temporal)")
+    parser.add_argument("--json", type=Path, default=None, help="Guardar el informe en este archivo")
+    parser.add_argument("--verboso", action="store_true", help="Mostrar todo el log de las sesiones")
+    args = parser.parse_args(argv)
+
+    if args.json is not None:
+        args.json = args.json.resolve()
+    directorio = (args.salida or Path(tempfile.mkdtemp(prefix="benchmark_consola_"))).resolve()
+    appLocal = preparar_entorno(directorio)
+    args.baudios_puerto = args.baudios or 115200
+    from consola import sesion as sesion_consola
+    if args.sin_lote:
+        sesion_consola.EJECUTAR_EN_LOTE = False
+
+    cronometro = Cronometro()
+    # TestThread usa los nombres importados en appLocal; las funciones de consola.sesion se llaman entre sí
+    cronometro.instrumentar(appLocal, sesion_consola)
+    corridas = []
+
+    for repeticion in range(1, args.repeticiones + 1):
+        print(f"Corrida {repeticion}/{args.repeticiones}: {args.modelo}")
+        simulador = SimuladorConsola(
+            modelo=args.modelo, baudios=args.baudios, latencia=args.latencia, jitter=args.jitter,
+            retardo=args.retardo,
+            escala_arranque=args.escala_arranque, semilla=args.semilla,
+        )
+        with simulador:
+            if args.corte_tras is not None:
+                simulador.programar_corte(args.corte_tras, args.duracion_corte)
+            servidor = SERVIDORES_CONSOLA.get(args.transporte)
+            servidor = servidor(simulador) if servidor else None
+            destino = servidor.iniciar() if servidor else simulador.ruta
+            sesion, resultado = crear_sesion(appLocal, simulador, destino, cronometro, args)
+            cronometro.nueva_corrida()
+            inicio = time.monotonic()
+            try:
+                # Se ejecuta en este hilo: las señales llegan directo al operador simulado
+                sesion.run()
+            finally:
+                if servidor is not None:
+                    servidor.detener()
+            corridas.append({
+                "duracion_s": round(time.monotonic() - inicio, 3),
+                "exito": resultado.get("exito", False),
+                "archivo": resultado.get("archivo", ""),
+                "comandos_simulador": simulador.comandos_ejecutados,
+            })
+
+    informe = {
+        "modelo": args.modelo,
+        "parametros": {
+            "baudios": args.baudios, "latencia": args.latencia, "jitter": args.jitter,
+            "retardo": args.retardo,
+            "escala_arranque": args.escala_arranque, "corte_tras": args.corte_tras,
+            "duracion_corte": args.duracion_corte, "en_lote": not args.sin_lote,
+            "transporte": args.transporte,
+        },
+        "directorio": str(directorio),
+        "corridas": corridas,
+        "pruebas": {str(prueba): resumir(muestras) for prueba, muestras in sorted(cronometro.pruebas.items())},
+        "comandos": [
+            {"prueba": prueba, "comando": comando, **resumir(muestras)}
+            for (prueba, comando), muestras in sorted(
+                cronometro.comandos.items(), key=lambda item: (item[0][0] or 0, item[0][1] or "")
+            )
+        ],
+    }
+    imprimir_informe(informe)
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(informe, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nInforme guardado en {args.json}")
+    return 0 if all(corrida["exito"] for corrida in corridas) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
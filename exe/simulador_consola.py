@@ -0,0 +1,1055 @@
+"""
+Simulador de consola Cisco Catalyst sobre un pseudo-terminal (solo Linux/macOS).
+
+Expone un pty que se comporta como la consola serial de un 9200, 9300 o 9500:
+prompt de usuario y privilegiado, contraseña de enable, salida paginada con
+--More-- (hasta "terminal length 0"), confirmación del reload, banners de
+arranque por etapas y mensajes de syslog al desconectar fuentes o
+ventiladores. Sirve para medir y probar el camino serial de appLocal sin un
+switch físico.
+
+Uso (desde la raíz del proyecto):
+    python exe/simulador_consola.py --modelo 9300
+    python exe/simulador_consola.py --modelo 9200 --baudios 9600 --latencia 0.05 --jitter 0.02
+    python exe/simulador_consola.py --modelo 9300 --retardo 0.1
+    python exe/simulador_consola.py --modelo 9500 --escala-arranque 0.05 --corte-tras 20 --duracion-corte 5
+
+El simulador imprime la ruta del pty (ej: /dev/pts/7), que se usa como puerto
+en la aplicación o en benchmark_consola.py. Con --tcp la misma consola se
+publica además como el puerto de un servidor de consolas:
+    python exe/simulador_consola.py --modelo 9300 --tcp 7001
+    (puerto en la aplicación: socket://127.0.0.1:7001)
+o, con --telnet, como su puerto telnet (negociación de opciones y break):
+    python exe/simulador_consola.py --modelo 9300 --tcp 7001 --telnet
+    (puerto en la aplicación: telnet://127.0.0.1:7001)
+"""
+
+import argparse
+import os
+import queue
+import random
+import re
+import select
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+# Bits por byte en la línea (8N1: start + 8 datos + stop)
+BITS_POR_BYTE = 10
+
+# Bytes que se escriben de una vez al limitar la velocidad de línea
+BLOQUE_ESCRITURA = 64
+
+# Líneas por página hasta que se ejecuta "terminal length 0" (valor de fábrica de IOS)
+LINEAS_PAGINA_DEFECTO = 24
+
+MARCA_MORE = " --More-- "
+BORRADO_MORE = "\b" * 9 + " " * 9 + "\b" * 9
+
+# Tiempo máximo sin tecla en un --More-- antes de dar la salida por abortada
+TIMEOUT_TECLA_MORE = 60
+
+# Intervalo con que el bucle revisa syslog pendientes y la orden de detenerse
+INTERVALO_BUCLE = 0.1
+
+MENSAJE_COMANDO_INVALIDO = "                ^\r\n% Invalid input detected at '^' marker.\r\n\r\n"
+MENSAJE_COMANDO_INCOMPLETO = "% Incomplete command.\r\n\r\n"
+
+# Telnet (RFC 854), para ServidorConsolaTelnet
+TELNET_IAC, TELNET_DONT, TELNET_DO, TELNET_WONT, TELNET_WILL = 255, 254, 253, 252, 251
+TELNET_SB, TELNET_BRK, TELNET_SE = 250, 243, 240
+TELNET_ECO, TELNET_SGA = 1, 3
+
+
+# =============================================================================
+# PERFILES DE MODELO
+# =============================================================================
+# "arranque": etapas del boot en orden, (segundos hasta mostrar el texto, texto),
+# con tiempos cercanos a un equipo real. "fuentes" y "ventiladores" son los
+# componentes instalados que el operador puede desconectar durante las pruebas.
+
+PERFILES: Dict[str, dict] = {
+    "9200": {
+        "modelo": "C9200L-24P-4G",
+        "serial": "JAE12345678",
+        "imagen": "CAT9K_LITE_IOSXE",
+        "version": "17.09.04a",
+        "puertos": ["GigabitEthernet1/0/{}".format(i) for i in range(1, 25)],
+        "pid_fuente": "PWR-C5-600WAC",
+        "fuentes": 2,
+        "ventiladores": 3,
+        "entorno": ("power", "fan"),
+        "arranque": [
+            (3, "Chassis 1 reloading, reason - Reload command\r\n"),
+            (12, "\r\nInitializing Hardware ...\r\n\r\nSystem Bootstrap, Version 17.6.1r, RELEASE SOFTWARE (P)\r\n"
+                 "Copyright (c) 1994-2021  by cisco Systems, Inc.\r\n\r\nCurrent image running: Boot ROM0\r\n"
+                 "Last reset cause: SoftwareReload\r\nC9200L-24P-4G platform with 2097152 Kbytes of main memory\r\n"),
+            (45, "\r\nboot: attempting to boot from [flash:packages.conf]\r\nboot: reading file packages.conf\r\n"
+                 "#########################################################################\r\n"),
+            (95, "\r\n\r\n              Restricted Rights Legend\r\n\r\nCisco IOS XE Software, Version 17.09.04a\r\n"
+                 "Cisco IOS Software [Cupertino], Catalyst L3 Switch Software (CAT9K_LITE_IOSXE), "
+                 "Version 17.9.4a, RELEASE SOFTWARE (fc3)\r\n"),
+            (40, "\r\n%SYS-5-RESTART: System restarted --\r\n\r\n\r\nPress RETURN to get started!\r\n"),
+        ],
+    },
+    "9300": {
+        "modelo": "C9300-48P",
+        "serial": "FOC2301X0AB",
+        "imagen": "CAT9K_IOSXE",
+        "version": "17.09.04a",
+        "puertos": ["GigabitEthernet1/0/{}".format(i) for i in range(1, 49)],
+        "pid_fuente": "PWR-C1-715WAC",
+        "fuentes": 2,
+        "ventiladores": 3,
+        "entorno": ("power", "fan"),
+        "arranque": [
+            (3, "Chassis 1 reloading, reason - Reload command\r\n"),
+            (15, "\r\nInitializing Hardware ...\r\n\r\nSystem Bootstrap, Version 17.9.1r, RELEASE SOFTWARE (P)\r\n"
+                 "Copyright (c) 1994-2022  by cisco Systems, Inc.\r\n\r\nCurrent image running: Boot ROM1\r\n"
+                 "Last reset cause: SoftwareReload\r\nC9300-48P platform with 8388608 Kbytes of main memory\r\n"),
+            (60, "\r\nboot: attempting to boot from [flash:packages.conf]\r\nboot: reading file packages.conf\r\n"
+                 "#########################################################################\r\n"),
+            (120, "\r\n\r\n              Restricted Rights Legend\r\n\r\nCisco IOS XE Software, Version 17.09.04a\r\n"
+                  "Cisco IOS Software [Cupertino], Catalyst L3 Switch Software (CAT9K_IOSXE), "
+                  "Version 17.9.4a, RELEASE SOFTWARE (fc3)\r\n"),
+            (50, "\r\n%SYS-5-RESTART: System restarted --\r\n\r\n\r\nPress RETURN to get started!\r\n"),
+        ],
+    },
+    "9500": {
+        "modelo": "C9500-48Y4C",
+        "serial": "FDO2345Z0AB",
+        "imagen": "CAT9K_IOSXE",
+        "version": "17.09.04a",
+        "puertos": (["TwentyFiveGigE1/0/{}".format(i) for i in range(1, 49)] +
+                    ["HundredGigE1/0/{}".format(i) for i in range(49, 53)]),
+        "pid_fuente": "C9K-PWR-1600WAC-R",
+        "fuentes": 2,
+        "ventiladores": 4,
+        "entorno": ("status",),
+        "arranque": [
+            (3, "Chassis 1 reloading, reason - Reload command\r\n"),
+            (20, "\r\nInitializing Hardware ...\r\n\r\nSystem Bootstrap, Version 17.9.1r, RELEASE SOFTWARE (P)\r\n"
+                 "Copyright (c) 1994-2022  by cisco Systems, Inc.\r\n\r\nCurrent image running: Boot ROM0\r\n"
+                 "Last reset cause: SoftwareReload\r\nC9500-48Y4C platform with 16777216 Kbytes of main memory\r\n"),
+            (75, "\r\nboot: attempting to boot from [bootflash:packages.conf]\r\nboot: reading file packages.conf\r\n"
+                 "#########################################################################\r\n"),
+            (150, "\r\n\r\n              Restricted Rights Legend\r\n\r\nCisco IOS XE Software, Version 17.09.04a\r\n"
+                  "Cisco IOS Software [Cupertino], Catalyst L3 Switch Software (CAT9K_IOSXE), "
+                  "Version 17.9.4a, RELEASE SOFTWARE (fc3)\r\n"),
+            (60, "\r\n%SYS-5-RESTART: System restarted --\r\n\r\n\r\nPress RETURN to get started!\r\n"),
+        ],
+    },
+}
+
+
+def perfil_para(modelo: str) -> dict:
+    """
+    Devuelve el perfil de un modelo.
+
+    Args:
+        modelo: "9200", "9300", "9500" o el nombre de la aplicación ("Cisco Catalyst 9300")
+
+    Raises:
+        ValueError: Si el modelo no tiene perfil
+    """
+    clave = modelo.split()[-1] if modelo else ""
+    if clave not in PERFILES:
+        raise ValueError(f"Modelo sin perfil de simulación: {modelo!r}. Opciones: {sorted(PERFILES)}")
+    return PERFILES[clave]
+
+
+# =============================================================================
+# SIMULADOR
+# =============================================================================
+
+class SimuladorConsola:
+    """
+    Switch Cisco simulado detrás de un pty.
+
+    Un hilo atiende el lado maestro del pty: hace eco de lo que se escribe,
+    ejecuta cada línea y responde respetando la velocidad de línea (si se
+    indica baudios), la latencia y el jitter configurados. Los métodos de
+    componentes y cortes se pueden llamar desde otro hilo (ej: el operador
+    simulado del benchmark).
+
+    Args:
+        modelo: Modelo a simular (ver perfil_para)
+        password: Contraseña de enable (None = enable sin contraseña)
+        baudios: Velocidad de línea simulada (None = sin límite)
+        latencia: Segundos antes de empezar a responder cada comando
+        jitter: Segundos extra aleatorios (0..jitter) sumados a la latencia
+        retardo: Demora de la línea en cada sentido (adaptador USB, servidor de
+            consolas); a diferencia de la latencia, no frena al equipo mientras
+            procesa comandos que ya recibió
+        escala_arranque: Factor aplicado a los tiempos de arranque del perfil
+        hostname: Nombre que aparece en el prompt
+        configuracion_modificada: Si es True, el reload pregunta si se guarda la configuración
+        semilla: Semilla del jitter, para corridas reproducibles
+    """
+
+    def __init__(self, modelo: str = "9200", password: Optional[str] = "cisco",
+                 baudios: Optional[int] = None, latencia: float = 0.0, jitter: float = 0.0,
+                 retardo: float = 0.0, escala_arranque: float = 1.0, hostname: str = "Switch",
+                 configuracion_modificada: bool = False, semilla: Optional[int] = None):
+        self.perfil = perfil_para(modelo)
+        self.password = password
+        self.baudios = baudios
+        self.latencia = latencia
+        self.jitter = jitter
+        self.retardo = retardo
+        self.escala_arranque = escala_arranque
+        self.hostname = hostname
+        self.configuracion_modificada = configuracion_modificada
+        self._azar = random.Random(semilla)
+
+        self.modo = ">"
+        self.lineas_pagina = LINEAS_PAGINA_DEFECTO
+        self.inicio_arranque = time.monotonic()
+        self.fuentes_desconectadas = set()
+        self.ventiladores_desconectados = set()
+        self.comandos_ejecutados = 0
+        self.breaks_recibidos = 0
+
+        self._maestro = None
+        self._esclavo = None
+        self._ruta = None
+        self._hilo = None
+        self._detener = threading.Event()
+        self._linea = bytearray()
+        self._ultimo_cr = False
+        self._entrada = deque()  # bytes recibidos que todavía no se procesaron
+        self._en_transito = deque()  # (instante de llegada, bytes) demorados por el retardo
+        self._salida = queue.Queue()  # (instante de entrega, bytes) con retardo
+        self._hilo_salida = None
+        self._syslog = deque()  # mensajes asíncronos pendientes de mostrar
+        self._cortado_hasta = 0.0
+        self._cortes = []  # (tras_comandos, duracion) programados
+
+    # -------------------------------------------------------------------------
+    # Ciclo de vida
+    # -------------------------------------------------------------------------
+    def iniciar(self) -> str:
+        """
+        Abre el pty y arranca el hilo del dispositivo.
+
+        Returns:
+            Ruta del lado esclavo del pty (el "puerto serial" a abrir)
+
+        Raises:
+            OSError: Si la plataforma no tiene pseudo-terminales (Windows)
+        """
+        if os.name != "posix":
+            raise OSError("El simulador de consola necesita pseudo-terminales (Linux/macOS)")
+        import tty
+
+        self._maestro, self._esclavo = os.openpty()
+        tty.setraw(self._maestro)
+        tty.setraw(self._esclavo)
+        self._ruta = os.ttyname(self._esclavo)
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name=f"simulador-{self._ruta}", daemon=True)
+        self._hilo.start()
+        if self.retardo:
+            self._hilo_salida = threading.Thread(target=self._entregar_salida, daemon=True)
+            self._hilo_salida.start()
+        return self._ruta
+
+    @property
+    def ruta(self) -> Optional[str]:
+        return self._ruta
+
+    def detener(self) -> None:
+        """Detiene el hilo y cierra el pty"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=2)
+        if self._hilo_salida is not None:
+            self._salida.put((0.0, None))
+            self._hilo_salida.join(timeout=2)
+        for fd in (self._maestro, self._esclavo):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._maestro = self._esclavo = self._hilo = self._hilo_salida = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *_):
+        self.detener()
+
+    # -------------------------------------------------------------------------
+    # Acciones del operador e inyección de fallas
+    # -------------------------------------------------------------------------
+    def desconectar_componente(self, tipo: str, numero: int) -> None:
+        """
+        Simula que el operador retira una fuente o un ventilador.
+
+        Args:
+            tipo: "fuente" o "ventilador"
+            numero: Número del componente, desde 1
+        """
+        if tipo == "fuente":
+            self.fuentes_desconectadas.add(numero)
+            slot = self._slot_fuente(numero)
+            self._syslog.append(f"%PLATFORM_PM-6-FRULINK_REMOVED: FRU power supply {slot} removed")
+            self._syslog.append(f"%PLATFORM_PM-3-PS_FAIL: signal on power supply {slot} is faulty")
+        else:
+            self.ventiladores_desconectados.add(numero)
+            self._syslog.append(f"%PLATFORM_FAN-3-FAN_REMOVED: System fan {numero} faulty or removed")
+
+    def reconectar_componente(self, tipo: str, numero: int) -> None:
+        """Simula que el operador vuelve a conectar una fuente o un ventilador"""
+        if tipo == "fuente":
+            self.fuentes_desconectadas.discard(numero)
+            slot = self._slot_fuente(numero)
+            self._syslog.append(f"%PLATFORM_PM-6-FRULINK_INSERTED: FRU power supply {slot} inserted")
+            self._syslog.append(f"%PLATFORM_PM-6-PS_OK: signal on power supply {slot} is restored")
+        else:
+            self.ventiladores_desconectados.discard(numero)
+            self._syslog.append(f"%PLATFORM_FAN-6-FAN_OK: System fan {numero} inserted")
+
+    def cortar(self, duracion: float) -> None:
+        """Simula un cable suelto: durante `duracion` segundos no se lee ni se responde nada"""
+        self._cortado_hasta = time.monotonic() + duracion
+
+    @property
+    def cortado(self) -> bool:
+        return time.monotonic() < self._cortado_hasta
+
+    def recibir_break(self) -> None:
+        """Break en la línea (ej: IAC BRK del servidor telnet); el simulador solo lo cuenta"""
+        self.breaks_recibidos += 1
+
+    def programar_corte(self, tras_comandos: int, duracion: float) -> None:
+        """Corta la línea `duracion` segundos después de ejecutar `tras_comandos` comandos más"""
+        self._cortes.append((self.comandos_ejecutados + tras_comandos, duracion))
+
+    # -------------------------------------------------------------------------
+    # E/S de bajo nivel
+    # -------------------------------------------------------------------------
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            if not self._recibir(INTERVALO_BUCLE):
+                return
+            while self._entrada and not self._detener.is_set():
+                self._procesar_byte(self._entrada.popleft())
+            if not self._linea:
+                self._volcar_syslog()
+
+    def _recibir(self, espera: float) -> bool:
+        """
+        Pasa a la entrada del dispositivo lo recibido (tras el retardo de la
+        línea). Devuelve False si el pty se cerró.
+        """
+        if self._en_transito:
+            espera = min(espera, max(0.0, self._en_transito[0][0] - time.monotonic()))
+        datos = self._leer(espera)
+        if datos is None:
+            return False
+        if datos and not self.cortado:
+            self._en_transito.append((time.monotonic() + self.retardo, datos))
+        while self._en_transito and self._en_transito[0][0] <= time.monotonic():
+            self._entrada.extend(self._en_transito.popleft()[1])
+        return True
+
+    def _leer(self, espera: float) -> Optional[bytes]:
+        """Bytes disponibles del lado maestro (b"" si no llegó nada, None si el pty se cerró)"""
+        try:
+            legible, _, _ = select.select([self._maestro], [], [], espera)
+            if not legible:
+                return b""
+            return os.read(self._maestro, 4096)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _leer_tecla(self, timeout: float) -> Optional[int]:
+        """Espera un byte de entrada (para --More-- y confirmaciones)"""
+        limite = time.monotonic() + timeout
+        while not self._entrada:
+            restante = limite - time.monotonic()
+            if restante <= 0 or self._detener.is_set():
+                return None
+            if not self._recibir(min(restante, INTERVALO_BUCLE)):
+                return None
+        return self._entrada.popleft()
+
+    def _enviar(self, texto: str) -> None:
+        """Escribe en la línea respetando la velocidad simulada"""
+        if self.cortado:
+            return
+        datos = texto.encode("ascii", errors="replace")
+        if not self.baudios:
+            self._escribir(datos)
+            return
+        pausa = BLOQUE_ESCRITURA * BITS_POR_BYTE / self.baudios
+        for inicio in range(0, len(datos), BLOQUE_ESCRITURA):
+            bloque = datos[inicio:inicio + BLOQUE_ESCRITURA]
+            self._escribir(bloque)
+            time.sleep(pausa * len(bloque) / BLOQUE_ESCRITURA)
+
+    def _escribir(self, datos: bytes) -> None:
+        if self.retardo:
+            self._salida.put((time.monotonic() + self.retardo, datos))
+            return
+        try:
+            os.write(self._maestro, datos)
+        except (OSError, TypeError):
+            pass
+
+    def _entregar_salida(self) -> None:
+        """Hilo de salida con retardo: escribe cada bloque cuando le llega el turno"""
+        while True:
+            entrega, datos = self._salida.get()
+            if datos is None:
+                return
+            time.sleep(max(0.0, entrega - time.monotonic()))
+            try:
+                os.write(self._maestro, datos)
+            except (OSError, TypeError):
+                return
+
+    def _esperar_latencia(self) -> None:
+        demora = self.latencia + (self._azar.uniform(0, self.jitter) if self.jitter else 0.0)
+        if demora > 0:
+            time.sleep(demora)
+
+    def _descartar_entrada(self) -> None:
+        """Lo que se escribe mientras el equipo arranca se pierde"""
+        self._entrada.clear()
+        self._en_transito.clear()
+        while self._leer(0):
+            pass
+
+    def _volcar_syslog(self) -> None:
+        if not self._syslog or self.cortado:
+            return
+        while self._syslog:
+            hora = datetime.now().strftime("%b %d %H:%M:%S.%f")[:-3]
+            self._enviar(f"\r\n{hora}: {self._syslog.popleft()}")
+        self._enviar(f"\r\n{self.prompt}")
+
+    # -------------------------------------------------------------------------
+    # Intérprete de comandos
+    # -------------------------------------------------------------------------
+    @property
+    def prompt(self) -> str:
+        return f"{self.hostname}{self.modo}"
+
+    def _procesar_byte(self, byte: int) -> None:
+        if byte in (0x0D, 0x0A):
+            # CR LF cuenta como un solo Enter
+            if byte == 0x0A and self._ultimo_cr and not self._linea:
+                self._ultimo_cr = False
+                return
+            self._ultimo_cr = byte == 0x0D
+            linea = self._linea.decode("ascii", errors="replace")
+            self._linea.clear()
+            self._enviar("\r\n")
+            self._ejecutar(linea)
+            return
+        self._ultimo_cr = False
+        if byte in (0x08, 0x7F):
+            if self._linea:
+                self._linea.pop()
+                self._enviar("\b \b")
+            return
+        if byte < 0x20:
+            return
+        self._linea.append(byte)
+        self._enviar(chr(byte))
+
+    def _ejecutar(self, linea: str) -> None:
+        # IOS no distingue mayúsculas en los comandos, pero sí en el filtro "| include"
+        base, barra, filtro = linea.partition("|")
+        comando = " ".join(base.split()).lower() + (barra + filtro if barra else "")
+        if not comando:
+            self._enviar(self.prompt)
+            return
+
+        self._esperar_latencia()
+        self.comandos_ejecutados += 1
+
+        if comando == "enable":
+            self._enable()
+        elif comando == "disable":
+            self.modo = ">"
+            self._enviar(self.prompt)
+        elif comando.startswith("terminal "):
+            self._terminal(comando.split()[1:])
+        elif comando == "reload":
+            self._reload()
+        else:
+            salida = self._salida_show(comando)
+            if salida is None:
+                self._enviar(MENSAJE_COMANDO_INVALIDO + self.prompt)
+            else:
+                self._responder(salida)
+
+        for corte in [c for c in self._cortes if c[0] <= self.comandos_ejecutados]:
+            self._cortes.remove(corte)
+            self.cortar(corte[1])
+
+    def _enable(self) -> None:
+        if self.modo == "#" or not self.password:
+            self.modo = "#"
+            self._enviar(self.prompt)
+            return
+        for _ in range(3):
+            self._enviar("Password: ")
+            intento = self._leer_linea_sin_eco()
+            self._enviar("\r\n")
+            if intento == self.password:
+                self.modo = "#"
+                self._enviar(self.prompt)
+                return
+        self._enviar("% Bad passwords\r\n\r\n" + self.prompt)
+
+    def _leer_linea_sin_eco(self) -> Optional[str]:
+        linea = bytearray()
+        while True:
+            byte = self._leer_tecla(TIMEOUT_TECLA_MORE)
+            if byte is None:
+                return None
+            if byte in (0x0D, 0x0A):
+                # Descartar el LF de un CR LF
+                if byte == 0x0D and self._entrada and self._entrada[0] == 0x0A:
+                    self._entrada.popleft()
+                return linea.decode("ascii", errors="replace")
+            linea.append(byte)
+
+    def _terminal(self, argumentos: List[str]) -> None:
+        if len(argumentos) < 2 or not argumentos[1].isdigit():
+            self._enviar(MENSAJE_COMANDO_INCOMPLETO + self.prompt)
+            return
+        if argumentos[0] == "length":
+            self.lineas_pagina = int(argumentos[1])
+        elif argumentos[0] != "width":
+            self._enviar(MENSAJE_COMANDO_INVALIDO + self.prompt)
+            return
+        self._enviar(self.prompt)
+
+    def _responder(self, salida: str) -> None:
+        """Envía la salida de un comando, paginada con --More-- si corresponde, y el prompt"""
+        lineas = salida.split("\r\n")
+        if lineas and lineas[-1] == "":
+            lineas.pop()
+        por_pagina = self.lineas_pagina - 1 if self.lineas_pagina else 0
+        enviadas = 0
+        while enviadas < len(lineas):
+            if not por_pagina:
+                pagina = len(lineas)
+            else:
+                pagina = por_pagina if enviadas == 0 else self._pedir_mas()
+                if pagina == 0:
+                    break
+            bloque = lineas[enviadas:enviadas + pagina]
+            self._enviar("".join(linea + "\r\n" for linea in bloque))
+            enviadas += len(bloque)
+            if por_pagina and enviadas < len(lineas):
+                self._enviar(MARCA_MORE)
+        self._enviar(self.prompt)
+
+    def _pedir_mas(self) -> int:
+        """Tras un --More--: espacio = otra página, Enter = una línea, cualquier otra tecla = abortar"""
+        tecla = self._leer_tecla(TIMEOUT_TECLA_MORE)
+        self._enviar(BORRADO_MORE)
+        if tecla == 0x20:
+            return self.lineas_pagina - 1
+        if tecla in (0x0D, 0x0A):
+            if tecla == 0x0D and self._entrada and self._entrada[0] == 0x0A:
+                self._entrada.popleft()
+            return 1
+        return 0
+
+    def _reload(self) -> None:
+        if self.modo != "#":
+            self._enviar(MENSAJE_COMANDO_INVALIDO + self.prompt)
+            return
+        if self.configuracion_modificada:
+            self._enviar("\r\nSystem configuration has been modified. Save? [yes/no]: ")
+            self._leer_linea_sin_eco()
+            self._enviar("\r\n")
+        self._enviar("Proceed with reload? [confirm]")
+        tecla = self._leer_tecla(TIMEOUT_TECLA_MORE)
+        if tecla in (ord("n"), ord("N")) or tecla is None:
+            self._enviar("\r\n" + self.prompt)
+            return
+        self._enviar("\r\n")
+        self._arrancar()
+
+    def _arrancar(self) -> None:
+        """Reinicio: banners por etapa con las pausas del perfil; la entrada se descarta"""
+        hora = datetime.now().strftime("%b %d %H:%M:%S.%f")[:-3]
+        self._enviar(f"\r\n{hora}: %SYS-5-RELOAD: Reload requested by console. Reload Reason: Reload Command.\r\n")
+        for segundos, texto in self.perfil["arranque"]:
+            limite = time.monotonic() + segundos * self.escala_arranque
+            while time.monotonic() < limite and not self._detener.is_set():
+                time.sleep(min(INTERVALO_BUCLE, max(0.0, limite - time.monotonic())))
+            self._descartar_entrada()
+            if self._detener.is_set():
+                return
+            self._enviar(texto)
+
+        self.modo = ">"
+        self.lineas_pagina = LINEAS_PAGINA_DEFECTO
+        self.inicio_arranque = time.monotonic()
+        self._syslog.clear()
+        self._linea.clear()
+
+    # -------------------------------------------------------------------------
+    # Salidas de los comandos show
+    # -------------------------------------------------------------------------
+    def _salida_show(self, comando: str) -> Optional[str]:
+        """Salida de un comando show (con filtro "| include/exclude") o None si no existe"""
+        comando, _, filtro = comando.partition("|")
+        comando = comando.strip()
+        filtro = filtro.strip()
+
+        generadores: Dict[str, Callable[[], str]] = {
+            "show version": self._show_version,
+            "show inventory": self._show_inventory,
+            "show inventory all": self._show_inventory,
+            "show interfaces": self._show_interfaces,
+            "show interfaces ethernet": self._show_interfaces,
+            "show interface ethernet": self._show_interfaces,
+        }
+        if "power" in self.perfil["entorno"]:
+            generadores["show environment power"] = self._show_environment_power
+        if "fan" in self.perfil["entorno"]:
+            generadores["show environment fan"] = self._show_environment_fan
+        if "status" in self.perfil["entorno"]:
+            generadores["show environment status"] = self._show_environment_status
+
+        generador = generadores.get(comando)
+        if generador is None:
+            return None
+        salida = generador()
+        if filtro:
+            salida = self._filtrar(salida, filtro)
+        return salida
+
+    @staticmethod
+    def _filtrar(salida: str, filtro: str) -> str:
+        tipo, _, patron = filtro.partition(" ")
+        tipo = tipo.lower()
+        try:
+            expresion = re.compile(patron.strip())
+        except re.error:
+            expresion = re.compile(re.escape(patron.strip()))
+        lineas = salida.split("\r\n")
+        if "include".startswith(tipo):
+            lineas = [linea for linea in lineas if expresion.search(linea)]
+        elif "exclude".startswith(tipo):
+            lineas = [linea for linea in lineas if not expresion.search(linea)]
+        return "".join(linea + "\r\n" for linea in lineas if linea)
+
+    def _slot_fuente(self, numero: int) -> str:
+        if "status" in self.perfil["entorno"]:
+            return f"PS{numero - 1}"
+        return chr(ord("A") + numero - 1)
+
+    def _uptime(self) -> str:
+        minutos = int((time.monotonic() - self.inicio_arranque) // 60)
+        return f"{minutos} minute" if minutos == 1 else f"{minutos} minutes"
+
+    def _show_version(self) -> str:
+        p = self.perfil
+        lineas = [
+            f"Cisco IOS XE Software, Version {p['version']}",
+            f"Cisco IOS Software [Cupertino], Catalyst L3 Switch Software ({p['imagen']}), "
+            f"Version 17.9.4a, RELEASE SOFTWARE (fc3)",
+            "Technical Support: http://www.cisco.com/techsupport",
+            "Copyright (c) 1986-2023 by Cisco Systems, Inc.",
+            "Compiled Thu 20-Jul-23 13:50 by mcpre",
+            "",
+            "",
+            "Cisco IOS-XE software, Copyright (c) 2005-2023 by cisco Systems, Inc.",
+            "All rights reserved.  Certain components of Cisco IOS-XE software are",
+            "licensed under the GNU General Public License (\"GPL\") Version 2.0.  The",
+            "software code licensed under GPL Version 2.0 is free software that comes",
+            "with ABSOLUTELY NO WARRANTY.  You can redistribute and/or modify such",
+            "GPL code under the terms of GPL Version 2.0.  For more details, see the",
+            "documentation or \"License Notice\" file accompanying the IOS-XE software,",
+            "or the applicable URL provided on the flyer accompanying the IOS-XE",
+            "software.",
+            "",
+            "",
+            "ROM: IOS-XE ROMMON",
+            "BOOTLDR: System Bootstrap, Version 17.9.1r, RELEASE SOFTWARE (P)",
+            "",
+            f"{self.hostname} uptime is {self._uptime()}",
+            f"Uptime for this control processor is {self._uptime()}",
+            "System returned to ROM by Reload Command",
+            "System image file is \"flash:packages.conf\"",
+            "Last reload reason: Reload Command",
+            "",
+            "Technology Package License Information:",
+            "",
+            "------------------------------------------------------------------------------",
+            "Technology-package                                     Technology-package",
+            "Current                        Type                       Next reboot",
+            "------------------------------------------------------------------------------",
+            "network-advantage      Smart License                      network-advantage",
+            "dna-advantage          Subscription Smart License         dna-advantage",
+            "",
+            f"cisco {p['modelo']} (ARM64) processor with 1324118K/6147K bytes of memory.",
+            "Processor board ID " + p["serial"],
+            f"{len(p['puertos'])} Ethernet interfaces",
+            "2048K bytes of non-volatile configuration memory.",
+            "",
+            "Base Ethernet MAC Address          : 70:18:a7:11:22:33",
+            "Motherboard Assembly Number        : 73-18785-05",
+            f"Motherboard Serial Number          : {p['serial'][:3]}24411ABC",
+            "Model Revision Number              : A0",
+            "Motherboard Revision Number        : A0",
+            f"Model Number                       : {p['modelo']}",
+            f"System Serial Number               : {p['serial']}",
+            "",
+            "",
+            "Switch Ports Model              SW Version        SW Image              Mode",
+            "------ ----- -----              ----------        ----------            ----",
+            f"*    1 {len(p['puertos']):<5} {p['modelo']:<18} {p['version']:<17} {p['imagen']:<21} INSTALL",
+            "",
+            "",
+            "Configuration register is 0x102",
+            "",
+        ]
+        return "\r\n".join(lineas) + "\r\n"
+
+    def _show_inventory(self) -> str:
+        p = self.perfil
+        lineas = [
+            f"NAME: \"Chassis\", DESCR: \"Cisco Catalyst {p['modelo']} Chassis\"",
+            f"PID: {p['modelo']:<18}, VID: V01  , SN: {p['serial']}",
+            "",
+        ]
+        for numero in range(1, p["fuentes"] + 1):
+            slot = self._slot_fuente(numero)
+            lineas.append(f"NAME: \"Switch 1 - Power Supply {slot}\", DESCR: \"Switch 1 - Power Supply {slot}\"")
+            if numero in self.fuentes_desconectadas:
+                lineas.append("PID: UNKNOWN           , VID: UNKNOWN, SN: UNKNOWN")
+            else:
+                lineas.append(f"PID: {p['pid_fuente']:<18}, VID: V02  , SN: DCB2345X{numero:03d}")
+            lineas.append("")
+        for numero in range(1, p["ventiladores"] + 1):
+            if numero in self.ventiladores_desconectados:
+                continue
+            lineas.append(f"NAME: \"Switch 1 FAN - T1 {numero}\", DESCR: \"Switch 1 Fan Tray {numero}\"")
+            lineas.append(f"PID: {p['modelo'][:5]}-FAN       , VID: V01  , SN: N/A")
+            lineas.append("")
+        return "\r\n".join(lineas) + "\r\n"
+
+    def _show_environment_power(self) -> str:
+        lineas = [
+            "SW  PID                 Serial#     Status           Sys Pwr  PoE Pwr  Watts",
+            "--  ------------------  ----------  ---------------  -------  -------  -----",
+        ]
+        for numero in range(1, self.perfil["fuentes"] + 1):
+            slot = f"1{self._slot_fuente(numero)}"
+            if numero in self.fuentes_desconectadas:
+                lineas.append(f"{slot}  Not Present")
+            else:
+                lineas.append(f"{slot}  {self.perfil['pid_fuente']:<18}  DCB2345X{numero:03d} "
+                              f"OK               Good     Good     600")
+        return "\r\n".join(lineas) + "\r\n\r\n"
+
+    def _show_environment_fan(self) -> str:
+        lineas = [
+            "Switch   FAN Speed   State   Airflow direction",
+            "---------------------------------------------------",
+        ]
+        for numero in range(1, self.perfil["ventiladores"] + 1):
+            if numero in self.ventiladores_desconectados:
+                lineas.append(f"  1       {numero}      0   NOT PRESENT or FAULTY")
+            else:
+                lineas.append(f"  1       {numero}   5440     OK     Front to Back")
+        for numero in range(1, self.perfil["fuentes"] + 1):
+            estado = "NOT PRESENT or FAULTY" if numero in self.fuentes_desconectadas else "OK"
+            lineas.append(f"FAN PS-{numero} is {estado}")
+        return "\r\n".join(lineas) + "\r\n\r\n"
+
+    def _show_environment_status(self) -> str:
+        estados_fan = "  ".join(
+            "fail " if numero in self.ventiladores_desconectados else "good "
+            for numero in range(1, self.perfil["ventiladores"] + 1)
+        )
+        lineas = [
+            "Power                                                       Fan States",
+            "Supply  Model No              Type  Capacity  Status        "
+            + "     ".join(str(n) for n in range(self.perfil["ventiladores"])),
+            "------  --------------------  ----  --------  ------------  " + "-" * 24,
+        ]
+        for numero in range(1, self.perfil["fuentes"] + 1):
+            slot = self._slot_fuente(numero)
+            if numero in self.fuentes_desconectadas:
+                lineas.append(f"{slot:<8}n/a                   n/a   n/a           fail")
+            else:
+                lineas.append(f"{slot:<8}{self.perfil['pid_fuente']:<22}ac    1600 W    active        {estados_fan}")
+        return "\r\n".join(lineas) + "\r\n\r\n"
+
+    def _show_interfaces(self) -> str:
+        lineas = []
+        for indice, puerto in enumerate(self.perfil["puertos"], start=1):
+            mac = f"00a3.d1f2.{indice:04x}"
+            lineas.extend([
+                f"{puerto} is down, line protocol is down (notconnect)",
+                f"  Hardware is Gigabit Ethernet, address is {mac} (bia {mac})",
+                "  MTU 1500 bytes, BW 1000000 Kbit/sec, DLY 10 usec,",
+                "     reliability 255/255, txload 1/255, rxload 1/255",
+                "  Encapsulation ARPA, loopback not set",
+                "  Keepalive set (10 sec)",
+                "  Auto-duplex, Auto-speed, media type is 10/100/1000BaseTX",
+                "  input flow-control is on, output flow-control is unsupported",
+                "  ARP type: ARPA, ARP Timeout 04:00:00",
+                "  Last input never, output never, output hang never",
+                "  Last clearing of \"show interface\" counters never",
+                "  Input queue: 0/2000/0/0 (size/max/drops/flushes); Total output drops: 0",
+                "  Queueing strategy: fifo",
+                "  Output queue: 0/40 (size/max)",
+                "  5 minute input rate 0 bits/sec, 0 packets/sec",
+                "  5 minute output rate 0 bits/sec, 0 packets/sec",
+                "     0 packets input, 0 bytes, 0 no buffer",
+                "     0 input errors, 0 CRC, 0 frame, 0 overrun, 0 ignored",
+                "     0 packets output, 0 bytes, 0 underruns",
+                "     0 output errors, 0 collisions, 1 interface resets",
+            ])
+        return "\r\n".join(lineas) + "\r\n"
+
+
+# =============================================================================
+# SERVIDOR DE CONSOLAS POR TCP
+# =============================================================================
+class ServidorConsolaTCP:
+    """
+    Publica la consola de un SimuladorConsola en un puerto TCP, como el puerto
+    crudo de un servidor de consolas: los bytes pasan tal cual en ambos
+    sentidos y se atiende una conexión a la vez (las demás se cierran, como
+    un puerto ocupado).
+
+    Args:
+        simulador: Simulador ya iniciado
+        puerto: Puerto TCP en el que escuchar (0 = uno libre)
+        host: Dirección en la que escuchar
+    """
+
+    def __init__(self, simulador: SimuladorConsola, puerto: int = 0, host: str = "127.0.0.1"):
+        self.simulador = simulador
+        self.host = host
+        self.puerto = puerto
+        self._servidor = None
+        self._hilo = None
+        self._cliente = None
+        self._detener = threading.Event()
+
+    def iniciar(self) -> str:
+        """
+        Returns:
+            Destino para abrir la consola (ej: socket://127.0.0.1:7001)
+        """
+        if self.simulador.ruta is None:
+            raise RuntimeError("El simulador no está iniciado")
+        self._servidor = socket.create_server((self.host, self.puerto))
+        self.puerto = self._servidor.getsockname()[1]
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._aceptar, name=f"consola-tcp-{self.puerto}", daemon=True)
+        self._hilo.start()
+        return self.destino
+
+    @property
+    def destino(self) -> str:
+        return f"socket://{self.host}:{self.puerto}"
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=2)
+        if self._servidor is not None:
+            self._servidor.close()
+        self._servidor = self._hilo = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *_):
+        self.detener()
+
+    def _aceptar(self) -> None:
+        while not self._detener.is_set():
+            legible, _, _ = select.select([self._servidor], [], [], INTERVALO_BUCLE)
+            if not legible:
+                continue
+            cliente, _ = self._servidor.accept()
+            if self._cliente is not None:
+                cliente.close()
+                continue
+            cliente.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._cliente = cliente
+            threading.Thread(target=self._atender, args=(cliente,), daemon=True).start()
+
+    def _atender(self, cliente: socket.socket) -> None:
+        """Pasa los bytes entre el cliente y el pty del simulador hasta que alguno se cierra"""
+        linea = os.open(self.simulador.ruta, os.O_RDWR | os.O_NOCTTY)
+        try:
+            self.al_conectar(cliente)
+            while not self._detener.is_set():
+                legible, _, _ = select.select([cliente, linea], [], [], INTERVALO_BUCLE)
+                if cliente in legible:
+                    datos = cliente.recv(4096)
+                    if not datos:
+                        return
+                    os.write(linea, self.entrada(datos))
+                if linea in legible:
+                    cliente.sendall(self.salida(os.read(linea, 4096)))
+        except OSError:
+            pass
+        finally:
+            os.close(linea)
+            cliente.close()
+            self._cliente = None
+
+    def al_conectar(self, cliente: socket.socket) -> None:
+        """Se llama al aceptar un cliente, antes de pasar bytes (TCP crudo: nada)"""
+
+    def entrada(self, datos: bytes) -> bytes:
+        """Bytes del cliente -> línea de consola (TCP crudo: sin cambios)"""
+        return datos
+
+    def salida(self, datos: bytes) -> bytes:
+        """Línea de consola -> bytes para el cliente (TCP crudo: sin cambios)"""
+        return datos
+
+
+class ServidorConsolaTelnet(ServidorConsolaTCP):
+    """
+    Como ServidorConsolaTCP, pero como el puerto telnet de un servidor de
+    consolas: ofrece eco y supresión de go-ahead al conectar, rechaza las
+    demás opciones, quita los comandos telnet de la entrada (IAC BRK se
+    entrega como break al simulador) y escapa 0xFF y el CR suelto en la salida.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._estado = "datos"
+        self._verbo = None
+        self._tras_cr = False
+        self._enviadas = set()
+
+    @property
+    def destino(self) -> str:
+        return f"telnet://{self.host}:{self.puerto}"
+
+    def al_conectar(self, cliente: socket.socket) -> None:
+        self._estado, self._verbo, self._tras_cr = "datos", None, False
+        self._enviadas = {(TELNET_WILL, TELNET_ECO), (TELNET_WILL, TELNET_SGA)}
+        cliente.sendall(bytes([TELNET_IAC, TELNET_WILL, TELNET_ECO, TELNET_IAC, TELNET_WILL, TELNET_SGA]))
+
+    def entrada(self, datos: bytes) -> bytes:
+        linea = bytearray()
+        for byte in datos:
+            if self._estado == "datos":
+                if byte == TELNET_IAC:
+                    self._estado = "iac"
+                elif not (self._tras_cr and byte == 0):
+                    linea.append(byte)
+                self._tras_cr = byte == 0x0D
+            elif self._estado == "iac":
+                self._estado = "datos"
+                if byte == TELNET_IAC:
+                    linea.append(byte)
+                elif byte == TELNET_BRK:
+                    self.simulador.recibir_break()
+                elif byte in (TELNET_WILL, TELNET_WONT, TELNET_DO, TELNET_DONT):
+                    self._verbo, self._estado = byte, "opcion"
+                elif byte == TELNET_SB:
+                    self._estado = "sb"
+            elif self._estado == "opcion":
+                self._estado = "datos"
+                self._negociar(self._verbo, byte)
+            elif self._estado == "sb":
+                if byte == TELNET_IAC:
+                    self._estado = "sb_iac"
+            else:
+                self._estado = "datos" if byte == TELNET_SE else "sb"
+        return bytes(linea)
+
+    def _negociar(self, verbo: int, opcion: int) -> None:
+        """Acepta eco y SGA de este lado y SGA del cliente; cada respuesta se envía una sola vez"""
+        if verbo == TELNET_DO:
+            respuesta = TELNET_WILL if opcion in (TELNET_ECO, TELNET_SGA) else TELNET_WONT
+        elif verbo == TELNET_WILL:
+            respuesta = TELNET_DO if opcion == TELNET_SGA else TELNET_DONT
+        else:
+            respuesta = TELNET_WONT if verbo == TELNET_DONT else TELNET_DONT
+        if (respuesta, opcion) not in self._enviadas and self._cliente is not None:
+            self._enviadas.add((respuesta, opcion))
+            self._cliente.sendall(bytes([TELNET_IAC, respuesta, opcion]))
+
+    def salida(self, datos: bytes) -> bytes:
+        datos = datos.replace(b"\xff", b"\xff\xff")
+        return re.sub(rb"\r(?!\n)", b"\r\0", datos)
+
+
+# =============================================================================
+# EJECUCIÓN DIRECTA
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador de consola Cisco Catalyst sobre un pty.")
+    parser.add_argument("--modelo", default="9200", choices=sorted(PERFILES), help="Modelo a simular")
+    parser.add_argument("--password", default="cisco", help="Contraseña de enable ('' = sin contraseña)")
+    parser.add_argument("--baudios", type=int, default=None, help="Velocidad de línea simulada")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos antes de cada respuesta")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Segundos aleatorios extra por respuesta")
+    parser.add_argument("--retardo", type=float, default=0.0, help="Demora de la línea en cada sentido (segundos)")
+    parser.add_argument("--escala-arranque", type=float, default=1.0,
+                        help="Factor de los tiempos de arranque (ej: 0.05 para un reload rápido)")
+    parser.add_argument("--corte-tras", type=int, default=None, help="Cortar la línea tras N comandos")
+    parser.add_argument("--duracion-corte", type=float, default=10.0, help="Segundos que dura el corte")
+    parser.add_argument("--tcp", type=int, default=None, metavar="PUERTO",
+                        help="Publicar también la consola en este puerto TCP (servidor de consolas)")
+    parser.add_argument("--telnet", action="store_true", help="Con --tcp, hablar telnet en lugar de TCP crudo")
+    args = parser.parse_args(argv)
+
+    simulador = SimuladorConsola(
+        modelo=args.modelo,
+        password=args.password or None,
+        baudios=args.baudios,
+        latencia=args.latencia,
+        jitter=args.jitter,
+        retardo=args.retardo,
+        escala_arranque=args.escala_arranque,
+    )
+    ruta = simulador.iniciar()
+    if args.corte_tras is not None:
+        simulador.programar_corte(args.corte_tras, args.duracion_corte)
+    servidor = None
+    if args.tcp is not None:
+        servidor = (ServidorConsolaTelnet if args.telnet else ServidorConsolaTCP)(simulador, args.tcp)
+        ruta = f"{ruta} y {servidor.iniciar()}"
+    print(f"Simulando Cisco Catalyst {args.modelo} en {ruta} (Ctrl+C para terminar)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if servidor is not None:
+            servidor.detener()
+        simulador.detener()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Control de admisión para la generación de informes.
+
+Limita cuántos informes se generan a la vez dentro del proceso del servidor,
+mantiene una cola de espera acotada (con tiempo máximo) y un tope de informes
+simultáneos por usuario. Cuando no hay lugar, se lanza ServidorOcupadoError
+con una estimación de cuándo reintentar.
+
+Los límites son por proceso: con varios workers (gunicorn, etc.) el máximo
+real es el configurado multiplicado por la cantidad de workers.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class ServidorOcupadoError(Exception):
+    """No hay capacidad para generar el informe en este momento."""
+
+    def __init__(self, mensaje, reintentar_en, motivo):
+        super().__init__(mensaje)
+        self.reintentar_en = reintentar_en
+        self.motivo = motivo
+
+
+class ControlAdmision:
+    """
+    Semáforo con cola FIFO acotada, espera máxima y tope por usuario.
+
+    Se inicializa como las extensiones de Flask:
+        control_informes = ControlAdmision()
+        control_informes.init_app(app)
+    """
+
+    # Peso de la última duración en el promedio móvil (EWMA)
+    ALFA_PROMEDIO = 0.3
+
+    def __init__(self, app=None):
+        self._cond = threading.Condition()
+        self._cola = deque()        # tickets esperando turno, en orden de llegada
+        self._activos = 0
+        self._por_usuario = {}      # id_usuario -> informes activos + en cola
+
+        self.max_concurrentes = 2
+        self.max_cola = 4
+        self.espera_maxima = 30
+        self.max_por_usuario = 1
+
+        # Métricas
+        self._admitidos = 0
+        self._rechazados = {"cola_llena": 0, "usuario": 0, "timeout": 0}
+        self._espera_ultima = 0.0
+        self._espera_promedio = 0.0
+        self._espera_maxima_vista = 0.0
+        self._duracion_promedio = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_concurrentes = max(1, app.config.get("INFORME_MAX_CONCURRENTES", 2))
+        self.max_cola = max(0, app.config.get("INFORME_MAX_COLA", 4))
+        self.espera_maxima = app.config.get("INFORME_ESPERA_MAXIMA", 30)
+        self.max_por_usuario = max(1, app.config.get("INFORME_MAX_POR_USUARIO", 1))
+        app.extensions["admision_informes"] = self
+
+    def _reintentar_en(self):
+        """Segundos estimados hasta que se libere un lugar (mínimo 1)."""
+        duracion = self._duracion_promedio or 10.0
+        rondas = (len(self._cola) + 1) / self.max_concurrentes
+        return max(1, math.ceil(duracion * rondas))
+
+    def _rechazar(self, motivo, mensaje):
+        self._rechazados[motivo] += 1
+        return ServidorOcupadoError(mensaje, self._reintentar_en(), motivo)
+
+    @contextmanager
+    def turno(self, usuario_id):
+        """
+        Espera un lugar para generar un informe y lo libera al salir.
+
+        Args:
+            usuario_id: Identificador del usuario (current_user.id_usuario).
+
+        Raises:
+            ServidorOcupadoError: Si el usuario ya tiene el máximo de informes en
+                curso, si la cola está llena o si se agotó la espera.
+        """
+        llegada = time.monotonic()
+        ticket = object()
+
+        with self._cond:
+            if self._por_usuario.get(usuario_id, 0) >= self.max_por_usuario:
+                raise self._rechazar(
+                    "usuario",
+                    "Ya tienes un informe en proceso. Espera a que termine antes de generar otro.",
+                )
+
+            hay_lugar = self._activos < self.max_concurrentes and not self._cola
+            if not hay_lugar and len(self._cola) >= self.max_cola:
+                raise self._rechazar(
+                    "cola_llena",
+                    "El servidor está generando muchos informes en este momento.",
+                )
+
+            self._por_usuario[usuario_id] = self._por_usuario.get(usuario_id, 0) + 1
+            self._cola.append(ticket)
+
+            limite = llegada + self.espera_maxima
+            while self._cola[0] is not ticket or self._activos >= self.max_concurrentes:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._cola.remove(ticket)
+                    self._liberar_usuario(usuario_id)
+                    # El siguiente en la cola puede haber quedado primero
+                    self._cond.notify_all()
+                    raise self._rechazar(
+                        "timeout",
+                        "El servidor está generando muchos informes en este momento.",
+                    )
+                self._cond.wait(restante)
+
+            self._cola.popleft()
+            self._activos += 1
+            self._registrar_espera(time.monotonic() - llegada)
+            self._admitidos += 1
+            # Si aún quedan lugares, el siguiente de la cola puede pasar
+            self._cond.notify_all()
+
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._activos -= 1
+                self._liberar_usuario(usuario_id)
+                self._registrar_duracion(time.monotonic() - inicio)
+                self._cond.notify_all()
+
+    def _liberar_usuario(self, usuario_id):
+        restantes = self._por_usuario.get(usuario_id, 0) - 1
+        if restantes > 0:
+            self._por_usuario[usuario_id] = restantes
+        else:
+            self._por_usuario.pop(usuario_id, None)
+
+    def _registrar_espera(self, segundos):
+        self._espera_ultima = segundos
+        self._espera_maxima_vista = max(self._espera_maxima_vista, segundos)
+        if self._admitidos == 0:
+            self._espera_promedio = segundos
+        else:
+            self._espera_promedio += self.ALFA_PROMEDIO * (segundos - self._espera_promedio)
+
+    def _registrar_duracion(self, segundos):
+        if self._duracion_promedio is None:
+            self._duracion_promedio = segundos
+        else:
+            self._duracion_promedio += self.ALFA_PROMEDIO * (segundos - self._duracion_promedio)
+
+    def metricas(self):
+        """Instantánea de ocupación, cola y tiempos de espera (en ms)."""
+        with self._cond:
+            return {
+                "activos": self._activos,
+                "en_cola": len(self._cola),
+                "max_concurrentes": self.max_concurrentes,
+                "max_cola": self.max_cola,
+                "admitidos": self._admitidos,
+                "rechazados": dict(self._rechazados),
+                "espera_ms": {
+                    "ultima": round(self._espera_ultima * 1000, 1),
+                    "promedio": round(self._espera_promedio * 1000, 1),
+                    "maxima": round(self._espera_maxima_vista * 1000, 1),
+                },
+                "duracion_promedio_ms": (
+                    round(self._duracion_promedio * 1000, 1)
+                    if self._duracion_promedio is not None else None
+                ),
+            }
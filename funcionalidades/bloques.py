@@ -0,0 +1,201 @@
+"""
+Construcción de los bloques de prueba del informe.
+
+Cada bloque (INICIO PRUEBA n ... FIN PRUEBA n) se sanitiza, se convierte en
+un párrafo Word y se resalta sin depender del resto del documento. Este módulo
+no importa Flask, por lo que sus funciones pueden ejecutarse dentro de
+procesos trabajadores.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Pt
+from docx.text.paragraph import Paragraph
+from lxml import etree
+from .resaltado import subrayar_texto
+
+# Pool de procesos compartido entre peticiones (se crea al primer uso). Varias
+# peticiones pueden generar informes a la vez: el lock evita crear dos pools
+_pool = None
+_pool_procesos = None
+_pool_lock = threading.Lock()
+
+
+def aplicar_fuente_cascadia_code(run, size_pt):
+    """
+    Propósito:
+        Aplicar la tipografía específica 'Cascadia Code' y un tamaño determinado
+        a un 'run' (fragmento de texto) dentro de un párrafo de Word.
+
+    Entradas:
+        run (docx.text.run.Run): El objeto Run de python-docx a modificar.
+        size_pt (int/float): El tamaño de la fuente en puntos.
+
+    Salidas:
+        None: Modifica el objeto run directamente en memoria.
+
+    Dependencias:
+        - docx.shared.Pt
+        - docx.oxml.ns.qn
+    """
+    # Establecer el nombre de la fuente principal
+    run.font.name = "Cascadia Code"
+    # Establecer el tamaño usando la unidad Pt (puntos)
+    run.font.size = Pt(size_pt)
+    # Forzar la configuración de fuente para caracteres de Asia Oriental (compatibilidad Word)
+    run._element.rPr.rFonts.set(qn("w:eastAsia"), "Cascadia Code")
+
+
+def limpiar_texto_xml(texto):
+    """
+    Propósito:
+        Sanitizar cadenas de texto eliminando caracteres de control incompatibles
+        con el estándar XML de Word (.docx), evitando errores al generar el archivo.
+
+    Entradas:
+        texto (str): La cadena de texto original.
+
+    Salidas:
+        str: La cadena limpia y segura para insertar en XML.
+
+    Dependencias:
+        None (usa funciones nativas de str y ord).
+    """
+    # Si el texto es None o vacío, devolverlo tal cual
+    if not texto:
+        return texto
+
+    # Eliminar bytes nulos (NULL bytes) que rompen cualquier parser XML
+    texto = texto.replace("\x00", "")
+
+    # Lista para acumular los caracteres válidos
+    caracteres_permitidos = []
+
+    # Iterar sobre cada carácter del texto
+    for char in texto:
+        # Obtener el código ASCII/Unicode del carácter
+        code = ord(char)
+
+        # Criterios de aceptación XML 1.0:
+        # 1. Caracteres imprimibles (code >= 0x20)
+        # 2. Caracteres de control permitidos: Tab (0x09), Salto línea (0x0A), Retorno carro (0x0D)
+        if code >= 0x20 or code in (0x09, 0x0A, 0x0D):
+            # Excluir específicamente el carácter DEL (0x7F)
+            # Excluir rango de control extendido (0x80-0x9F) que a veces causa problemas
+            if code != 0x7F and not (0x80 <= code <= 0x9F):
+                caracteres_permitidos.append(char)
+
+    # Unir la lista en un solo string
+    return "".join(caracteres_permitidos)
+
+
+def llenar_parrafo(para, texto, size_pt):
+    """
+    Propósito:
+        Volcar el texto de un bloque en un párrafo, una línea por run, con la
+        fuente de código del informe.
+
+    Entradas:
+        para (docx.text.paragraph.Paragraph): Párrafo vacío a completar.
+        texto (str): Texto del bloque ya sanitizado.
+        size_pt (int/float): Tamaño de la fuente en puntos.
+
+    Salidas:
+        None: Modifica el párrafo en memoria.
+
+    Dependencias:
+        - limpiar_texto_xml
+        - aplicar_fuente_cascadia_code
+    """
+    para.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
+    for line in texto.split("\n"):
+        # Limpiar cada línea individualmente por seguridad
+        line = limpiar_texto_xml(line)
+        run = para.add_run(line)
+        aplicar_fuente_cascadia_code(run, size_pt)
+        para.add_run("\n")  # salto tras cada línea
+
+
+def procesar_bloque(bloque, file_type, contador, size_pt):
+    """
+    Propósito:
+        Ejecutar en forma aislada el trabajo completo de un bloque de prueba:
+        sanitizar -> insertar en un párrafo -> resaltar -> serializar a XML.
+        Pensada para ejecutarse dentro de un proceso trabajador.
+
+    Entradas:
+        bloque (str): Texto del bloque INICIO PRUEBA n ... FIN PRUEBA n.
+        file_type (str): Tipo de equipo seleccionado (ej: "SW L2 9200").
+        contador (int): Número de prueba, usado para elegir las reglas de resaltado.
+        size_pt (int/float): Tamaño de la fuente en puntos.
+
+    Salidas:
+        bytes: Elemento <w:p> resaltado, serializado como XML.
+
+    Dependencias:
+        - llenar_parrafo
+        - subrayar_texto
+    """
+    # Párrafo suelto (sin documento): solo declara el espacio de nombres "w",
+    # igual que un párrafo creado con cell.add_paragraph()
+    para = Paragraph(OxmlElement("w:p"), None)
+
+    texto = limpiar_texto_xml(bloque)
+    llenar_parrafo(para, texto, size_pt)
+    subrayar_texto([para], file_type, contador)
+
+    return etree.tostring(para._p)
+
+
+def insertar_fragmento(doc, marker, fragmento):
+    """
+    Propósito:
+        Reemplazar el contenido de las celdas que contienen `marker` por un
+        párrafo ya procesado (ver procesar_bloque).
+
+    Entradas:
+        doc (docx.Document): Documento plantilla abierto en memoria.
+        marker (str): Texto marcador de la celda (ej: "Insertar codigo de la extracción 01").
+        fragmento (bytes): XML de un elemento <w:p>.
+
+    Salidas:
+        int: Cantidad de celdas reemplazadas.
+
+    Dependencias:
+        - docx.oxml.parse_xml
+    """
+    reemplazos = 0
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                if marker in cell.text:
+                    cell.text = ""
+                    cell._tc.append(parse_xml(fragmento))
+                    reemplazos += 1
+    return reemplazos
+
+
+def obtener_pool(max_procesos):
+    """
+    Propósito:
+        Entregar el pool de procesos usado para los bloques, creándolo (o
+        recreándolo si cambió el tamaño) solo cuando se necesita.
+
+    Entradas:
+        max_procesos (int): Cantidad máxima de procesos trabajadores.
+
+    Salidas:
+        ProcessPoolExecutor: Pool compartido.
+    """
+    global _pool, _pool_procesos
+
+    with _pool_lock:
+        if _pool is None or _pool_procesos != max_procesos:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=max_procesos)
+            _pool_procesos = max_procesos
+        return _pool
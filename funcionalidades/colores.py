@@ -1,12 +1,33 @@
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 
-def aplicar_resaltado_marcador(run, color_name):
+class ContextoResaltado:
     """
-    Aplica un resaltado tipo marcador (editable desde Word) al run.
-    color_name: debe ser un valor válido como 'green', 'yellow', 'red', etc.
+    Lleva el estado de resaltado de una pasada de subrayar_texto en Python,
+    sin tocar el XML: qué runs ya fueron procesados y qué color les toca.
+    Al final, aplicar() escribe un único w:highlight por run.
     """
-    rPr = run._element.get_or_add_rPr()
+
+    def __init__(self):
+        # elemento w:r -> nombre del color
+        self.colores = {}
+
+    def procesado(self, run):
+        return run._element in self.colores
+
+    def asignar(self, run, color_name):
+        self.colores[run._element] = color_name
+
+    def aplicar(self):
+        for elm, color_name in self.colores.items():
+            # Los runs partidos por highlight_partial ya no están en el párrafo
+            if elm.getparent() is None:
+                continue
+            escribir_highlight(elm, color_name)
+        self.colores.clear()
+
+def escribir_highlight(elm, color_name):
+    rPr = elm.get_or_add_rPr()
 
     # Quitar highlight previo si ya existe
     highlight = rPr.find(qn('w:highlight'))
@@ -18,15 +39,27 @@ def aplicar_resaltado_marcador(run, color_name):
     hl.set(qn('w:val'), color_name)
     rPr.append(hl)
 
+def aplicar_resaltado_marcador(run, color_name, contexto=None):
+    """
+    Aplica un resaltado tipo marcador (editable desde Word) al run.
+    color_name: debe ser un valor válido como 'green', 'yellow', 'red', etc.
+    contexto: si se indica (ContextoResaltado), el color solo se registra y
+    se escribe en el XML al llamar a contexto.aplicar().
+    """
+    if contexto is not None:
+        contexto.asignar(run, color_name)
+        return
+    escribir_highlight(run._element, color_name)
+
 # Funciones específicas
-def resaltado_ok(run):
-    aplicar_resaltado_marcador(run, 'green')
+def resaltado_ok(run, contexto=None):
+    aplicar_resaltado_marcador(run, 'green', contexto)
 
-def resaltado_na(run):
-    aplicar_resaltado_marcador(run, 'yellow')
+def resaltado_na(run, contexto=None):
+    aplicar_resaltado_marcador(run, 'yellow', contexto)
 
-def resaltado_fallido(run):
-    aplicar_resaltado_marcador(run, 'red')
+def resaltado_fallido(run, contexto=None):
+    aplicar_resaltado_marcador(run, 'red', contexto)
 
-def resaltado_opcional(run):
-    aplicar_resaltado_marcador(run, 'magenta')  # o 'pink', 'cyan', etc.
\ No newline at end of file
+def resaltado_opcional(run, contexto=None):
+    aplicar_resaltado_marcador(run, 'magenta', contexto)  # o 'pink', 'cyan', etc.
@@ -0,0 +1,129 @@
+"""
+Licencias firmadas de la aplicación de escritorio.
+
+Al validar el acceso, el servidor entrega una licencia corta firmada con
+Ed25519 que dice hasta cuándo puede usarse la aplicación. El ejecutable la
+guarda y la verifica con la clave pública embebida: mientras esté vigente,
+el inicio de sesión no necesita al servidor (funciona sin conexión y evita el
+bcrypt de /api/validar-acceso en cada arranque).
+
+Formato: <datos en base64url>.<firma en base64url>, con los datos en JSON
+({"id", "email", "usuario", "emitida", "hasta"}; fechas en segundos epoch).
+
+Uso (generar un par de claves nuevo):
+    python -m funcionalidades.licencias
+La privada va en LICENCIA_CLAVE_PRIVADA del servidor y la pública en
+LICENCIA_CLAVE_PUBLICA de exe/appLocal.py.
+"""
+
+import base64
+import binascii
+import json
+import time
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+)
+
+
+class LicenciaInvalidaError(Exception):
+    """La licencia no se pudo verificar o ya venció."""
+
+    def __init__(self, mensaje, motivo):
+        super().__init__(mensaje)
+        self.motivo = motivo    # "formato" | "firma" | "vencida"
+
+
+def _a_base64(datos):
+    return base64.urlsafe_b64encode(datos).rstrip(b"=").decode("ascii")
+
+
+def _desde_base64(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def cargar_clave_privada(texto):
+    """Clave privada Ed25519 desde sus 32 bytes en base64."""
+    return Ed25519PrivateKey.from_private_bytes(base64.b64decode(texto))
+
+
+def cargar_clave_publica(texto):
+    """Clave pública Ed25519 desde sus 32 bytes en base64."""
+    return Ed25519PublicKey.from_public_bytes(base64.b64decode(texto))
+
+
+def generar_par_claves():
+    """
+    Returns:
+        tuple[str, str]: (privada, pública) en base64, para la configuración.
+    """
+    privada = Ed25519PrivateKey.generate()
+    crudo_privada = privada.private_bytes(
+        serialization.Encoding.Raw,
+        serialization.PrivateFormat.Raw,
+        serialization.NoEncryption(),
+    )
+    crudo_publica = privada.public_key().public_bytes(
+        serialization.Encoding.Raw, serialization.PublicFormat.Raw
+    )
+    return base64.b64encode(crudo_privada).decode(), base64.b64encode(crudo_publica).decode()
+
+
+def emitir_licencia(clave_privada, datos, hasta):
+    """
+    Firma una licencia.
+
+    Args:
+        clave_privada: Ed25519PrivateKey del servidor.
+        datos: Datos del usuario (id, email, usuario).
+        hasta: Vencimiento en segundos epoch.
+
+    Returns:
+        str: Licencia firmada.
+    """
+    contenido = dict(datos, emitida=int(time.time()), hasta=int(hasta))
+    cuerpo = _a_base64(json.dumps(contenido, separators=(",", ":")).encode("utf-8"))
+    firma = clave_privada.sign(cuerpo.encode("ascii"))
+    return f"{cuerpo}.{_a_base64(firma)}"
+
+
+def verificar_licencia(clave_publica, licencia, ahora=None):
+    """
+    Verifica la firma y la vigencia de una licencia.
+
+    Args:
+        clave_publica: Ed25519PublicKey del servidor.
+        licencia: Licencia firmada por emitir_licencia().
+        ahora: Segundos epoch de referencia (por defecto, la hora actual).
+
+    Returns:
+        dict: Datos de la licencia.
+
+    Raises:
+        LicenciaInvalidaError
+    """
+    try:
+        cuerpo, firma = licencia.split(".")
+        clave_publica.verify(_desde_base64(firma), cuerpo.encode("ascii"))
+    except InvalidSignature:
+        raise LicenciaInvalidaError("La firma de la licencia no es válida", "firma")
+    except (AttributeError, ValueError, binascii.Error):
+        raise LicenciaInvalidaError("La licencia no tiene el formato esperado", "formato")
+
+    try:
+        datos = json.loads(_desde_base64(cuerpo))
+        hasta = float(datos["hasta"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise LicenciaInvalidaError("La licencia no tiene el formato esperado", "formato")
+
+    if (time.time() if ahora is None else ahora) >= hasta:
+        raise LicenciaInvalidaError("La licencia venció", "vencida")
+    return datos
+
+
+if __name__ == "__main__":
+    privada, publica = generar_par_claves()
+    print(f"LICENCIA_CLAVE_PRIVADA={privada}")
+    print(f"LICENCIA_CLAVE_PUBLICA={publica}")
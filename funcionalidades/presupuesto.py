@@ -0,0 +1,125 @@
+"""
+Presupuesto de tiempo y cancelación cooperativa para la generación de informes.
+
+procesar_archivo consulta el presupuesto en puntos de control (entre etapas y
+entre bloques de prueba). Si el cliente cerró la conexión o se agotó el tiempo,
+se lanza GeneracionCanceladaError y el worker queda libre. Un bloque que ya corre
+en un proceso trabajador no se interrumpe: procesar_archivo solo mantiene en vuelo
+una ventana acotada de bloques, y el resto se cancela. Opcionalmente, pasado
+cierto tiempo se deja de resaltar y el resto de los bloques se inserta como
+texto plano ("modo rápido").
+"""
+
+import select
+import socket
+import time
+
+
+class GeneracionCanceladaError(Exception):
+    """La generación del informe se abortó en un punto de control."""
+
+    def __init__(self, mensaje, motivo, etapa):
+        super().__init__(mensaje)
+        self.motivo = motivo    # "cliente_desconectado" | "tiempo_agotado"
+        self.etapa = etapa
+
+
+def sonda_cliente(environ):
+    """
+    Crea una función que indica si el cliente HTTP sigue conectado, usando el
+    socket que exponen el servidor de desarrollo de Werkzeug y gunicorn.
+
+    Args:
+        environ: request.environ de la petición en curso.
+
+    Returns:
+        callable | None: Función sin argumentos que devuelve False si el
+        cliente cerró la conexión; None si el servidor no expone el socket.
+    """
+    sock = environ.get("werkzeug.socket") or environ.get("gunicorn.socket")
+    if sock is None:
+        return None
+
+    def conectado():
+        try:
+            legible, _, _ = select.select([sock], [], [], 0)
+            if not legible:
+                return True
+            # Socket legible sin datos pendientes = el otro extremo cerró
+            return sock.recv(1, socket.MSG_PEEK) != b""
+        except (OSError, ValueError):
+            # Sockets TLS no admiten MSG_PEEK, o el socket ya no es válido:
+            # ante la duda se asume que el cliente sigue conectado
+            return True
+
+    return conectado
+
+
+class PresupuestoGeneracion:
+    """
+    Límite de tiempo total de un informe, con cancelación por desconexión.
+
+    Args:
+        tiempo_maximo: Segundos totales permitidos (None o 0 = sin límite).
+        tiempo_resaltado: Segundos tras los cuales se deja de resaltar
+            (None o 0 = siempre se resalta).
+        cliente_conectado: Función de sonda_cliente() o None.
+    """
+
+    # Intervalo mínimo entre sondeos del socket del cliente (segundos)
+    INTERVALO_SONDEO = 0.5
+
+    def __init__(self, tiempo_maximo=None, tiempo_resaltado=None, cliente_conectado=None):
+        self.inicio = time.monotonic()
+        self.tiempo_maximo = tiempo_maximo or None
+        self.tiempo_resaltado = tiempo_resaltado or None
+        self.cliente_conectado = cliente_conectado
+        self._ultimo_sondeo = 0.0
+
+    def transcurrido(self):
+        return time.monotonic() - self.inicio
+
+    def restante(self):
+        """Segundos que quedan del presupuesto total (None = sin límite)."""
+        if self.tiempo_maximo is None:
+            return None
+        return max(0.0, self.tiempo_maximo - self.transcurrido())
+
+    def restante_resaltado(self):
+        """Segundos que quedan para seguir resaltando (None = sin límite)."""
+        if self.tiempo_resaltado is None:
+            return self.restante()
+        margen = max(0.0, self.tiempo_resaltado - self.transcurrido())
+        total = self.restante()
+        return margen if total is None else min(margen, total)
+
+    def permite_resaltado(self):
+        """False cuando se pasó al modo rápido (texto sin resaltar)."""
+        return self.tiempo_resaltado is None or self.transcurrido() < self.tiempo_resaltado
+
+    def verificar(self, etapa):
+        """
+        Punto de control: aborta si se agotó el tiempo o el cliente se fue.
+
+        Raises:
+            GeneracionCanceladaError
+        """
+        if self.tiempo_maximo is not None and self.transcurrido() >= self.tiempo_maximo:
+            raise GeneracionCanceladaError(
+                "El informe superó el tiempo máximo de generación.",
+                "tiempo_agotado",
+                etapa,
+            )
+
+        if self.cliente_conectado is None:
+            return
+        ahora = time.monotonic()
+        if ahora - self._ultimo_sondeo < self.INTERVALO_SONDEO:
+            return
+        self._ultimo_sondeo = ahora
+        if not self.cliente_conectado():
+            raise GeneracionCanceladaError(
+                "El cliente cerró la conexión.",
+                "cliente_desconectado",
+                etapa,
+            )
@@ -0,0 +1,332 @@
+"""
+Regresión de resaltado y tiempos para todas las reglas de CONFIGS.
+
+Ejecuta cada conjunto de reglas (file_type, prueba) sobre un bloque de ejemplo
+del corpus y compara el mapa de resaltado resultante contra un archivo
+"golden". También mide el tiempo de subrayar_texto por conjunto de reglas y
+falla si empeora más allá de un umbral respecto de la línea base guardada.
+
+Los tiempos se guardan relativos a una carga de calibración medida junto a
+cada caso, para descontar la velocidad de la máquina en ese momento, y la
+línea base es local: no se versiona (solo los goldens van al repositorio).
+Si no existe, la primera corrida sin diferencias la crea.
+
+Uso (desde la raíz del proyecto, antes de desplegar):
+    python -m funcionalidades.regresion
+    python -m funcionalidades.regresion --actualizar     # regenera goldens y tiempos
+    python -m funcionalidades.regresion --sin-tiempos    # solo compara salida
+
+Estructura de datos:
+    regresion_datos/corpus/<modelo>/prueba_<n>.txt   bloque INICIO..FIN PRUEBA n
+    regresion_datos/golden/<modelo>_prueba_<n>.json  mapa de resaltado esperado
+    regresion_datos/tiempos.json                     línea base local de tiempos relativos
+"""
+
+import argparse
+import gc
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from lxml import etree
+from .bloques import limpiar_texto_xml, llenar_parrafo
+from .resaltado import CONFIGS, subrayar_texto
+
+DIRECTORIO_DATOS = Path(__file__).resolve().parent / "regresion_datos"
+DIRECTORIO_CORPUS = DIRECTORIO_DATOS / "corpus"
+DIRECTORIO_GOLDEN = DIRECTORIO_DATOS / "golden"
+ARCHIVO_TIEMPOS = DIRECTORIO_DATOS / "tiempos.json"
+
+# Tamaño de fuente usado por el informe para los bloques de código
+TAMANO_FUENTE = 8
+
+# Diferencia mínima (ms) para considerar una regresión de tiempo; evita falsos
+# positivos en conjuntos de reglas que tardan muy poco
+MARGEN_MINIMO_MS = 5.0
+
+# Versión del formato de tiempos.json (una línea base de otro formato se ignora)
+FORMATO_TIEMPOS = "relativo-calibracion-1"
+
+# Carga de calibración: expresiones regulares y XML sobre líneas con el aspecto
+# de una salida de show, sin pasar por el código que se está midiendo
+TEXTO_CALIBRACION = [
+    f"Gi1/0/{i}   connected   {i % 4094}   a-full   a-1000   10/100/1000BaseTX   Power OK {i * 37}"
+    for i in range(1, 300)
+]
+PATRON_CALIBRACION = re.compile(r"\d+/\d+/\d+|connected|Power\s+OK|a-\w+")
+REPETICIONES_CALIBRACION = 3
+
+# Mediciones por caso al crear la línea base; se guarda la mediana
+MEDICIONES_LINEA_BASE = 3
+
+
+def nombre_caso(file_type, prueba):
+    """Devuelve el identificador de archivo de un caso, ej: '9200_prueba_1'."""
+    modelo = file_type.split()[-1]
+    return f"{modelo}_prueba_{prueba}"
+
+
+def ruta_corpus(file_type, prueba):
+    """Ruta del bloque de ejemplo de un conjunto de reglas."""
+    modelo = file_type.split()[-1]
+    return DIRECTORIO_CORPUS / modelo / f"prueba_{prueba}.txt"
+
+
+def construir_parrafo(bloque):
+    """Arma el párrafo del bloque igual que el informe (sin resaltar)."""
+    para = Paragraph(OxmlElement("w:p"), None)
+    llenar_parrafo(para, limpiar_texto_xml(bloque), TAMANO_FUENTE)
+    return para
+
+
+def mapa_resaltado(para):
+    """
+    Convierte un párrafo resaltado en una lista de líneas, donde cada línea
+    es una lista de tramos [texto, color] (color None = sin resaltar).
+
+    Los tramos contiguos con el mismo color se fusionan y los vacíos se
+    descartan, de modo que la comparación depende solo del resultado visible
+    y no de cómo se dividieron internamente los runs.
+    """
+    lineas = [[]]
+    for run in para.runs:
+        texto = run.text or ""
+        rpr = run._element.rPr
+        highlight = rpr.find(qn("w:highlight")) if rpr is not None else None
+        color = highlight.get(qn("w:val")) if highlight is not None else None
+
+        partes = texto.split("\n")
+        for i, parte in enumerate(partes):
+            if i > 0:
+                lineas.append([])
+            if not parte:
+                continue
+            actual = lineas[-1]
+            if actual and actual[-1][1] == color:
+                actual[-1][0] += parte
+            else:
+                actual.append([parte, color])
+
+    # Cada línea del bloque termina con un run "\n": quitar la línea vacía final
+    if lineas and not lineas[-1]:
+        lineas.pop()
+    return lineas
+
+
+def calibrar(repeticiones=REPETICIONES_CALIBRACION):
+    """
+    Mejor tiempo (ms) de la carga de calibración. Se mide junto a cada caso:
+    dividir por este valor descuenta la velocidad de la máquina en ese momento.
+    """
+    mejor = None
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, repeticiones)):
+            inicio = time.perf_counter()
+            raiz = etree.Element("p")
+            for linea in TEXTO_CALIBRACION:
+                for coincidencia in PATRON_CALIBRACION.finditer(linea):
+                    etree.SubElement(raiz, "r").text = coincidencia.group(0)
+            transcurrido = (time.perf_counter() - inicio) * 1000
+            if mejor is None or transcurrido < mejor:
+                mejor = transcurrido
+    finally:
+        if gc_activo:
+            gc.enable()
+    return mejor
+
+
+def medir_relativo(bloque, file_type, prueba, repeticiones):
+    """
+    Mide un caso alternando cada ejecución con una calibración, de modo que
+    cada cociente compara dos mediciones tomadas en el mismo momento.
+
+    Returns:
+        tuple: (mapa de resaltado, mejor tiempo en ms, mediana del tiempo
+        relativo a la calibración)
+    """
+    mapa = None
+    tiempos = []
+    relativos = []
+    for _ in range(max(1, repeticiones)):
+        calibracion = calibrar()
+        mapa, ms = medir(bloque, file_type, prueba, 1)
+        tiempos.append(ms)
+        relativos.append(ms / calibracion)
+    return mapa, min(tiempos), statistics.median(relativos)
+
+
+def es_regresion(ms, relativo, base, umbral):
+    """True si el tiempo relativo empeoró más del umbral y de MARGEN_MINIMO_MS."""
+    return relativo > base * (1 + umbral) and ms - ms * base / relativo > MARGEN_MINIMO_MS
+
+
+def medir(bloque, file_type, prueba, repeticiones):
+    """
+    Ejecuta subrayar_texto `repeticiones` veces sobre párrafos nuevos.
+
+    Returns:
+        tuple: (mapa de resaltado de la última ejecución, mejor tiempo en ms)
+    """
+    mejor = None
+    para = None
+    # Igual que timeit: sin recolector de basura durante la medición
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, repeticiones)):
+            para = construir_parrafo(bloque)
+            inicio = time.perf_counter()
+            subrayar_texto([para], file_type, prueba)
+            transcurrido = (time.perf_counter() - inicio) * 1000
+            if mejor is None or transcurrido < mejor:
+                mejor = transcurrido
+    finally:
+        if gc_activo:
+            gc.enable()
+    return mapa_resaltado(para), mejor
+
+
+def primera_diferencia(esperado, obtenido):
+    """Describe la primera línea que difiere entre dos mapas de resaltado."""
+    for i, (linea_esp, linea_obt) in enumerate(zip(esperado, obtenido), start=1):
+        if linea_esp != linea_obt:
+            return f"línea {i}: esperado {linea_esp} / obtenido {linea_obt}"
+    return f"cantidad de líneas: esperado {len(esperado)} / obtenido {len(obtenido)}"
+
+
+def leer_json(ruta, por_defecto):
+    if not ruta.exists():
+        return por_defecto
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def escribir_json(ruta, datos):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+
+
+def ejecutar(actualizar=False, umbral=0.5, repeticiones=10, medir_tiempos=True):
+    """
+    Recorre todos los conjuntos de reglas de CONFIGS.
+
+    Args:
+        actualizar: Si es True, reescribe goldens y línea base local de tiempos.
+        umbral: Empeoramiento relativo tolerado (0.5 = 50% más lento).
+        repeticiones: Ejecuciones por caso, cada una con su calibración; se
+            compara la mediana del tiempo relativo.
+        medir_tiempos: Si es False, solo se compara la salida.
+
+    Returns:
+        int: Código de salida (0 = sin diferencias, 1 = hubo fallas).
+    """
+    DIRECTORIO_GOLDEN.mkdir(parents=True, exist_ok=True)
+    guardado = leer_json(ARCHIVO_TIEMPOS, {})
+    tiempos_base = guardado.get("casos", {}) if guardado.get("formato") == FORMATO_TIEMPOS else {}
+    tiempos_nuevos = {}
+    fallas = 0
+
+    for file_type, prueba in CONFIGS:
+        caso = nombre_caso(file_type, prueba)
+        corpus = ruta_corpus(file_type, prueba)
+        if not corpus.exists():
+            print(f"[FALTA]  {caso}: no existe {corpus}")
+            fallas += 1
+            continue
+
+        bloque = corpus.read_text(encoding="utf-8")
+        obtenido, ms, relativo = medir_relativo(bloque, file_type, prueba, repeticiones if medir_tiempos else 1)
+        if medir_tiempos and (actualizar or not tiempos_base):
+            relativo = statistics.median([relativo] + [
+                medir_relativo(bloque, file_type, prueba, repeticiones)[2]
+                for _ in range(MEDICIONES_LINEA_BASE - 1)
+            ])
+        tiempos_nuevos[caso] = round(relativo, 4)
+        ruta_golden = DIRECTORIO_GOLDEN / f"{caso}.json"
+
+        if actualizar:
+            escribir_json(ruta_golden, {
+                "file_type": file_type,
+                "prueba": prueba,
+                "lineas": obtenido,
+            })
+            print(f"[ACTUALIZADO] {caso}: {ms:.2f} ms")
+            continue
+
+        golden = leer_json(ruta_golden, None)
+        if golden is None:
+            print(f"[FALTA]  {caso}: no existe {ruta_golden} (ejecutar con --actualizar)")
+            fallas += 1
+            continue
+
+        if golden["lineas"] != obtenido:
+            print(f"[SALIDA] {caso}: {primera_diferencia(golden['lineas'], obtenido)}")
+            fallas += 1
+            continue
+
+        if not medir_tiempos:
+            print(f"[OK]     {caso}")
+            continue
+
+        base = tiempos_base.get(caso)
+        if base is None:
+            print(f"[OK]     {caso}: {ms:.2f} ms, x{relativo:.2f} calibración (sin línea base)")
+            continue
+        if es_regresion(ms, relativo, base, umbral):
+            # Se confirma con una segunda medición antes de dar la falla
+            _, ms_repetido, relativo_repetido = medir_relativo(bloque, file_type, prueba, repeticiones)
+            if relativo_repetido < relativo:
+                ms, relativo = ms_repetido, relativo_repetido
+        if es_regresion(ms, relativo, base, umbral):
+            print(f"[TIEMPO] {caso}: {ms:.2f} ms, x{relativo:.2f} calibración "
+                  f"(base x{base:.2f}, +{(relativo / base - 1) * 100:.0f}%)")
+            fallas += 1
+        else:
+            print(f"[OK]     {caso}: {ms:.2f} ms, x{relativo:.2f} calibración (base x{base:.2f})")
+
+    if medir_tiempos and (actualizar or (not tiempos_base and not fallas)):
+        escribir_json(ARCHIVO_TIEMPOS, {"formato": FORMATO_TIEMPOS, "casos": tiempos_nuevos})
+        if not actualizar:
+            print(f"\nLínea base local de tiempos creada en {ARCHIVO_TIEMPOS}")
+
+    total = len(CONFIGS)
+    if fallas:
+        print(f"\n{fallas} de {total} conjuntos de reglas con diferencias")
+        return 1
+    print(f"\n{total} conjuntos de reglas sin diferencias")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m funcionalidades.regresion",
+        description="Compara el resaltado de cada conjunto de reglas contra los goldens y mide tiempos.",
+    )
+    parser.add_argument("--actualizar", action="store_true",
+                        help="regenerar goldens y línea base local de tiempos con la salida actual")
+    parser.add_argument("--umbral", type=float, default=0.5,
+                        help="empeoramiento relativo de tiempo tolerado (por defecto 0.5 = 50%%)")
+    parser.add_argument("--repeticiones", type=int, default=10,
+                        help="ejecuciones por caso; se usa la mediana del tiempo relativo (por defecto 10)")
+    parser.add_argument("--sin-tiempos", action="store_true",
+                        help="comparar solo la salida, sin medir tiempos")
+    args = parser.parse_args(argv)
+
+    return ejecutar(
+        actualizar=args.actualizar,
+        umbral=args.umbral,
+        repeticiones=args.repeticiones,
+        medir_tiempos=not args.sin_tiempos,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
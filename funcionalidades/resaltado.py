@@ -1,7 +1,6 @@
-from docx.oxml.ns import qn
 import re
 from copy import deepcopy
-from .colores import resaltado_fallido, resaltado_na, resaltado_ok, resaltado_opcional
+from .colores import ContextoResaltado, resaltado_fallido, resaltado_na, resaltado_ok, resaltado_opcional
 from .modelos._9200 import prueba_1_9200, prueba_2_9200,prueba_3_9200,prueba_4_9200, prueba_5_9200
 from .modelos._9300 import prueba_1_9300, prueba_2_9300, prueba_3_9300, prueba_4_9300, prueba_5_9300
 from .modelos._9500 import prueba_1_9500, prueba_2_9500, prueba_3_9500, prueba_4_9500, prueba_5_9500
@@ -10,11 +9,10 @@ from .modelos._9500 import prueba_1_9500, prueba_2_9500, prueba_3_9500, prueba_4
 # Helpers de resaltado
 # --------------------------------------
 
-def ya_procesado(run):
-    rpr = run._element.get_or_add_rPr()
-    return rpr.find(qn('w:highlight')) is not None
+def ya_procesado(run, contexto):
+    return contexto.procesado(run)
 
-def highlight_partial(run, match, shading_func):
+def highlight_partial(run, match, shading_func, contexto=None):
     text = run.text or ""
     start, end = match.span(1)
     before, middle, after = text[:start], text[start:end], text[end:]
@@ -31,7 +29,7 @@ def highlight_partial(run, match, shading_func):
     elm_mid = deepcopy(elm)
     elm_mid.text = middle
     shaded_run = run.__class__(elm_mid, run._parent)
-    shading_func(shaded_run)
+    shading_func(shaded_run, contexto)
     parent.insert(idx+1, elm_mid)
     # 3) Después
     elm_after = deepcopy(elm)
@@ -40,10 +38,10 @@ def highlight_partial(run, match, shading_func):
     # Eliminar run original
     parent.remove(elm)
 
-def highlight_line(run, shading_func):
-    shading_func(run)
+def highlight_line(run, shading_func, contexto=None):
+    shading_func(run, contexto)
 
-def highlight_to_end(run, match, shading_func):
+def highlight_to_end(run, match, shading_func, contexto=None):
     text = run.text or ""
     try:
         start = match.span(1)[0]
@@ -52,9 +50,9 @@ def highlight_to_end(run, match, shading_func):
     class DummyMatch:
         def span(self, grp):
             return (start, len(text))
-    highlight_partial(run, DummyMatch(), shading_func)
+    highlight_partial(run, DummyMatch(), shading_func, contexto)
 
-def highlight_right_excluding(run, match, shading_func):
+def highlight_right_excluding(run, match, shading_func, contexto=None):
     text = run.text or ""
     _, end = match.span(1)
     if end >= len(text):
@@ -62,9 +60,9 @@ def highlight_right_excluding(run, match, shading_func):
     class DummyMatch:
         def span(self, grp):
             return (end, len(text))
-    highlight_partial(run, DummyMatch(), shading_func)
+    highlight_partial(run, DummyMatch(), shading_func, contexto)
 
-def highlight_until(run, match, end_word, shading_func):
+def highlight_until(run, match, end_word, shading_func, contexto=None):
     text = run.text or ""
     start = match.span(1)[0]
     idx_rel = re.search(re.escape(end_word), text[start:], re.IGNORECASE)
@@ -75,7 +73,7 @@ def highlight_until(run, match, end_word, shading_func):
     class DummyMatch:
         def span(self, grp):
             return (start, end)
-    highlight_partial(run, DummyMatch(), shading_func)
+    highlight_partial(run, DummyMatch(), shading_func, contexto)
 
 # --------------------------------------
 # Lógica de aplicación de estilo
@@ -84,30 +82,30 @@ def highlight_until(run, match, end_word, shading_func):
 def apply_behavior(run, match, word,
                    pt_linea, pt_to_end, pt_until_comma,
                    pt_derecha_excluyendo, pt_until_next,
-                   shading_func=resaltado_ok):
+                   shading_func=resaltado_ok, contexto=None):
 
     if word in pt_linea:
-        highlight_line(run, shading_func)
+        highlight_line(run, shading_func, contexto)
         return
 
     if word in pt_to_end:
-        highlight_to_end(run, match, shading_func)
+        highlight_to_end(run, match, shading_func, contexto)
         return
 
     if word in pt_until_comma:
-        highlight_partial(run, match, shading_func)
+        highlight_partial(run, match, shading_func, contexto)
         return
 
     if word in pt_derecha_excluyendo:
-        highlight_right_excluding(run, match, shading_func)
+        highlight_right_excluding(run, match, shading_func, contexto)
         return
 
     for start_word, end_word in pt_until_next:
         if word.lower() == start_word.lower():
-            highlight_until(run, match, end_word, shading_func)
+            highlight_until(run, match, end_word, shading_func, contexto)
             return
 
-    highlight_partial(run, match, shading_func)
+    highlight_partial(run, match, shading_func, contexto)
 
 # --------------------------------------
 # Patrones especiales
@@ -129,6 +127,9 @@ def subrayar_texto(paragraphs, file_type, contador):
      pt_until_next,
      pt_nth) = seleccion_modelos(file_type, contador)
 
+    # Estado de resaltado en memoria: el XML se escribe una sola vez al final
+    contexto = ContextoResaltado()
+
     # -----------------------------------------
     # Primera pasada: bloques "hasta next"
     # -----------------------------------------
@@ -136,23 +137,23 @@ def subrayar_texto(paragraphs, file_type, contador):
         for para in paragraphs:
             found = False
             for run in para.runs:
-                if ya_procesado(run):
+                if ya_procesado(run, contexto):
                     continue
                 text = run.text or ""
                 if not found:
                     m0 = re.search(r'(' + re.escape(start_word) + r')', text, re.IGNORECASE)
                     if m0:
-                        highlight_to_end(run, m0, shading_map[start_word.lower()])
+                        highlight_to_end(run, m0, shading_map[start_word.lower()], contexto)
                         found = True
                     continue
                 m1 = re.search(re.escape(end_word), text, re.IGNORECASE)
                 if m1:
                     class DummyMatchEnd:
                         def span(self, grp): return (0, m1.start())
-                    highlight_partial(run, DummyMatchEnd(), shading_map[start_word.lower()])
+                    highlight_partial(run, DummyMatchEnd(), shading_map[start_word.lower()], contexto)
                     break
                 else:
-                    highlight_line(run, shading_map[start_word.lower()])
+                    highlight_line(run, shading_map[start_word.lower()], contexto)
 
     # -----------------------------------------
     # Segunda pasada: lógica normal pt_todas/pt_unicas
@@ -169,21 +170,21 @@ def subrayar_texto(paragraphs, file_type, contador):
         while True:
             changed = False
             for run in list(para.runs):
-                if ya_procesado(run):
+                if ya_procesado(run, contexto):
                     continue
                 txt = run.text or ""
                 low = txt.lower()
                 # Casos especiales 
                 if pattern_na.search(low):
-                    resaltado_na(run)
+                    resaltado_na(run, contexto)
                     changed = True
                     continue
                 if pattern_fail.search(low):
-                    resaltado_fallido(run)
+                    resaltado_fallido(run, contexto)
                     changed = True
                     continue
                 if pattern_optional.search(low):
-                    resaltado_opcional(run)
+                    resaltado_opcional(run, contexto)
                     changed = True
                     continue
                 # Procesar el orden forzado
@@ -203,7 +204,8 @@ def subrayar_texto(paragraphs, file_type, contador):
                             pt_linea, pt_to_end, pt_until_comma,
                             pt_derecha_excluyendo,
                             [],  # omitimos pt_until_next aquí
-                            shading_func=func
+                            shading_func=func,
+                            contexto=contexto
                         )
                         changed = True
                         if palabra in pt_unicas:
@@ -220,7 +222,7 @@ def subrayar_texto(paragraphs, file_type, contador):
         patron = re.compile(r'(' + re.escape(palabra) + r')', re.IGNORECASE)
         for para in paragraphs:
             for run in para.runs:
-                if ya_procesado(run):
+                if ya_procesado(run, contexto):
                     continue
                 txt = run.text or ""
                 for m in patron.finditer(txt):
@@ -232,7 +234,8 @@ def subrayar_texto(paragraphs, file_type, contador):
                             pt_linea, pt_to_end, pt_until_comma,
                             pt_derecha_excluyendo,
                             [],            # pt_until_next ya no aplica aquí
-                            shading_func=func
+                            shading_func=func,
+                            contexto=contexto
                         )
                         break
                 if count == target:
@@ -240,6 +243,9 @@ def subrayar_texto(paragraphs, file_type, contador):
             if count == target:
                 break
 
+    # Volcar al XML los colores acumulados (un w:highlight por run)
+    contexto.aplicar()
+
 def seleccion_modelos(file_type, contador):
     key = (file_type, contador)
     if key not in CONFIGS:
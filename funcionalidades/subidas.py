@@ -0,0 +1,239 @@
+"""
+Subida reanudable de capturas en bloques comprimidos.
+
+La aplicación de escritorio divide la transcripción en bloques de tamaño fijo,
+envía primero el manifiesto (tamaño, SHA-256 del archivo y de cada bloque) y
+luego solo los bloques que el servidor no tiene, comprimidos con gzip. Los
+bloques se guardan por hash en un almacén por usuario: si la subida se corta,
+al reintentar se retoma desde donde quedó, y una transcripción que creció
+(corrida reanudada) solo envía los bloques nuevos. Al completar se arma el
+archivo y se verifica su hash.
+
+Estructura en disco:
+    <SUBIDAS_DIR>/<id_usuario>/bloques/<sha256>.gz    bloque comprimido
+    <SUBIDAS_DIR>/<id_usuario>/subidas/<sha256>.json  manifiesto de la subida
+    <SUBIDAS_DIR>/<id_usuario>/capturas/<nombre>      captura completa
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+
+# Tamaños de bloque aceptados (bytes sin comprimir)
+TAMANO_BLOQUE_MINIMO = 64 * 1024
+TAMANO_BLOQUE_MAXIMO = 4 * 1024 * 1024
+
+PATRON_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class SubidaError(Exception):
+    """Petición de subida inválida; `estado` es el código HTTP a responder."""
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _escribir_atomico(ruta, datos):
+    """Escribe en un temporal del mismo directorio y lo renombra (sin archivos a medias)."""
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(datos)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def descomprimir_bloque(datos, tamano_maximo):
+    """
+    Descomprime un bloque gzip sin superar `tamano_maximo` bytes de salida.
+
+    Raises:
+        SubidaError: Si los datos no son gzip válido o exceden el tamaño.
+    """
+    descompresor = zlib.decompressobj(wbits=31)
+    try:
+        contenido = descompresor.decompress(datos, tamano_maximo + 1)
+    except zlib.error:
+        raise SubidaError("El bloque no es un gzip válido")
+    if len(contenido) > tamano_maximo or descompresor.unconsumed_tail:
+        raise SubidaError("El bloque excede el tamaño declarado", 413)
+    if not descompresor.eof:
+        raise SubidaError("El bloque gzip está incompleto")
+    return contenido
+
+
+class AlmacenSubidas:
+    """
+    Manifiestos, bloques y capturas subidas, por usuario.
+
+    Se inicializa como las extensiones de Flask:
+        almacen_subidas = AlmacenSubidas()
+        almacen_subidas.init_app(app)
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.directorio = "subidas"
+        self.tamano_maximo = 20 * 1024 * 1024
+        self.retencion_bloques = 7 * 24 * 3600
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directorio = app.config.get("SUBIDAS_DIR", "subidas")
+        self.tamano_maximo = app.config.get("MAX_FILE_SIZE_TXT", 20 * 1024 * 1024)
+        self.retencion_bloques = app.config.get("SUBIDAS_RETENCION_DIAS", 7) * 24 * 3600
+        app.extensions["subidas_capturas"] = self
+
+    def _carpeta(self, id_usuario, tipo):
+        carpeta = os.path.join(self.directorio, str(id_usuario), tipo)
+        os.makedirs(carpeta, exist_ok=True)
+        return carpeta
+
+    def _ruta_bloque(self, id_usuario, sha256):
+        return os.path.join(self._carpeta(id_usuario, "bloques"), f"{sha256}.gz")
+
+    def _ruta_manifiesto(self, id_usuario, id_subida):
+        if not PATRON_SHA256.match(id_subida or ""):
+            raise SubidaError("Identificador de subida inválido", 404)
+        return os.path.join(self._carpeta(id_usuario, "subidas"), f"{id_subida}.json")
+
+    def _leer_manifiesto(self, id_usuario, id_subida):
+        try:
+            with open(self._ruta_manifiesto(id_usuario, id_subida), encoding="utf-8") as archivo:
+                return json.load(archivo)
+        except FileNotFoundError:
+            raise SubidaError("La subida no existe o ya se completó", 404)
+
+    def _faltantes(self, id_usuario, manifiesto):
+        return [
+            indice for indice, sha256 in enumerate(manifiesto["bloques"])
+            if not os.path.exists(self._ruta_bloque(id_usuario, sha256))
+        ]
+
+    def _purgar_bloques(self, id_usuario):
+        """Borra los bloques sin uso hace más de la retención configurada."""
+        limite = time.time() - self.retencion_bloques
+        carpeta = self._carpeta(id_usuario, "bloques")
+        for nombre in os.listdir(carpeta):
+            ruta = os.path.join(carpeta, nombre)
+            try:
+                if os.path.getmtime(ruta) < limite:
+                    os.unlink(ruta)
+            except OSError:
+                pass
+
+    def iniciar(self, id_usuario, nombre, tamano, sha256, tamano_bloque, bloques):
+        """
+        Registra (o retoma) la subida de una captura.
+
+        La subida se identifica por el SHA-256 del archivo, así que reintentar
+        con el mismo archivo retoma la anterior.
+
+        Returns:
+            dict: {"id_subida", "faltantes": [índices de bloque a enviar]}
+
+        Raises:
+            SubidaError: Si el manifiesto es inválido o excede los límites.
+        """
+        if not nombre:
+            raise SubidaError("Falta el nombre del archivo")
+        if not isinstance(tamano, int) or not 0 < tamano <= self.tamano_maximo:
+            raise SubidaError("Tamaño de archivo inválido o mayor al permitido", 413)
+        if not isinstance(tamano_bloque, int) or not TAMANO_BLOQUE_MINIMO <= tamano_bloque <= TAMANO_BLOQUE_MAXIMO:
+            raise SubidaError("Tamaño de bloque fuera de rango")
+        if not isinstance(sha256, str) or not PATRON_SHA256.match(sha256):
+            raise SubidaError("SHA-256 del archivo inválido")
+        if (
+            not isinstance(bloques, list)
+            or len(bloques) != math.ceil(tamano / tamano_bloque)
+            or not all(isinstance(b, str) and PATRON_SHA256.match(b) for b in bloques)
+        ):
+            raise SubidaError("La lista de hashes de bloques no coincide con el tamaño")
+
+        manifiesto = {
+            "nombre": nombre,
+            "tamano": tamano,
+            "sha256": sha256,
+            "tamano_bloque": tamano_bloque,
+            "bloques": bloques,
+        }
+        with self._lock:
+            self._purgar_bloques(id_usuario)
+            _escribir_atomico(
+                self._ruta_manifiesto(id_usuario, sha256),
+                json.dumps(manifiesto).encode("utf-8"),
+            )
+        return {"id_subida": sha256, "faltantes": self._faltantes(id_usuario, manifiesto)}
+
+    def guardar_bloque(self, id_usuario, id_subida, indice, datos_gzip):
+        """
+        Verifica y guarda un bloque comprimido de la subida.
+
+        Raises:
+            SubidaError: Si el índice no existe o el contenido no coincide con su hash.
+        """
+        manifiesto = self._leer_manifiesto(id_usuario, id_subida)
+        if not 0 <= indice < len(manifiesto["bloques"]):
+            raise SubidaError("Índice de bloque fuera de rango", 404)
+
+        contenido = descomprimir_bloque(datos_gzip, manifiesto["tamano_bloque"])
+        esperado = manifiesto["bloques"][indice]
+        if hashlib.sha256(contenido).hexdigest() != esperado:
+            raise SubidaError("El contenido del bloque no coincide con su hash", 422)
+
+        ruta = self._ruta_bloque(id_usuario, esperado)
+        if os.path.exists(ruta):
+            os.utime(ruta)
+        else:
+            _escribir_atomico(ruta, datos_gzip)
+
+    def completar(self, id_usuario, id_subida):
+        """
+        Arma la captura con sus bloques y verifica tamaño y hash.
+
+        Returns:
+            dict: {"archivo": nombre guardado, "tamano", "sha256"}
+
+        Raises:
+            SubidaError: 409 si faltan bloques, 422 si el archivo armado no coincide.
+        """
+        manifiesto = self._leer_manifiesto(id_usuario, id_subida)
+        faltantes = self._faltantes(id_usuario, manifiesto)
+        if faltantes:
+            raise SubidaError(f"Faltan {len(faltantes)} bloques por subir", 409)
+
+        carpeta = self._carpeta(id_usuario, "capturas")
+        nombre = f"{manifiesto['sha256'][:12]}_{manifiesto['nombre']}"
+        descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+        resumen = hashlib.sha256()
+        tamano = 0
+        try:
+            with os.fdopen(descriptor, "wb") as destino:
+                for sha256 in manifiesto["bloques"]:
+                    with gzip.open(self._ruta_bloque(id_usuario, sha256), "rb") as bloque:
+                        contenido = bloque.read()
+                    resumen.update(contenido)
+                    tamano += len(contenido)
+                    destino.write(contenido)
+            if tamano != manifiesto["tamano"] or resumen.hexdigest() != manifiesto["sha256"]:
+                raise SubidaError("La captura armada no coincide con el manifiesto", 422)
+            os.replace(temporal, os.path.join(carpeta, nombre))
+        except BaseException:
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+            raise
+
+        os.unlink(self._ruta_manifiesto(id_usuario, id_subida))
+        return {"archivo": nombre, "tamano": tamano, "sha256": manifiesto["sha256"]}
@@ -1,33 +1,56 @@
 #!/usr/bin/env python3
 """
 Script para pruebas de diagnóstico en switches Cisco Catalyst 9200
-Conexión via cable consola usando pyserial
+Conexión via cable consola (pyserial) o servidor de consolas por TCP, con la
+sesión de consola compartida con la aplicación (consola/)
 
 Uso:
     1. Instalar pyserial: pip install pyserial
-    2. Ajustar PUERTO_SERIAL según tu sistema
-    3. Ejecutar: python cisco_9200_test.py
+    2. Ajustar PUERTO_SERIAL según tu sistema (o usar --puerto)
+    3. Ejecutar: python script_modelos/9200.py
+                 python script_modelos/9200.py --puerto telnet://10.0.0.5:2003
 """
 
-import serial
+import argparse
+import os
+import sys
 import time
-import re
 from datetime import datetime
 
+# La sesión de consola (lectura por prompt, enable, paginación, transportes)
+# es la misma que usa exe/appLocal.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from consola.sesion import (
+    INTERVALO_CONFIRMACION_RELOAD,
+    INTERVALO_SEGUIMIENTO_ARRANQUE,
+    MENSAJES_INICIO_RELOAD,
+    SILENCIO_FIN_ARRANQUE,
+    TIMEOUT_ARRANQUE_MAXIMO,
+    TIMEOUT_CONFIRMACION_RELOAD,
+    SeguimientoArranque,
+    abrir_conexion_serial,
+    configurar_terminal,
+    contar_fuentes_poder,
+    contar_ventiladores,
+    despertar_consola,
+    ejecutar_comando_completo,
+    entrar_modo_enable,
+    estabilizar_consola_post_reload,
+    leer_fragmento_consola,
+)
+from consola.transportes import cerrar_conexion_serial
+
 
 # =====================
 # CONFIGURACIÓN GENERAL 
 # =====================
 
-# Puerto serial
+# Puerto serial (COM3, /dev/ttyUSB0) o servidor de consolas (telnet:// o socket://host:puerto)
 PUERTO_SERIAL = "COM3"
 
 # Configuración estándar para consola Cisco
 BAUDRATE = 9600
-BYTESIZE = serial.EIGHTBITS
-PARITY = serial.PARITY_NONE
-STOPBITS = serial.STOPBITS_ONE
-TIMEOUT_LECTURA = 2  # segundos
 
 # Credenciales 
 PASSWORD_ENABLE = "admin"  # Contraseña para modo privilegiado
@@ -35,302 +58,8 @@ PASSWORD_ENABLE = "admin"  # Contraseña para modo privilegiado
 # Archivo de salida
 ARCHIVO_SALIDA = "resultado_pruebas_cisco_9200_PRUEBASW2.txt" #Falta modificar para que tenga el nombre del modelo al igual que el informe
 
-# Tiempos de espera (segundos)
-ESPERA_COMANDO = 1
-ESPERA_RELOAD = 180  # 3 minutos para el reload
-
-
-# =============================================================================
-# FUNCIONES DE CONEXIÓN SERIAL
-# =============================================================================
-
-def abrir_conexion_serial(puerto, baudrate):
-    """
-    Abre una conexión serial con el dispositivo Cisco.
-    
-    Args:
-        puerto: Puerto serial
-        baudrate: Velocidad de transmisión (Configurada en 9600)
-    
-    Returns:
-        Objeto serial si la conexión es exitosa, None si falla
-    """
-    try:
-        conexion = serial.Serial(
-            port=puerto,
-            baudrate=baudrate,
-            bytesize=BYTESIZE,
-            parity=PARITY,
-            stopbits=STOPBITS,
-            timeout=TIMEOUT_LECTURA,
-            xonxoff=False,
-            rtscts=False,
-            dsrdtr=False
-        )
-        #print(f"[OK] Conexión establecida en {puerto} a {baudrate} baudios")
-        return conexion
-    
-    except serial.SerialException as error:
-        #print(f"[ERROR] No se pudo abrir el puerto {puerto}: {error}")
-        return None
-
-
-def cerrar_conexion_serial(conexion):
-    """
-    Cierra la conexión serial de forma segura.
-    
-    Args:
-        conexion: Objeto serial a cerrar
-    """
-    if conexion and conexion.is_open:
-        conexion.close()
-        #print("[OK] Conexión serial cerrada")
-
-
-# =============================================
-# FUNCIONES DE COMUNICACIÓN CON EL DISPOSITIVO
-# =============================================
-
-def leer_respuesta_completa(conexion, timeout_total=10):
-    """
-    Lee la respuesta completa del dispositivo hasta que no haya más datos.
-    
-    Args:
-        conexion: Objeto serial activo
-        timeout_total: Tiempo máximo de espera total (segundos)
-    
-    Returns:
-        String con toda la respuesta recibida
-    """
-    respuesta_completa = ""
-    tiempo_inicio = time.time()
-    
-    while True:
-        # Verificar timeout total
-        if time.time() - tiempo_inicio > timeout_total:
-            break
-        
-        # Leer bytes disponibles
-        if conexion.in_waiting > 0:
-            datos = conexion.read(conexion.in_waiting)
-            try:
-                respuesta_completa += datos.decode('ascii', errors='ignore')
-            except:
-                respuesta_completa += datos.decode('latin-1', errors='ignore')
-            tiempo_inicio = time.time()  # Resetear timeout si recibimos datos
-        else:
-            # Si no hay datos, esperar un poco
-            time.sleep(0.1)
-            
-            # Si después de esperar sigue sin datos, verificar si terminó
-            if conexion.in_waiting == 0:
-                time.sleep(0.5)
-                if conexion.in_waiting == 0:
-                    break
-    
-    return respuesta_completa
-
-
-def enviar_comando(conexion, comando, espera=ESPERA_COMANDO):
-    """
-    Envía un comando al dispositivo y espera la respuesta.
-    
-    Args:
-        conexion: Objeto serial activo
-        comando: Comando a enviar (string)
-        espera: Tiempo de espera después del comando (segundos)
-    
-    Returns:
-        String con la respuesta del dispositivo
-    """
-    # Limpiar buffer de entrada antes de enviar
-    conexion.reset_input_buffer()
-    
-    # Enviar comando con retorno de ¿'carro'?
-    comando_bytes = (comando + "\n").encode('ascii')
-    conexion.write(comando_bytes)
-    
-    #print(f"[ENVIADO] {comando}")
-    
-    # Esperar a que el dispositivo procese el comando
-    time.sleep(espera)
-    
-    # Leer toda la respuesta disponible
-    respuesta = leer_respuesta_completa(conexion)
-    
-    return respuesta
-
-
-def manejar_more_prompt(conexion, respuesta):
-    """
-    Maneja el prompt '--More--' que aparece en salidas largas de Cisco.
-    Envía espacio para continuar hasta obtener toda la salida.
-    
-    Args:
-        conexion: Objeto serial activo
-        respuesta: Respuesta inicial del comando
-    
-    Returns:
-        String con la respuesta completa (sin --More--)
-    """
-    respuesta_total = respuesta
-    
-    while "--More--" in respuesta_total:
-        # Enviar espacio para continuar
-        conexion.write(b" ")
-        time.sleep(0.5)
-        
-        # Leer más datos
-        nueva_respuesta = leer_respuesta_completa(conexion, timeout_total=5)
-        
-        # Limpiar el --More-- de la respuesta anterior
-        respuesta_total = respuesta_total.replace("--More--", "")
-        respuesta_total += nueva_respuesta
-    
-    return respuesta_total
-
-
-def ejecutar_comando_completo(conexion, comando, espera=ESPERA_COMANDO):
-    """
-    Ejecuta un comando y maneja automáticamente el paginado --More--.
-    
-    Args:
-        conexion: Objeto serial activo
-        comando: Comando a ejecutar
-        espera: Tiempo de espera después del comando
-    
-    Returns:
-        String con la respuesta completa del comando
-    """
-    respuesta = enviar_comando(conexion, comando, espera)
-    respuesta = manejar_more_prompt(conexion, respuesta)
-    return respuesta
-
-
-# =========================================
-# FUNCIONES DE AUTENTICACIÓN Y PREPARACIÓN
-# =========================================
-
-def despertar_consola(conexion):
-    """
-    'Despierta' la consola enviando Enter para obtener el prompt.
-    
-    Args:
-        conexion: Objeto serial activo
-    
-    Returns:
-        String con la respuesta (debería mostrar el prompt)
-    """
-    print("[INFO] Despertando consola...")
-    
-    # Enviar varios Enter para activar la consola
-    for _ in range(3):
-        conexion.write(b"\r\n")
-        time.sleep(0.5)
-    
-    respuesta = leer_respuesta_completa(conexion, timeout_total=5)
-    return respuesta
-
-
-def entrar_modo_enable(conexion, password):
-    """
-    Entra al modo privilegiado (enable) del dispositivo.
-    
-    Args:
-        conexion: Objeto serial activo
-        password: Contraseña para modo enable
-    
-    Returns:
-        True si entró correctamente, False si falló
-    """
-    print("[INFO] Entrando a modo privilegiado (enable)...")
-    
-    # Enviar comando enable
-    respuesta = enviar_comando(conexion, "enable", espera=1)
-    
-    # Si pide password, enviarlo
-    if "Password:" in respuesta or "password:" in respuesta.lower():
-        respuesta = enviar_comando(conexion, password, espera=1)
-    
-    # Verificar si estamos en modo enable (prompt termina en #)
-    if "#" in respuesta:
-        print("[OK] Modo privilegiado activado")
-        return True
-    else:
-        print("[ADVERTENCIA] Puede que ya estemos en modo enable o hubo un error")
-        return True  # Continuar de todas formas
-
-
-def configurar_terminal(conexion):
-    """
-    Configura el terminal para evitar paginación y mejorar la salida.
-    
-    Args:
-        conexion: Objeto serial activo
-    """
-    print("[INFO] Configurando terminal...")
-    
-    # Desactivar paginación (terminal length 0)
-    ejecutar_comando_completo(conexion, "terminal length 0")
-    
-    # Desactivar ancho de terminal para evitar cortes
-    ejecutar_comando_completo(conexion, "terminal width 512")
-    
-    print("[OK] Terminal configurado")
-
-
-# =============================================================================
-# FUNCIONES DE ANÁLISIS DE SALIDAS
-# =============================================================================
-
-def contar_fuentes_poder(salida_show_inventory):
-    """
-    Cuenta el número de fuentes de poder según 'show inventory'.
-    
-    Args:
-        salida_show_inventory: Salida del comando show inventory
-    
-    Returns:
-        Número de fuentes de poder encontradas
-    """
-    # Buscar patrones comunes de PSU en Cisco
-    patron_psu = re.compile(r'(PWR-|Power Supply|PSU)', re.IGNORECASE)
-    
-    coincidencias = patron_psu.findall(salida_show_inventory)
-    cantidad = len(coincidencias)
-    
-    # Mínimo 1 fuente si no se detectan
-    if cantidad == 0:
-        print("[INFO] No se detectaron fuentes de poder, asumiendo 1")
-        cantidad = 1
-    
-    print(f"[INFO] Fuentes de poder detectadas: {cantidad}")
-    return cantidad
-
-
-def contar_ventiladores(salida_show_inventory):
-    """
-    Cuenta el número de ventiladores según 'show inventory'.
-    
-    Args:
-        salida_show_inventory: Salida del comando show inventory
-    
-    Returns:
-        Número de ventiladores encontrados
-    """
-    # Buscar patrones comunes de FAN en Cisco
-    patron_fan = re.compile(r'(FAN|Fan Tray)', re.IGNORECASE)
-    
-    coincidencias = patron_fan.findall(salida_show_inventory)
-    cantidad = len(coincidencias)
-    
-    # Mínimo 1 ventilador si no se detectan
-    if cantidad == 0:
-        print("[INFO] No se detectaron ventiladores, asumiendo 1")
-        cantidad = 1
-    
-    print(f"[INFO] Ventiladores detectados: {cantidad}")
-    return cantidad
+# Modelo con el que se guardan los tiempos de arranque aprendidos (compartidos con appLocal)
+MODELO = "Cisco Catalyst 9200"
 
 
 # =============================================================================
@@ -486,9 +215,6 @@ def ejecutar_prueba_2(conexion, archivo, cantidad_psu):
         
         resultado = ejecutar_comando_completo(conexion, "show environment power", espera=2)
         escribir_comando_resultado(archivo, f"show environment power (#{i + 1})", resultado)
-        
-        # Pequeña pausa entre consultas
-        time.sleep(0.5)
     
     escribir_fin_prueba(archivo, 2)
 
@@ -510,9 +236,6 @@ def ejecutar_prueba_3(conexion, archivo, cantidad_fan):
         
         resultado = ejecutar_comando_completo(conexion, "show environment fan", espera=2)
         escribir_comando_resultado(archivo, f"show environment fan (#{i + 1})", resultado)
-        
-        # Pequeña pausa entre consultas
-        time.sleep(0.5)
     
     escribir_fin_prueba(archivo, 3)
 
@@ -532,63 +255,66 @@ def ejecutar_prueba_4(conexion, archivo, password_enable):
     
     escribir_en_archivo(archivo, "\n=== INICIANDO RELOAD DEL EQUIPO ===\n")
     escribir_en_archivo(archivo, f"Hora de inicio reload: {datetime.now().strftime('%H:%M:%S')}\n")
-    
-    # Enviar comando reload
+
+    # Enviar reload y responder cada pregunta apenas aparece
+    conexion.reset_input_buffer()
     conexion.write(b"reload\n")
-    time.sleep(1)
-    
-    # Leer respuesta (puede pedir confirmación)
-    respuesta = leer_respuesta_completa(conexion, timeout_total=5)
-    escribir_en_archivo(archivo, f"Respuesta inicial: {respuesta}\n")
-    
-    # Manejar: "System configuration has been modified. Save? [yes/no]:"
-    if "Save?" in respuesta or "save" in respuesta.lower():
-        conexion.write(b"no\n")  # No guardar cambios
-        time.sleep(1)
-        respuesta = leer_respuesta_completa(conexion, timeout_total=5)
-        escribir_en_archivo(archivo, f"Respuesta a Save: {respuesta}\n")
-    
-    # Manejar: "Proceed with reload? [confirm]"
-    if "confirm" in respuesta.lower() or "proceed" in respuesta.lower():
-        conexion.write(b"\n")  # Confirmar reload
-        time.sleep(1)
-        respuesta = leer_respuesta_completa(conexion, timeout_total=5)
-        escribir_en_archivo(archivo, f"Confirmación enviada: {respuesta}\n")
-    
-    # Esperar a que el equipo reinicie
-    print(f"[INFO] Esperando {ESPERA_RELOAD} segundos para que el equipo reinicie...")
-    escribir_en_archivo(archivo, f"\nEsperando {ESPERA_RELOAD} segundos para reinicio...\n")
-    
-    tiempo_inicio_reload = time.time()
-    
-    # Monitorear el proceso de arranque
-    while time.time() - tiempo_inicio_reload < ESPERA_RELOAD:
-        if conexion.in_waiting > 0:
-            datos = leer_respuesta_completa(conexion, timeout_total=2)
-            if datos:
-                escribir_en_archivo(archivo, datos)
-                print(".", end="", flush=True)
-        time.sleep(5)
-    
-    print()  # Nueva línea después de los puntos
-    
-    # Intentar despertar la consola después del reload
-    escribir_en_archivo(archivo, "\n=== EQUIPO REINICIADO, RECONECTANDO ===\n")
-    
-    for intento in range(10):
-        despertar_consola(conexion)
-        time.sleep(2)
-        
-        respuesta = leer_respuesta_completa(conexion, timeout_total=3)
-        escribir_en_archivo(archivo, f"Intento {intento + 1}: {respuesta}\n")
-        
-        # Verificar si tenemos prompt
-        if ">" in respuesta or "#" in respuesta:
-            print(f"[OK] Consola disponible después de {intento + 1} intentos")
+
+    respuesta = ""
+    save_respondido = False
+    seguimiento = None
+    tiempo_inicio = time.time()
+    while time.time() - tiempo_inicio < TIMEOUT_CONFIRMACION_RELOAD:
+        respuesta += leer_fragmento_consola(conexion, INTERVALO_CONFIRMACION_RELOAD).decode('utf-8', errors='ignore')
+
+        # "System configuration has been modified. Save? [yes/no]:"
+        if "Save?" in respuesta and not save_respondido:
+            conexion.write(b"no\n")  # No guardar cambios
+            save_respondido = True
+            continue
+
+        # "Proceed with reload? [confirm]"
+        if "[confirm]" in respuesta and seguimiento is None:
+            conexion.write(b"\n")  # Confirmar reload
+            seguimiento = SeguimientoArranque(MODELO)
+            continue
+
+        if seguimiento is not None and any(mensaje in respuesta for mensaje in MENSAJES_INICIO_RELOAD):
             break
-        
-        time.sleep(3)
-    
+    escribir_en_archivo(archivo, f"Respuesta al reload: {respuesta}\n")
+
+    if seguimiento is None:
+        print("[ERROR] El equipo no pidió confirmar el reload")
+        escribir_fin_prueba(archivo, 4)
+        return
+
+    # Seguir el arranque hasta "Press RETURN to get started" (sin esperas fijas)
+    print("[INFO] Esperando el arranque del equipo...")
+    escribir_en_archivo(archivo, "\n=== ESPERANDO ARRANQUE DEL EQUIPO ===\n")
+    seguimiento.procesar(respuesta)
+    ultima_actividad = time.monotonic()
+    while not seguimiento.listo and seguimiento.transcurrido() < TIMEOUT_ARRANQUE_MAXIMO:
+        datos = leer_fragmento_consola(conexion, INTERVALO_SEGUIMIENTO_ARRANQUE)
+        if datos:
+            ultima_actividad = time.monotonic()
+            texto = datos.decode('utf-8', errors='ignore')
+            escribir_en_archivo(archivo, texto)
+            for etapa in seguimiento.procesar(texto):
+                print(f"[INFO] Arranque: {etapa} ({int(seguimiento.etapas[etapa])}s)")
+        elif (time.monotonic() - ultima_actividad >= SILENCIO_FIN_ARRANQUE
+              and ("ios" in seguimiento.etapas or seguimiento.transcurrido() >= seguimiento.tope())):
+            break
+
+    if seguimiento.listo:
+        seguimiento.registrar()
+
+    # Despertar la consola después del reload
+    escribir_en_archivo(archivo, "\n=== EQUIPO REINICIADO, RECONECTANDO ===\n")
+    if estabilizar_consola_post_reload(conexion, max_intentos=15):
+        print(f"[OK] Consola disponible después de {int(seguimiento.transcurrido())}s")
+    else:
+        print("[ADVERTENCIA] La consola no respondió con un prompt estable, se continúa")
+
     # Ejecutar show version después del reload
     resultado_version = ejecutar_comando_completo(conexion, "show version", espera=2)
     escribir_comando_resultado(archivo, "show version (post-reload)", resultado_version)
@@ -629,26 +355,37 @@ def ejecutar_prueba_5(conexion, archivo):
 # FUNCIÓN PRINCIPAL
 # =============================================================================
 
-def main():
+def main(argv=None):
     """
     Función principal que ejecuta todas las pruebas en secuencia.
     """
-        
+    parser = argparse.ArgumentParser(description="Pruebas de diagnóstico de un Cisco Catalyst 9200.")
+    parser.add_argument("--puerto", default=PUERTO_SERIAL,
+                        help="Puerto serial o servidor de consolas (telnet:// o socket://host:puerto)")
+    parser.add_argument("--baudios", type=int, default=BAUDRATE, help="Velocidad de la consola")
+    parser.add_argument("--password", default=PASSWORD_ENABLE, help="Contraseña de enable")
+    args = parser.parse_args(argv)
+
     # Inicializar archivo de salida
     if not iniciar_archivo_salida(ARCHIVO_SALIDA):
         print("[ERROR] No se pudo inicializar el archivo de salida. Abortando.")
         return
     
-    # Abrir conexión serial
-    conexion = abrir_conexion_serial(PUERTO_SERIAL, BAUDRATE)
-    if not conexion:
-        print("[ERROR] No se pudo establecer conexión serial. Abortando.")
+    # Abrir conexión serial (valida que responda un equipo Cisco)
+    try:
+        conexion = abrir_conexion_serial(args.puerto, args.baudios)
+    except Exception as error:
+        print(f"[ERROR] No se pudo establecer conexión serial: {error}. Abortando.")
         return
+    print(f"[OK] Conexión establecida en {args.puerto} a {args.baudios} baudios")
     
     try:
         # Preparar la conexión
+        print("[INFO] Despertando consola...")
         despertar_consola(conexion)
-        entrar_modo_enable(conexion, PASSWORD_ENABLE)
+        print("[INFO] Entrando a modo privilegiado (enable)...")
+        entrar_modo_enable(conexion, args.password)
+        print("[INFO] Configurando terminal...")
         configurar_terminal(conexion)
         
         # =====================================================================
@@ -659,6 +396,8 @@ def main():
         # Analizar inventory para determinar cantidad de PSU y FAN
         cantidad_psu = contar_fuentes_poder(resultado_inventory)
         cantidad_fan = contar_ventiladores(resultado_inventory)
+        print(f"[INFO] Fuentes de poder detectadas: {cantidad_psu}")
+        print(f"[INFO] Ventiladores detectados: {cantidad_fan}")
         
         # =====================================================================
         # PRUEBA 2: show environment power
@@ -682,7 +421,7 @@ def main():
             print("\n" + "!" * 60)
             print("EJECUTANDO RELOAD - EL EQUIPO SE REINICIARÁ")
             print("!" * 60 + "\n")
-            ejecutar_prueba_4(conexion, ARCHIVO_SALIDA, PASSWORD_ENABLE)
+            ejecutar_prueba_4(conexion, ARCHIVO_SALIDA, args.password)
         else:
             print("\n" + "!" * 60)
             print("ADVERTENCIA: Prueba 4 (reload) OMITIDA por seguridad.")